@@ -1,86 +1,24 @@
-import json, requests, time
-from dotenv import set_key, load_dotenv
+import json
+from concurrent.futures import ThreadPoolExecutor
 from random import randint
 from django.contrib.auth import get_user_model
+from django.db import connections
 from config.settings import (
-    ENV_FILE,
     BASE_URL,
-    ACCESS_TOKEN_URL,
-    ZOHO_ACCESS_TOKEN,
-    ZOHO_CLIENT_ID,
-    ZOHO_CLIENT_SECRET,
-    ZOHO_REFRESH_TOKEN,
     DEFAULT_EMAIL_DOMAIN,
     DEFAULT_USER_CREATION_PASSWORD,
+    ZOHO_CONCURRENCY,
 )
-
-# Constants
-load_dotenv(ENV_FILE)
+from shared.zoho_client import APIException, get_zoho_client
 
 User = get_user_model()
 
-HTTP_OK = 200
-HTTP_UNAUTHORIZED = 401
 LIMIT = 100
-MAX_RETRIES = 5
-SLEEP_TIME = 1
-
-
-class APIException(Exception):
-    pass
-
-
-class UnauthorizedException(APIException):
-    pass
-
-
-class RateLimitExceededException(APIException):
-    pass
-
-
-def get_headers():
-    access_token = ZOHO_ACCESS_TOKEN
-    print(access_token)
-    return {"Authorization": f"Zoho-oauthtoken {access_token}"}
-
-
-def refresh_access_token():
-    client_id = ZOHO_CLIENT_ID
-    client_secret = ZOHO_CLIENT_SECRET
-    refresh_token = ZOHO_REFRESH_TOKEN
+ELEKTRIKKALENDER_URL = f"{BASE_URL}/Elektrikkalender"
 
-    url = f"{ACCESS_TOKEN_URL}?refresh_token={refresh_token}&client_id={client_id}&client_secret={client_secret}&grant_type=refresh_token"
-    response = requests.post(url)
-    if response.status_code != HTTP_OK:
-        raise APIException(f"Error refreshing token: {response.status_code}")
 
-    data = response.json()
-    new_access_token = data.get("access_token")
-    set_key(ENV_FILE, "ZOHO_ACCESS_TOKEN", new_access_token)
-    return new_access_token
-
-
-def fetch_records(
-    endpoint, headers, params, retries=MAX_RETRIES, sleep_time=SLEEP_TIME
-):
-    for i in range(retries):
-        try:
-            response = requests.get(endpoint, headers=headers, params=params)
-            if response.status_code == HTTP_UNAUTHORIZED:
-                headers["Authorization"] = f"Zoho-oauthtoken {refresh_access_token()}"
-                continue
-            elif response.status_code == 429:
-                time.sleep(sleep_time)
-                sleep_time *= 2
-                continue
-            elif response.status_code != HTTP_OK:
-                raise APIException(f"HTTPError: {response.status_code}")
-
-            return response.json()
-        except requests.exceptions.HTTPError as err:
-            print(f"An error occurred: {err}")
-            continue
-    raise APIException("Max retries exceeded.")
+def fetch_records(endpoint, params=None):
+    return get_zoho_client().get(endpoint, params)
 
 
 def create_user(user_info):
@@ -126,22 +64,41 @@ def extract_ids(data):
 
 
 def fetch_all_elektrik_angebots():
-    headers = get_headers()
     params = {"limit": LIMIT}
-    url = BASE_URL+"/Elektrikkalender"
-    return fetch_records(url, headers, params)
-
-
-def fetch_all_detailed_elektrik_records(ids):
-    headers = get_headers()
-    data_list = []
-    for record_id in ids:
-        data = fetch_records(f"{BASE_URL}/{record_id}", headers, {})
-        if data:
-            data_list.append(data)
-        else:
-            raise APIException(f"Failed to fetch record {record_id}")
-    return data_list
+    return fetch_records(ELEKTRIKKALENDER_URL, params)
+
+
+def iter_elektrik_kalender():
+    """Alle Einträge des Reports Elektrikkalender (u. a. ID und Modified_Time), seitenweise."""
+    return get_zoho_client().iter_records(ELEKTRIKKALENDER_URL, limit=LIMIT)
+
+
+def fetch_elektrik_record(record_id):
+    data = fetch_records(f"{BASE_URL}/{record_id}")
+    if not data:
+        raise APIException(f"Failed to fetch record {record_id}")
+    return data
+
+
+def fetch_elektrik_record_in_thread(record_id):
+    try:
+        return fetch_elektrik_record(record_id)
+    finally:
+        # Rate-Limiter und Token-Speicher öffnen im Worker-Thread eigene DB-Verbindungen
+        connections.close_all()
+
+
+def fetch_all_detailed_elektrik_records(ids, max_workers=ZOHO_CONCURRENCY):
+    """
+    Detaildatensätze zu `ids`, höchstens `max_workers` Abrufe gleichzeitig;
+    Reihenfolge wie `ids`. Der erste Fehler bricht ab.
+    """
+    if not ids:
+        return []
+    # Token vorab im Hauptthread holen, damit die Worker nur die lokale Kopie lesen
+    get_zoho_client().access_token()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(fetch_elektrik_record_in_thread, ids))
 
 
 def extract_unique_elektrikers(json_list):
@@ -1,28 +1,24 @@
 from django.core.management.base import BaseCommand
-from authentication.fetch_elektrikers import (
-    fetch_all_elektrik_angebots,
-    extract_ids,
-    fetch_all_detailed_elektrik_records,
-)
+from elektriker_kalender.utils import sync_elektriker_kalender
 
 
 class Command(BaseCommand):
-    help = "Update Elektrikers from Zoho"
+    help = "Update Elektriker-Kalender from Zoho"
 
     def handle(self, *args, **kwargs):
-        self.stdout.write("Starting elektrikers update...")
+        self.stdout.write("Starting elektriker kalender update...")
         try:
-            data = fetch_all_elektrik_angebots()
-            ids = extract_ids(data)
-            fetched_records = fetch_all_detailed_elektrik_records(ids)
-
-            for user_info in fetched_records:
-                # print(user_info)
-                pass
-            self.stdout.write(self.style.SUCCESS(f"ElektrikerKalender : ...."))
+            stats = sync_elektriker_kalender()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"ElektrikerKalender : {stats['listed']} listed, "
+                    f"{stats['fetched']} fetched, {stats['created']} created, "
+                    f"{stats['updated']} updated, {stats['deleted']} deleted"
+                )
+            )
 
         except Exception as e:
             self.stdout.write(
-                self.style.ERROR("An error occurred while updating elektrikers:")
+                self.style.ERROR("An error occurred while updating elektriker kalender:")
             )
             self.stdout.write(self.style.ERROR(str(e)))
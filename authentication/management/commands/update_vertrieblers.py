@@ -1,22 +1,12 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from dotenv import set_key
 from authentication.models import Role
-import requests
 import json
-from random import randint
 from config.settings import (
-    ENV_FILE,
-    ZOHO_ACCESS_TOKEN,
     BASE_URL,
-    BASE_URL_PRIV_KUNDEN,
-    ZOHO_CLIENT_ID,
-    ZOHO_CLIENT_SECRET,
-    ZOHO_REFRESH_TOKEN,
-    DEFAULT_EMAIL_DOMAIN,
-    DEFAULT_PHONE,
     DEFAULT_USER_CREATION_PASSWORD,
 )
+from shared.zoho_client import get_zoho_client
 from vertrieb_interface.models import Editierbarer_Text
 
 User = get_user_model()
@@ -26,96 +16,41 @@ class Command(BaseCommand):
     help = "Updates the User model with the list of users from Zoho"
 
     def fetch_vertriebler_list_IDs(self):
-        access_token = ZOHO_ACCESS_TOKEN
-        if not access_token:
-            access_token = self.refresh_access_token()
-
         url = BASE_URL + "/Au_endienstler_API"
 
-        headers = {
-            "Authorization": f"Zoho-oauthtoken {access_token}",
-        }
-
         # Define an empty set to store unique Vertriebler data
         vertriebler_set = set()
 
-        # Specify the number of records to fetch per request
-        limit = 100
-        start_index = 0
-
-        while True:
-            params = {
-                "from": start_index,
-                "limit": limit,
-                "criteria": "Mail != null"
-            }
-            response = requests.get(url, headers=headers, params=params)  # type: ignore
-            if response.status_code == 401:
-                access_token = self.refresh_access_token()
-                headers["Authorization"] = f"Zoho-oauthtoken {access_token}"
-                continue
-
-            # Check the response status code
-            elif response.status_code != 200:
-                print(f"Failed to fetch data, status code: {response.status_code}")
-                break
-            print(f"access_token is alive, status code: {response.status_code}")
-            data = json.loads(response.text)
-
-            if not data["data"]:
-                break
-
-            for record in data["data"]:
-                if (
-                    "Name" in record
-                    and "Mail" in record
-                    and "ID" in record
-                    and "Mobil" in record
-                    and "Anrede" in record
-                    and "Stellenbezeichnung" in record
-                ):
-                    is_active = record["Unternehmen_verlassen_am"] == ""
-                    print(f"{is_active}: {record}")
-                    vertriebler_set.add(
-                        (
-                            record["Name"],
-                            record["ID"],
-                            record["Mail"],
-                            record["Mobil"],
-                            record["Anrede"],
-                            record["Stellenbezeichnung"],
-                            is_active,
-                        )
+        for record in get_zoho_client().iter_records(
+            url, {"criteria": "Mail != null"}, limit=100, start=0
+        ):
+            if (
+                "Name" in record
+                and "Mail" in record
+                and "ID" in record
+                and "Mobil" in record
+                and "Anrede" in record
+                and "Stellenbezeichnung" in record
+            ):
+                is_active = record["Unternehmen_verlassen_am"] == ""
+                print(f"{is_active}: {record}")
+                vertriebler_set.add(
+                    (
+                        record["Name"],
+                        record["ID"],
+                        record["Mail"],
+                        record["Mobil"],
+                        record["Anrede"],
+                        record["Stellenbezeichnung"],
+                        is_active,
                     )
-
-            # Update the start index for the next batch of records
-            start_index += limit
+                )
 
         # Convert the set to a list and print
         vertriebler_list = list(vertriebler_set)
         vertriebler_list = json.dumps(vertriebler_list, indent=4)
         return vertriebler_list
 
-    def refresh_access_token(self):
-        client_id = ZOHO_CLIENT_ID
-        client_secret = ZOHO_CLIENT_SECRET
-        refresh_token = ZOHO_REFRESH_TOKEN
-
-        url = f"https://accounts.zoho.eu/oauth/v2/token?refresh_token={refresh_token}&client_id={client_id}&client_secret={client_secret}&grant_type=refresh_token"
-
-        response = requests.post(url)
-
-        if response.status_code == 200:
-            data = response.json()
-            new_access_token = data.get("access_token")
-            print("Access token refreshed.", new_access_token)
-
-            set_key(ENV_FILE, "ZOHO_ACCESS_TOKEN", new_access_token)
-
-            return new_access_token
-        else:
-            print(f"Error refreshing token: {response.status_code}")
-
     def signatureCreator(self, user):
         stellenbez = ""
         if user.typ == "Vertrieb":
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0033_remove_user_initial_notstrom"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="zoho_full_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="zoho_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -117,6 +117,9 @@ class User(AbstractBaseUser, PermissionsMixin, models.Model):
     zoho_data = models.JSONField(default=dict, blank=True)
     zoho_data_text = models.TextField(default="", blank=True)
     records_fetch_limit = models.PositiveIntegerField(default=400)
+    # Delta-Sync der Privatkunden: Stand des letzten Abrufs bzw. des letzten Vollabgleichs
+    zoho_synced_at = models.DateTimeField(null=True, blank=True)
+    zoho_full_synced_at = models.DateTimeField(null=True, blank=True)
     sonstiges = models.TextField(blank=True, null=True)
     role = models.ForeignKey(
         Role,
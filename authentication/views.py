@@ -17,6 +17,7 @@ from schema_graph.views import Schema
 from .utils import handle_avatar_upload
 from authentication.forms import AvatarUploadForm
 from authentication.models import User
+from shared.zoho_client import get_zoho_client
 
 
 @staff_member_required
@@ -57,6 +58,12 @@ def protected_schema_view(request):
     return view(request)
 
 
+@staff_member_required
+def zoho_client_stats(request):
+    """Aufrufe, Fehler, Wiederholungen und Laufzeiten des Zoho-Clients in diesem Worker-Prozess."""
+    return JsonResponse(get_zoho_client().stats())
+
+
 @staff_member_required
 def update_elektrikers(request):
     def stream_response():
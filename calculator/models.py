@@ -1,38 +1,32 @@
 from django.db import models
 from authentication.models import User
 from django.core.validators import MinValueValidator
-from prices.models import (
-    WrGarantiePreise,
-    KwpPreise,
-    OptionalAccessoriesPreise,
-    AndereKonfigurationWerte,
-    SolarModulePreise,
-    WallBoxPreise,
-)
+from prices.catalog import get_price_catalog
+from shared.projection import LegacyArbeitsListeMixin, price_inflation, project_offer
 from math import ceil
 from django.utils import timezone
-from django.core.cache import cache
-from django.core.exceptions import ObjectDoesNotExist
 from django.utils.formats import date_format
 
 now = timezone.now()
 now_german = date_format(now, "DATETIME_FORMAT")
 
 
-def get_price(model, name):
-    model_name = model.__name__
-    key = f"{model_name}_{name}"
-    price = cache.get(key)
-    if price is None:
-        try:
-            price = model.objects.get(name=name).price
-        except ObjectDoesNotExist:
-            price = 0
-        cache.set(key, price)
-    return price
-
-
 # Model properties
+CALCULATED_FIELDS = (
+    "wallbox_angebot_price",
+    "optimizer_angebot_price",
+    "batteriespeicher_angebot_price",
+    "angebotsumme",
+    "benotigte_restenergie",
+    "nutzbare_nutzenergie",
+    "erzeugte_energie_pro_jahr",
+    "einspreisevergütung_gesamt",
+    "abzug_vergutung",
+    "Ersparnis",
+    "kosten_fur_restenergie",
+    "Rest_liste",
+    "Arbeits_liste",
+)
 MODULE_NAME_MAP = {
     "Phono Solar PS420M7GFH-18/VNH": "Phono Solar PS420M7GFH-18/VNH",
     "Jinko Solar Tiger Neo N-type JKM425N-54HL4-B": "Jinko Solar Tiger Neo N-type JKM425N-54HL4-B",
@@ -42,7 +36,7 @@ BATT_DICT = {1: 0.6, 2: 0.7, 3: 0.75, 4: 0.8, 5: 0.85, 6: 0.92}
 DEFAULT_BATT_USAGE = 0.3
 
 
-class Calculator(models.Model):
+class Calculator(LegacyArbeitsListeMixin, models.Model):
     calculator_id = models.CharField(max_length=255, unique=True, primary_key=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
@@ -158,18 +152,31 @@ class Calculator(models.Model):
     Full_ticket_preis = models.FloatField(default=0.00)
 
     def get_optional_accessory_price(self, name):
-        return float(OptionalAccessoriesPreise.objects.get(name=name).price)
+        return float(self.price_catalog.accessory_price(name))
 
     def get_module_preis(self, name):
-        return float(SolarModulePreise.objects.get(name=name).price)
+        return float(self.price_catalog.module(name)["price"])
 
     def get_wr_garantie_preis(self, name):
-        return float(WrGarantiePreise.objects.get(name=name).price)
+        return float(self.price_catalog.wr_garantie_price(name))
 
     def get_leistungs_garantie(self, name):
-        return str(SolarModulePreise.objects.get(name=name).leistungs_garantie)
+        return str(self.price_catalog.module(name)["leistungs_garantie"])
+
+    @property
+    def price_catalog(self):
+        if not hasattr(self, "_price_catalog"):
+            self._price_catalog = get_price_catalog()
+        return self._price_catalog
 
     def save(self, *args, **kwargs):
+        self._price_catalog = get_price_catalog()
+        self.calculate_fields()
+        super().save(*args, **kwargs)
+
+    def calculate_fields(self):
+        """Setzt alle berechneten Felder aus den Eingaben, ohne zu speichern."""
+        self.__dict__.pop("_projection", None)
         self.wallbox_angebot_price = self.full_wallbox_preis
         self.optimizer_angebot_price = float(self.full_optimizer_preis)
         if self.batteriespeicher_preis:
@@ -185,53 +192,42 @@ class Calculator(models.Model):
         self.Rest_liste = self.rest_liste
         self.Arbeits_liste = self.arbeits_liste
 
-        super().save(*args, **kwargs)
-
     @property
     def leistungsmodul_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul").price)
+        return float(self.price_catalog.accessory_price("leistungsmodul"))
 
     @property
     def stromgrundpreis_gesamt(self):
         return round(float(self.grundpreis) * 12 * int(self.zeitraum), 2)
 
-    @staticmethod
-    def priceInflation(pricePerYear, increasePerYear, years):
-        sumPrice = 0
-        priceList = []
-        for i in range(years):
-            sumPrice += pricePerYear
-            priceList.append(sumPrice)
-            pricePerYear = pricePerYear * (1.0 + increasePerYear)
-        return sumPrice, priceList
-
-    def get_arbeitspreis_and_list(self):
-        if not hasattr(self, "_arbeitspreis_and_list"):
-            self._arbeitspreis_and_list = self.priceInflation(
-                float(self.arbeitspreis) / 100 * float(self.verbrauch),
-                float(self.prognose) / 100,
-                int(self.zeitraum),
-            )
-        return self._arbeitspreis_and_list
-
     @property
     def arbeitspreis_gesamt(self):
-        arb_ges, _ = self.get_arbeitspreis_and_list()
-        return round(arb_ges, 2)
+        arb_ges, _ = price_inflation(
+            float(self.arbeitspreis) / 100 * float(self.verbrauch),
+            float(self.prognose) / 100,
+            int(self.zeitraum),
+        )
+        return round(float(arb_ges[0]), 2)
 
     @property
-    def arbeits_liste(self):
-        _, arb_liste = self.get_arbeitspreis_and_list()
-        return arb_liste
+    def projection(self):
+        """Je Instanz einmal berechnet, `calculate_fields()` verwirft sie vorher."""
+        if "_projection" not in self.__dict__:
+            self._projection = project_offer(self)
+        return self._projection
+
+    def arbeitspreis_liste(self):
+        return self.projection.arbeit_liste()
+
+    def projected_rest_liste(self):
+        return self.projection.mit_pv_liste()
 
     @property
     def erzProJahr(self):
         direction_map = {"Sud": "erzeugung_sued", "Ost/West": "erzeugung_ost_west"}
         direction = str(self.ausrichtung)
         if direction in direction_map:
-            return AndereKonfigurationWerte.objects.get(
-                name=direction_map[direction]
-            ).value
+            return self.price_catalog.andere_value(direction_map[direction])
         else:
             return 0.00
 
@@ -246,9 +242,7 @@ class Calculator(models.Model):
         }
         complexity = str(self.komplex)
         if complexity in complexity_map:
-            return AndereKonfigurationWerte.objects.get(
-                name=complexity_map[complexity]
-            ).value
+            return self.price_catalog.andere_value(complexity_map[complexity])
         else:
             return 0.00
 
@@ -258,24 +252,30 @@ class Calculator(models.Model):
 
     """
 
-    @staticmethod
-    def get_values():
-        return {obj.name: obj.zuschlag for obj in SolarModulePreise.objects.all()}
+    def get_values(self):
+        return {
+            name: row["zuschlag"]
+            for name, row in self.price_catalog.rows("SolarModulePreise").items()
+        }
 
-    @staticmethod
-    def get_prices():
-        return {obj.name: obj.price for obj in OptionalAccessoriesPreise.objects.all()}
+    def get_prices(self):
+        return {
+            name: row["price"]
+            for name, row in self.price_catalog.rows("OptionalAccessoriesPreise").items()
+        }
 
-    @staticmethod
-    def get_module_prices():
-        return {obj.name: obj.price for obj in SolarModulePreise.objects.all()}
+    def get_module_prices(self):
+        return {
+            name: row["price"]
+            for name, row in self.price_catalog.rows("SolarModulePreise").items()
+        }
 
-    def calculate_price(self, model, name, multiplier):
+    def calculate_price(self, name, multiplier):
         try:
             multiplier = int(multiplier)
         except ValueError:
             multiplier = 0
-        price = get_price(model, name)
+        price = self.price_catalog.get_price("OptionalAccessoriesPreise", name)
         return price * multiplier
 
     @property
@@ -303,21 +303,21 @@ class Calculator(models.Model):
             anz_speicher = int(self.anz_speicher)
             if self.speicher_model == "LUNA 2000-5-S0":
                 batteriePreis = self.calculate_price(
-                    OptionalAccessoriesPreise, "batteriemodul_huawei5", anz_speicher
+                    "batteriemodul_huawei5", anz_speicher
                 )
                 batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * float(
                     leistungsmodulePreis
                 )
             elif self.speicher_model == "LUNA 2000-7-S1":
                 batteriePreis = self.calculate_price(
-                    OptionalAccessoriesPreise, "batteriemodul_huawei7", anz_speicher
+                    "batteriemodul_huawei7", anz_speicher
                 )
                 batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * float(
                     leistungsmodulePreis
                 )
             elif self.speicher_model == "Vitocharge VX3 PV-Stromspeicher":
                 batteriePreis = self.calculate_price(
-                    OptionalAccessoriesPreise, "batteriemodul_viessmann", anz_speicher
+                    "batteriemodul_viessmann", anz_speicher
                 )
             return batteriePreis
         else:
@@ -359,12 +359,12 @@ class Calculator(models.Model):
 
     @property
     def rest_strom_preis(self):
-        reststromPreis, _ = self.priceInflation(
+        reststromPreis, _ = price_inflation(
             float(self.arbeitspreis) / 100 * float(self.restenergie),
             float(self.prognose) / 100,
-            self.zeitraum,
+            int(self.zeitraum),
         )
-        return round(reststromPreis, 2)
+        return round(float(reststromPreis[0]), 2)
 
     @property
     def strom_ohne(self):
@@ -402,15 +402,15 @@ class Calculator(models.Model):
 
     @property
     def wallbox_kabel_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="kabelpreis").price)
+        return float(self.price_catalog.accessory_price("kabelpreis"))
 
     @property
     def harvi_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="harvi").price)
+        return float(self.price_catalog.accessory_price("harvi"))
 
     @property
     def optimizer_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="optimizer").price)
+        return float(self.price_catalog.accessory_price("optimizer"))
 
     @property
     def elwa_price(self):
@@ -444,7 +444,7 @@ class Calculator(models.Model):
     @property
     def full_wallbox_preis(self):
         if self.wallbox_anzahl:
-            preis = float(WallBoxPreise.objects.get(name=str(self.wallboxtyp)).price)
+            preis = float(self.price_catalog.wallbox_price(str(self.wallboxtyp)))
             preis *= self.wallbox_anzahl
             if self.kabelanschluss and self.kabelanschluss >= 10:
                 preis += (self.kabelanschluss - 10) * self.get_optional_accessory_price(
@@ -479,13 +479,13 @@ class Calculator(models.Model):
             name = prefix + str(kw)
 
             #return float(KwpPreise.objects.get(name=name).price)
-            return (float(KwpPreise.objects.get(name=name).price)) * float(
+            return (float(self.price_catalog.kwp_price(name))) * float(
                 self.get_zuschlag
             )
 
         def get_garantie_price(kw, years):
             name = f"garantie{kw}_{years}"
-            return float(WrGarantiePreise.objects.get(name=name).price)
+            return float(self.price_catalog.wr_garantie_price(name))
 
         limits = [5, 7, 10, 12, 15, 20, 25, 30]
         ranges = (
@@ -521,7 +521,7 @@ class Calculator(models.Model):
     @property
     def kosten_pva(self):
         return float(self.angebots_summe) * float(
-            1 + AndereKonfigurationWerte.objects.get(name="steuersatz").value
+            1 + self.price_catalog.andere_value("steuersatz")
         )
 
     @property
@@ -550,17 +550,4 @@ class Calculator(models.Model):
         )
         return round(ersp, 2)
 
-    @property
-    def rest_liste(self):
-        restenergie = float(self.verbrauch) - self.nutz_energie
-        _, restListe = self.priceInflation(
-            float(self.arbeitspreis) / 100 * restenergie,
-            float(self.prognose) / 100,
-            self.zeitraum,
-        )
-        for i in range(self.zeitraum):
-            self.arbeits_liste[i] += float(self.grundpreis) * 12 * (i + 1)
-            restListe[i] += float(self.grundpreis) * 12 * (i + 1)
-            restListe[i] += self.kosten_pva
-            restListe[i] -= self.einsp_pro_jahr * (i + 1)
-        return restListe
+
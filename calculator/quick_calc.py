@@ -0,0 +1,63 @@
+"""
+Zustandsloser Schnellrechner für das Dashboard-Widget.
+
+Rechnet dieselben Werte wie `Calculator.save()`, aber auf einer ungespeicherten
+Instanz: keine Schreibzugriffe auf die gemeinsame Calculator-Zeile. Ergebnisse
+werden über einen Hash der Eingaben im Django-Cache gehalten. Ohne `CACHES` in den
+Settings ist das der LocMemCache jedes Prozesses: jeder Worker rechnet eine Eingabe
+einmal selbst, und der Cache wächst je Worker bis zu dessen Eintragslimit. Für einen
+gemeinsamen Cache genügt ein geteiltes Backend (z. B. Redis) in `CACHES`.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from calculator.forms import CalculatorForm
+from calculator.models import CALCULATED_FIELDS
+from prices.catalog import get_price_catalog
+
+INPUT_FIELDS = tuple(
+    field for field in CalculatorForm.Meta.fields if field not in CALCULATED_FIELDS
+)
+CACHE_PREFIX = "quick_calc"
+CACHE_TIMEOUT = 60 * 60
+
+
+def calc_cache_key(inputs, users_aufschlag, catalog_version):
+    """
+    Schlüssel aus Eingaben, Aufschlag des Vertrieblers und Preiskatalog-Version:
+    nach einer Preisänderung werden alte Ergebnisse nicht mehr getroffen.
+    """
+    payload = json.dumps(
+        [inputs, str(users_aufschlag), catalog_version], sort_keys=True, default=str
+    )
+    return f"{CACHE_PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def quick_calc(user, data):
+    """
+    Liefert `(ergebnis, fehler)` für die Formulardaten `data` (QueryDict oder dict).
+    Ungültige Eingaben werden nicht gecacht.
+    """
+    catalog = get_price_catalog()
+    inputs = {field: data.get(field) for field in INPUT_FIELDS}
+    key = calc_cache_key(inputs, user.users_aufschlag, catalog.version)
+
+    result = cache.get(key)
+    if result is not None:
+        return result, None
+
+    form = CalculatorForm(data, user=user)
+    if not form.is_valid():
+        return None, form.errors.get_json_data()
+
+    calculator = form.save(commit=False)
+    calculator.user = user
+    calculator._price_catalog = catalog
+    calculator.calculate_fields()
+
+    result = {field: getattr(calculator, field) for field in INPUT_FIELDS}
+    result.update({field: getattr(calculator, field) for field in CALCULATED_FIELDS})
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result, None
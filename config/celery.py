@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import worker_init
 
 from celery.schedules import crontab
 from django.conf import settings
@@ -40,5 +41,36 @@ app.conf.beat_schedule = {
             day_of_month=1, hour=2, minute=0
         ),  # Monatlich am ersten Tag des Monats um 02:00 Uhr
     },
+    "reconcile_zoho_kunden": {
+        # Vollabgleich der Privatkunden mit Zoho, fängt alles auf, was der Delta-Sync verpasst
+        "task": "vertrieb_interface.tasks.reconcile_zoho_kunden",
+        "schedule": crontab(hour=3, minute=0),  # Täglich um 03:00 Uhr
+    },
+    "drain_zoho_outbox": {
+        # Wiederholt fällige Zoho-Schreibzugriffe aus der Outbox (neue Einträge werden sofort angestoßen)
+        "task": "vertrieb_interface.tasks.drain_zoho_outbox",
+        "schedule": crontab(),  # Jede Minute
+    },
+    "refresh_elektriker_kalender": {
+        # Abgleich des Elektriker-Kalenders mit Zoho, lädt nur geänderte Einträge im Detail
+        "task": "elektriker_kalender.tasks.refresh_elektriker_kalender",
+        "schedule": crontab(minute="*/15"),  # Alle 15 Minuten
+    },
 }
 app.autodiscover_tasks()
+
+
+@worker_init.connect
+def zoho_background_priority(**kwargs):
+    # Zoho-Aufrufe aus Celery-Tasks stehen beim Rate-Limiter hinter interaktiven Anfragen
+    from shared.zoho_rate_limit import BACKGROUND, set_default_priority
+
+    set_default_priority(BACKGROUND)
+
+
+@worker_init.connect
+def preload_pdf_assets(**kwargs):
+    # Schriften und Logos der PDF-Generatoren einmal laden, die Worker-Prozesse erben sie
+    from shared.pdf_assets import preload
+
+    preload()
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
 
@@ -185,10 +186,69 @@ BASE_URL_PRIV_KUNDEN = os.getenv("BASE_URL_PRIV_KUNDEN")
 REFRESH_URL = os.getenv("REFRESH_URL")
 POST_ANGEBOT_URL = os.getenv("POST_ANGEBOT_URL")
 ACCESS_TOKEN_URL = os.getenv("ACCESS_TOKEN_URL")
+# Formular für neue Angebote und Report der Projekte; für Tests z. B. auf `manage.py fake_zoho` umbiegen
+ZOHO_ANGEBOT_FORM_URL = os.getenv(
+    "ZOHO_ANGEBOT_FORM_URL",
+    "https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/form/Angebot",
+)
+ZOHO_PROJEKT_REPORT_URL = os.getenv(
+    "ZOHO_PROJEKT_REPORT_URL",
+    "https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/report/PVA_klein1",
+)
 ZOHO_ACCESS_TOKEN = os.getenv("ZOHO_ACCESS_TOKEN")
 ZOHO_CLIENT_ID = os.getenv("ZOHO_CLIENT_ID")
 ZOHO_CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
 ZOHO_REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
+# (Verbindungs-, Lese-)Timeout in Sekunden, Wiederholungen bei 429/5xx, Backoff-Basis in Sekunden
+ZOHO_TIMEOUT = (
+    float(os.getenv("ZOHO_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("ZOHO_READ_TIMEOUT", "30")),
+)
+ZOHO_MAX_RETRIES = int(os.getenv("ZOHO_MAX_RETRIES", "4"))
+ZOHO_BACKOFF = float(os.getenv("ZOHO_BACKOFF", "1"))
+ZOHO_POOL_SIZE = int(os.getenv("ZOHO_POOL_SIZE", "10"))
+# Seiten, die beim Blättern großer Reports höchstens gleichzeitig abgerufen werden
+ZOHO_CONCURRENCY = int(os.getenv("ZOHO_CONCURRENCY", "4"))
+# "database" (prozessübergreifend) oder "memory" (Tests/lokal); Refresh so viele Sekunden vor Ablauf
+ZOHO_TOKEN_STORE = os.getenv("ZOHO_TOKEN_STORE", "database")
+ZOHO_TOKEN_REFRESH_MARGIN = int(os.getenv("ZOHO_TOKEN_REFRESH_MARGIN", "300"))
+# Kundendaten gelten so viele Sekunden als aktuell; danach stößt das Dashboard einen Hintergrund-Sync an
+ZOHO_SYNC_TTL = int(os.getenv("ZOHO_SYNC_TTL", "900"))
+# Outbox für Schreibzugriffe: Einträge je Lauf, Versuche bis ein Eintrag als fehlgeschlagen gilt
+ZOHO_OUTBOX_BATCH_SIZE = int(os.getenv("ZOHO_OUTBOX_BATCH_SIZE", "50"))
+ZOHO_OUTBOX_MAX_ATTEMPTS = int(os.getenv("ZOHO_OUTBOX_MAX_ATTEMPTS", "10"))
+# Sekunden, die ein Worker einen Eintrag beim Senden für sich beansprucht; länger als ein
+# Aufruf samt Wiederholungen und Drosselung dauern kann
+ZOHO_OUTBOX_LEASE = int(os.getenv("ZOHO_OUTBOX_LEASE", "900"))
+# Sekunden nach einer Preisänderung, bis offene Angebote/Tickets neu bepreist werden;
+# weitere Änderungen in dieser Zeit kommen in denselben Lauf
+REPRICING_DELAY = int(os.getenv("REPRICING_DELAY", "120"))
+# Neubepreisung nach Preisänderungen überhaupt einreihen; unter "manage.py test" standardmäßig aus
+REPRICING_ENABLED = (
+    os.getenv("REPRICING_ENABLED", str(sys.argv[1:2] != ["test"])) == "True"
+)
+# Token-Bucket je Endpunktfamilie (Aufrufe pro Minute, Burst), prozessübergreifend ("database") oder "memory"
+ZOHO_RATE_LIMITS = {
+    "read": (
+        int(os.getenv("ZOHO_RATE_READ_PER_MINUTE", "40")),
+        int(os.getenv("ZOHO_RATE_READ_BURST", "10")),
+    ),
+    "write": (
+        int(os.getenv("ZOHO_RATE_WRITE_PER_MINUTE", "20")),
+        int(os.getenv("ZOHO_RATE_WRITE_BURST", "5")),
+    ),
+}
+ZOHO_RATE_LIMITER = os.getenv("ZOHO_RATE_LIMITER", "database")
+# Aufrufe pro Tag (0 = unbegrenzt); Hintergrundjobs dürfen nur diesen Anteil nutzen
+# und lassen im Bucket diesen Anteil des Bursts für interaktive Anfragen frei
+ZOHO_DAILY_BUDGET = int(os.getenv("ZOHO_DAILY_BUDGET", "25000"))
+ZOHO_BACKGROUND_BUDGET_SHARE = float(os.getenv("ZOHO_BACKGROUND_BUDGET_SHARE", "0.8"))
+ZOHO_INTERACTIVE_RESERVE = float(os.getenv("ZOHO_INTERACTIVE_RESERVE", "0.3"))
+# Höchstens so viele Sekunden wird auf einen freien Aufruf gewartet (interaktiv, Hintergrund)
+ZOHO_THROTTLE_MAX_WAIT = {
+    "interactive": float(os.getenv("ZOHO_THROTTLE_MAX_WAIT_INTERACTIVE", "10")),
+    "background": float(os.getenv("ZOHO_THROTTLE_MAX_WAIT_BACKGROUND", "300")),
+}
 SERVER_UPLINK_KEY = os.getenv("SERVER_UPLINK_KEY")
 CLIENT_UPLINK_KEY = os.getenv("CLIENT_UPLINK_KEY")
 DEVELOPEMENT_MODE = os.getenv(f"DEVELOPEMENT")
@@ -196,6 +256,12 @@ TELEBOT_TOKEN = os.getenv("TELEBOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 RABBITMQ_DEFAULT_USER = os.getenv("RABBITMQ_DEFAULT_USER")
 RABBITMQ_DEFAULT_PASS = os.getenv("RABBITMQ_DEFAULT_PASS")
+# PDF-Erstellung läuft auf einer eigenen Queue mit eigenem Worker (supervisord: celerypdfworker)
+CELERY_TASK_ROUTES = {
+    "vertrieb_interface.tasks.render_pdf": {"queue": "pdf"},
+}
+# Sekunden, nach denen ein PDF-Job im Status "Wird erstellt" als fehlgeschlagen gilt (abgestürzter Worker)
+PDF_JOB_TIMEOUT = int(os.getenv("PDF_JOB_TIMEOUT", "300"))
 
 TELEGRAM_LOGGING = False
 
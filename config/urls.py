@@ -9,6 +9,7 @@ from authentication.views import (
     update_elektrikers,
     delete_unused_data,
     protected_schema_view,
+    zoho_client_stats,
 )
 
 
@@ -36,6 +37,7 @@ urlpatterns = [
     path("update_elektrikers/", update_elektrikers, name="update_elektrikers"),
     path("delete_unused_data/", delete_unused_data, name="delete_unused_data"),
     path("admin/schema/", protected_schema_view, name="schema_view"),
+    path("admin/zoho_stats/", zoho_client_stats, name="zoho_client_stats"),
 ]
 
 # General Paths
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elektriker_kalender", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="electriccalendar",
+            name="zoho_modified_time",
+            field=models.CharField(blank=True, default="", max_length=30),
+        ),
+        migrations.AlterField(
+            model_name="electriccalendar",
+            name="zoho_id",
+            field=models.CharField(db_index=True, default="", max_length=20),
+        ),
+    ]
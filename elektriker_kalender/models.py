@@ -123,7 +123,9 @@ class ElectricCalendar(TimeStampMixin):
     calendar_id = models.CharField(
         max_length=255, primary_key=True, unique=True, default=None
     )
-    zoho_id = models.CharField(max_length=20, default="")
+    zoho_id = models.CharField(max_length=20, default="", db_index=True)
+    # Modified_Time aus Zoho beim letzten Abgleich; unverändert -> kein Detailabruf
+    zoho_modified_time = models.CharField(max_length=30, blank=True, default="")
     current_date = models.DateField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     is_locked = models.BooleanField(default=False)
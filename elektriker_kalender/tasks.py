@@ -0,0 +1,52 @@
+from celery import shared_task
+from django.core.cache import cache
+from django.db import DatabaseError
+from elektriker_kalender.utils import sync_elektriker_kalender
+from shared.zoho_client import APIException
+from celery.utils.log import get_task_logger
+import logging
+
+# Konfigurieren des Loggers für die Ausgabe von Log-Meldungen
+logger = get_task_logger(__name__)
+logger.setLevel(logging.INFO)
+
+# So lange wird nach dem Einreihen kein weiterer Abgleich über die Kalenderseite angestoßen
+KALENDER_REFRESH_PENDING_TIMEOUT = 120
+
+
+@shared_task
+def refresh_elektriker_kalender():
+    """
+    Gleicht den Elektriker-Kalender mit Zoho ab; nur neue oder geänderte Einträge
+    werden im Detail geladen (siehe `sync_elektriker_kalender`).
+    """
+    logger.info("Task - refresh_elektriker_kalender  - starting")
+    try:
+        stats = sync_elektriker_kalender()
+        logger.info(
+            f"Elektriker-Kalender: {stats['listed']} listed, {stats['fetched']} fetched, "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['deleted']} deleted."
+        )
+        return stats
+    except (APIException, DatabaseError) as e:
+        logger.error(f"Failed to refresh Elektriker-Kalender: {e}")
+    finally:
+        cache.delete("elektriker_kalender_refresh")
+
+
+def schedule_elektriker_kalender_refresh():
+    """
+    Reiht `refresh_elektriker_kalender` ein, sofern nicht schon ein Abgleich aussteht.
+    Blockiert nie auf Zoho; ist der Broker nicht erreichbar, bleibt es beim lokalen Stand.
+    """
+    if not cache.add(
+        "elektriker_kalender_refresh", True, KALENDER_REFRESH_PENDING_TIMEOUT
+    ):
+        return True
+    try:
+        refresh_elektriker_kalender.delay()
+    except Exception as e:
+        logger.error(f"Failed to schedule Elektriker-Kalender refresh: {e}")
+        cache.delete("elektriker_kalender_refresh")
+        return False
+    return True
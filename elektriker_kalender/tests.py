@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from authentication.models import User
+from elektriker_kalender.models import ElectricCalendar, Position
+from elektriker_kalender.utils import sync_elektriker_kalender
+
+
+def kalender(zoho_id, elektriker, modified="01-Oct-2026 10:00:00"):
+    return {
+        "ID": zoho_id,
+        "Modified_Time": modified,
+        "Elektriker_calfield": elektriker,
+        "Kundenname": f"Kunde {zoho_id}",
+        "Elektriktermin_am": "18-Oct-2026 09:30",
+    }
+
+
+class SyncElektrikerKalenderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.elektriker = User.objects.create(
+            username="elektriker_ea", kuerzel="EA", zoho_id=501, beruf="Elektriker"
+        )
+
+    def sync(self, listing, details=None):
+        """Abgleich mit `listing` als Report und `details` als Detaildatensätzen (Standard: wie gelistet)."""
+        details = {record["ID"]: record for record in (details or listing)}
+        with mock.patch(
+            "elektriker_kalender.utils.iter_elektrik_kalender",
+            return_value=iter(listing),
+        ), mock.patch(
+            "elektriker_kalender.utils.fetch_all_detailed_elektrik_records",
+            side_effect=lambda ids: [{"data": details[zoho_id]} for zoho_id in ids],
+        ):
+            return sync_elektriker_kalender()
+
+    def zoho_ids(self):
+        return set(ElectricCalendar.objects.values_list("zoho_id", flat=True))
+
+    def test_deletes_entries_no_longer_listed(self):
+        self.sync([kalender("1", 501), kalender("2", 501), kalender("3", 501)])
+        Position.objects.create(
+            calendar=ElectricCalendar.objects.get(zoho_id="2"), quantity=1
+        )
+
+        stats = self.sync([kalender("1", 501), kalender("3", 501)])
+        self.assertEqual(stats["deleted"], 1)
+        self.assertEqual(self.zoho_ids(), {"1", "3"})
+        self.assertFalse(Position.objects.exists())
+
+    def test_deletes_entries_reassigned_to_unknown_elektriker(self):
+        self.sync([kalender("1", 501), kalender("2", 501)])
+
+        # Liste mit Elektriker: gar nicht erst gelistet
+        listing = [kalender("1", 999, "02-Oct-2026 08:00:00"), kalender("2", 501)]
+        self.assertEqual(self.sync(listing)["deleted"], 1)
+        self.assertEqual(self.zoho_ids(), {"2"})
+
+        # Liste ohne Elektriker: erst der Detaildatensatz zeigt die Neuzuordnung
+        listing = [{"ID": "2", "Modified_Time": "03-Oct-2026 08:00:00"}]
+        details = [kalender("2", 999, "03-Oct-2026 08:00:00")]
+        self.assertEqual(self.sync(listing, details)["deleted"], 1)
+        self.assertEqual(self.zoho_ids(), set())
+
+    def test_empty_listing_keeps_entries(self):
+        self.sync([kalender("1", 501)])
+        self.assertEqual(self.sync([])["deleted"], 0)
+        self.assertEqual(self.zoho_ids(), {"1"})
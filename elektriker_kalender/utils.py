@@ -1,63 +1,156 @@
-from django.core.exceptions import ObjectDoesNotExist
 from datetime import datetime
+from django.db import transaction
+from django.utils import timezone
+from authentication.fetch_elektrikers import (
+    fetch_all_detailed_elektrik_records,
+    iter_elektrik_kalender,
+)
 from authentication.models import User
 from elektriker_kalender.models import (
     ElectricCalendar,
     PVAKlein1,
-)  # Make sure to replace "your_app" with the name of your Django app
+)
 import random
 
+# Felder, die bei jedem Abgleich aus dem Zoho-Detaildatensatz übernommen werden
+SYNCED_FIELDS = [
+    "user",
+    "anschluss_PVA",
+    "elektriker_calfield",
+    "kundenname",
+    "privatkunde_adresse_pva",
+    "besonderheiten",
+    "elektriktermin_am",
+    "kundenname_rawdata",
+    "termin_best_tigt",
+    "zoho_modified_time",
+]
 
-def create_instances(data_list, kurz):
-    for item in data_list:
-        data = item["data"]
-        zoho_id = str(
-            data["Elektriker_calfield"]
-        )  # Convert ID to string since zoho_id is a CharField
 
-        try:
-            # Try to get User by zoho_id
-            user = User.objects.get(zoho_id=zoho_id)
-        except ObjectDoesNotExist:
-            # If User does not exist, skip this data
+def parse_elektriktermin(value):
+    """ "18-Oct-2026 09:30" -> naive datetime (lokale Zeit) oder None."""
+    try:
+        return datetime.strptime(value, "%d-%b-%Y %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def calendar_values(data):
+    elektriktermin_am = parse_elektriktermin(data.get("Elektriktermin_am"))
+    return {
+        "anschluss_PVA": data.get("Anschluss_PVA"),
+        "elektriker_calfield": int(data["Elektriker_calfield"]),
+        "kundenname": data.get("Kundenname"),
+        "privatkunde_adresse_pva": data.get("Privatkunde.Adresse_PVA"),
+        "besonderheiten": data.get("Besonderheiten"),
+        "elektriktermin_am": (
+            timezone.make_aware(elektriktermin_am) if elektriktermin_am else None
+        ),
+        "kundenname_rawdata": data.get("Kundenname-rawdata"),
+        "termin_best_tigt": data.get("Termin_best_tigt"),
+    }
+
+
+def sync_elektriker_kalender():
+    """
+    Gleicht `ElectricCalendar` mit dem Zoho-Report Elektrikkalender ab.
+
+    Die Liste liefert je Eintrag ID und Modified_Time; Detaildatensätze werden nur für
+    neue oder seit dem letzten Abgleich geänderte Einträge geholt (parallel, siehe
+    `fetch_all_detailed_elektrik_records`) und per bulk_create/bulk_update gespeichert.
+    Einträge ohne passenden Elektriker (`User.zoho_id`) werden übersprungen; enthält
+    die Liste schon `Elektriker_calfield`, gar nicht erst im Detail geladen.
+    Lokale Einträge, die Zoho nicht mehr listet oder die jetzt einem Elektriker ohne
+    lokalen Benutzer gehören, werden samt Positionen gelöscht.
+    """
+    elektriker_zoho_ids = {
+        str(zoho_id)
+        for zoho_id in User.objects.filter(zoho_id__isnull=False).values_list(
+            "zoho_id", flat=True
+        )
+    }
+    listed = {}
+    for record in iter_elektrik_kalender():
+        elektriker = record.get("Elektriker_calfield")
+        if elektriker and str(elektriker) not in elektriker_zoho_ids:
             continue
-        try:
-            # Try to get ElectricCalendar by zoho_id
-            ElectricCalendar.objects.get(zoho_id=data["ID"])
-        except ObjectDoesNotExist:
-            # If ElectricCalendar does not exist, create a new one
-            elektriktermin_am = datetime.strptime(
-                data["Elektriktermin_am"], "%d-%b-%Y %H:%M"
-            )
-            elektriker_calfield = int(data["Elektriker_calfield"])
+        listed[str(record["ID"])] = record.get("Modified_Time", "")
+    known = dict(
+        ElectricCalendar.objects.filter(zoho_id__in=listed).values_list(
+            "zoho_id", "zoho_modified_time"
+        )
+    )
+    # ohne Modified_Time im Report lässt sich nichts vergleichen: dann immer neu holen
+    changed = [
+        zoho_id
+        for zoho_id, modified in listed.items()
+        if not modified or known.get(zoho_id) != modified
+    ]
+    records = [
+        record["data"] for record in fetch_all_detailed_elektrik_records(changed)
+    ]
+
+    elektriker_ids = {int(data["Elektriker_calfield"]) for data in records}
+    users = User.objects.filter(zoho_id__in=elektriker_ids).in_bulk(
+        field_name="zoho_id"
+    )
+    existing = {
+        calendar.zoho_id: calendar
+        for calendar in ElectricCalendar.objects.filter(zoho_id__in=changed)
+    }
 
+    to_create, to_update, pva_kleins = [], [], []
+    unassigned = set()
+    for data in records:
+        user = users.get(int(data["Elektriker_calfield"]))
+        if user is None:
+            unassigned.add(str(data["ID"]))
+            continue
+        zoho_id = str(data["ID"])
+        values = calendar_values(data)
+        calendar = existing.get(zoho_id)
+        if calendar is None:
+            termin = parse_elektriktermin(data.get("Elektriktermin_am"))
             calendar = ElectricCalendar(
-                calendar_id=generate_angebot_id(str(elektriktermin_am), kurz),
-                zoho_id=data["ID"],
-                user=user,
-                anschluss_PVA=data["Anschluss_PVA"],
-                elektriker_calfield=elektriker_calfield,
-                kundenname=data["Kundenname"],
-                privatkunde_adresse_pva=data["Privatkunde.Adresse_PVA"],
-                besonderheiten=data["Besonderheiten"],
-                elektriktermin_am=elektriktermin_am,
-                kundenname_rawdata=data["Kundenname-rawdata"],
-                termin_best_tigt=data["Termin_best_tigt"],
+                calendar_id=generate_angebot_id(str(termin or ""), user.kuerzel),
+                zoho_id=zoho_id,
             )
-            try:
-                calendar.save()
-            except Exception as e:
-                print(f"Error saving calendar: {e}")
-
-            try:
-                pva_klein1 = PVAKlein1(
-                    display_value=data["PVA_klein1"]["display_value"],
-                    ID=data["PVA_klein1"]["ID"],
+            to_create.append(calendar)
+        else:
+            to_update.append(calendar)
+        for field, value in values.items():
+            setattr(calendar, field, value)
+        calendar.user = user
+        calendar.zoho_modified_time = listed.get(zoho_id, "")
+        if data.get("PVA_klein1"):
+            pva_kleins.append(
+                PVAKlein1(
+                    display_value=data["PVA_klein1"].get("display_value", ""),
+                    pva_id=data["PVA_klein1"].get("ID", ""),
                     calendar=calendar,
                 )
-                pva_klein1.save()
-            except Exception as e:
-                print(f"Error saving pva_klein1: {e}")
+            )
+
+    # eine leere Liste ist eher ein Fehler bei Zoho als ein leerer Kalender
+    stale = set(unassigned)
+    if listed:
+        local = ElectricCalendar.objects.values_list("zoho_id", flat=True)
+        stale.update(set(local) - set(listed))
+
+    with transaction.atomic():
+        _, deleted = ElectricCalendar.objects.filter(zoho_id__in=stale).delete()
+        ElectricCalendar.objects.bulk_create(to_create, batch_size=500)
+        ElectricCalendar.objects.bulk_update(to_update, SYNCED_FIELDS, batch_size=500)
+        PVAKlein1.objects.filter(calendar__in=to_update).delete()
+        PVAKlein1.objects.bulk_create(pva_kleins, batch_size=500)
+
+    return {
+        "listed": len(listed),
+        "fetched": len(records),
+        "created": len(to_create),
+        "updated": len(to_update),
+        "deleted": deleted.get(ElectricCalendar._meta.label, 0),
+    }
 
 
 def generate_angebot_id(date_string, kurz):
@@ -8,49 +8,24 @@ from elektriker_kalender.forms import PositionForm
 from elektriker_kalender.models import ElectricCalendar, Position
 from django.shortcuts import get_object_or_404
 from authentication.models import User
-from authentication.fetch_elektrikers import (
-    fetch_all_elektrik_angebots,
-    extract_ids,
-    fetch_all_detailed_elektrik_records,
-)
+from elektriker_kalender.tasks import schedule_elektriker_kalender_refresh
 from dotenv import load_dotenv
-from elektriker_kalender.utils import create_instances
 from config.settings import ENV_FILE
 
 load_dotenv(ENV_FILE)
 
 
-def filter_data_by_elektriker_id(json_data, elektriker_id):
-    filtered_data = []
-    for item in json_data:
-        elektriker = item["data"]["Elektriker"]
-        if elektriker["ID"] == elektriker_id:
-            filtered_data.append(item)
-    return filtered_data
-
-
 class ElektrikerKalenderView(LoginRequiredMixin, View):
-    def get_elektriker_kalender(self, request):
-        print("Starting elektriker kalender update...")
-        elektriker = get_object_or_404(User, zoho_id=request.user.zoho_id)
-        data = fetch_all_elektrik_angebots()
-        ids = extract_ids(data)
-        fetched_records = fetch_all_detailed_elektrik_records(ids)
-        print(elektriker.zoho_id)
-        elektriker_id = str(elektriker.zoho_id)
-        filtered_data_by_id = filter_data_by_elektriker_id(
-            fetched_records, elektriker_id
-        )
-        elektriker.zoho_data_text = filtered_data_by_id
-        elektriker.save()
-        return filtered_data_by_id
-
     def get(self, request, *args, **kwargs):
-        kalender_user_data = self.get_elektriker_kalender(request)
-        user = request.user
-        kurz = user.kuerzel
-        create_instances(kalender_user_data, kurz)
-        return render(request, "invoices/elektriker_kalender.html")
+        # Zoho-Abgleich läuft im Hintergrund (Celery beat + Anstoß hier), die Seite
+        # zeigt den lokalen Stand
+        schedule_elektriker_kalender_refresh()
+        context = {
+            "elektriker_kalenders": ElectricCalendar.objects.filter(
+                user=request.user
+            ).prefetch_related("pva_kleins1"),
+        }
+        return render(request, "invoices/elektriker_kalender.html", context)
         # return JsonResponse(
         #     {"status": "success", "elektriker_kaleder": kalender_user_data}
         # )
@@ -1,6 +1,7 @@
 from math import ceil
 from datetime import datetime, date
 from fpdf import FPDF
+from shared.pdf_assets import AssetCacheMixin
 import os
 from config import settings
 from config.settings import STATIC_URL
@@ -8,11 +9,12 @@ from prices.models import ElektrikPreis
 
 import os
 
-title = ""
-pages = "2"
 
+class PDF(AssetCacheMixin, FPDF):
+    def __init__(self, total_pages, *args, **kwargs):
+        super(PDF, self).__init__(*args, **kwargs)
+        self.total_pages = total_pages
 
-class PDF(FPDF):
     def header(self):
         font_path = os.path.join(settings.STATIC_ROOT, "fonts/JUNOSolarLt.ttf")
         self.add_font("JUNO Solar Lt", "", font_path, uni=True)
@@ -24,10 +26,10 @@ class PDF(FPDF):
         self.set_font("JUNO Solar Lt", "", 12)
         self.set_text_color(0)
         # Page number
-        self.cell(0, 10, f"Seite {str(self.page_no())}/{pages}", 0, 0, "")
+        self.cell(0, 10, f"Seite {str(self.page_no())}/{self.total_pages}", 0, 0, "")
         self.set_x(40)
         if self.page_no() != 1:
-            self.cell(0, 10, title, 0, 0, "")
+            self.cell(0, 10, self.title, 0, 0, "")
         self.image(
             os.path.join(settings.MEDIA_ROOT, "fonts/junosolar_logo.jpg"),
             x=170,
@@ -109,7 +111,7 @@ class PDF(FPDF):
         )
         self.set_y(80)
         self.set_font("JUNO Solar Lt", "B", 17)
-        self.cell(0, 6, title, 0, 0, "R")
+        self.cell(0, 6, self.title, 0, 0, "R")
         # Überschrift und Text
         self.set_font("JUNO Solar Lt", "B", 17)
         self.set_x(0)
@@ -337,12 +339,9 @@ def createOfferPdf(invoice, eintrag, user, mats, k_data):
         total_position_price.append(total_price)
 
     total_summe = sum(total_position_price)
-    global title, pages
 
-    title = f"{invoice.invoice_id}"
-    pages = "2"
-    pdf = PDF()
-    pdf.set_title(title)
+    pdf = PDF("2")
+    pdf.set_title(f"{invoice.invoice_id}")
     pdf.set_author("JUNO Solar Home GmbH")
 
     # Create the offer-PDF
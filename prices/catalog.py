@@ -0,0 +1,139 @@
+import re
+import threading
+
+# fünfstellige Postleitzahl oder explizites Präfix mit Stern ("012*")
+POSTCODE_RE = re.compile(r"(?<!\d)(\d{5})(?!\d)|(?<!\d)(\d{1,4})\*")
+
+
+def parse_postcodes(text):
+    """
+    Postleitzahlen aus dem Freitext einer `PLZAufpreisNachkauf`-Zeile, z. B. "01067, 01069 01097".
+    Einträge wie "012*" gelten als Präfix für alle Postleitzahlen, die mit 012 beginnen;
+    andere Zahlen im Text (z. B. "500 km") werden ignoriert.
+    """
+    return [exact or prefix for exact, prefix in POSTCODE_RE.findall(text or "")]
+
+
+class PriceCatalog:
+    """
+    Schnappschuss aller Preistabellen aus `prices.models`, als Dictionaries nach `name`.
+
+    Die Werte bleiben unverändert (Decimal wie aus der Datenbank), damit die
+    Preisberechnungen exakt dieselben Ergebnisse liefern wie die direkten
+    `objects.get(name=...)`-Abfragen.
+    """
+
+    TABLES = (
+        "ElektrikPreis",
+        "WrGarantiePreise",
+        "KwpPreise",
+        "SolarModulePreise",
+        "WallBoxPreise",
+        "OptionalAccessoriesPreise",
+        "WrTauschPreise",
+        "Sonderrabatt",
+        "AndereKonfigurationWerte",
+        "PLZAufpreisNachkauf",
+    )
+
+    def __init__(self, version, tables):
+        self.version = version
+        self.tables = tables
+        self.plz_zones = self.build_plz_zones(tables.get("PLZAufpreisNachkauf", {}))
+
+    @staticmethod
+    def build_plz_zones(rows):
+        """`{postleitzahl_oder_praefix: zeile}`; bei Doppelungen gewinnt wie bisher die erste Zeile (pk)."""
+        zones = {}
+        for row in rows.values():
+            for postcode in parse_postcodes(row["text"]):
+                zones.setdefault(postcode, row)
+        return zones
+
+    @classmethod
+    def load(cls, version=0):
+        from prices import models as price_models
+
+        tables = {}
+        for table in cls.TABLES:
+            model = getattr(price_models, table)
+            tables[table] = {
+                row["name"]: row for row in model.objects.order_by("pk").values()
+            }
+        return cls(version, tables)
+
+    def rows(self, table):
+        return self.tables[table]
+
+    def row(self, table, name):
+        return self.tables[table][name]
+
+    def get_price(self, table, name, istNachkauf=False):
+        row = self.tables[table].get(name)
+        if row is None:
+            return 0
+        return row["price_other"] if istNachkauf else row["price"]
+
+    def accessory_price(self, name, istNachkauf=False):
+        row = self.row("OptionalAccessoriesPreise", name)
+        return row["price_other"] if istNachkauf else row["price"]
+
+    def wallbox_price(self, name, istNachkauf=False):
+        row = self.row("WallBoxPreise", name)
+        return row["price_other"] if istNachkauf else row["price"]
+
+    def kwp_price(self, name):
+        return self.row("KwpPreise", name)["price"]
+
+    def wr_garantie_price(self, name):
+        return self.row("WrGarantiePreise", name)["price"]
+
+    def module(self, name):
+        return self.row("SolarModulePreise", name)
+
+    def wr_tausch(self, name):
+        return self.row("WrTauschPreise", name)
+
+    def sonderrabatt(self, name):
+        return self.row("Sonderrabatt", name)
+
+    def andere_value(self, name):
+        return self.row("AndereKonfigurationWerte", name)["value"]
+
+    def plz_zone(self, plz):
+        """
+        Zeile aus `PLZAufpreisNachkauf` für eine fünfstellige Postleitzahl: exakter Treffer
+        oder längstes passendes Präfix, sonst None.
+        """
+        if not (len(plz) == 5 and plz.isdigit()):
+            return None
+        for length in range(5, 0, -1):
+            row = self.plz_zones.get(plz[:length])
+            if row is not None:
+                return row
+        return None
+
+    def andere_text(self, name):
+        return self.row("AndereKonfigurationWerte", name)["text"]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_price_catalog():
+    """
+    Liefert den PriceCatalog dieses Prozesses und lädt ihn neu,
+    sobald sich der Versionsstempel in `PriceCatalogVersion` geändert hat.
+    """
+    global _catalog
+    from prices.models import PriceCatalogVersion
+
+    version = PriceCatalogVersion.current()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = PriceCatalog.load(version)
+            catalog = _catalog
+    return catalog
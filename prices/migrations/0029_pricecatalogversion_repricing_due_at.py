@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prices", "0028_pricecatalogversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricecatalogversion",
+            name="repricing_due_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
 
 class ElektrikPreis(models.Model):
@@ -188,3 +191,53 @@ class Prices(models.Model):
     andere_preise = models.ForeignKey(
         AndereKonfigurationWerte, on_delete=models.CASCADE
     )
+
+
+class PriceCatalogVersion(models.Model):
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Start der eingereihten Neubepreisung offener Angebote/Tickets (siehe
+    # `vertrieb_interface.repricing.schedule_repricing`); bis dahin wird nichts weiter eingereiht
+    repricing_due_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.version}"
+
+    @staticmethod
+    def current():
+        version = (
+            PriceCatalogVersion.objects.filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+        )
+        return version or 0
+
+    @staticmethod
+    def bump():
+        updated = PriceCatalogVersion.objects.filter(pk=1).update(
+            version=models.F("version") + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            PriceCatalogVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+PRICE_CATALOG_MODELS = (
+    ElektrikPreis,
+    WrGarantiePreise,
+    KwpPreise,
+    SolarModulePreise,
+    WallBoxPreise,
+    OptionalAccessoriesPreise,
+    WrTauschPreise,
+    Sonderrabatt,
+    AndereKonfigurationWerte,
+    PLZAufpreisNachkauf,
+)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_price_catalog_version(sender, **kwargs):
+    # Jede Preisänderung (Admin, adminfeautures, Shell) invalidiert den PriceCatalog
+    if sender in PRICE_CATALOG_MODELS:
+        PriceCatalogVersion.bump()
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from prices.catalog import PriceCatalog, parse_postcodes
+from vertrieb_interface.pricing import plz_aufpreis
+
+
+def zone(pk, name, value, text):
+    return {"id": pk, "name": name, "value": Decimal(value), "text": text}
+
+
+ZONES = {
+    row["name"]: row
+    for row in (
+        zone(1, "bis 50 km", "150", "01067, 01069\n01097"),
+        zone(2, "bis 100 km", "250", "012*  09111-09116"),
+        zone(3, "bis 200 km", "350", "0121* 01069"),
+        zone(4, "ab 500 km", "600", ""),
+    )
+}
+
+
+class ParsePostcodesTest(SimpleTestCase):
+    def test_separators_and_whitespace(self):
+        self.assertEqual(
+            parse_postcodes(" 01067,01069;\t01097\n\n04109 "),
+            ["01067", "01069", "01097", "04109"],
+        )
+
+    def test_prefixes(self):
+        self.assertEqual(parse_postcodes("012* 0*, 09111"), ["012", "0", "09111"])
+        # ein Stern hinter einer vollständigen Postleitzahl ändert nichts
+        self.assertEqual(parse_postcodes("01067*"), ["01067"])
+
+    def test_ranges_keep_only_the_endpoints(self):
+        # wie die frühere `text__icontains`-Abfrage: kein Aufzählen dazwischen
+        self.assertEqual(parse_postcodes("09111-09116"), ["09111", "09116"])
+        self.assertEqual(parse_postcodes("09111 - 09116"), ["09111", "09116"])
+
+    def test_garbage(self):
+        for text in (
+            None,
+            "",
+            "ab 500 km",
+            "123456",
+            "1234",
+            "PLZ: abc*",
+            "*",
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(parse_postcodes(text), [])
+
+
+class PlzZonesTest(SimpleTestCase):
+    def setUp(self):
+        self.catalog = PriceCatalog(0, {"PLZAufpreisNachkauf": ZONES})
+
+    def test_build_plz_zones(self):
+        zones = PriceCatalog.build_plz_zones(ZONES)
+        self.assertEqual(
+            {postcode: row["name"] for postcode, row in zones.items()},
+            {
+                "01067": "bis 50 km",
+                # doppelt eingetragen: die erste Zeile gewinnt
+                "01069": "bis 50 km",
+                "01097": "bis 50 km",
+                "012": "bis 100 km",
+                "09111": "bis 100 km",
+                "09116": "bis 100 km",
+                "0121": "bis 200 km",
+            },
+        )
+
+    def test_plz_zone(self):
+        for plz, expected in (
+            ("01067", "bis 50 km"),
+            # längstes Präfix gewinnt
+            ("01234", "bis 100 km"),
+            ("01219", "bis 200 km"),
+            ("09116", "bis 100 km"),
+            ("09113", None),
+            ("0106", None),
+            ("0106x", None),
+            ("", None),
+        ):
+            with self.subTest(plz=plz):
+                row = self.catalog.plz_zone(plz)
+                self.assertEqual(row and row["name"], expected)
+
+    def test_plz_aufpreis(self):
+        for ort, expected in (
+            ("01067 Dresden", 150.0),
+            ("  01097 Dresden  ", 150.0),
+            ("01234 Irgendwo", 250.0),
+            ("09116 Chemnitz", 250.0),
+            # ohne passende Zone oder ohne Postleitzahl: "ab 500 km"
+            ("09113 Chemnitz", 600.0),
+            ("Dresden", 600.0),
+            ("1067 Dresden", 600.0),
+            ("", 0),
+            (None, 0),
+        ):
+            with self.subTest(ort=ort):
+                self.assertEqual(plz_aufpreis(self.catalog, ort), expected)
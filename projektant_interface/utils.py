@@ -1,28 +1,19 @@
-import requests
-from dotenv import set_key
 from projektant_interface.models import (
     Project,
 )
 from django.contrib.auth import get_user_model
-from config.settings import (
-    ENV_FILE,
-    ACCESS_TOKEN_URL,
-    ZOHO_ACCESS_TOKEN,
-    ZOHO_CLIENT_ID,
-    ZOHO_CLIENT_SECRET,
-    ZOHO_REFRESH_TOKEN,
+from config.settings import ZOHO_PROJEKT_REPORT_URL
+from shared.zoho_client import (
+    NoRecordsException,
+    NotFoundException,
+    get_zoho_client,
 )
 
-BASE_URL = "https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/report/PVA_klein1"
+BASE_URL = ZOHO_PROJEKT_REPORT_URL
 
 User = get_user_model()
 
-HTTP_OK = 200
-HTTP_UNAUTHORIZED = 401
-HTTP_NOT_FOUND = 404
 LIMIT = 25
-MAX_RETRIES = 20
-SLEEP_TIME = 1
 
 from datetime import datetime
 
@@ -34,23 +25,6 @@ def convert_date_format(date_string):
         return None
 
 
-class APIException(Exception):
-    pass
-
-
-class UnauthorizedException(APIException):
-    pass
-
-
-class RateLimitExceededException(APIException):
-    pass
-
-
-def get_headers():
-    access_token = ZOHO_ACCESS_TOKEN or refresh_access_token()
-    return {"Authorization": f"Zoho-oauthtoken {access_token}"}
-
-
 def id_and_name_extractor(data):
     for entry in data:
         zoho_id = entry.get("zoho_id", None)
@@ -58,43 +32,19 @@ def id_and_name_extractor(data):
         print(f"ZohoAngebotID:  {zoho_id},  Name: {name}")
 
 
-def refresh_access_token():
-    params = {
-        "refresh_token": ZOHO_REFRESH_TOKEN,
-        "client_id": ZOHO_CLIENT_ID,
-        "client_secret": ZOHO_CLIENT_SECRET,
-        "grant_type": "refresh_token",
-    }
-    response = requests.post(ACCESS_TOKEN_URL, params=params)
-    print("REFRESH TOKEN", response)
-    if response.status_code != HTTP_OK:
-        raise APIException(f"Error refreshing token: {response.status_code}")
-
-    new_access_token = response.json().get("access_token")
-    if new_access_token:
-        set_key(ENV_FILE, "ZOHO_ACCESS_TOKEN", new_access_token)
-        return new_access_token
-    else:
-        raise APIException("New access token not found in the API response.")
-
-
-def fetch_records(url, headers, params):
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == HTTP_OK:
-        return response.json()
-    elif response.status_code == HTTP_UNAUTHORIZED:
-        headers["Authorization"] = f"Zoho-oauthtoken {refresh_access_token()}"
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == HTTP_OK:
-            return response.json()
+def fetch_records(url, params=None):
+    """JSON-Antwort von Zoho; None, wenn der Datensatz/Report nichts liefert."""
+    try:
+        return get_zoho_client().get(url, params)
+    except (NoRecordsException, NotFoundException):
+        return None
 
 
 def create_project_instances_from_zoho():
     endpoint = BASE_URL  # replace with your specific endpoint
-    headers = get_headers()
     params = {"limit": LIMIT}
 
-    data = fetch_records(endpoint, headers, params)
+    data = fetch_records(endpoint, params) or {}
     new_projects_count = 0
     for record in data.get("data", []):
         exists = Project.objects.filter(ID=record["ID"]).exists()
@@ -181,7 +131,6 @@ def create_project_instances_from_zoho():
 
 def populate_project_instance_from_zoho(project_id):
     endpoint = BASE_URL + f"/{project_id}"
-    headers = get_headers()
     start_index = 1
     params = {
         "from": start_index,
@@ -189,7 +138,7 @@ def populate_project_instance_from_zoho(project_id):
     }
 
     print(project_id)
-    response_data = fetch_records(endpoint, headers, params)
+    response_data = fetch_records(endpoint, params)
 
     # if response_data and not response_data.get("data"):
     #     return None
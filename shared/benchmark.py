@@ -0,0 +1,420 @@
+"""
+Benchmark für die Preisberechnung und den save()-Pfad von VertriebAngebot,
+VertriebTicket und Calculator.
+
+`seed_prices()` und `seed_users()` legen realistische Preis- und Benutzerdaten an,
+`run_benchmark()` misst alle Operationen über die Konfigurationsmatrix
+`SCENARIO_MATRIX` und liefert einen JSON-fähigen Report (Laufzeit, Anzahl
+DB-Queries, Speicherallokationen). Mit `compare_reports()` lassen sich zwei
+Reports (z. B. von zwei Commits) vergleichen.
+
+Aufruf über `python manage.py benchmark_pricing`, das eine eigene Testdatenbank anlegt.
+"""
+import datetime
+import itertools
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from decimal import Decimal
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+REPORT_VERSION = 1
+
+SCENARIO_MATRIX = {
+    "modulanzahl": (10, 24, 40),
+    "speicher": (
+        # (Kürzel für den Szenarionamen, Speichermodell, Anzahl Module)
+        ("ohne", "----", 0),
+        ("luna5", "LUNA 2000-5-S0", 3),
+        ("luna7", "LUNA 2000-7-S1", 8),
+        ("vitocharge", "Vitocharge VX3 PV-Stromspeicher", 2),
+    ),
+    "wallbox": (0, 1),
+    "garantieWR": ("keine", "10 Jahre", "15 Jahre"),
+    "sonderrabatt": (False, True),
+}
+
+OPERATIONS = ("angebot_save", "angebot_data", "ticket_save", "calculator_save")
+
+ZOHO_ID = "BENCH-1"
+
+KWP_PREISE = {
+    **{f"Preis{kw}": 1800 - 40 * i for i, kw in enumerate([5, 7, 10, 12, 15, 20, 25, 30])},
+    **{f"BetaPlatte{kw}": 300 + 50 * i for i, kw in enumerate([7, 11, 15, 19, 23, 27, 30])},
+    **{f"MetallZiegel{kw}": 200 + 40 * i for i, kw in enumerate([7, 11, 15, 19, 23, 27, 30])},
+}
+WR_GARANTIE_PREISE = {
+    **{f"garantie{kw}_10": 150 + 10 * i for i, kw in enumerate([3, 4, 5, 6, 8, 10, 15, 16, 20, 25, 30])},
+    **{f"garantie{kw}_15": 250 + 15 * i for i, kw in enumerate([3, 4, 5, 6, 8, 10, 15, 16, 20, 25, 30])},
+}
+SOLAR_MODULE_PREISE = {
+    "Phono Solar PS420M7GFH-18/VNH": ("120.50", "1.000"),
+    "Jinko Solar Tiger Neo N-type JKM425N-54HL4-B": ("130.00", "1.050"),
+}
+WALLBOX_PREISE = {"Zappi": "1200.00", "Power Boost": "900.00"}
+OPTIONAL_ACCESSORIES_PREISE = {
+    "leistungsmodul": "400", "leistungsmodul_7": "450", "elwa_2": "700", "ac_thor_3_kw": "800",
+    "heizstab": "300", "prefa_befestigung": "12.5", "wandhalterung_fuer_speicher": "80",
+    "wandhalterung_fuer_speicher_7": "95", "mid_zaehler": "150", "batteriemodul_huawei5": "2000",
+    "batteriemodul_huawei7": "2600", "batteriemodul_viessmann": "2200", "batteriemodul_atmoce": "2400",
+    "zusatzwechselrichter": "1500", "smartmeter_dtsu": "220", "smartmeter_emma": "320",
+    "smartmeter_viessmann": "250", "smartmeter_atmoce": "260", "kabelpreis": "14.5",
+    "kabelpreis_smartguard": "9.5", "optimizer": "60", "aufpreisMAP0": "180", "aufpreisMB0": "120",
+    "ersatzstrom": "900", "smartDongleLte": "140", "apzFeld": "500", "apzFeldUVV": "650",
+    "zaehlerschrank": "1800", "zaehlerschrank_2": "2400", "potentialausgleich": "250",
+    "geruestKunde": "600", "geruestOeffentlich": "350", "dachhakenKunde": "200", "hub": "180",
+    "harvi": "190",
+}
+ANDERE_KONFIGURATION_WERTE = {
+    "erzeugung_sued": "1000", "erzeugung_ost_west": "850", "einfach_einfach_erreichbar": "1.0",
+    "einfach_schwer_erreichbar": "1.05", "komplex_einfach_erreichbar": "1.1",
+    "komplex_schwer_erreichbar": "1.15", "sehr_komplex": "1.2", "garantiefaktor": "1.3",
+    "steuersatz": "0.19", "rabatt_limit": "15", "rabatt_limit_mail": "10",
+}
+PLZ_AUFPREIS = {
+    "bis 100 km": ("150", "01067, 01069, 01097"),
+    "bis 300 km": ("350", "10115, 10117"),
+    "ab 500 km": ("600", ""),
+}
+
+
+def seed_prices():
+    """Legt die Preistabellen an, die für alle Konfigurationen der Matrix benötigt werden."""
+    from vertrieb_interface.repricing import repricing_paused
+
+    # Testdaten statt Preisänderung: keine Neubepreisung offener Angebote einreihen
+    with repricing_paused():
+        create_price_rows()
+
+
+def create_price_rows():
+    from prices.models import (
+        AndereKonfigurationWerte,
+        KwpPreise,
+        OptionalAccessoriesPreise,
+        PLZAufpreisNachkauf,
+        SolarModulePreise,
+        Sonderrabatt,
+        WallBoxPreise,
+        WrGarantiePreise,
+        WrTauschPreise,
+    )
+
+    for name, price in KWP_PREISE.items():
+        KwpPreise.objects.update_or_create(name=name, defaults={"price": Decimal(price)})
+    for name, price in WR_GARANTIE_PREISE.items():
+        WrGarantiePreise.objects.update_or_create(name=name, defaults={"price": Decimal(price)})
+    for name, (price, zuschlag) in SOLAR_MODULE_PREISE.items():
+        SolarModulePreise.objects.update_or_create(
+            name=name,
+            defaults={
+                "price": Decimal(price),
+                "zuschlag": Decimal(zuschlag),
+                "module_garantie": "15",
+                "leistungs_garantie": "30",
+            },
+        )
+    for name, price in WALLBOX_PREISE.items():
+        WallBoxPreise.objects.update_or_create(
+            name=name,
+            defaults={
+                "price": Decimal(price),
+                "price_other": Decimal(price) * Decimal("1.1"),
+                "pdf_text": f"{name} Text",
+            },
+        )
+    for name, price in OPTIONAL_ACCESSORIES_PREISE.items():
+        OptionalAccessoriesPreise.objects.update_or_create(
+            name=name,
+            defaults={
+                "price": Decimal(price),
+                "price_other": Decimal(price) * Decimal("1.1"),
+                "pdf_name": name.upper(),
+                "pdf_text": f"{name} Text",
+            },
+        )
+    WrTauschPreise.objects.update_or_create(name="Kein Tausch", defaults={"price": Decimal("0")})
+    WrTauschPreise.objects.update_or_create(
+        name="SUN2000-10KTL",
+        defaults={"price": Decimal("2100"), "pdf_name": "WR", "pdf_text": "WR Tausch"},
+    )
+    Sonderrabatt.objects.update_or_create(
+        name="Sommer", defaults={"prozentsatz": Decimal("3"), "fixbetrag": Decimal("250")}
+    )
+    for name, value in ANDERE_KONFIGURATION_WERTE.items():
+        AndereKonfigurationWerte.objects.update_or_create(name=name, defaults={"value": Decimal(value)})
+    AndereKonfigurationWerte.objects.update_or_create(
+        name="vertriebsleitung", defaults={"value": Decimal("0"), "text": "vertrieb@example.com"}
+    )
+    for name, (value, text) in PLZ_AUFPREIS.items():
+        PLZAufpreisNachkauf.objects.update_or_create(
+            name=name, defaults={"value": Decimal(value), "text": text}
+        )
+
+
+def seed_users():
+    """Legt zwei Vertriebler an (mit und ohne Aufschlag); liefert sie als Liste."""
+    from authentication.models import User
+    from vertrieb_interface.models import ZohoKunde
+
+    kunde = {"zoho_id": ZOHO_ID, "zoho_kundennumer": "K-BENCH-1", "status_pva": "abgeschlossen"}
+    users = []
+    for kuerzel, aufschlag in (("BA", 0), ("BB", 5)):
+        user, _ = User.objects.update_or_create(
+            username=f"benchmark_{kuerzel.lower()}",
+            defaults={
+                "email": f"benchmark_{kuerzel.lower()}@example.com",
+                "kuerzel": kuerzel,
+                "users_aufschlag": aufschlag,
+                "beruf": "Vertrieb",
+                "typ": "Vertrieb",
+            },
+        )
+        ZohoKunde.objects.update_or_create(
+            user=user,
+            zoho_id=ZOHO_ID,
+            defaults={
+                "zoho_kundennumer": kunde["zoho_kundennumer"],
+                "status_pva": kunde["status_pva"],
+                "data": kunde,
+            },
+        )
+        users.append(user)
+    return users
+
+
+def scenarios():
+    """Alle Kombinationen aus `SCENARIO_MATRIX` als `(name, config)`."""
+    keys = list(SCENARIO_MATRIX)
+    for values in itertools.product(*(SCENARIO_MATRIX[key] for key in keys)):
+        config = dict(zip(keys, values))
+        kuerzel, _, anz_speicher = config["speicher"]
+        name = (
+            f"m{config['modulanzahl']}"
+            f"-{kuerzel}{anz_speicher}"
+            f"-wb{config['wallbox']}"
+            f"-g{config['garantieWR'].split(' ')[0]}"
+            f"-sr{int(config['sonderrabatt'])}"
+        )
+        yield name, config
+
+
+def build_angebot(config, user, index):
+    from vertrieb_interface.models import VertriebAngebot
+
+    _, speicher_model, anz_speicher = config["speicher"]
+    return VertriebAngebot(
+        user=user,
+        zoho_id=ZOHO_ID,
+        solar_module="Phono Solar PS420M7GFH-18/VNH",
+        modulanzahl=config["modulanzahl"],
+        hersteller="Huawei",
+        wechselrichter_model="SUN 2000 MAP0",
+        garantieWR=config["garantieWR"],
+        speicher_model=speicher_model,
+        anz_speicher=anz_speicher,
+        anz_wandhalterung_fuer_speicher=1 if anz_speicher else 0,
+        smartmeter_model="Smart Power Sensor DTSU666H",
+        wallbox_anzahl=config["wallbox"],
+        wallboxtyp="Zappi" if config["wallbox"] else None,
+        kabelanschluss=10.0 if config["wallbox"] else None,
+        sonderrabatt_included=config["sonderrabatt"],
+        sonderrabatt="Sommer",
+        rabatt=index % 5,
+        ersatzstrom=bool(anz_speicher),
+        kabelSmartGuard=3.0,
+        anzOptimizer=index % 4,
+        midZaehler=index % 2,
+        beta_platte=index % 2 == 0,
+        elwa=index % 3 == 0,
+        ausrichtung="Sud" if index % 2 else "Ost/West",
+        komplex="komplex, einfach erreichbar",
+    )
+
+
+def build_ticket(config, user):
+    from vertrieb_interface.models import VertriebTicket
+
+    _, speicher_model, anz_speicher = config["speicher"]
+    return VertriebTicket(
+        user=user,
+        zoho_id=ZOHO_ID,
+        solar_module="Phono Solar PS420M7GFH-18/VNH",
+        modulanzahl=config["modulanzahl"] // 4,
+        speicher_model=speicher_model,
+        anz_speicher=min(anz_speicher, 3),
+        smartmeter_model="Smart Power Sensor DTSU666H",
+        wallbox_anzahl=config["wallbox"],
+        wallboxtyp="Power Boost" if config["wallbox"] else None,
+        kabelanschluss=4.0 if config["wallbox"] else None,
+        sonderrabatt_included=config["sonderrabatt"],
+        sonderrabatt="Sommer",
+        wr_tausch="SUN2000-10KTL",
+        ort="01069 Dresden",
+    )
+
+
+def build_calculator(config, user, index):
+    from calculator.models import Calculator
+
+    _, speicher_model, anz_speicher = config["speicher"]
+    return Calculator(
+        calculator_id=f"BENCH-{index}",
+        user=user,
+        modulanzahl=config["modulanzahl"],
+        speicher=bool(anz_speicher),
+        speicher_model=speicher_model if anz_speicher else "LUNA 2000-5-S0",
+        # Calculator kennt nur bis zu 6 Speichermodule
+        anz_speicher=min(anz_speicher, 6),
+        garantieWR=config["garantieWR"],
+        wallbox_anzahl=config["wallbox"],
+        wallboxtyp="Zappi",
+        kabelanschluss=15.0,
+        anzOptimizer=index % 4,
+    )
+
+
+def measure(func, track_allocations=True):
+    """Führt `func` einmal aus; liefert Laufzeit (ms), Anzahl Queries und Allokationen."""
+    if track_allocations:
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        if track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if track_allocations:
+            tracemalloc.stop()
+    sample = {"ms": elapsed * 1000, "queries": len(queries)}
+    if track_allocations:
+        sample["alloc_kib"] = current / 1024
+        sample["peak_kib"] = peak / 1024
+    return sample
+
+
+def summarize(samples):
+    # Läufe mit tracemalloc sind deutlich langsamer und zählen nicht zur Laufzeit
+    timed = [sample for sample in samples if "peak_kib" not in sample] or samples
+    times = sorted(sample["ms"] for sample in timed)
+    summary = {
+        "runs": len(timed),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "min_ms": round(times[0], 3),
+        "max_ms": round(times[-1], 3),
+        "queries": round(statistics.fmean(sample["queries"] for sample in samples), 2),
+    }
+    allocations = [sample for sample in samples if "peak_kib" in sample]
+    if allocations:
+        summary["alloc_kib"] = round(statistics.fmean(sample["alloc_kib"] for sample in allocations), 1)
+        summary["peak_kib"] = round(max(sample["peak_kib"] for sample in allocations), 1)
+    return summary
+
+
+def run_scenario(config, user, index, repeat):
+    """
+    Misst alle `OPERATIONS` für eine Konfiguration. Ein zusätzlicher erster Lauf
+    misst die Allokationen (und dient als Aufwärmlauf), die `repeat` weiteren die Laufzeit.
+    """
+    samples = {operation: [] for operation in OPERATIONS}
+    for run in range(repeat + 1):
+        track_allocations = run == 0
+        angebot = build_angebot(config, user, index)
+        samples["angebot_save"].append(measure(angebot.save, track_allocations))
+        # Das Ticket soll ein angenommenes Angebot vorfinden
+        type(angebot).objects.filter(pk=angebot.pk).update(angenommenes_angebot=angebot.pk)
+        angebot.refresh_from_db()
+        samples["angebot_data"].append(measure(lambda: angebot.data, track_allocations))
+
+        ticket = build_ticket(config, user)
+        samples["ticket_save"].append(measure(ticket.save, track_allocations))
+
+        calculator = build_calculator(config, user, index * (repeat + 1) + run)
+        samples["calculator_save"].append(measure(calculator.save, track_allocations))
+
+        ticket.delete()
+        angebot.delete()
+        calculator.delete()
+    return samples
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmark(repeat=3, scenario_filter=None):
+    """
+    Führt den Benchmark über alle (bzw. die auf `scenario_filter` passenden)
+    Konfigurationen aus. Erwartet eine Datenbank, in der `seed_prices()` und
+    `seed_users()` ausgeführt werden dürfen.
+    """
+    seed_prices()
+    users = seed_users()
+
+    totals = {operation: [] for operation in OPERATIONS}
+    per_scenario = {}
+    started = time.perf_counter()
+    for index, (name, config) in enumerate(scenarios()):
+        if scenario_filter and scenario_filter not in name:
+            continue
+        samples = run_scenario(config, users[index % len(users)], index, repeat)
+        per_scenario[name] = {
+            operation: summarize(operation_samples)
+            for operation, operation_samples in samples.items()
+        }
+        for operation, operation_samples in samples.items():
+            totals[operation].extend(operation_samples)
+
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "scenarios": len(per_scenario),
+            "seconds": round(time.perf_counter() - started, 2),
+        },
+        "operations": {
+            operation: summarize(samples)
+            for operation, samples in totals.items()
+            if samples
+        },
+        "scenarios": per_scenario,
+    }
+
+
+def compare_reports(old, new, metrics=("median_ms", "queries", "peak_kib")):
+    """Vergleicht zwei Reports je Operation; liefert `{operation: {metric: (alt, neu, delta_prozent)}}`."""
+    result = {}
+    for operation, new_summary in new["operations"].items():
+        old_summary = old.get("operations", {}).get(operation)
+        if old_summary is None:
+            continue
+        result[operation] = {}
+        for metric in metrics:
+            if metric not in old_summary or metric not in new_summary:
+                continue
+            before, after = old_summary[metric], new_summary[metric]
+            delta = round((after - before) / before * 100, 1) if before else None
+            result[operation][metric] = (before, after, delta)
+    return result
@@ -0,0 +1,236 @@
+"""
+Benchmark für die PDF-Generatoren (Angebot, Angebot mit Kalkulation, Kalkulation,
+Nachverkauf).
+
+Baut für eine Auswahl der Konfigurationen aus `shared.benchmark.SCENARIO_MATRIX` je ein
+Angebot und ein Ticket und misst jede Dokumentart wie `pdf_jobs.render_document`
+(Laufzeit, Anzahl DB-Queries, Speicherallokationen, Größe des PDFs). Mit `cold_assets`
+werden der Asset-Cache (`shared.pdf_assets`) und die gespeicherten AGB-Seiten
+(`static_sections`) vor jedem Dokument geleert, das entspricht dem Verhalten ohne Cache;
+der Vergleich zweier Reports zeigt die Ersparnis pro Dokument.
+
+`check_concurrency()` erstellt dieselben Dokumente einmal nacheinander und einmal
+gleichzeitig in mehreren Threads und prüft, dass sich die PDFs nicht gegenseitig
+beeinflussen (Titel und Seitenzahlen in den Kopfzeilen).
+
+Aufruf über `python manage.py benchmark_pdf`, das eine eigene Testdatenbank anlegt.
+"""
+import datetime
+import platform
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+import fitz
+from django.db import connection, connections
+
+from shared import pdf_assets
+from shared.benchmark import (
+    REPORT_VERSION,
+    build_angebot,
+    build_ticket,
+    git_revision,
+    measure,
+    scenarios,
+    seed_prices,
+    seed_users,
+    summarize,
+)
+from vertrieb_interface.pdf_services import static_sections
+
+DOCUMENTS = ("angebot", "angebot_calc", "calc", "ticket")
+
+HEADER_RE = re.compile(r"Seite (\d+)/(\d+)\s+(.+)")
+CREATION_DATE_RE = re.compile(rb"/CreationDate \(D:\d+\)")
+
+
+def render(document, angebot, ticket, user):
+    from vertrieb_interface.pdf_services import (
+        angebot_pdf_creator_user,
+        calc_pdf_creator,
+        ticket_pdf_creator_user,
+    )
+
+    if document == "ticket":
+        return ticket_pdf_creator_user.createOfferPdf(
+            ticket.data, ticket, user.user_certifikate, user
+        )
+    if document == "calc":
+        return calc_pdf_creator.createCalcPdf(angebot.data, angebot, user)
+    return angebot_pdf_creator_user.createOfferPdf(
+        angebot.data,
+        angebot,
+        user.user_certifikate,
+        user,
+        document == "angebot_calc",
+    )
+
+
+def pick_scenarios(limit, scenario_filter=None):
+    """`limit` gleichmäßig über die Matrix verteilte Konfigurationen (0 = alle)."""
+    selected = [
+        (name, config)
+        for name, config in scenarios()
+        if not scenario_filter or scenario_filter in name
+    ]
+    if limit and len(selected) > limit:
+        step = len(selected) / limit
+        selected = [selected[int(i * step)] for i in range(limit)]
+    return selected
+
+
+def run_pdf_benchmark(repeat=3, scenario_filter=None, limit=6, cold_assets=False):
+    """
+    Misst alle `DOCUMENTS` für die ausgewählten Konfigurationen. Wie beim
+    Preis-Benchmark misst ein zusätzlicher erster Lauf die Allokationen.
+    """
+    seed_prices()
+    users = seed_users()
+
+    totals = {document: [] for document in DOCUMENTS}
+    per_scenario = {}
+    sizes = {document: [] for document in DOCUMENTS}
+    started = time.perf_counter()
+    for name, angebot, ticket, user in build_documents(users, limit, scenario_filter):
+        samples = {document: [] for document in DOCUMENTS}
+        for run in range(repeat + 1):
+            for document in DOCUMENTS:
+                if cold_assets:
+                    pdf_assets.clear()
+                    static_sections.clear()
+                content = []
+                samples[document].append(
+                    measure(
+                        lambda: content.append(render(document, angebot, ticket, user)),
+                        track_allocations=run == 0,
+                    )
+                )
+                sizes[document].append(len(content[0]))
+        per_scenario[name] = {
+            document: summarize(document_samples)
+            for document, document_samples in samples.items()
+        }
+        for document, document_samples in samples.items():
+            totals[document].extend(document_samples)
+
+        ticket.delete()
+        angebot.delete()
+
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "scenarios": len(per_scenario),
+            "cold_assets": cold_assets,
+            "seconds": round(time.perf_counter() - started, 2),
+        },
+        "operations": {
+            document: dict(
+                summarize(samples),
+                pdf_kib=round(sum(sizes[document]) / len(sizes[document]) / 1024, 1),
+            )
+            for document, samples in totals.items()
+            if samples
+        },
+        "scenarios": per_scenario,
+    }
+
+
+def build_documents(users, count, scenario_filter=None):
+    """
+    `count` gespeicherte Angebote und Tickets über die Matrix verteilt, mit festen IDs,
+    damit sie gleichzeitig existieren können (die generierten sind nur sekundengenau).
+    """
+    documents = []
+    for index, (name, config) in enumerate(pick_scenarios(count, scenario_filter)):
+        user = users[index % len(users)]
+        angebot = build_angebot(config, user, index)
+        ticket = build_ticket(config, user)
+        angebot.angebot_id = f"AN-BENCH{index:04d}"
+        ticket.ticket_id = f"ZV-BENCH{index:04d}"
+        # Das Formular liefert 0.0, nicht None
+        angebot.kabelanschluss = angebot.kabelanschluss or 0.0
+        ticket.kabelanschluss = ticket.kabelanschluss or 0.0
+        angebot.save()
+        ticket.save()
+        documents.append((name, angebot, ticket, user))
+    return documents
+
+
+def headers(content):
+    """`(seite, seiten, titel)` der Kopfzeile jeder Seite."""
+    result = []
+    with fitz.open(stream=content, filetype="pdf") as document:
+        for page in document:
+            match = HEADER_RE.search(page.get_text())
+            result.append(match.groups() if match else None)
+    return result
+
+
+def check_concurrency(threads=8, count=16, scenario_filter=None):
+    """
+    Erstellt für `count` Konfigurationen je eine Dokumentart (reihum aus `DOCUMENTS`)
+    erst nacheinander, dann alle gleichzeitig mit `threads` Threads. Jedes parallel
+    erstellte PDF muss (bis auf das Erstellungsdatum) dem nacheinander erstellten
+    gleichen und auf jeder Seite die eigene Nummer in der Kopfzeile tragen.
+    Liefert `(report, fehler)`.
+    """
+    seed_prices()
+    users = seed_users()
+    jobs = []
+    for index, (name, angebot, ticket, user) in enumerate(
+        build_documents(users, count, scenario_filter)
+    ):
+        document = DOCUMENTS[index % len(DOCUMENTS)]
+        jobs.append((f"{name}/{document}", document, angebot, ticket, user))
+
+    def run(job):
+        _, document, angebot, ticket, user = job
+        # wie `pdf_jobs.render_document` frisch geladen: `data` rechnet bei jedem Zugriff
+        # den Grundpreis erneut in die je Instanz gehaltene `arbeits_liste` ein
+        angebot = type(angebot).objects.get(pk=angebot.pk)
+        ticket = type(ticket).objects.get(pk=ticket.pk)
+        return render(document, angebot, ticket, user)
+
+    def run_in_thread(job):
+        try:
+            return run(job)
+        finally:
+            # jeder Thread hat eigene Datenbankverbindungen
+            connections.close_all()
+
+    started = time.perf_counter()
+    expected = [run(job) for job in jobs]
+    serial_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(run_in_thread, jobs))
+    parallel_seconds = time.perf_counter() - started
+
+    errors = []
+    for (label, document, angebot, ticket, _), before, after in zip(jobs, expected, results):
+        number = ticket.ticket_id if document == "ticket" else angebot.angebot_id
+        page_headers = headers(after)
+        for page, header in enumerate(page_headers, start=1):
+            if header is None or header[0] != str(page) or number not in header[2]:
+                errors.append(f"{label}: Kopfzeile auf Seite {page}: {header}")
+        if page_headers != headers(before):
+            errors.append(f"{label}: Kopfzeilen weichen vom nacheinander erstellten PDF ab")
+        elif CREATION_DATE_RE.sub(b"", before) != CREATION_DATE_RE.sub(b"", after):
+            errors.append(f"{label}: Inhalt weicht vom nacheinander erstellten PDF ab")
+
+    report = {
+        "documents": len(jobs),
+        "threads": threads,
+        "serial_seconds": round(serial_seconds, 2),
+        "parallel_seconds": round(parallel_seconds, 2),
+        "errors": len(errors),
+    }
+    return report, errors
@@ -0,0 +1,679 @@
+"""
+Lokaler Stand-in für Zoho Creator, für Last- und Integrationstests ohne Produktivsystem.
+
+Bedient die Reports `Privatkunden_API`, `Angebote`, `Elektrikkalender`, `PVA_klein1`
+und `Au_endienstler_API` aus generierten Daten (`ZohoFixtures`, reproduzierbar über
+`seed`), das Formular `Angebot` sowie den OAuth-Token-Endpunkt. Wie das Original:
+
+- `criteria` (==, !=, <, >, <=, >=, &&, ||, Klammern, null, today.subDay(n)) und
+  Blättern mit `from`/`limit`; eine leere Seite ist HTTP 404 mit Zoho-Code 3100,
+- Datensätze per ID (`report/<name>/<id>`, für den Elektrikkalender auch `report/<id>`),
+  PATCH/PUT/DELETE darauf, POST auf Formulare,
+- nur Access-Tokens aus dem Token-Endpunkt werden angenommen und laufen nach
+  `token_lifetime` Sekunden ab (dann 401, der Client erneuert),
+- einstellbare Latenz (`latency` ± `jitter` Sekunden) sowie zufällige 429 (mit
+  Retry-After) und 5xx in den Anteilen `rate_429` bzw. `error_rate`.
+
+Gestartet wird er mit `manage.py fake_zoho`; das Kommando gibt die Umgebungsvariablen
+aus, mit denen die App (BASE_URL, ACCESS_TOKEN_URL, ...) auf ihn zeigt.
+"""
+
+import datetime
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+APP_PATH = "/api/v2/junosolar/juno-kleinanlagen-portal"
+TOKEN_PATH = "/oauth/v2/token"
+# Formular -> Report, in dem neue Datensätze landen
+FORM_REPORTS = {"Angebot": "Angebote"}
+MAX_LIMIT = 1000
+
+ZOHO_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+FIRST_NAMES = (
+    "Anna",
+    "Ben",
+    "Clara",
+    "David",
+    "Emma",
+    "Felix",
+    "Greta",
+    "Hannes",
+    "Ida",
+    "Jonas",
+    "Karla",
+    "Lukas",
+)
+LAST_NAMES = (
+    "Müller",
+    "Schmidt",
+    "Schneider",
+    "Fischer",
+    "Weber",
+    "Meyer",
+    "Wagner",
+    "Becker",
+    "Hoffmann",
+    "Koch",
+)
+CITIES = (
+    ("08056", "Zwickau"),
+    ("09111", "Chemnitz"),
+    ("01067", "Dresden"),
+    ("04109", "Leipzig"),
+    ("09599", "Freiberg"),
+)
+STATUS = ("", "", "Angebot gesendet", "bekommen", "abgelehnt", "storniert", "nicht qualifiziert")
+STATUS_PVA = ("", "offen", "in Planung", "in Bau", "fertig")
+PROJEKT_STATUS = ("offen", "in Bearbeitung", "abgeschlossen")
+STELLEN = ("Energiefachberater", "Handelsvertreter/in", "Regionalleitung", "Kooperationspartner")
+
+
+def zoho_date(value):
+    return f"{value.day:02d}-{ZOHO_MONTHS[value.month - 1]}-{value.year}"
+
+
+def zoho_datetime(value, seconds=True):
+    return (
+        f"{zoho_date(value)} {value:%H:%M:%S}" if seconds else f"{zoho_date(value)} {value:%H:%M}"
+    )
+
+
+def parse_zoho_datetime(value):
+    """ "18-Oct-2026", "18-Oct-2026 09:30" oder "18-Oct-2026 09:30:00" -> datetime, sonst None."""
+    if not isinstance(value, str):
+        return None
+    match = re.fullmatch(
+        r"(\d{2})-([A-Z][a-z]{2})-(\d{4})(?: (\d{2}):(\d{2})(?::(\d{2}))?)?", value
+    )
+    if not match or match.group(2) not in ZOHO_MONTHS:
+        return None
+    day, month, year, hour, minute, second = match.groups()
+    return datetime.datetime(
+        int(year),
+        ZOHO_MONTHS.index(month) + 1,
+        int(day),
+        int(hour or 0),
+        int(minute or 0),
+        int(second or 0),
+    )
+
+
+"""
+
+FIXTURES
+
+"""
+
+
+class ZohoFixtures:
+    """
+    Generierte Reports als Listen von Datensätzen im Format der Creator-API v2.
+    Gleicher `seed` und gleiche Mengen ergeben dieselben Daten (Datumsangaben relativ zu `today`).
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        vertriebler=10,
+        kunden=2000,
+        elektriker=5,
+        kalender=300,
+        projekte=500,
+        today=None,
+    ):
+        self.random = random.Random(seed)
+        self.today = today or datetime.date.today()
+        self.now = datetime.datetime.combine(self.today, datetime.time(12, 0))
+        self._next_id = 3989760000001000000
+        self.reports = {}
+        self.reports["Au_endienstler_API"] = [self.vertriebler() for _ in range(vertriebler)]
+        self.elektriker = [self.lookup(self.full_name(), self.new_id()) for _ in range(elektriker)]
+        self.reports["Privatkunden_API"] = [self.kunde() for _ in range(kunden)]
+        self.reports["Angebote"] = []
+        for kunde in self.reports["Privatkunden_API"]:
+            kunde["Angebot"] = [
+                self.lookup(angebot["Angebot_ID"], angebot["ID"])
+                for angebot in (self.angebot(kunde) for _ in range(self.random.randint(0, 2)))
+            ] or ""
+        self.reports["PVA_klein1"] = [self.projekt() for _ in range(projekte)]
+        self.reports["Elektrikkalender"] = [self.kalender() for _ in range(kalender)]
+
+    def new_id(self):
+        self._next_id += self.random.randint(1, 50)
+        return str(self._next_id)
+
+    @staticmethod
+    def lookup(display_value, record_id):
+        return {"display_value": display_value, "ID": record_id}
+
+    def full_name(self):
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def past(self, days):
+        return self.now - datetime.timedelta(
+            days=self.random.randint(0, days), minutes=self.random.randint(0, 24 * 60)
+        )
+
+    def address(self):
+        postal_code, city = self.random.choice(CITIES)
+        street = f"{self.random.choice(LAST_NAMES)}straße {self.random.randint(1, 120)}"
+        return {
+            "address_line_1": street,
+            "address_line_2": "",
+            "postal_code": postal_code,
+            "district_city": city,
+            "state_province": "Sachsen",
+            "country": "Germany",
+            "latitude": f"{50 + self.random.random():.6f}",
+            "longitude": f"{12 + self.random.random():.6f}",
+            "display_value": f"{street}, {postal_code} {city}",
+        }
+
+    def vertriebler(self):
+        first_name, last_name = self.full_name().split(" ")
+        return {
+            "ID": self.new_id(),
+            "Name": f"{first_name} {last_name}",
+            "Mail": f"{first_name[0].lower()}{last_name[:2].lower()}@example.com",
+            "Mobil": f"+49175{self.random.randint(1000000, 9999999)}",
+            "Anrede": self.random.choice(("Herr", "Frau")),
+            "Stellenbezeichnung": self.random.choice(STELLEN),
+            "Unternehmen_verlassen_am": (
+                "" if self.random.random() > 0.1 else zoho_date(self.past(365))
+            ),
+        }
+
+    def kunde(self):
+        vertriebler = self.random.choice(self.reports["Au_endienstler_API"])
+        first_name, last_name = self.full_name().split(" ")
+        prefix = self.random.choice(("Herr", "Frau", "Herr", "Frau", "Firma"))
+        name = {"prefix": prefix, "first_name": first_name, "last_name": last_name, "suffix": ""}
+        address = self.address()
+        return {
+            "ID": self.new_id(),
+            "Name": {**name, "display_value": f"{prefix} {first_name} {last_name}"},
+            "Adresse_PVA": address,
+            "Name_Postanschrift": name,
+            "Postanschrift": address,
+            "Vertriebler": self.lookup(vertriebler["Name"], vertriebler["ID"]),
+            "Status": self.random.choice(STATUS),
+            "Status_PVA": self.random.choice(STATUS_PVA),
+            "Anfrage_vom": zoho_date(self.past(400)),
+            "Angebot_bekommen_am": "",
+            "Kundennummer": f"K{self.random.randint(10000, 99999)}",
+            "Email": f"{first_name.lower()}.{last_name.lower()}@example.com",
+            "Telefon_Festnetz": f"+49375{self.random.randint(100000, 999999)}",
+            "Telefon_mobil": f"+49176{self.random.randint(1000000, 9999999)}",
+            "Notizen": "",
+            "Angenommenes_Angebot": "",
+            "Modified_Time": zoho_datetime(self.past(60)),
+        }
+
+    def angebot(self, kunde):
+        angebot = {
+            "ID": self.new_id(),
+            "Angebot_ID": f"AN-{kunde['Kundennummer']}-{self.random.randint(100000, 999999)}",
+            "Privatkunde": self.lookup(kunde["Name"]["display_value"], kunde["ID"]),
+            "Vertriebler": kunde["Vertriebler"],
+            "Angebotssumme": f"{self.random.uniform(8000, 40000):.2f}",
+            "Status": self.random.choice(("", "bekommen", "angenommen")),
+            "Modified_Time": zoho_datetime(self.past(60)),
+        }
+        self.reports["Angebote"].append(angebot)
+        return angebot
+
+    def projekt(self):
+        kunde = self.random.choice(self.reports["Privatkunden_API"])
+        auftrag = self.past(365)
+        return {
+            "ID": self.new_id(),
+            "Status": self.random.choice(PROJEKT_STATUS),
+            "Kunde": self.lookup(kunde["Name"]["display_value"], kunde["ID"]),
+            "Kunde.Kundennummer": kunde["Kundennummer"],
+            "Kunde.Adresse_PVA": kunde["Adresse_PVA"]["display_value"],
+            "Kunde.Email": kunde["Email"],
+            "Kunde.Postanschrift": kunde["Postanschrift"]["display_value"],
+            "Kunde.Telefon_Festnetz": kunde["Telefon_Festnetz"],
+            "Kunde.Telefon_mobil": kunde["Telefon_mobil"],
+            "Vertriebler": kunde["Vertriebler"]["display_value"],
+            "Auftrag_Erteilt_am": zoho_date(auftrag),
+            "Auftragsbest_tigung_versendet": zoho_date(auftrag + datetime.timedelta(days=2)),
+            "Modul_Summe_kWp": f"{self.random.randint(10, 300) / 10:.1f}",
+            "Module1": [self.lookup("JA Solar 415 Wp", self.new_id())],
+            "Wechselrichter1": [self.lookup("SolarEdge SE10K", self.new_id())],
+            "Wallbox1": [],
+            "Speicher": [],
+            "Bautermine": [],
+            "Elektriktermin": [],
+            "Besonderheiten": "",
+            "Netzbetreiber": "Mitnetz Strom",
+            "Status_Elektrik": self.random.choice(("", "geplant", "erledigt")),
+            "Rechnung_versandt": "",
+            "UK_vsl_Lieferung": "",
+            "EDDI": "",
+            "Hub1": "",
+            "Modified_Time": zoho_datetime(self.past(60)),
+        }
+
+    def kalender(self):
+        elektriker = self.random.choice(self.elektriker)
+        projekt = self.random.choice(self.reports["PVA_klein1"])
+        termin = self.now + datetime.timedelta(
+            days=self.random.randint(-30, 60), hours=self.random.randint(-4, 5)
+        )
+        return {
+            "ID": self.new_id(),
+            "Elektriker": elektriker,
+            "Elektriker_calfield": elektriker["ID"],
+            "Anschluss_PVA": self.random.choice(("Zählerschrank", "Hausanschluss")),
+            "Kundenname": projekt["Kunde"],
+            "Kundenname-rawdata": projekt["Kunde"]["display_value"],
+            "Privatkunde.Adresse_PVA": projekt["Kunde.Adresse_PVA"],
+            "Besonderheiten": "",
+            "Elektriktermin_am": zoho_datetime(termin, seconds=False),
+            "Termin_best_tigt": self.random.choice(("true", "false")),
+            "PVA_klein1": self.lookup(projekt["Kunde"]["display_value"], projekt["ID"]),
+            "Modified_Time": zoho_datetime(self.past(30)),
+        }
+
+
+"""
+
+KRITERIEN
+
+"""
+
+
+CRITERIA_TOKEN = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<op>&&|\|\||==|!=|<=|>=|<|>|\(|\))'
+    r"|(?P<function>today\.subDay\(\s*-?\d+\s*\))|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<name>[A-Za-z_][\w.\-]*))"
+)
+
+
+class CriteriaError(ValueError):
+    pass
+
+
+def tokenize(criteria):
+    tokens, position = [], 0
+    criteria = criteria.rstrip()
+    while position < len(criteria):
+        match = CRITERIA_TOKEN.match(criteria, position)
+        if not match:
+            raise CriteriaError(f"Ungültiges Kriterium bei {criteria[position:]!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "string":
+            tokens.append(("value", json.loads(text)))
+        elif kind == "number":
+            tokens.append(("value", text))
+        elif kind == "function":
+            days = int(re.search(r"-?\d+", text).group())
+            tokens.append(("value", datetime.date.today() - datetime.timedelta(days=days)))
+        elif kind == "name" and text in ("null", "true", "false"):
+            tokens.append(("value", None if text == "null" else text))
+        else:
+            tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+def field_value(record, field):
+    """Wert eines Felds; "Vertriebler.ID" greift in Lookups, flache Schlüssel wie "Kunde.Email" gehen vor."""
+    if field in record:
+        value = record[field]
+    else:
+        value = record
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, dict):
+        value = value.get("ID", value.get("display_value"))
+    return value
+
+
+def compare(left, op, right):
+    empty = left in (None, "", [])
+    if right is None:
+        return {"==": empty, "!=": not empty}.get(op, False)
+    if empty:
+        return op == "!="
+    if isinstance(right, datetime.date):
+        left = parse_zoho_datetime(left)
+        if left is None:
+            return False
+        if not isinstance(right, datetime.datetime):
+            left = left.date()
+    elif isinstance(right, str) and parse_zoho_datetime(right) and parse_zoho_datetime(left):
+        left, right = parse_zoho_datetime(left), parse_zoho_datetime(right)
+    elif re.fullmatch(r"-?\d+", str(left)) and re.fullmatch(r"-?\d+", str(right)):
+        left, right = int(left), int(right)
+    else:
+        try:
+            left, right = float(left), float(right)
+        except (TypeError, ValueError):
+            left, right = str(left), str(right)
+    return {
+        "==": left == right,
+        "!=": left != right,
+        "<": left < right,
+        ">": left > right,
+        "<=": left <= right,
+        ">=": left >= right,
+    }[op]
+
+
+class Criteria:
+    """Rekursiver Abstieg über die Tokens: or -> and -> Vergleich/Klammer."""
+
+    def __init__(self, criteria):
+        self.tokens = tokenize(criteria)
+        self.position = 0
+        self.tree = self.parse_or() if self.tokens else None
+        if self.position != len(self.tokens):
+            raise CriteriaError(f"Unerwartetes {self.tokens[self.position][1]!r} in {criteria!r}")
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def expect(self, kind, text=None):
+        token = self.peek()
+        if token[0] != kind or (text is not None and token[1] != text):
+            raise CriteriaError(f"Erwartet {text or kind}, gefunden {token[1]!r}")
+        self.position += 1
+        return token[1]
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ("op", "||"):
+            self.position += 1
+            node = ("||", node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_atom()
+        while self.peek() == ("op", "&&"):
+            self.position += 1
+            node = ("&&", node, self.parse_atom())
+        return node
+
+    def parse_atom(self):
+        if self.peek() == ("op", "("):
+            self.position += 1
+            node = self.parse_or()
+            self.expect("op", ")")
+            return node
+        field = self.expect("name")
+        op = self.expect("op")
+        if op not in ("==", "!=", "<", ">", "<=", ">="):
+            raise CriteriaError(f"Unbekannter Vergleich {op!r}")
+        return ("cmp", field, op, self.expect("value"))
+
+    def matches(self, record, node=None):
+        node = node or self.tree
+        if node is None:
+            return True
+        if node[0] == "cmp":
+            return compare(field_value(record, node[1]), node[2], node[3])
+        if node[0] == "&&":
+            return self.matches(record, node[1]) and self.matches(record, node[2])
+        return self.matches(record, node[1]) or self.matches(record, node[2])
+
+
+"""
+
+SERVER
+
+"""
+
+
+class FakeZohoServer:
+    """
+    HTTP-Server (ein Thread je Verbindung) über `ZohoFixtures`.
+
+    `start()` läuft im Hintergrund, `serve_forever()` blockiert; `url` ist die Basis
+    ohne Pfad, `settings_env()` die passenden Umgebungsvariablen.
+    """
+
+    def __init__(
+        self,
+        fixtures=None,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        rate_429=0.0,
+        error_rate=0.0,
+        token_lifetime=3600,
+        seed=0,
+    ):
+        self.fixtures = fixtures or ZohoFixtures(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.random = random.Random(seed)
+        self.tokens = {}
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings_env(self):
+        base = f"{self.url}{APP_PATH}"
+        return {
+            "BASE_URL": f"{base}/report",
+            "BASE_URL_PRIV_KUNDEN": f"{base}/report/Privatkunden_API",
+            "ACCESS_TOKEN_URL": f"{self.url}{TOKEN_PATH}",
+            "ZOHO_ANGEBOT_FORM_URL": f"{base}/form/Angebot",
+            "ZOHO_PROJEKT_REPORT_URL": f"{base}/report/PVA_klein1",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    """
+
+    ANFRAGEN
+
+    """
+
+    def issue_token(self):
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.tokens[token] = time.time() + self.token_lifetime
+        return {
+            "access_token": token,
+            "expires_in": self.token_lifetime,
+            "api_domain": self.url,
+            "token_type": "Bearer",
+        }
+
+    def authorized(self, header):
+        token = (header or "").removeprefix("Zoho-oauthtoken ").strip()
+        with self.lock:
+            expires_at = self.tokens.get(token)
+        return expires_at is not None and time.time() < expires_at
+
+    def injected_failure(self):
+        """Simulierte Latenz und zufällige Fehler; liefert `(status, body, headers)` oder None."""
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        roll = self.random.random()
+        if roll < self.rate_429:
+            return 429, {"code": 2955, "message": "Too many requests"}, {"Retry-After": "1"}
+        if roll < self.rate_429 + self.error_rate:
+            return 503, {"code": 9000, "message": "Service unavailable"}, {}
+        return None
+
+    def find(self, record_id, report=None):
+        """`(report, index)` des Datensatzes; ohne `report` in allen Reports."""
+        reports = [report] if report else list(self.fixtures.reports)
+        for name in reports:
+            for index, record in enumerate(self.fixtures.reports.get(name, [])):
+                if record["ID"] == record_id:
+                    return name, index
+        return None, None
+
+    def list_records(self, report, query):
+        try:
+            start = max(int(query.get("from", 1)), 1)
+            limit = min(max(int(query.get("limit", 200)), 1), MAX_LIMIT)
+            criteria = Criteria(query.get("criteria", ""))
+        except (CriteriaError, ValueError) as e:
+            return 400, {"code": 3001, "message": str(e)}
+        with self.lock:
+            records = [
+                record for record in self.fixtures.reports[report] if criteria.matches(record)
+            ]
+        page = records[start - 1 : start - 1 + limit]
+        if not page:
+            return 404, {"code": 3100, "message": "No Data Available"}
+        return 200, {"code": 3000, "data": page}
+
+    def handle(self, method, path, query, body, headers):
+        """Beantwortet eine Anfrage; liefert `(status, body, headers)`."""
+        if path == TOKEN_PATH:
+            if method != "POST":
+                return 405, {"error": "method_not_allowed"}, {}
+            self.count("POST token")
+            return 200, self.issue_token(), {}
+
+        if not path.startswith(APP_PATH + "/"):
+            return 404, {"message": f"Unbekannter Pfad {path}"}, {}
+        parts = path[len(APP_PATH) + 1 :].split("/")
+        kind, name, record_id = (
+            parts[0],
+            parts[1] if len(parts) > 1 else "",
+            parts[2] if len(parts) > 2 else None,
+        )
+        self.count(f"{method} {kind}/{'<id>' if name.isdigit() else name}")
+
+        if not self.authorized(headers.get("Authorization")):
+            return 401, {"code": 1030, "message": "Invalid OAuthtoken"}, {}
+        failure = self.injected_failure()
+        if failure:
+            self.count(f"injected {failure[0]}")
+            return failure
+
+        if kind == "form" and method == "POST" and name in FORM_REPORTS:
+            data = dict(body.get("data") or {})
+            with self.lock:
+                data["ID"] = self.fixtures.new_id()
+                data["Modified_Time"] = zoho_datetime(datetime.datetime.now())
+                self.fixtures.reports[FORM_REPORTS[name]].append(data)
+            return (
+                200,
+                {"code": 3000, "data": {"ID": data["ID"]}, "message": "Data Added Successfully!"},
+                {},
+            )
+        if kind != "report":
+            return 404, {"message": f"Unbekannter Pfad {path}"}, {}
+
+        # report/<id> ohne Report-Namen: Datensatz aus irgendeinem Report (wie der Elektrikkalender-Abruf)
+        if name not in self.fixtures.reports and name.isdigit() and record_id is None:
+            name, record_id = None, name
+        elif name not in self.fixtures.reports:
+            return 404, {"code": 2894, "message": f"Report {name} nicht vorhanden"}, {}
+
+        if record_id is None:
+            if method != "GET":
+                return 405, {"message": "Methode nur für einzelne Datensätze"}, {}
+            return (*self.list_records(name, query), {})
+
+        with self.lock:
+            report, index = self.find(record_id, name)
+            if report is None:
+                return 404, {"code": 3100, "message": "No Data Available"}, {}
+            record = self.fixtures.reports[report][index]
+            if method == "GET":
+                return 200, {"code": 3000, "data": record}, {}
+            if method in ("PATCH", "PUT"):
+                record.update(body.get("data") or {})
+                record["Modified_Time"] = zoho_datetime(datetime.datetime.now())
+                return (
+                    200,
+                    {
+                        "code": 3000,
+                        "data": {"ID": record_id},
+                        "message": "Data Updated Successfully!",
+                    },
+                    {},
+                )
+            if method == "DELETE":
+                del self.fixtures.reports[report][index]
+                return (
+                    200,
+                    {
+                        "code": 3000,
+                        "data": {"ID": record_id},
+                        "message": "Data Deleted Successfully!",
+                    },
+                    {},
+                )
+        return 405, {"message": f"Methode {method} nicht unterstützt"}, {}
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def dispatch(self):
+                url = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    body = json.loads(raw or b"{}")
+                else:
+                    body = {key: values[-1] for key, values in parse_qs(raw.decode()).items()}
+                status, payload, headers = server.handle(
+                    self.command, url.path, query, body, self.headers
+                )
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,82 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from shared.benchmark import compare_reports
+from shared.benchmark_pdf import check_concurrency, run_pdf_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the offer, calculation and ticket PDF generators on a separate test database "
+        "and writes a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="benchmark_pdf.json", help="Path of the JSON report")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario and document")
+        parser.add_argument("--limit", type=int, default=6, help="Number of scenarios (0 = all)")
+        parser.add_argument("--scenario", default=None, help="Only run scenarios whose name contains this text")
+        parser.add_argument(
+            "--cold-assets",
+            action="store_true",
+            help="Clear the font/image cache and the cached AGB pages before every document (behaviour without the caches)",
+        )
+        parser.add_argument("--compare", default=None, help="Earlier report to compare against")
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=0,
+            help="Also render --documents PDFs concurrently in this many threads and check their headers",
+        )
+        parser.add_argument("--documents", type=int, default=16, help="Number of PDFs for --threads")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        # Nie gegen die echte Datenbank messen: Benchmark-Daten landen in der Testdatenbank
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            report = run_pdf_benchmark(
+                repeat=options["repeat"],
+                scenario_filter=options["scenario"],
+                limit=options["limit"],
+                cold_assets=options["cold_assets"],
+            )
+            if options["threads"]:
+                report["concurrency"], errors = check_concurrency(
+                    threads=options["threads"],
+                    count=options["documents"],
+                    scenario_filter=options["scenario"],
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        with open(options["output"], "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+        for document, summary in report["operations"].items():
+            self.stdout.write(
+                f"{document}: median {summary['median_ms']} ms, p95 {summary['p95_ms']} ms, "
+                f"{summary['queries']} queries, peak {summary.get('peak_kib', '-')} KiB, "
+                f"{summary['pdf_kib']} KiB PDF"
+            )
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                old_report = json.load(file)
+            for document, metrics in compare_reports(old_report, report).items():
+                for metric, (before, after, delta) in metrics.items():
+                    self.stdout.write(f"{document} {metric}: {before} -> {after} ({delta} %)")
+
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if options["threads"]:
+            concurrency = report["concurrency"]
+            self.stdout.write(
+                f"{concurrency['documents']} PDFs: {concurrency['serial_seconds']} s serial, "
+                f"{concurrency['parallel_seconds']} s with {concurrency['threads']} threads"
+            )
+            if errors:
+                raise CommandError("Concurrently rendered PDFs differ:\n" + "\n".join(errors))
+            self.stdout.write(self.style.SUCCESS("Concurrently rendered PDFs match"))
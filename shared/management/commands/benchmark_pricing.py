@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from shared.benchmark import compare_reports, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks VertriebAngebot/VertriebTicket/Calculator pricing on a separate test database "
+        "and writes a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="benchmark_pricing.json", help="Path of the JSON report")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario and operation")
+        parser.add_argument("--scenario", default=None, help="Only run scenarios whose name contains this text")
+        parser.add_argument("--compare", default=None, help="Earlier report to compare against")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        # Nie gegen die echte Datenbank messen: Benchmark-Daten landen in der Testdatenbank
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            report = run_benchmark(repeat=options["repeat"], scenario_filter=options["scenario"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        with open(options["output"], "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+        for operation, summary in report["operations"].items():
+            self.stdout.write(
+                f"{operation}: median {summary['median_ms']} ms, p95 {summary['p95_ms']} ms, "
+                f"{summary['queries']} queries, peak {summary.get('peak_kib', '-')} KiB"
+            )
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                old_report = json.load(file)
+            for operation, metrics in compare_reports(old_report, report).items():
+                for metric, (before, after, delta) in metrics.items():
+                    self.stdout.write(f"{operation} {metric}: {before} -> {after} ({delta} %)")
+
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
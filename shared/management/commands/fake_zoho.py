@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from shared.fake_zoho import FakeZohoServer, ZohoFixtures
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local Zoho Creator stand-in with generated reports for load and integration "
+        "tests and prints the environment variables that point the app at it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+        parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the generated fixtures")
+        parser.add_argument("--vertriebler", type=int, default=10, help="Number of Vertriebler")
+        parser.add_argument("--kunden", type=int, default=2000, help="Number of Privatkunden")
+        parser.add_argument("--elektriker", type=int, default=5, help="Number of Elektriker")
+        parser.add_argument(
+            "--kalender", type=int, default=300, help="Number of Elektrikkalender entries"
+        )
+        parser.add_argument(
+            "--projekte", type=int, default=500, help="Number of PVA_klein1 projects"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Added latency per request in seconds"
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.0,
+            help="Random +/- variation of the latency in seconds",
+        )
+        parser.add_argument(
+            "--rate-429", type=float, default=0.0, help="Share of requests answered with 429"
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0, help="Share of requests answered with 503"
+        )
+        parser.add_argument(
+            "--token-lifetime",
+            type=int,
+            default=3600,
+            help="Lifetime of issued access tokens in seconds",
+        )
+
+    def handle(self, *args, **options):
+        fixtures = ZohoFixtures(
+            seed=options["seed"],
+            vertriebler=options["vertriebler"],
+            kunden=options["kunden"],
+            elektriker=options["elektriker"],
+            kalender=options["kalender"],
+            projekte=options["projekte"],
+        )
+        server = FakeZohoServer(
+            fixtures,
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            jitter=options["jitter"],
+            rate_429=options["rate_429"],
+            error_rate=options["error_rate"],
+            token_lifetime=options["token_lifetime"],
+            seed=options["seed"],
+        )
+
+        self.stdout.write(f"Fake Zoho Creator auf {server.url}")
+        for report, records in fixtures.reports.items():
+            self.stdout.write(f"  {report}: {len(records)} Datensätze")
+        self.stdout.write("Umgebung für die App:")
+        for key, value in server.settings_env().items():
+            self.stdout.write(f"  export {key}={value}")
+        # Vertriebler-IDs für User.zoho_id, z. B. nach `update_vertrieblers`
+        vertriebler_ids = ", ".join(
+            record["ID"] for record in fixtures.reports["Au_endienstler_API"][:3]
+        )
+        self.stdout.write(f"Vertriebler-IDs (Auszug): {vertriebler_ids}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f"Anfragen: {server.stats()}")
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shared", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZohoApiUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("priority", models.CharField(max_length=20)),
+                ("calls", models.PositiveIntegerField(default=0)),
+                ("throttled", models.PositiveIntegerField(default=0)),
+                ("throttle_seconds", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ZohoRateBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("family", models.CharField(max_length=50, unique=True)),
+                ("tokens", models.FloatField(default=0)),
+                ("refilled_at", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="zohoapiusage",
+            constraint=models.UniqueConstraint(
+                fields=("day", "priority"), name="unique_zoho_api_usage_per_day"
+            ),
+        ),
+    ]
@@ -7,3 +7,50 @@ class TimeStampMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ZohoAccessToken(models.Model):
+    """
+    Gemeinsamer OAuth-Access-Token für alle Prozesse (Web, Celery, Management-Commands).
+    Die Zeile wird beim Erneuern gesperrt, damit immer nur ein Prozess den Token-Endpunkt aufruft.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    access_token = models.TextField(blank=True, default="")
+    expires_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} (bis {self.expires_at})"
+
+
+class ZohoRateBucket(models.Model):
+    """Token-Bucket einer Zoho-Endpunktfamilie (siehe `shared.zoho_rate_limit`), beim Abbuchen gesperrt."""
+
+    family = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField(default=0)
+    # Zeitpunkt des letzten Auffüllens als Unix-Zeitstempel
+    refilled_at = models.FloatField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.family}: {self.tokens:.1f}"
+
+
+class ZohoApiUsage(models.Model):
+    """Zoho-Aufrufe pro Tag und Priorität, für das Tagesbudget und zur Auswertung."""
+
+    day = models.DateField()
+    priority = models.CharField(max_length=20)
+    calls = models.PositiveIntegerField(default=0)
+    throttled = models.PositiveIntegerField(default=0)
+    throttle_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "priority"], name="unique_zoho_api_usage_per_day"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.priority}: {self.calls}"
@@ -0,0 +1,164 @@
+"""
+Schriften und Bilder der FPDF-Generatoren, einmal pro Prozess geladen.
+
+fpdf liest bei jedem `add_font` die Schriftmetriken neu ein (aus der .pkl neben der TTF
+oder, falls die fehlt, aus der TTF selbst) und dekodiert jedes Bild neu von der Platte,
+und zwar für jedes Dokument. `AssetCacheMixin` hält beides für die Dateien unter
+`ASSET_DIRS` prozessweit vor und trägt jedem neuen `PDF` nur noch Kopien der fertigen
+Einträge in `fonts`/`font_files`/`images` ein. Ändert sich eine Datei (Größe oder
+mtime, z. B. nach `collectstatic`), wird sie neu geladen.
+
+Dazu gehören auch die Zertifikate der Benutzer (`certPage`): fpdf trennt bei PNGs mit
+Alphakanal die Transparenz Zeile für Zeile in Python ab, für einen A4-Scan einige
+Sekunden pro Dokument. Andere Dateien (Diagramme der Kalkulation) laufen unverändert
+durch fpdf. Die Celery-Worker laden `PRELOAD_FONTS` und `PRELOAD_IMAGES` schon beim
+Start (`preload()`, siehe `config.celery`), Web-Prozesse beim ersten Dokument.
+"""
+
+import os
+import threading
+
+from fpdf import FPDF
+
+from config import settings
+
+ASSET_DIRS = (
+    settings.STATIC_ROOT,
+    os.path.join(settings.MEDIA_ROOT, "fonts"),
+    # `upload_to` von `User.user_certifikate`
+    os.path.join(settings.MEDIA_ROOT, "assets/images/users/certifikates"),
+)
+
+# (Familie, Stil, Pfad relativ zu STATIC_ROOT)
+PRELOAD_FONTS = (
+    ("JUNO Solar Lt", "", "fonts/JUNOSolarLt.ttf"),
+    ("JUNO Solar Lt", "B", "fonts/JUNOSolarRg.ttf"),
+    ("Poppins", "", "fonts/Poppins-Regular.ttf"),
+    ("Poppins", "B", "fonts/Poppins-Bold.ttf"),
+)
+PRELOAD_IMAGES = (
+    os.path.join(settings.STATIC_ROOT, "fonts/junosolar_logo.jpg"),
+    os.path.join(settings.STATIC_ROOT, "fonts/Stempel_blue.jpg"),
+    os.path.join(settings.MEDIA_ROOT, "fonts/junosolar_logo.jpg"),
+)
+
+_fonts = {}
+_images = {}
+_lock = threading.Lock()
+
+
+def is_asset(path):
+    path = os.path.abspath(path)
+    return any(path.startswith(os.path.abspath(folder) + os.sep) for folder in ASSET_DIRS)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _cached(cache, key, path, load):
+    signature = file_signature(path)
+    entry = cache.get(key)
+    if entry is None or entry[0] != signature:
+        with _lock:
+            entry = cache.get(key)
+            if entry is None or entry[0] != signature:
+                entry = (signature, load())
+                cache[key] = entry
+    return entry[1]
+
+
+def font_resource(family, style, path):
+    """Metriken einer TTF wie von `FPDF.add_font(..., uni=True)`: `(fonts-Eintrag, font_files-Eintrag)`."""
+
+    def load():
+        pdf = FPDF()
+        FPDF.add_font(pdf, family, style, path, uni=True)
+        fontkey = next(iter(pdf.fonts))
+        return pdf.fonts[fontkey], pdf.font_files[fontkey]
+
+    return _cached(_fonts, (family.lower(), style.upper(), path), path, load)
+
+
+def image_resource(path):
+    """Dekodiertes Bild wie von `FPDF.image()` (ohne Objektnummern)."""
+
+    def load():
+        pdf = FPDF()
+        pdf.add_page()
+        FPDF.image(pdf, path, x=0, y=0, w=1, h=1)
+        return pdf.images[path]
+
+    return _cached(_images, path, path, load)
+
+
+def preload():
+    """Lädt `PRELOAD_FONTS` und `PRELOAD_IMAGES`; fehlende Dateien (vor `collectstatic`) überspringt es."""
+    warmup = WarmupPDF()
+    warmup.add_page()
+    for family, style, name in PRELOAD_FONTS:
+        path = os.path.join(settings.STATIC_ROOT, name)
+        if os.path.exists(path):
+            font_resource(family, style, path)
+            warmup.add_font(family, style, path, uni=True)
+            warmup.set_font(family, style, 8)
+            warmup.cell(0, 5, "Ä")
+    for path in PRELOAD_IMAGES:
+        if os.path.exists(path):
+            image_resource(path)
+    # fpdf legt beim ersten Ausgeben einer Schrift die .cw127.pkl neben der TTF an und
+    # liest sie danach ungesperrt; einmal vorab, damit parallel erstellte Dokumente
+    # keine halb geschriebene Datei lesen
+    warmup.output(dest="S")
+
+
+def clear():
+    with _lock:
+        _fonts.clear()
+        _images.clear()
+
+
+class AssetCacheMixin:
+    """Vor `FPDF` in die Basisklassen eines Generators: Schriften und Bilder aus dem Cache."""
+
+    def add_font(self, family, style="", fname="", uni=False):
+        if not (uni and fname and is_asset(fname)):
+            return super().add_font(family, style, fname, uni)
+        style = style.upper()
+        if style == "IB":
+            style = "BI"
+        fontkey = family.lower() + style
+        if fontkey in self.fonts:
+            return
+        font, font_file = font_resource(family, style, fname)
+        # Schriftbreiten teilen sich alle Dokumente, die Zeichenauswahl (subset) nicht
+        self.fonts[fontkey] = dict(
+            font,
+            i=len(self.fonts) + 1,
+            subset=list(range(0, 57 if hasattr(self, "str_alias_nb_pages") else 32)),
+        )
+        self.font_files[fontkey] = dict(font_file)
+        self.font_files[fname] = {"type": "TTF"}
+
+    def image(self, name, *args, **kwargs):
+        if name not in self.images and is_asset(name):
+            # fpdf setzt beim Ausgeben Objektnummern und löscht die Bilddaten, daher eine Kopie
+            self.images[name] = dict(image_resource(name), i=len(self.images) + 1)
+            # wie in `FPDF._parsepng` für Bilder mit Alphakanal
+            if "smask" in self.images[name] and self.pdf_version < "1.4":
+                self.pdf_version = "1.4"
+        return super().image(name, *args, **kwargs)
+
+    def _putfonts(self):
+        # fpdf hängt jedes gesetzte Zeichen an `subset` an, auch doppelt, und sucht beim
+        # Ausgeben für jedes Zeichen der Schrift in dieser Liste; ohne Doppelte ist das
+        # PDF dasselbe (die erste 0, die fpdf dabei entfernt, bleibt vorne)
+        for font in self.fonts.values():
+            if "subset" in font:
+                font["subset"] = list(dict.fromkeys(font["subset"]))
+        return super()._putfonts()
+
+
+class WarmupPDF(AssetCacheMixin, FPDF):
+    pass
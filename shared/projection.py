@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def price_inflation(price_per_year, increase_per_year, years):
+    """
+    Vektorisierte Variante des früheren `priceInflation`.
+
+    Alle Argumente dürfen Skalare oder gleich lange Arrays (ein Eintrag je Angebot) sein.
+    Liefert `(gesamt, reihe)`: die Summe über `years` Jahre und die kumulierten Kosten
+    je Jahr als Array der Form `(n, max(years))`. Jahre jenseits von `years` sind NaN.
+
+    Die Jahrespreise werden wie in der Schleife schrittweise mit `1 + increase_per_year`
+    multipliziert (cumprod) und anschließend aufsummiert (cumsum), damit die Werte
+    bitgenau mit der bisherigen Berechnung übereinstimmen.
+    """
+    price_per_year = np.atleast_1d(np.asarray(price_per_year, dtype=float))
+    increase_per_year = np.atleast_1d(np.asarray(increase_per_year, dtype=float))
+    years = np.atleast_1d(np.asarray(years, dtype=int))
+    price_per_year, increase_per_year, years = np.broadcast_arrays(
+        price_per_year, increase_per_year, years
+    )
+    horizon = int(years.max()) if years.size else 0
+
+    factors = np.empty(price_per_year.shape + (horizon,))
+    if horizon:
+        factors[:, 0] = price_per_year
+        factors[:, 1:] = (1.0 + increase_per_year)[:, None]
+    series = np.cumsum(np.cumprod(factors, axis=1), axis=1)
+    series[np.arange(horizon) >= years[:, None]] = np.nan
+
+    totals = np.zeros(price_per_year.shape)
+    has_years = years > 0
+    totals[has_years] = series[has_years, years[has_years] - 1]
+    return totals, series
+
+
+class Projection:
+    """
+    Kostenverlauf mit und ohne PV-Anlage für ein oder mehrere Angebote.
+
+    `arbeit[k, i]`: kumulierte Arbeitspreise bis Jahr `i + 1`.
+    `ohne_pv[k, i]`: dasselbe plus Grundpreis.
+    `mit_pv[k, i]`: kumulierter Reststrom plus Grundpreis plus Anlagenkosten,
+    abzüglich der bis dahin erhaltenen Einspeisevergütung.
+    """
+
+    def __init__(
+        self, years, arbeitspreis_gesamt, reststrom_preis, arbeit, ohne_pv, mit_pv
+    ):
+        self.years = years
+        self.arbeitspreis_gesamt = arbeitspreis_gesamt
+        self.reststrom_preis = reststrom_preis
+        self.arbeit = arbeit
+        self.ohne_pv = ohne_pv
+        self.mit_pv = mit_pv
+
+    def __len__(self):
+        return len(self.years)
+
+    def arbeit_liste(self, index=0):
+        return self.arbeit[index, : self.years[index]].tolist()
+
+    def ohne_pv_liste(self, index=0):
+        return self.ohne_pv[index, : self.years[index]].tolist()
+
+    def mit_pv_liste(self, index=0):
+        return self.mit_pv[index, : self.years[index]].tolist()
+
+    def amortisationsjahre(self):
+        """
+        Erstes Jahr je Angebot, in dem die kumulierten Kosten mit PV höchstens so hoch
+        sind wie ohne PV; 0, falls sich die Anlage im Betrachtungszeitraum nicht amortisiert.
+        """
+        amortisiert = self.mit_pv <= self.ohne_pv  # NaN jenseits von `years` zählt als nicht amortisiert
+        return np.where(amortisiert.any(axis=1), amortisiert.argmax(axis=1) + 1, 0)
+
+
+def project(
+    verbrauch,
+    restenergie,
+    arbeitspreis,
+    grundpreis,
+    prognose,
+    zeitraum,
+    kosten_pva,
+    einsp_pro_jahr,
+):
+    """
+    Berechnet die Amortisationsreihen für ein Angebot oder einen ganzen Batch.
+
+    Jedes Argument ist ein Skalar oder ein Array mit einem Wert je Angebot;
+    `arbeitspreis` in Cent/kWh, `grundpreis` in €/Monat, `prognose` in Prozent pro Jahr.
+    """
+    zeitraum = np.atleast_1d(np.asarray(zeitraum, dtype=int))
+    steigerung = np.asarray(prognose, dtype=float) / 100
+    arbeitspreis = np.asarray(arbeitspreis, dtype=float) / 100
+    arbeit_gesamt, arbeit = price_inflation(
+        arbeitspreis * np.asarray(verbrauch, dtype=float), steigerung, zeitraum
+    )
+    rest_gesamt, rest = price_inflation(
+        arbeitspreis * np.asarray(restenergie, dtype=float), steigerung, zeitraum
+    )
+
+    jahre = np.arange(1, arbeit.shape[1] + 1)
+    grundpreise = np.atleast_1d(np.asarray(grundpreis, dtype=float))[:, None] * 12 * jahre
+    kosten_pva = np.atleast_1d(np.asarray(kosten_pva, dtype=float))[:, None]
+    einspeisung = np.atleast_1d(np.asarray(einsp_pro_jahr, dtype=float))[:, None] * jahre
+
+    return Projection(
+        years=np.broadcast_to(zeitraum, arbeit_gesamt.shape),
+        arbeitspreis_gesamt=arbeit_gesamt,
+        reststrom_preis=rest_gesamt,
+        arbeit=arbeit,
+        ohne_pv=arbeit + grundpreise,
+        mit_pv=rest + grundpreise + kosten_pva - einspeisung,
+    )
+
+
+def project_offer(offer):
+    """Projektion aus den Feldern eines `Calculator` (oder eines Objekts mit denselben Feldern)."""
+    return project(
+        verbrauch=float(offer.verbrauch),
+        restenergie=float(offer.verbrauch) - offer.nutz_energie,
+        arbeitspreis=float(offer.arbeitspreis),
+        grundpreis=float(offer.grundpreis),
+        prognose=float(offer.prognose),
+        zeitraum=int(offer.zeitraum),
+        kosten_pva=offer.kosten_pva,
+        einsp_pro_jahr=offer.einsp_pro_jahr,
+    )
+
+
+class LegacyArbeitsListeMixin:
+    """
+    `arbeits_liste`/`rest_liste` mit den bisher gespeicherten Zahlen.
+
+    Die frühere `rest_liste` addierte bei jedem Aufruf den Grundpreis in die je Instanz
+    zwischengespeicherte `arbeits_liste`, die in `Arbeits_liste` und `ag_data` landet.
+    Das bleibt hier Aufruf für Aufruf erhalten, damit gespeicherte Werte und Diagramme
+    unverändert bleiben. Die Modelle liefern `arbeitspreis_liste()` (ohne Grundpreis)
+    und `projected_rest_liste()`.
+    """
+
+    @property
+    def arbeits_liste(self):
+        if "_arbeits_liste" not in self.__dict__:
+            self._arbeits_liste = self.arbeitspreis_liste()
+        return self._arbeits_liste
+
+    @property
+    def rest_liste(self):
+        rest_liste = self.projected_rest_liste()
+        arbeits_liste = self.arbeits_liste
+        for i in range(self.zeitraum):
+            arbeits_liste[i] += float(self.grundpreis) * 12 * (i + 1)
+        return rest_liste
@@ -1,3 +1,154 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from shared import zoho_rate_limit
+from shared.benchmark_pdf import check_concurrency
+from shared.fake_zoho import APP_PATH, TOKEN_PATH, FakeZohoServer
+from shared.zoho_client import BudgetExceededException, ZohoClient
+from shared.zoho_rate_limit import (
+    BACKGROUND,
+    INTERACTIVE,
+    BudgetExhausted,
+    DatabaseRateLimiter,
+    MemoryRateLimiter,
+    zoho_priority,
+)
+from shared.zoho_token import MemoryTokenStore
+
+
+class PdfConcurrencyTest(TransactionTestCase):
+    # TransactionTestCase, weil die Threads eigene Verbindungen haben und nur
+    # committete Testdaten sehen
+
+    def test_parallel_pdfs_match_serial(self):
+        report, errors = check_concurrency(threads=8, count=16)
+        self.assertEqual(errors, [])
+        self.assertEqual(report["documents"], 16)
+
+
+class ZohoRateLimitTest(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch.object(
+            zoho_rate_limit, "time", SimpleNamespace(time=lambda: self.now)
+        )
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def limiters(self, **kwargs):
+        return [
+            MemoryRateLimiter(**kwargs),
+            DatabaseRateLimiter(**kwargs),
+        ]
+
+    def acquire_all(self, limiter, count, priority=INTERACTIVE):
+        return [limiter.acquire("read", priority) for _ in range(count)]
+
+    def test_burst_then_refill(self):
+        for limiter in self.limiters(limits={"read": (60, 5)}, daily_budget=0):
+            with self.subTest(type(limiter).__name__):
+                self.now = 1000.0
+                # voller Bucket: der Burst geht sofort raus, danach 1 Token pro Sekunde
+                self.assertEqual(self.acquire_all(limiter, 5), [0.0] * 5)
+                self.assertAlmostEqual(limiter.acquire("read"), 1.0)
+                self.now += 0.5
+                self.assertAlmostEqual(limiter.acquire("read"), 0.5)
+                self.now += 0.5
+                self.assertEqual(limiter.acquire("read"), 0.0)
+                # nach langer Pause höchstens wieder der Burst
+                self.now += 600
+                self.assertEqual(self.acquire_all(limiter, 5), [0.0] * 5)
+                self.assertGreater(limiter.acquire("read"), 0)
+                # andere Endpunktfamilien haben eigene Buckets bzw. kein Limit
+                self.assertEqual(limiter.acquire("write"), 0.0)
+
+    def test_background_leaves_reserve_for_interactive(self):
+        for limiter in self.limiters(
+            limits={"read": (60, 10)}, daily_budget=0, interactive_reserve=0.3
+        ):
+            with self.subTest(type(limiter).__name__):
+                with zoho_priority(BACKGROUND):
+                    self.assertEqual(
+                        [limiter.acquire("read") for _ in range(7)], [0.0] * 7
+                    )
+                    # 3 Tokens bleiben für interaktive Anfragen stehen
+                    self.assertAlmostEqual(limiter.acquire("read"), 1.0)
+                self.assertEqual(self.acquire_all(limiter, 3), [0.0] * 3)
+                self.assertAlmostEqual(limiter.acquire("read"), 1.0)
+                self.assertAlmostEqual(limiter.acquire("read", BACKGROUND), 4.0)
+
+    def test_daily_budget(self):
+        for limiter in self.limiters(limits={}, daily_budget=10, background_share=0.6):
+            with self.subTest(type(limiter).__name__):
+                self.assertEqual(self.acquire_all(limiter, 6, BACKGROUND), [0.0] * 6)
+                with self.assertRaises(BudgetExhausted):
+                    limiter.acquire("read", BACKGROUND)
+                # interaktive Aufrufe dürfen das ganze Budget nutzen
+                self.assertEqual(self.acquire_all(limiter, 4), [0.0] * 4)
+                with self.assertRaises(BudgetExhausted):
+                    limiter.acquire("write", INTERACTIVE)
+                usage = limiter.usage()
+                self.assertEqual(usage[BACKGROUND]["calls"], 6)
+                self.assertEqual(usage[INTERACTIVE]["calls"], 4)
+
+    def test_client_reports_exhausted_budget(self):
+        client = ZohoClient(
+            token_store=MemoryTokenStore(),
+            rate_limiter=MemoryRateLimiter(limits={}, daily_budget=1),
+        )
+        self.assertEqual(client.throttle("GET", "report/Angebote", INTERACTIVE), 0.0)
+        with self.assertRaises(BudgetExceededException):
+            client.throttle("GET", "report/Angebote", INTERACTIVE)
+
+
+class ZohoTokenTest(SimpleTestCase):
+    def setUp(self):
+        self.server = FakeZohoServer(latency=0.05).start()
+        self.addCleanup(self.server.stop)
+        token_url = mock.patch(
+            "shared.zoho_client.ACCESS_TOKEN_URL", f"{self.server.url}{TOKEN_PATH}"
+        )
+        token_url.start()
+        self.addCleanup(token_url.stop)
+        self.url = f"{self.server.url}{APP_PATH}/report/Privatkunden_API"
+        self.store = MemoryTokenStore()
+
+    def zoho_client(self):
+        return ZohoClient(
+            token_store=self.store,
+            rate_limiter=MemoryRateLimiter(limits={}, daily_budget=0),
+        )
+
+    def refreshes(self):
+        return self.server.stats().get("POST token", 0)
+
+    def test_single_refresh_for_concurrent_401(self):
+        # zwei Clients mit gemeinsamem Store stehen für zwei Prozesse
+        clients = [self.zoho_client(), self.zoho_client()]
+        for client in clients:
+            client.get(self.url, {"limit": 1})
+        self.assertEqual(self.refreshes(), 1)
+
+        # Zoho verwirft alle Tokens: jede Anfrage bekommt zunächst 401
+        with self.server.lock:
+            self.server.tokens.clear()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda index: clients[index % 2].get(self.url, {"limit": 1}),
+                    range(8),
+                )
+            )
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.refreshes(), 2)
+        self.assertEqual(self.server.stats()["GET report/Privatkunden_API"], 2 + 8 + 8)
+        token = self.store.load()[0]
+        self.assertEqual([client.access_token() for client in clients], [token] * 2)
+
+    def test_stored_token_is_reused(self):
+        self.zoho_client().get(self.url, {"limit": 1})
+        self.zoho_client().get(self.url, {"limit": 1})
+        self.assertEqual(self.refreshes(), 1)
@@ -1,9 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.db.utils import IntegrityError
 from authentication.models import User
-import requests
-import json
 from config.settings import BASE_URL_PRIV_KUNDEN
+from shared.zoho_client import APIException, get_zoho_client
 
 
 class Command(BaseCommand):
@@ -11,29 +10,10 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         url = BASE_URL_PRIV_KUNDEN
-        headers = {"Authorization": "Zoho-oauthtoken your_auth_token"}
         vertriebler_set = set()
-        limit = 200
-        start_index = 0
 
-        while True:
-            params = {"from": start_index, "limit": limit}
-            response = requests.get(url, headers=headers, params=params)  # type: ignore
-
-            if response.status_code != 200:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f"Failed to fetch data, status code: {response.status_code}"
-                    )
-                )
-                break
-
-            data = json.loads(response.text)
-
-            if not data["data"]:
-                break
-
-            for record in data["data"]:
+        try:
+            for record in get_zoho_client().iter_records(url, limit=200, start=0):
                 if (
                     "Vertriebler" in record
                     and "display_value" in record["Vertriebler"]
@@ -45,8 +25,8 @@ class Command(BaseCommand):
                             record["Vertriebler"]["ID"],
                         )
                     )
-
-            start_index += limit
+        except APIException as e:
+            self.stdout.write(self.style.ERROR(f"Failed to fetch data: {e}"))
 
         for name, zoho_id in vertriebler_set:
             try:
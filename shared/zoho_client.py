@@ -0,0 +1,629 @@
+"""
+Gemeinsamer HTTP-Client für alle Zugriffe auf Zoho Creator.
+
+Eine `requests.Session` je Prozess mit Connection-Pool (Keep-Alive), festen
+Timeouts und exponentiellem Backoff bei 429 sowie, für idempotente Methoden, bei 5xx
+und Verbindungsfehlern.
+Ein 401 löst genau einen Token-Refresh mit anschließender Wiederholung aus;
+der Token liegt prozessübergreifend in einem Token-Store (`shared.zoho_token`).
+Vor jedem Aufruf bucht der Client beim Rate-Limiter (`shared.zoho_rate_limit`) ab
+und wartet, falls der Token-Bucket leer ist.
+Fehler werden als `APIException`-Unterklassen gemeldet; Laufzeit, Wiederholungen
+und Drosselung je Endpunkt stehen in `ZohoClient.stats()`.
+
+Große Reports lassen sich mit `iter_records()` abrufen: mehrere Seiten parallel
+(asyncio/aiohttp), die Datensätze kommen trotzdem der Reihe nach als Strom.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from django.db import connections
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    ACCESS_TOKEN_URL,
+    ZOHO_BACKOFF,
+    ZOHO_CLIENT_ID,
+    ZOHO_CLIENT_SECRET,
+    ZOHO_CONCURRENCY,
+    ZOHO_MAX_RETRIES,
+    ZOHO_POOL_SIZE,
+    ZOHO_RATE_LIMITER,
+    ZOHO_REFRESH_TOKEN,
+    ZOHO_THROTTLE_MAX_WAIT,
+    ZOHO_TIMEOUT,
+    ZOHO_TOKEN_REFRESH_MARGIN,
+    ZOHO_TOKEN_STORE,
+)
+from shared.zoho_rate_limit import (
+    RATE_LIMITERS,
+    BudgetExhausted,
+    current_priority,
+    endpoint_family,
+)
+from shared.zoho_token import TOKEN_STORES
+
+logger = logging.getLogger(__name__)
+
+HTTP_UNAUTHORIZED = 401
+HTTP_NOT_FOUND = 404
+HTTP_TOO_MANY_REQUESTS = 429
+RETRY_STATUS = {HTTP_TOO_MANY_REQUESTS, 500, 502, 503, 504}
+# Ein POST, der Zoho erreicht hat, legt beim Wiederholen einen zweiten Datensatz an;
+# wiederholt werden nur diese Methoden (und jede Methode nach 429, das Zoho abgelehnt hat)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+# Zoho Creator: "No records found for the given criteria"
+ZOHO_NO_RECORDS = 3100
+MAX_BACKOFF = 60
+
+
+class APIException(Exception):
+    def __init__(self, message, status_code=None, url=None, code=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+        self.code = code
+
+
+class UnauthorizedException(APIException):
+    pass
+
+
+class TokenRefreshException(UnauthorizedException):
+    pass
+
+
+class RateLimitExceededException(APIException):
+    pass
+
+
+class BudgetExceededException(RateLimitExceededException):
+    """Eigenes Tagesbudget bzw. maximale Wartezeit des Rate-Limiters überschritten; nicht an Zoho gesendet."""
+
+
+class ServerErrorException(APIException):
+    pass
+
+
+class NotFoundException(APIException):
+    pass
+
+
+class NoRecordsException(APIException):
+    pass
+
+
+class TransportException(APIException):
+    """Timeout oder Verbindungsfehler, bevor Zoho geantwortet hat."""
+
+
+def endpoint_name(url):
+    """Kurzname für Statistiken, z. B. "report/Privatkunden_API" (ohne Datensatz-ID)."""
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    for kind in ("report", "form"):
+        if kind in parts:
+            index = parts.index(kind)
+            return "/".join(part for part in parts[index : index + 2] if not part.isdigit())
+    return "/".join(part for part in parts if not part.isdigit()) or url
+
+
+def error_for_response(response, method, endpoint):
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    return error_for_status(response.status_code, body, response.url, method, endpoint)
+
+
+def error_for_status(status_code, body, url, method, endpoint):
+    code = body.get("code") if isinstance(body, dict) else None
+    message = f"{method} {endpoint}: HTTP {status_code}"
+    if code:
+        message += f", Zoho-Code {code}"
+
+    if code == ZOHO_NO_RECORDS:
+        exception_class = NoRecordsException
+    elif status_code == HTTP_UNAUTHORIZED:
+        exception_class = UnauthorizedException
+    elif status_code == HTTP_NOT_FOUND:
+        exception_class = NotFoundException
+    elif status_code == HTTP_TOO_MANY_REQUESTS:
+        exception_class = RateLimitExceededException
+    elif status_code >= 500:
+        exception_class = ServerErrorException
+    else:
+        exception_class = APIException
+    return exception_class(message, status_code=status_code, url=url, code=code)
+
+
+class ZohoClient:
+    def __init__(
+        self,
+        timeout=ZOHO_TIMEOUT,
+        max_retries=ZOHO_MAX_RETRIES,
+        backoff=ZOHO_BACKOFF,
+        pool_size=ZOHO_POOL_SIZE,
+        sleep=time.sleep,
+        token_store=None,
+        rate_limiter=None,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.token_store = token_store or TOKEN_STORES[ZOHO_TOKEN_STORE]()
+        self.rate_limiter = rate_limiter or RATE_LIMITERS[ZOHO_RATE_LIMITER]()
+        # lokale Kopie aus dem Token-Store, erspart die Abfrage bei jedem Aufruf
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    """
+
+    TOKEN
+
+    """
+
+    @staticmethod
+    def usable(token, rejected=None):
+        """Token ist vorhanden, nicht gerade von Zoho abgelehnt und läuft nicht bald ab."""
+        return (
+            token is not None
+            and token[0] != rejected
+            and time.time() < token[1] - ZOHO_TOKEN_REFRESH_MARGIN
+        )
+
+    def access_token(self, rejected=None):
+        """
+        Gültiger Access-Token. `rejected` ist ein Token, den Zoho gerade mit 401 abgelehnt hat.
+
+        Reihenfolge: lokale Kopie, dann Token-Store, erst dann Refresh bei Zoho. Der Refresh
+        läuft single-flight: im Prozess hinter `_token_lock`, prozessübergreifend hinter
+        `token_store.locked()`. Wer warten musste, findet danach meist schon den neuen Token.
+        Tokens werden `ZOHO_TOKEN_REFRESH_MARGIN` Sekunden vor Ablauf erneuert.
+        """
+        if self.usable(self._token, rejected):
+            return self._token[0]
+        with self._token_lock:
+            if self.usable(self._token, rejected):
+                return self._token[0]
+            stored = self.token_store.load()
+            if not self.usable(stored, rejected):
+                with self.token_store.locked():
+                    stored = self.token_store.load()
+                    if not self.usable(stored, rejected):
+                        stored = self.refresh_access_token()
+                        self.token_store.save(*stored)
+            self._token = stored
+            return stored[0]
+
+    def refresh_access_token(self):
+        """Holt einen neuen Token bei Zoho; liefert `(access_token, expires_at)`."""
+        data = self.request(
+            "POST",
+            ACCESS_TOKEN_URL,
+            data={
+                "refresh_token": ZOHO_REFRESH_TOKEN,
+                "client_id": ZOHO_CLIENT_ID,
+                "client_secret": ZOHO_CLIENT_SECRET,
+                "grant_type": "refresh_token",
+            },
+            auth=False,
+            # ein zweiter Refresh liefert nur einen weiteren Token
+            idempotent=True,
+        )
+        if not data.get("access_token"):
+            raise TokenRefreshException(
+                f"Kein Access-Token in der Antwort: {data.get('error', data)}",
+                url=ACCESS_TOKEN_URL,
+            )
+        logger.info("Zoho Access-Token erneuert")
+        return data["access_token"], time.time() + float(data.get("expires_in", 3600))
+
+    """
+
+    REQUESTS
+
+    """
+
+    def backoff_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF)
+        delay = self.backoff * 2**attempt
+        return min(delay + random.uniform(0, self.backoff), MAX_BACKOFF)
+
+    def throttle(self, method, endpoint, priority, waited=0.0):
+        """
+        Ein Schritt beim Rate-Limiter: 0, wenn der Aufruf raus darf, sonst die Wartezeit.
+        Wirft `BudgetExceededException`, wenn das Tagesbudget erschöpft ist oder die
+        Gesamtwartezeit `ZOHO_THROTTLE_MAX_WAIT` überschreiten würde.
+        """
+        try:
+            wait = self.rate_limiter.acquire(endpoint_family(method), priority, waited)
+        except BudgetExhausted as exc:
+            raise BudgetExceededException(f"{method} {endpoint}: {exc}")
+        if wait and waited + wait > ZOHO_THROTTLE_MAX_WAIT[priority]:
+            raise BudgetExceededException(
+                f"{method} {endpoint}: gedrosselt, über {ZOHO_THROTTLE_MAX_WAIT[priority]:.0f} s Wartezeit"
+            )
+        return wait
+
+    def wait_for_slot(self, method, endpoint):
+        """Wartet, bis der Rate-Limiter den Aufruf freigibt; liefert die Wartezeit in Sekunden."""
+        priority = current_priority()
+        waited = 0.0
+        while True:
+            wait = self.throttle(method, endpoint, priority, waited)
+            if not wait:
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    def request(
+        self,
+        method,
+        url,
+        params=None,
+        json=None,
+        data=None,
+        headers=None,
+        auth=True,
+        idempotent=None,
+    ):
+        """
+        Sendet eine Anfrage und liefert die JSON-Antwort. Wiederholt bei 429 sowie, für
+        idempotente Methoden (`IDEMPOTENT_METHODS`), bei 5xx und Verbindungsfehlern bis zu
+        `max_retries` Mal; wirft sonst die passende `APIException`. Ein POST wirft bei
+        5xx/Timeout sofort, ob er wiederholt wird, entscheidet der Aufrufer (Outbox).
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        endpoint = endpoint_name(url)
+        started = time.perf_counter()
+        retries = 0
+        refreshed = False
+        error = None
+        throttled = 0.0
+        try:
+            while True:
+                request_headers = dict(headers or {})
+                token = None
+                if auth:
+                    # der Token-Endpunkt (auth=False) zählt nicht gegen das Creator-Limit
+                    throttled += self.wait_for_slot(method, endpoint)
+                    token = self.access_token()
+                    request_headers["Authorization"] = f"Zoho-oauthtoken {token}"
+                response = None
+                try:
+                    response = self.session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json,
+                        data=data,
+                        headers=request_headers,
+                        timeout=self.timeout,
+                    )
+                except (requests.Timeout, requests.ConnectionError) as exc:
+                    error = TransportException(f"{method} {endpoint}: {exc}", url=url)
+                else:
+                    if response.status_code < 400:
+                        error = None
+                        try:
+                            return response.json()
+                        except ValueError:
+                            error = APIException(
+                                f"{method} {endpoint}: keine JSON-Antwort",
+                                status_code=response.status_code,
+                                url=url,
+                            )
+                            raise error
+                    error = error_for_response(response, method, endpoint)
+                    if auth and response.status_code == HTTP_UNAUTHORIZED and not refreshed:
+                        refreshed = True
+                        self.access_token(rejected=token)
+                        continue
+                    if response.status_code not in RETRY_STATUS:
+                        raise error
+
+                rejected = (
+                    response is not None and response.status_code == HTTP_TOO_MANY_REQUESTS
+                )
+                if retries >= self.max_retries or not (idempotent or rejected):
+                    raise error
+                delay = self.backoff_delay(retries, response)
+                logger.warning("Zoho %s, Wiederholung %s in %.1f s", error, retries + 1, delay)
+                retries += 1
+                self.sleep(delay)
+        finally:
+            self._record(
+                endpoint, (time.perf_counter() - started) * 1000, retries, error, throttled
+            )
+
+    def get(self, url, params=None):
+        return self.request("GET", url, params=params)
+
+    def post(self, url, json=None):
+        return self.request("POST", url, json=json)
+
+    def put(self, url, json=None):
+        return self.request("PUT", url, json=json)
+
+    def patch(self, url, json=None):
+        return self.request("PATCH", url, json=json)
+
+    def delete(self, url):
+        return self.request("DELETE", url)
+
+    def fetch_pages(self, url, params=None, limit=200, start=1):
+        """
+        Liefert die Datensätze eines Reports seitenweise (je Seite eine Liste),
+        bis eine leere oder unvollständige Seite kommt.
+        """
+        start_index = start
+        while True:
+            try:
+                data = self.get(url, {**(params or {}), "from": start_index, "limit": limit})
+            except NoRecordsException:
+                return
+            records = data.get("data") or []
+            if not records:
+                return
+            yield records
+            if len(records) < limit:
+                return
+            start_index += limit
+
+    """
+
+    PARALLELES BLÄTTERN
+
+    """
+
+    def iter_records(self, url, params=None, limit=200, start=1, concurrency=ZOHO_CONCURRENCY):
+        """
+        Datensätze eines Reports als Strom, in Report-Reihenfolge. Es sind höchstens
+        `concurrency` Seiten gleichzeitig unterwegs; gehalten werden nur diese Seiten.
+        """
+        for records in self.iter_pages(url, params, limit, start, concurrency):
+            yield from records
+
+    def iter_pages(self, url, params=None, limit=200, start=1, concurrency=ZOHO_CONCURRENCY):
+        """
+        Synchroner Zugang zu `afetch_pages` für Views, Tasks und Management-Commands.
+        Die Event-Loop läuft nur, solange auf die nächste Seite gewartet wird; liest der
+        Aufrufer langsamer, ruhen die vorab gestarteten Abrufe so lange.
+        """
+        loop = asyncio.new_event_loop()
+        pages = self.afetch_pages(url, params, limit, start, concurrency)
+        try:
+            while True:
+                try:
+                    records = loop.run_until_complete(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield records
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.close()
+
+    async def afetch_pages(
+        self, url, params=None, limit=200, start=1, concurrency=ZOHO_CONCURRENCY
+    ):
+        """
+        Wie `fetch_pages`, aber mit bis zu `concurrency` Seiten gleichzeitig. Das Fenster
+        beginnt bei einer Seite und verdoppelt sich mit jeder vollen Seite, damit kleine
+        Ergebnisse keine Leerabfragen kosten. Nach der ersten leeren oder unvollständigen
+        Seite werden die übrigen Abrufe abgebrochen.
+
+        Rate-Limiter und Token-Store sprechen mit der Datenbank; das läuft nicht in der
+        Loop, sondern in einem eigenen Thread, dessen Verbindung am Ende geschlossen wird.
+        """
+        connect_timeout, read_timeout = (
+            self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        )
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+        )
+        pending = deque()
+        next_start = start
+        priority = current_priority()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zoho-db")
+
+        def schedule():
+            nonlocal next_start
+            page_params = {**(params or {}), "from": next_start, "limit": limit}
+            pending.append(
+                asyncio.ensure_future(
+                    self._afetch_page(session, url, page_params, executor, priority)
+                )
+            )
+            next_start += limit
+
+        try:
+            window = 1
+            schedule()
+            while pending:
+                records = await pending.popleft()
+                if records:
+                    yield records
+                if len(records) < limit:
+                    return
+                window = min(window * 2, concurrency)
+                while len(pending) < window:
+                    schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await session.close()
+            await asyncio.get_running_loop().run_in_executor(executor, connections.close_all)
+            executor.shutdown(wait=False)
+
+    async def _afetch_page(self, session, url, params, executor, priority):
+        try:
+            data = await self._aget(session, url, params, executor, priority)
+        except NoRecordsException:
+            return []
+        return data.get("data") or []
+
+    async def _await_slot(self, endpoint, executor, priority):
+        loop = asyncio.get_running_loop()
+        waited = 0.0
+        while True:
+            wait = await loop.run_in_executor(
+                executor,
+                self.throttle,
+                "GET",
+                endpoint,
+                priority,
+                waited,
+            )
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def _aget(self, session, url, params, executor, priority):
+        """Asynchrones GET mit denselben Wiederholungs- und Drosselungsregeln wie `request`."""
+        endpoint = endpoint_name(url)
+        params = {key: str(value) for key, value in params.items()}
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        retries = 0
+        refreshed = False
+        error = None
+        throttled = 0.0
+        try:
+            while True:
+                throttled += await self._await_slot(endpoint, executor, priority)
+                token = await loop.run_in_executor(executor, self.access_token)
+                response = None
+                try:
+                    async with session.get(
+                        url, params=params, headers={"Authorization": f"Zoho-oauthtoken {token}"}
+                    ) as response:
+                        try:
+                            body = await response.json(content_type=None)
+                        except ValueError:
+                            body = None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    error = TransportException(f"GET {endpoint}: {exc!r}", url=url)
+                else:
+                    if response.status < 400:
+                        if body is None:
+                            error = APIException(
+                                f"GET {endpoint}: keine JSON-Antwort",
+                                status_code=response.status,
+                                url=url,
+                            )
+                            raise error
+                        error = None
+                        return body
+                    error = error_for_status(
+                        response.status, body, str(response.url), "GET", endpoint
+                    )
+                    if response.status == HTTP_UNAUTHORIZED and not refreshed:
+                        refreshed = True
+                        await loop.run_in_executor(executor, self.access_token, token)
+                        continue
+                    if response.status not in RETRY_STATUS:
+                        raise error
+
+                if retries >= self.max_retries:
+                    raise error
+                delay = self.backoff_delay(retries, response)
+                logger.warning("Zoho %s, Wiederholung %s in %.1f s", error, retries + 1, delay)
+                retries += 1
+                await asyncio.sleep(delay)
+        finally:
+            self._record(
+                endpoint, (time.perf_counter() - started) * 1000, retries, error, throttled
+            )
+
+    """
+
+    STATISTIK
+
+    """
+
+    def _record(self, endpoint, ms, retries, error, throttled=0.0):
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                endpoint,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "throttled": 0,
+                    "throttle_ms": 0.0,
+                },
+            )
+            stats["calls"] += 1
+            stats["retries"] += retries
+            if throttled:
+                stats["throttled"] += 1
+                stats["throttle_ms"] += throttled * 1000
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            # "keine Datensätze" ist das normale Ende beim Blättern, kein Fehler
+            if error is not None and not isinstance(error, NoRecordsException):
+                stats["errors"] += 1
+        logger.debug("Zoho %s: %.1f ms, %s Wiederholungen", endpoint, ms, retries)
+
+    def stats(self):
+        """
+        Zähler dieses Prozesses je Endpunkt: Aufrufe, Fehler, Wiederholungen, Laufzeit und
+        Drosselung (gedrosselte Aufrufe, Wartezeit). Tageszähler über alle Prozesse liefert
+        `rate_limiter.usage()`.
+        """
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "throttle_ms": round(stats["throttle_ms"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["calls"], 1),
+                }
+                for endpoint, stats in self._stats.items()
+            }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_zoho_client():
+    """
+    Der ZohoClient dieses Prozesses. Nach einem fork (Gunicorn, Celery prefork)
+    wird ein neuer angelegt, damit Prozesse keine Pool-Verbindungen teilen.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = ZohoClient()
+                _client_pid = pid
+    return _client
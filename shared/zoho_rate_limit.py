@@ -0,0 +1,232 @@
+"""
+Ratenbegrenzung für Zoho Creator, geteilt zwischen allen Prozessen.
+
+Je Endpunktfamilie ("read", "write", siehe `endpoint_family`) ein Token-Bucket mit
+`ZOHO_RATE_LIMITS` (Aufrufe pro Minute, Burst), dazu ein Tagesbudget `ZOHO_DAILY_BUDGET`.
+Interaktive Anfragen haben Vorrang vor Hintergrundjobs: Hintergrundaufrufe lassen
+`ZOHO_INTERACTIVE_RESERVE` des Bursts im Bucket stehen und dürfen nur
+`ZOHO_BACKGROUND_BUDGET_SHARE` des Tagesbudgets verbrauchen.
+
+`acquire()` bucht einen Aufruf ab und liefert 0 oder – ohne abzubuchen – die Sekunden,
+nach denen es sich lohnt, erneut zu fragen. Ist das Tagesbudget erschöpft, wirft es
+`BudgetExhausted` (der Client meldet das als `BudgetExceededException`). Die Priorität
+kommt aus `current_priority()`: Standard ist interaktiv, Celery-Worker schalten beim
+Start auf Hintergrund um (`config.celery`).
+"""
+
+import contextvars
+import datetime
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F
+
+from config.settings import (
+    ZOHO_BACKGROUND_BUDGET_SHARE,
+    ZOHO_DAILY_BUDGET,
+    ZOHO_INTERACTIVE_RESERVE,
+    ZOHO_RATE_LIMITS,
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_default_priority = INTERACTIVE
+_priority = contextvars.ContextVar("zoho_priority", default=None)
+
+
+class BudgetExhausted(Exception):
+    """Das Tagesbudget für diese Priorität ist aufgebraucht."""
+
+
+def set_default_priority(priority):
+    """Priorität aller Aufrufe dieses Prozesses, sofern nicht per `zoho_priority` überschrieben."""
+    global _default_priority
+    _default_priority = priority
+
+
+def current_priority():
+    return _priority.get() or _default_priority
+
+
+@contextmanager
+def zoho_priority(priority):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def endpoint_family(method):
+    """Lesende Aufrufe (GET auf Reports) und schreibende (Formulare, PATCH/PUT/DELETE)."""
+    return "read" if method == "GET" else "write"
+
+
+def take(tokens, refilled_at, now, per_minute, burst, reserve):
+    """
+    Ein Schritt des Token-Buckets: füllt seit `refilled_at` auf und bucht einen Token ab,
+    sofern danach noch `reserve` Tokens übrig bleiben. Liefert `(tokens, wartezeit)`.
+    """
+    rate = per_minute / 60
+    tokens = min(burst, tokens + max(0.0, now - refilled_at) * rate)
+    if tokens >= 1 + reserve:
+        return tokens - 1, 0.0
+    return tokens, (1 + reserve - tokens) / rate
+
+
+class RateLimiter:
+    """Gemeinsame Logik; Unterklassen liefern `locked_bucket()`, `used_today()` und `count()`."""
+
+    def __init__(
+        self,
+        limits=ZOHO_RATE_LIMITS,
+        daily_budget=ZOHO_DAILY_BUDGET,
+        background_share=ZOHO_BACKGROUND_BUDGET_SHARE,
+        interactive_reserve=ZOHO_INTERACTIVE_RESERVE,
+    ):
+        self.limits = limits
+        self.daily_budget = daily_budget
+        self.background_share = background_share
+        self.interactive_reserve = interactive_reserve
+
+    def budget(self, priority):
+        if priority == BACKGROUND:
+            return int(self.daily_budget * self.background_share)
+        return self.daily_budget
+
+    def acquire(self, family, priority=None, waited=0.0):
+        """
+        Bucht einen Aufruf in `family` ab; 0 bei Erfolg, sonst Wartezeit in Sekunden.
+        `waited` (bisherige Wartezeit dieses Aufrufs) fließt in die Tagesstatistik ein.
+        """
+        priority = priority or current_priority()
+        today = datetime.date.today()
+        limit = self.limits.get(family)
+        with self.locked_bucket(family) as bucket:
+            if self.daily_budget and self.used_today(today, priority) >= self.budget(
+                priority
+            ):
+                raise BudgetExhausted(
+                    f"Zoho-Tagesbudget für {priority} erschöpft ({self.budget(priority)} Aufrufe)"
+                )
+            if limit:
+                per_minute, burst = limit
+                reserve = (
+                    burst * self.interactive_reserve if priority == BACKGROUND else 0
+                )
+                if bucket["refilled_at"] == 0:
+                    bucket["tokens"] = burst
+                now = time.time()
+                bucket["tokens"], wait = take(
+                    bucket["tokens"],
+                    bucket["refilled_at"],
+                    now,
+                    per_minute,
+                    burst,
+                    reserve,
+                )
+                bucket["refilled_at"] = now
+                if wait:
+                    return wait
+            self.count(today, priority, waited)
+        return 0.0
+
+
+class DatabaseRateLimiter(RateLimiter):
+    """Buckets in `shared.ZohoRateBucket` (SELECT ... FOR UPDATE), Zähler in `shared.ZohoApiUsage`."""
+
+    @contextmanager
+    def locked_bucket(self, family):
+        from shared.models import ZohoRateBucket
+
+        with transaction.atomic():
+            row, _ = ZohoRateBucket.objects.select_for_update().get_or_create(
+                family=family
+            )
+            bucket = {"tokens": row.tokens, "refilled_at": row.refilled_at}
+            yield bucket
+            if (bucket["tokens"], bucket["refilled_at"]) != (
+                row.tokens,
+                row.refilled_at,
+            ):
+                ZohoRateBucket.objects.filter(pk=row.pk).update(**bucket)
+
+    def used_today(self, day, priority):
+        from shared.models import ZohoApiUsage
+
+        usage = ZohoApiUsage.objects.filter(day=day)
+        if priority == BACKGROUND:
+            usage = usage.filter(priority=BACKGROUND)
+        return sum(usage.values_list("calls", flat=True))
+
+    def count(self, day, priority, waited):
+        from shared.models import ZohoApiUsage
+
+        updated = ZohoApiUsage.objects.filter(day=day, priority=priority).update(
+            calls=F("calls") + 1,
+            throttled=F("throttled") + (1 if waited else 0),
+            throttle_seconds=F("throttle_seconds") + waited,
+        )
+        if not updated:
+            ZohoApiUsage.objects.get_or_create(day=day, priority=priority)
+            self.count(day, priority, waited)
+
+    def usage(self, day=None):
+        """Tageszähler je Priorität: Aufrufe, gedrosselte Aufrufe, Wartezeit in Sekunden."""
+        from shared.models import ZohoApiUsage
+
+        return {
+            row["priority"]: row
+            for row in ZohoApiUsage.objects.filter(
+                day=day or datetime.date.today()
+            ).values("priority", "calls", "throttled", "throttle_seconds")
+        }
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Stand-in für Tests und lokale Läufe ohne Datenbank; nur innerhalb des Prozesses geteilt."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buckets = {}
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def locked_bucket(self, family):
+        with self._lock:
+            yield self._buckets.setdefault(family, {"tokens": 0.0, "refilled_at": 0})
+
+    def used_today(self, day, priority):
+        return sum(
+            usage["calls"]
+            for (usage_day, usage_priority), usage in self._usage.items()
+            if usage_day == day
+            and (priority != BACKGROUND or usage_priority == BACKGROUND)
+        )
+
+    def count(self, day, priority, waited):
+        usage = self._usage.setdefault(
+            (day, priority), {"calls": 0, "throttled": 0, "throttle_seconds": 0.0}
+        )
+        usage["calls"] += 1
+        usage["throttled"] += 1 if waited else 0
+        usage["throttle_seconds"] += waited
+
+    def usage(self, day=None):
+        day = day or datetime.date.today()
+        with self._lock:
+            return {
+                priority: {"priority": priority, **usage}
+                for (usage_day, priority), usage in self._usage.items()
+                if usage_day == day
+            }
+
+
+RATE_LIMITERS = {
+    "database": DatabaseRateLimiter,
+    "memory": MemoryRateLimiter,
+}
@@ -0,0 +1,79 @@
+"""
+Ablage des Zoho-Access-Tokens, geteilt zwischen allen Prozessen.
+
+`locked()` sorgt dafür, dass immer nur einer erneuert (single-flight); alle anderen
+warten und lesen danach den frischen Token. `load()` liefert `(access_token, expires_at)`
+mit `expires_at` als Unix-Zeitstempel oder None.
+"""
+import datetime
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+TOKEN_NAME = "zoho_creator"
+
+
+class DatabaseTokenStore:
+    """Eine Zeile in `shared.ZohoAccessToken`, beim Erneuern per SELECT ... FOR UPDATE gesperrt."""
+
+    def __init__(self, name=TOKEN_NAME):
+        self.name = name
+
+    @contextmanager
+    def locked(self):
+        from shared.models import ZohoAccessToken
+
+        with transaction.atomic():
+            ZohoAccessToken.objects.select_for_update().get_or_create(name=self.name)
+            yield
+
+    def load(self):
+        from shared.models import ZohoAccessToken
+
+        row = (
+            ZohoAccessToken.objects.filter(name=self.name)
+            .values_list("access_token", "expires_at")
+            .first()
+        )
+        if not row or not row[0] or row[1] is None:
+            return None
+        return row[0], row[1].timestamp()
+
+    def save(self, access_token, expires_at):
+        from shared.models import ZohoAccessToken
+
+        ZohoAccessToken.objects.update_or_create(
+            name=self.name,
+            defaults={
+                "access_token": access_token,
+                "expires_at": datetime.datetime.fromtimestamp(
+                    expires_at, tz=datetime.timezone.utc
+                ),
+            },
+        )
+
+
+class MemoryTokenStore:
+    """Stand-in für Tests und lokale Läufe ohne Datenbank; nur innerhalb des Prozesses geteilt."""
+
+    def __init__(self):
+        self._token = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield
+
+    def load(self):
+        return self._token
+
+    def save(self, access_token, expires_at):
+        self._token = (access_token, expires_at)
+
+
+TOKEN_STORES = {
+    "database": DatabaseTokenStore,
+    "memory": MemoryTokenStore,
+}
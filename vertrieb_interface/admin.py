@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib import admin
+from django.utils import timezone
 from .models import VertriebAngebot, VertriebTicket
-from .models import Editierbarer_Text, Dokument_PDF, CustomLogEntry
+from .models import Editierbarer_Text, Dokument_PDF, CustomLogEntry, PdfJob, ZohoOutbox
 
 
 class VertriebAngebotAdmin(admin.ModelAdmin):
@@ -497,6 +498,55 @@ class DokumentPDFAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "last_modified")
 
 
+@admin.register(ZohoOutbox)
+class ZohoOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "operation",
+        "record_key",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "zoho_record_id",
+        "created_at",
+    )
+    list_filter = ("status", "operation")
+    search_fields = ("record_key", "source_id", "zoho_record_id", "last_error")
+    readonly_fields = ("idempotency_key", "sent_at", "created_at", "updated_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Erneut senden")
+    def requeue(self, request, queryset):
+        pending_keys = ZohoOutbox.objects.filter(status__in=ZohoOutbox.OPEN).values(
+            "idempotency_key"
+        )
+        count = (
+            queryset.filter(status=ZohoOutbox.FAILED)
+            .exclude(idempotency_key__in=pending_keys)
+            .update(
+                status=ZohoOutbox.PENDING, attempts=0, next_attempt_at=timezone.now()
+            )
+        )
+        self.message_user(request, f"{count} Einträge wieder eingereiht.")
+
+
+@admin.register(PdfJob)
+class PdfJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "object_id",
+        "user",
+        "status",
+        "wait_ms",
+        "render_ms",
+        "created_at",
+    )
+    list_filter = ("status", "kind")
+    search_fields = ("object_id", "user__username", "error")
+    readonly_fields = ("started_at", "finished_at", "created_at", "updated_at")
+
+
 # Check if the model is registered
 if Dokument_PDF.editable_texts.through in admin.site._registry:
     admin.site.unregister(Dokument_PDF.editable_texts.through)
@@ -22,7 +22,8 @@ from prices.models import SolarModulePreise, WallBoxPreise
 from vertrieb_interface.forms import (
     VertriebAngebotEmailForm,
 )
-from vertrieb_interface.models import VertriebAngebot
+from vertrieb_interface.models import PdfJob, VertriebAngebot
+from vertrieb_interface.pdf_jobs import latest_job
 
 import logging
 
@@ -54,6 +55,9 @@ class DocumentView(LoginRequiredMixin, DetailView):
         pdf_url = reverse("vertrieb_interface:serve_pdf", args=[angebot_id])
         context["pdf_url"] = pdf_url
         context["angebot_id"] = angebot_id
+        context["pdf_job"] = latest_job(
+            [PdfJob.ANGEBOT, PdfJob.ANGEBOT_UND_KALKULATION], angebot_id, self.request.user
+        )
         context["form"] = self.form_class(
             instance=vertrieb_angebot, user=self.request.user
         )
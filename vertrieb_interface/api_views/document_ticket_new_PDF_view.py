@@ -22,7 +22,8 @@ from prices.models import SolarModulePreise, WallBoxPreise
 from vertrieb_interface.forms import (
     VertriebTicketEmailForm,
 )
-from vertrieb_interface.models import VertriebTicket
+from vertrieb_interface.models import PdfJob, VertriebTicket
+from vertrieb_interface.pdf_jobs import latest_job
 
 import logging
 
@@ -54,6 +55,9 @@ class DocumentViewTicketNew(LoginRequiredMixin, DetailView):
         pdf_url = reverse("vertrieb_interface:serve_ticket_new_pdf", args=[ticket_id])
         context["pdf_url"] = pdf_url
         context["ticket_id"] = ticket_id
+        context["pdf_job"] = latest_job(
+            [PdfJob.TICKET], ticket_id, self.request.user
+        )
         context["form"] = self.form_class(
             instance=vertrieb_ticket, user=self.request.user
         )
@@ -8,6 +8,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
 from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.generic import View
@@ -20,11 +21,8 @@ from config.settings import TELEGRAM_LOGGING, EMAIL_BACKEND
 from vertrieb_interface.forms import (
     VertriebTicketForm,
 )
-from vertrieb_interface.zoho_api_connector import (
-    pushTicket,
-    put_form_data_to_zoho_jpp,
-    fetch_user_angebote_all,
-)
+from vertrieb_interface.zoho_outbox import enqueue_ticket, enqueue_kunde_update
+from vertrieb_interface.zoho_sync import sync_user_kunden
 from prices.models import AndereKonfigurationWerte
 from vertrieb_interface.models import CustomLogEntry, VertriebTicket
 from vertrieb_interface.telegram_logs_sender import (
@@ -96,9 +94,7 @@ class TicketNewEditView(LoginRequiredMixin, VertriebCheckMixin, FormMixin, View)
     def handle_status_change(self, ticket_id, reload):
         user = self.request.user
         if reload:
-            all_user_angebots_list = fetch_user_angebote_all(self.request)
-            user.zoho_data_text = json.dumps(all_user_angebots_list)
-            user.save()
+            sync_user_kunden(user)
 
         for angebot in self.model.objects.filter(
             ticket_id=ticket_id, status="bekommen"
@@ -167,10 +163,10 @@ class TicketNewEditView(LoginRequiredMixin, VertriebCheckMixin, FormMixin, View)
                     instance.angebot_id_assigned = True
                     instance.is_locked = True
                     instance.status = "bekommen"
-                    form.save()
-                    self.push_and_save_angebot(
-                        vertrieb_ticket, user_zoho_id, form, request
-                    )
+                    with transaction.atomic():
+                        form.save()
+                        enqueue_ticket(vertrieb_ticket, user_zoho_id)
+                    self.send_rabatt_mail(vertrieb_ticket, form, request)
                     if TELEGRAM_LOGGING:
                         send_message_to_bot(
                             f"{user.first_name} {user.last_name} hat ein PDF Angebot für einen Kunden erstellt. Kunde: {vertrieb_ticket.name}"
@@ -222,8 +218,9 @@ class TicketNewEditView(LoginRequiredMixin, VertriebCheckMixin, FormMixin, View)
                         if vertrieb_ticket.ticket_id == extracted_part:
                             # instance.save()
                             form.fill_geo_coordinates()
-                            form.save()
-                            put_form_data_to_zoho_jpp(form)
+                            with transaction.atomic():
+                                form.save()
+                                enqueue_kunde_update(form)
                             CustomLogEntry.objects.log_action(
                                 user_id=vertrieb_ticket.user_id,
                                 content_type_id=ContentType.objects.get_for_model(
@@ -246,10 +243,11 @@ class TicketNewEditView(LoginRequiredMixin, VertriebCheckMixin, FormMixin, View)
                             )
                             return self.form_invalid(form, vertrieb_ticket, request)
                     else:
-                        instance.save()
                         form.fill_geo_coordinates()
-                        form.save()
-                        put_form_data_to_zoho_jpp(form)
+                        with transaction.atomic():
+                            instance.save()
+                            form.save()
+                            enqueue_kunde_update(form)
 
                         CustomLogEntry.objects.log_action(
                             user_id=vertrieb_ticket.user_id,
@@ -268,22 +266,12 @@ class TicketNewEditView(LoginRequiredMixin, VertriebCheckMixin, FormMixin, View)
 
             return self.form_invalid(form, vertrieb_ticket, request)
 
-    def push_and_save_angebot(self, vertrieb_ticket, user_zoho_id, form, request):
+    def send_rabatt_mail(self, vertrieb_ticket, form, request):
         """
-        Attempts to push an Angebot to ZOHO and save the response.
-        In case of any exception, adds an error to the form and returns a form invalid response.
+        Informs the Vertriebsleitung by mail when the Rabatt exceeds the configured limit.
+        The offer itself is sent to ZOHO via the outbox (see `vertrieb_interface.zoho_outbox`).
 
         """
-        try:
-            response = pushTicket(vertrieb_ticket, user_zoho_id)
-            response_data = response.json()
-            new_record_id = response_data["data"]["ID"]
-            vertrieb_ticket.angebot_zoho_id = new_record_id
-            vertrieb_ticket.save()
-        except Exception as e:
-            error_message = f"ZOHO connection Fehler: {str(e)}"
-            form.add_error(None, error_message)
-            return self.form_invalid(form, vertrieb_ticket, request)
         email_address = AndereKonfigurationWerte.objects.get(name="vertriebsleitung").text
         user = vertrieb_ticket.user
         user_email = user.email
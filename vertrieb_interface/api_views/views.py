@@ -3,7 +3,6 @@ import asyncio
 import datetime
 import json
 import os
-from time import sleep
 from urllib.parse import unquote
 
 # Django related imports
@@ -43,6 +42,7 @@ from prices.models import SolarModulePreise
 # Local imports from 'calculator'
 from calculator.models import Calculator
 from calculator.forms import CalculatorForm
+from calculator.quick_calc import quick_calc
 
 # Local imports from 'datenblatter'
 from datenblatter.models import Datenblatter
@@ -61,12 +61,16 @@ from vertrieb_interface.zoho_api_connector import (
     fetch_angenommen_status,
     fetch_user_angebote_all,
 )
-from vertrieb_interface.models import CustomLogEntry, VertriebAngebot, VertriebTicket
-from vertrieb_interface.pdf_services import (
-    angebot_pdf_creator_user,
-    ticket_pdf_creator_user,
-    calc_pdf_creator,
+from vertrieb_interface.models import (
+    CustomLogEntry,
+    PdfJob,
+    VertriebAngebot,
+    VertriebTicket,
 )
+from vertrieb_interface.pdf_jobs import enqueue_pdf_job, job_status, latest_job
+from vertrieb_interface.tasks import schedule_zoho_refresh
+from vertrieb_interface.zoho_sync import is_stale
+from vertrieb_interface.pricing import BATTERIE_DICT, sweep_offer
 from vertrieb_interface.permissions import admin_required, AdminRequiredMixin
 from vertrieb_interface.telegram_logs_sender import (
     send_message_to_bot,
@@ -278,7 +282,8 @@ def get_icon_based_on_status(entry, status):
 @user_passes_test(vertrieb_check)
 def home(request):
     user = request.user
-    load_user_angebots(request)
+    # Zoho wird im Hintergrund abgeglichen; die Seite zeigt sofort die vorhandenen Daten
+    zoho_sync_pending = schedule_zoho_refresh(user)
 
     year, month = now.year, now.month
 
@@ -415,12 +420,79 @@ def home(request):
         "remaining_stock": remaining_stock,
         "solar_module_ticket_stats": solar_module_ticket_stats,
         "all_vertrieb_angebots": all_vertrieb_angebots,
+        "zoho_synced_at": user.zoho_synced_at,
+        "zoho_sync_pending": zoho_sync_pending,
         **status_counts,
     }
 
     return render(request, "vertrieb/home.html", context)
 
 
+@user_passes_test(vertrieb_check)
+def zoho_sync_status(request):
+    """Stand der Zoho-Kundendaten des Benutzers, vom Dashboard abgefragt, solange ein Refresh läuft."""
+    user = User.objects.only("zoho_synced_at").get(pk=request.user.pk)
+    return JsonResponse(
+        {
+            "synced_at": user.zoho_synced_at.isoformat() if user.zoho_synced_at else None,
+            "stale": is_stale(user),
+        }
+    )
+
+
+@user_passes_test(vertrieb_check)
+def calc_api(request):
+    """Schnellrechner als JSON, ohne die gemeinsame Calculator-Zeile zu speichern."""
+    data = request.POST if request.method == "POST" else request.GET
+    result, errors = quick_calc(request.user, data)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    return JsonResponse(result)
+
+
+SWEEP_SPEICHER_MODELS = ("LUNA 2000-5-S0", "LUNA 2000-7-S1")
+SWEEP_MAX_CELLS = 2000
+
+
+@user_passes_test(vertrieb_check)
+def angebot_varianten_api(request, angebot_id):
+    """
+    Varianten eines Angebots als JSON: Modulanzahl × Speichermodule × Speichermodell,
+    z. B. `?modulanzahl_min=10&modulanzahl_max=40&speicher_max=6&speicher_model=LUNA 2000-7-S1`.
+    """
+    vertrieb_angebot = get_object_or_404(
+        VertriebAngebot, angebot_id=angebot_id, user=request.user
+    )
+    try:
+        modulanzahl_min = int(request.GET.get("modulanzahl_min", 10))
+        modulanzahl_max = int(request.GET.get("modulanzahl_max", 40))
+        modulanzahl_step = int(request.GET.get("modulanzahl_step", 1))
+        speicher_max = int(request.GET.get("speicher_max", 6))
+    except ValueError:
+        return JsonResponse({"error": "Ungültige Zahl im Raster"}, status=400)
+    speicher_models = request.GET.getlist("speicher_model") or SWEEP_SPEICHER_MODELS
+
+    modulanzahl_values = range(max(modulanzahl_min, 0), modulanzahl_max + 1, max(modulanzahl_step, 1))
+    anz_speicher_values = range(0, min(max(speicher_max, 0), 6) + 1)
+    cells = len(modulanzahl_values) * len(anz_speicher_values) * len(speicher_models)
+    if not cells or cells > SWEEP_MAX_CELLS:
+        return JsonResponse(
+            {"error": f"Das Raster muss 1 bis {SWEEP_MAX_CELLS} Varianten umfassen"},
+            status=400,
+        )
+    if any(model not in BATTERIE_DICT for model in speicher_models):
+        return JsonResponse({"error": "Unbekanntes Speichermodell"}, status=400)
+
+    varianten = sweep_offer(
+        vertrieb_angebot.pricing_input(),
+        vertrieb_angebot.price_catalog,
+        modulanzahl_values,
+        anz_speicher_values,
+        speicher_models,
+    )
+    return JsonResponse({"angebot_id": angebot_id, "varianten": varianten})
+
+
 def filter_bekommen(data):
     return [item for item in data if item.get("status") == "bekommen"]
 
@@ -476,7 +548,7 @@ def help(request):
 def user_redirect_view(request):
     if request.user.is_authenticated:
         if request.user.is_home_page:
-            load_user_angebots(request)
+            schedule_zoho_refresh(request.user)
             return redirect("vertrieb_interface:intermediate_view")
         else:
             return redirect("vertrieb_interface:home")
@@ -864,159 +936,52 @@ class DeleteUserTicket(DeleteView):
         return redirect(self.get_success_url())
 
 
-def delete_unexisting_records(request):
-    user = request.user
-
-    try:
-        user_data = json.loads(user.zoho_data_text) if user.zoho_data_text else []
-        if not user_data:
-            return HttpResponse("No data found in user's Zoho data.", status=200)
-
-        user_zoho_ids = {item.get("zoho_id") for item in user_data}
-
-        # Query only once to get angebots that might need updating
-        vertrieb_angebots = VertriebAngebot.objects.filter(
-            user=user, angebot_id_assigned=True
-        )
-
-        # Filter those that don't match the Zoho IDs to update
-        vertrieb_angebots_to_update = vertrieb_angebots.exclude(
-            zoho_id__in=user_zoho_ids
-        )
-        vertrieb_angebots_to_update.update(angebot_id_assigned=False)
-
-        return HttpResponse(
-            f"Updated {vertrieb_angebots_to_update.count()} records.", status=200
-        )
-
-    except json.JSONDecodeError:
-        return HttpResponse("Failed to decode JSON from user's Zoho data.", status=400)
-    except Exception as e:
-        return HttpResponse(f"An unexpected error occurred: {str(e)}", status=500)
-
-
-def update_status_to_angenommen(request):
-
-    user = request.user
-    user_data = json.loads(user.zoho_data_text)
-    user_zoho_ids = {item["zoho_id"] for item in user_data}
-
-    zoho_id_to_status = {item["zoho_id"]: item["status"] for item in user_data}
-    zoho_id_to_status_PVA = {item["zoho_id"]: item["status_pva"] for item in user_data}
-    zoho_id_to_angenommenes_angebot = {
-        item["zoho_id"]: item["angenommenes_angebot"] for item in user_data
-    }
-
-    vertrieb_angebots_to_update = VertriebAngebot.objects.filter(
-        user=user,
-        angebot_id_assigned=True,
-    ).filter(zoho_id__in=user_zoho_ids)
-
-    for angebot in vertrieb_angebots_to_update:
-        angebot.status = zoho_id_to_status.get(angebot.zoho_id)
-        angebot.status_pva = zoho_id_to_status_PVA.get(angebot.zoho_id)
-        angebot.angenommenes_angebot = zoho_id_to_angenommenes_angebot.get(
-            angebot.zoho_id
-        )
-        angebot.save()
-        if angebot.angenommenes_angebot == angebot.angebot_id:
-            angebot.angebot_id_assigned = True
-
-            angebot.save()
-        elif (
-            angebot.angenommenes_angebot != angebot.angebot_id
-            and angebot.status == "angenommen"
-        ):
-            angebot.angebot_id_assigned = False
-            angebot.save()
-        else:
-            pass
-
-
 def replace_spaces_with_underscores(s: str) -> str:
     return s.replace(" ", "_").replace(",","")
 
 
 @login_required
 def create_angebot_pdf_user(request, angebot_id):
-    vertrieb_angebot = get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
-    user = request.user
-    data = vertrieb_angebot.data
-    certifikate = user.user_certifikate
-
-    pdf_content = angebot_pdf_creator_user.createOfferPdf(
-        data,
-        vertrieb_angebot,
-        certifikate,
-        user,
-    )
-    vertrieb_angebot.angebot_pdf = pdf_content
-    vertrieb_angebot.save()
-
+    get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
+    enqueue_pdf_job(PdfJob.ANGEBOT, angebot_id, request.user)
     return redirect("vertrieb_interface:document_view", angebot_id=angebot_id)
 
 
 @login_required
 def create_angebot_and_calc_pdf(request, angebot_id):
-    vertrieb_angebot = get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
-    user = request.user
-    data = vertrieb_angebot.data
-    certifikate = user.user_certifikate
-
-    pdf_content = angebot_pdf_creator_user.createOfferPdf(
-        data,
-        vertrieb_angebot,
-        certifikate,
-        user,
-        True,
-    )
-    vertrieb_angebot.angebot_pdf = pdf_content
-    vertrieb_angebot.save()
-
+    get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
+    enqueue_pdf_job(PdfJob.ANGEBOT_UND_KALKULATION, angebot_id, request.user)
     return redirect("vertrieb_interface:document_view", angebot_id=angebot_id)
 
 
 @login_required
 def create_calc_pdf(request, angebot_id):
-    vertrieb_angebot = get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
-    user = request.user
-    data = vertrieb_angebot.data
-    name = replace_spaces_with_underscores(vertrieb_angebot.name)
-
-    pdf_content = calc_pdf_creator.createCalcPdf(
-        data,
-        vertrieb_angebot,
-        user,
-    )
-    vertrieb_angebot.calc_pdf = pdf_content
-    vertrieb_angebot.save()
-
+    get_object_or_404(VertriebAngebot, angebot_id=angebot_id)
+    enqueue_pdf_job(PdfJob.KALKULATION, angebot_id, request.user)
     return redirect("vertrieb_interface:document_calc_view", angebot_id=angebot_id)
 
 
 @login_required
 def create_ticket_new_pdf_user(request, ticket_id):
-    vertrieb_ticket = get_object_or_404(VertriebTicket, ticket_id=ticket_id)
-    user = request.user
-    data = vertrieb_ticket.data
-    certifikate = user.user_certifikate
-
-    pdf_content = ticket_pdf_creator_user.createOfferPdf(
-        data,
-        vertrieb_ticket,
-        certifikate,
-        user,
-    )
-    vertrieb_ticket.ticket_pdf = pdf_content
-    vertrieb_ticket.save()
-
+    get_object_or_404(VertriebTicket, ticket_id=ticket_id)
+    enqueue_pdf_job(PdfJob.TICKET, ticket_id, request.user)
     return redirect("vertrieb_interface:document_view_ticket_new", ticket_id=ticket_id)
 
 
+@login_required
+def pdf_job_status(request, job_id):
+    job = get_object_or_404(PdfJob, pk=job_id, user=request.user)
+    return JsonResponse(job_status(job))
+
+
 @login_required
 def document_calc_view(request, angebot_id):
     pdf_url = reverse("vertrieb_interface:serve_calc_pdf", args=[angebot_id])
-    context = {"pdf_url": pdf_url, "angebot_id": angebot_id}
+    context = {
+        "pdf_url": pdf_url,
+        "angebot_id": angebot_id,
+        "pdf_job": latest_job([PdfJob.KALKULATION], angebot_id, request.user),
+    }
     return render(request, "vertrieb/document_calc_view.html", context)
 
 
@@ -1026,8 +991,6 @@ def serve_pdf(request, angebot_id):
     vertrieb_angebot = get_object_or_404(VertriebAngebot, angebot_id=decoded_angebot_id)
     name = replace_spaces_with_underscores(vertrieb_angebot.name)
     filename = f"{name}_{vertrieb_angebot.angebot_id}.pdf"
-    sleep(0.5)
-
     if not vertrieb_angebot.angebot_pdf:
         return StreamingHttpResponse("File not found.", status=404)
 
@@ -1045,7 +1008,6 @@ def serve_calc_pdf(request, angebot_id):
     vertrieb_angebot = get_object_or_404(VertriebAngebot, angebot_id=decoded_angebot_id)
     name = replace_spaces_with_underscores(vertrieb_angebot.name)
     filename = f"Kalkulation_{name}_{vertrieb_angebot.angebot_id}.pdf"
-    sleep(0.5)
     if not vertrieb_angebot.calc_pdf:
         return StreamingHttpResponse("File not found.", status=404)
 
@@ -1062,8 +1024,6 @@ def serve_ticket_new_pdf(request, ticket_id):
     vertrieb_ticket = get_object_or_404(VertriebTicket, ticket_id=decoded_ticket_id)
     name = replace_spaces_with_underscores(vertrieb_ticket.name)
     filename = f"{name}_{vertrieb_ticket.ticket_id}.pdf"
-    sleep(0.5)
-
     if not vertrieb_ticket.ticket_pdf:
         return StreamingHttpResponse("File not found.", status=404)
 
@@ -1,44 +1,39 @@
 from django.http import HttpResponse, JsonResponse
-import json
+import logging
 
 # Importiere Hilfsfunktionen und Modelle aus dem vertrieb_interface Modul
 from vertrieb_interface.api_views.common import load_json_data, update_list
-from vertrieb_interface.models import VertriebAngebot
-from vertrieb_interface.zoho_api_connector import (
-    fetch_user_angebote_all,
-)
+from vertrieb_interface.models import VertriebAngebot, ZohoKunde
+from vertrieb_interface.zoho_sync import sync_user_kunden
 from authentication.models import User
+from shared.zoho_client import APIException
 
+logger = logging.getLogger(__name__)
 
-def load_user_json_data(request):
-    user_data = load_json_data(request.user.zoho_data_text)
-    if user_data is None:
-        raise ValueError("Failed to decode JSON from user's Zoho data.")
-    if not user_data:
+
+def user_kunden(user):
+    kunden = ZohoKunde.objects.filter(user=user)
+    if not kunden.exists():
         raise ValueError("No data found in user's Zoho data.")
-    return user_data
+    return kunden
 
 
-def delete_unexisting_records(request):
+def delete_unexisting_records(user):
     """
     Entfernt Datensätze, die nicht mehr in Zoho vorhanden sind, aus der VertriebAngebot Datenbank.
 
     Args:
-    request: Django HttpRequest-Objekt, das Daten des Benutzers enthält.
+    user: Benutzer, dessen Zoho-Daten abgeglichen werden.
 
     Returns:
     HttpResponse: Gibt den Status der Operation zurück, einschließlich der Anzahl der aktualisierten Datensätze.
     """
     try:
-        # Lade Benutzerdaten aus der Anfrage
-        user_data = load_user_json_data(request)
-        user_zoho_ids = {item.get("zoho_id") for item in user_data}
-        print(user_zoho_ids)
-
-        # Filtere Angebote, die aktualisiert werden müssen
+        # Filtere Angebote, die aktualisiert werden müssen (Abgleich in der Datenbank)
+        kunden = user_kunden(user)
         vertrieb_angebots_to_update = VertriebAngebot.objects.filter(
-            user=request.user, angebot_id_assigned=True
-        ).exclude(zoho_id__in=user_zoho_ids)
+            user=user, angebot_id_assigned=True
+        ).exclude(zoho_id__in=kunden.values("zoho_id"))
 
         # Aktualisiere die gefilterten Angebote
         updated_count = vertrieb_angebots_to_update.update(angebot_id_assigned=False)
@@ -47,35 +42,27 @@ def delete_unexisting_records(request):
         return HttpResponse(str(e), status=400)
 
 
-def update_status_to_angenommen(request):
+def update_status_to_angenommen(user):
     """
     Aktualisiert den Status von Angeboten auf 'angenommen', basierend auf den Daten von Zoho.
 
     Args:
-    request: Django HttpRequest-Objekt, das Daten des Benutzers enthält.
+    user: Benutzer, dessen Zoho-Daten abgeglichen werden.
 
     Returns:
     HttpResponse: Gibt den Erfolg oder Fehler der Operation zurück.
     """
     try:
-        user_data = load_user_json_data(request)
-        zoho_id_to_attributes = {
-            item["zoho_id"]: {
-                "name": item["name"],
-                "name_first_name": item["name_first_name"],
-                "name_last_name": item["name_last_name"],
-                "name_suffix": item["name_suffix"],
-                "status": item["status"],
-                "status_pva": item["status_pva"],
-                "angenommenes_angebot": item["angenommenes_angebot"],
-            }
-            for item in user_data
-        }
-
         vertrieb_angebots_to_update = VertriebAngebot.objects.filter(
-            user=request.user,
+            user=user,
             angebot_id_assigned=True,
         )
+        # nur die Kunden, zu denen es zugewiesene Angebote gibt
+        zoho_id_to_attributes = dict(
+            user_kunden(user)
+            .filter(zoho_id__in=vertrieb_angebots_to_update.values("zoho_id"))
+            .values_list("zoho_id", "data")
+        )
 
         updates = []
         for angebot in vertrieb_angebots_to_update:
@@ -108,6 +95,22 @@ def update_status_to_angenommen(request):
         return HttpResponse(str(e), status=400)
 
 
+def refresh_user_angebote(user):
+    """
+    Holt die Zoho-Änderungen des Benutzers und gleicht seine VertriebAngebote damit ab.
+    Wirft `APIException`, wenn Zoho nicht erreichbar ist.
+
+    Returns:
+    bool: True, wenn beide Abgleiche erfolgreich waren.
+    """
+    sync_user_kunden(user)
+
+    # Bearbeite Antworten von Hilfsfunktionen
+    response1 = delete_unexisting_records(user)
+    response2 = update_status_to_angenommen(user)
+    return response1.status_code == 200 and response2.status_code == 200
+
+
 def load_user_angebots(request):
     """
     Lädt Angebote für den Benutzer und führt erforderliche Aktualisierungen durch.
@@ -119,20 +122,14 @@ def load_user_angebots(request):
     JsonResponse: Gibt das Ergebnis der Operation zurück, einschließlich Fehler- oder Erfolgsstatus.
     """
     try:
-        all_user_angebots_list = fetch_user_angebote_all(request)
-        request.user.zoho_data_text = json.dumps(all_user_angebots_list)
-        request.user.save()
-    except Exception:
-        all_user_angebots_list = fetch_user_angebote_all(request)
-        request.user.zoho_data_text = json.dumps(all_user_angebots_list)
-        request.user.save()
-
-    # Bearbeite Antworten von Hilfsfunktionen
-    response1 = delete_unexisting_records(request)
-    response2 = update_status_to_angenommen(request)
+        refreshed = refresh_user_angebote(request.user)
+    except APIException as e:
+        # Wiederholungen macht bereits der ZohoClient; mit den zuletzt geladenen Daten weiterarbeiten
+        logger.error("Zoho-Abruf für %s fehlgeschlagen: %s", request.user, e)
+        return JsonResponse({"status": "error"}, status=502)
 
     # Überprüfe die Antwortcodes und gebe entsprechend das Ergebnis zurück
-    if response1.status_code != 200 or response2.status_code != 200:
+    if not refreshed:
         return JsonResponse({"status": "error"}, status=500)
 
     return JsonResponse({"status": "success"}, status=200)
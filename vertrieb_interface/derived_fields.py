@@ -0,0 +1,143 @@
+import logging
+from collections import Counter
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+_profile_hooks = []
+
+
+def add_profile_hook(hook):
+    """
+    Registriert `hook(instance, counts)`. Wird nach jedem `DerivedFieldContext`
+    mit der Anzahl der tatsächlichen Berechnungen je abgeleitetem Wert aufgerufen.
+    """
+    _profile_hooks.append(hook)
+
+
+def remove_profile_hook(hook):
+    if hook in _profile_hooks:
+        _profile_hooks.remove(hook)
+
+
+def derived(*depends_on):
+    """
+    Property für einen abgeleiteten Wert mit expliziten Abhängigkeiten.
+
+    `depends_on` nennt die Attribute (Modellfelder, andere abgeleitete Werte), die
+    gelesen werden. Ohne aktiven `DerivedFieldContext` verhält sich die Property wie
+    eine normale `@property`; innerhalb des Kontextes wird sie nur neu berechnet,
+    wenn sich eine der Abhängigkeiten geändert hat.
+    """
+
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        def getter(instance):
+            context = instance.__dict__.get("_derived_context")
+            if context is None:
+                return func(instance)
+            return context.get(name, func)
+
+        getter.depends_on = depends_on
+        return property(getter)
+
+    return decorator
+
+
+def dependency_graph(model):
+    """Sammelt `{name: depends_on}` aller `@derived`-Properties eines Modells."""
+    graph = model.__dict__.get("_derived_graph")
+    if graph is None:
+        graph = {}
+        for klass in reversed(model.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, property) and hasattr(attr.fget, "depends_on"):
+                    graph[name] = attr.fget.depends_on
+        model._derived_graph = graph
+    return graph
+
+
+class DerivedFieldContext:
+    """
+    Speicher für abgeleitete Werte während eines `save()`.
+
+    Zu jedem berechneten Wert merkt sich der Kontext die Werte seiner Abhängigkeiten,
+    die keine abgeleiteten Werte sind. Hat sich beim nächsten Zugriff eine davon
+    geändert (auch über einen abgeleiteten Zwischenwert), werden der Wert und alles,
+    was davon abhängt, verworfen und neu berechnet; sonst wird er nur einmal berechnet.
+    `counts` zählt die Berechnungen je Wert und geht am Ende an die Profiling-Hooks.
+
+    Verschachtelte Kontexte für dieselbe Instanz verwenden den äußeren weiter.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.graph = dependency_graph(type(instance))
+        self.values = {}
+        self.inputs = {}
+        self.counts = Counter()
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = self.instance.__dict__.get("_derived_context")
+        if self.outer is not None:
+            return self.outer
+        self.instance._derived_context = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.outer is not None:
+            return False
+        self.instance.__dict__.pop("_derived_context", None)
+        if exc_type is None:
+            self.report()
+        return False
+
+    def get(self, name, func):
+        if name in self.values and self.is_stale(name):
+            self.invalidate(name)
+        if name not in self.values:
+            self.counts[name] += 1
+            self.values[name] = func(self.instance)
+            self.inputs[name] = self.read_inputs(name)
+        return self.values[name]
+
+    def read_inputs(self, name):
+        return tuple(
+            getattr(self.instance, dependency)
+            for dependency in self.graph[name]
+            if dependency not in self.graph
+        )
+
+    def is_stale(self, name):
+        if name not in self.values:
+            return True
+        if self.inputs[name] != self.read_inputs(name):
+            return True
+        return any(
+            self.is_stale(dependency)
+            for dependency in self.graph[name]
+            if dependency in self.graph
+        )
+
+    def invalidate(self, *names):
+        """Verwirft `names` und alle Werte, die direkt oder indirekt davon abhängen."""
+        stale = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for name, depends_on in self.graph.items():
+                if name not in stale and stale.intersection(depends_on):
+                    stale.add(name)
+                    changed = True
+        for name in stale:
+            self.values.pop(name, None)
+            self.inputs.pop(name, None)
+
+    def report(self):
+        counts = dict(self.counts)
+        logger.debug("%s %s: %s", type(self.instance).__name__, self.instance, counts)
+        for hook in list(_profile_hooks):
+            hook(self.instance, counts)
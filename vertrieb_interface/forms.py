@@ -16,10 +16,7 @@ from dotenv import load_dotenv
 from authentication.models import User
 from config.settings import ENV_FILE, GOOGLE_MAPS_API_KEY
 from prices.models import SolarModulePreise, WallBoxPreise, AndereKonfigurationWerte, Sonderrabatt, WrTauschPreise
-from vertrieb_interface.models import VertriebAngebot, VertriebTicket
-from vertrieb_interface.zoho_api_connector import (
-    update_status,
-)
+from vertrieb_interface.models import VertriebAngebot, VertriebTicket, ZohoKunde
 
 from vertrieb_interface.api_views.common import load_json_data, update_list
 from vertrieb_interface.api_views.zoho_operations_aktualisierung import (
@@ -1394,14 +1391,14 @@ class VertriebAngebotForm(ModelForm):
         self.fields["name"].choices = default_choice  # Set default choice initially
 
         try:
-            filtered_data = [
-                item
-                for item in load_json_data(user.zoho_data_text)
-                if item["status"] not in ["abgelehnt", "storniert", "angenommen"]
-            ]
-
-            if filtered_data:
-                name_list = [(item["zoho_id"], item["name"]) for item in filtered_data]
+            # nur zoho_id und Name der offenen Kunden laden
+            name_list = list(
+                ZohoKunde.objects.filter(user=user)
+                .exclude(status__in=["abgelehnt", "storniert", "angenommen"])
+                .values_list("zoho_id", "name")
+            )
+
+            if name_list:
                 name_list = sorted(name_list, key=lambda x: x[1])
                 self.fields["name"].choices = default_choice + name_list
 
@@ -2676,14 +2673,14 @@ class VertriebTicketForm(ModelForm):
         self.fields["name"].choices = default_choice  # Set default choice initially
 
         try:
-            filtered_data = [
-                item
-                for item in load_json_data(user.zoho_data_text)
-                if item["status"] not in ["abgelehnt", "storniert"]
-            ]
-
-            if filtered_data:
-                name_list = [(item["zoho_id"], item["name"]) for item in filtered_data]
+            # nur zoho_id und Name der offenen Kunden laden
+            name_list = list(
+                ZohoKunde.objects.filter(user=user)
+                .exclude(status__in=["abgelehnt", "storniert"])
+                .values_list("zoho_id", "name")
+            )
+
+            if name_list:
                 name_list = sorted(name_list, key=lambda x: x[1])
                 self.fields["name"].choices = default_choice + name_list
 
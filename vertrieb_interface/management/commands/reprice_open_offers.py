@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+from vertrieb_interface.repricing import reprice_open_offers
+
+
+class Command(BaseCommand):
+    help = "Re-prices all open VertriebAngebot and VertriebTicket rows with the current price catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only print the diff report, do not write anything",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        report = reprice_open_offers(
+            dry_run=options["dry_run"], chunk_size=options["chunk_size"]
+        )
+        for change in report["changes"]:
+            self.stdout.write(json.dumps(change, ensure_ascii=False))
+        for model_name, stats in report["models"].items():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model_name}: {stats['rows']} rows, {stats['changed']} changed, "
+                    f"{stats['seconds']} s, {stats['rows_per_second']} rows/s"
+                )
+            )
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "vertrieb_interface",
+            "0104_rename_optimizer_angebot_price_vertriebangebot_zubehoer_angebot_price_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZohoKunde",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("zoho_id", models.CharField(max_length=30)),
+                (
+                    "vertriebler_id",
+                    models.CharField(blank=True, default="", max_length=30),
+                ),
+                ("name", models.CharField(blank=True, default="", max_length=255)),
+                ("status", models.CharField(blank=True, default="", max_length=100)),
+                (
+                    "status_pva",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                (
+                    "zoho_kundennumer",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                (
+                    "angenommenes_angebot",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("anfrage_vom", models.DateField(blank=True, null=True)),
+                ("data", models.JSONField(default=dict)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="zoho_kunden",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["vertriebler_id"], name="vertrieb_in_vertrie_95d10d_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="zohokunde",
+            constraint=models.UniqueConstraint(
+                fields=("user", "zoho_id"), name="unique_zoho_kunde_per_user"
+            ),
+        ),
+    ]
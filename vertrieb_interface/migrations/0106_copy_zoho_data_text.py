@@ -0,0 +1,76 @@
+import datetime
+import json
+
+from django.db import migrations
+
+MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+def parse_date(value):
+    try:
+        day, month, year = value.split("-")
+        return datetime.date(int(year), MONTHS.index(month) + 1, int(day))
+    except (AttributeError, ValueError):
+        return None
+
+
+def copy_zoho_data_text(apps, schema_editor):
+    """
+    Übernimmt die Kundenlisten aus `User.zoho_data_text` nach `ZohoKunde`, damit der
+    Delta-Sync dort weitermachen kann. Andere Inhalte (z. B. Elektriker-Kalender) bleiben stehen.
+    """
+    User = apps.get_model("authentication", "User")
+    ZohoKunde = apps.get_model("vertrieb_interface", "ZohoKunde")
+
+    for user in User.objects.exclude(zoho_data_text="").only("id", "zoho_data_text"):
+        try:
+            kunden = json.loads(user.zoho_data_text)
+        except ValueError:
+            continue
+        if not isinstance(kunden, list) or not all(
+            isinstance(kunde, dict) and kunde.get("zoho_id") for kunde in kunden
+        ):
+            continue
+
+        rows = {
+            kunde["zoho_id"]: ZohoKunde(
+                user_id=user.id,
+                zoho_id=kunde["zoho_id"],
+                vertriebler_id=kunde.get("vertriebler_id") or "",
+                name=kunde.get("name") or "",
+                status=kunde.get("status") or "",
+                status_pva=kunde.get("status_pva") or "",
+                zoho_kundennumer=kunde.get("zoho_kundennumer") or "",
+                angenommenes_angebot=kunde.get("angenommenes_angebot") or "",
+                anfrage_vom=parse_date(kunde.get("anfrage_vom")),
+                data=kunde,
+            )
+            for kunde in kunden
+        }
+        ZohoKunde.objects.bulk_create(rows.values(), batch_size=500)
+        User.objects.filter(id=user.id).update(zoho_data_text="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0034_user_zoho_synced_at"),
+        ("vertrieb_interface", "0105_zohokunde"),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_zoho_data_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.0.2 on 2026-10-18 10:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vertrieb_interface", "0106_copy_zoho_data_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZohoOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "operation",
+                    models.CharField(
+                        choices=[
+                            ("push_angebot", "Angebot senden"),
+                            ("push_ticket", "Nachverkauf senden"),
+                            ("update_kunde", "Kundendaten aktualisieren"),
+                            ("update_status", "Status aktualisieren"),
+                            ("delete_angebot", "Angebot löschen"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("record_key", models.CharField(max_length=100)),
+                ("idempotency_key", models.CharField(max_length=255)),
+                ("payload", models.JSONField(default=dict)),
+                ("source_id", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ausstehend"),
+                            ("done", "Gesendet"),
+                            ("superseded", "Überholt"),
+                            ("failed", "Fehlgeschlagen"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("last_error", models.TextField(blank=True, default="")),
+                (
+                    "zoho_record_id",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"],
+                        name="vertrieb_in_status_db8a61_idx",
+                    ),
+                    models.Index(
+                        fields=["record_key", "status"],
+                        name="vertrieb_in_record__8cf3f2_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="zohooutbox",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "pending")),
+                fields=("idempotency_key",),
+                name="unique_pending_zoho_outbox_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vertrieb_interface", "0108_pdfjob"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="zohooutbox",
+            name="unique_pending_zoho_outbox_key",
+        ),
+        migrations.AddField(
+            model_name="zohooutbox",
+            name="dispatched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="zohooutbox",
+            name="locked_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="zohooutbox",
+            name="operation",
+            field=models.CharField(
+                choices=[
+                    ("push_angebot", "Angebot senden"),
+                    ("push_ticket", "Nachverkauf senden"),
+                    ("update_kunde", "Kundendaten aktualisieren"),
+                ],
+                max_length=30,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="zohooutbox",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Ausstehend"),
+                    ("sending", "Wird gesendet"),
+                    ("done", "Gesendet"),
+                    ("superseded", "Überholt"),
+                    ("failed", "Fehlgeschlagen"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="zohooutbox",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "sending"])),
+                fields=("idempotency_key",),
+                name="unique_open_zoho_outbox_key",
+            ),
+        ),
+    ]
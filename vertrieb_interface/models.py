@@ -13,7 +13,10 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.formats import date_format
@@ -25,18 +28,19 @@ from datetime import timedelta
 
 # Local application/library specific imports
 from config.settings import GOOGLE_MAPS_API_KEY
-from prices.models import (
-    AndereKonfigurationWerte,
-    WrGarantiePreise,
-    KwpPreise,
-    OptionalAccessoriesPreise,
-    WrTauschPreise,
-    Sonderrabatt,
-    SolarModulePreise,
-    WallBoxPreise,
-    PLZAufpreisNachkauf,
-)
+from prices.catalog import get_price_catalog
+from prices.models import PRICE_CATALOG_MODELS
 from shared.models import TimeStampMixin
+from shared.projection import LegacyArbeitsListeMixin
+from vertrieb_interface.derived_fields import DerivedFieldContext, derived
+from vertrieb_interface.pricing import (
+    KAPAZITAT_DICT,
+    OfferInput,
+    TicketInput,
+    extract_modulleistung_wp,
+    price_offer,
+    price_ticket,
+)
 from vertrieb_interface.utils import (
     validate_range,
     extract_modulleistungWp,
@@ -51,11 +55,6 @@ MODULE_NAME_MAP = {
     "Phono Solar PS420M7GFH-18/VNH": "Phono Solar PS420M7GFH-18/VNH",
     "Jinko Solar Tiger Neo N-type JKM425N-54HL4-B": "Jinko Solar Tiger Neo N-type JKM425N-54HL4-B",
 }
-ACCESSORY_NAME = "leistungsmodul"
-#BATT_DICT = {1: 0.6, 2: 0.7, 3: 0.75, 4: 0.8, 5: 0.85, 6: 0.92}
-BATT_DICT = {5: 0.6, 7: 0.66, 10: 0.74, 14: 0.79, 15: 0.79, 20: 0.81, 21: 0.81, 25: 0.85, 28: 0.90, 30: 0.92, 35: 0.92,
-             42: 0.92}
-DEFAULT_BATT_USAGE = 0.35
 ANGEBOT_STATUS_CHOICES = [
     ("", ""),
     ("angenommen", "angenommen"),
@@ -117,17 +116,6 @@ def get_modulleistungWp_from_map(module_name_map):
     return result
 
 
-def get_price(model, name, istNachkauf=False):
-    try:
-        if istNachkauf:
-            price = model.objects.get(name=name).price_other
-        else:
-            price = model.objects.get(name=name).price
-    except ObjectDoesNotExist:
-        price = 0
-    return price
-
-
 class LogEntryManager(models.Manager):
     def log_action(
         self, user_id, content_type_id, object_id, object_repr, action_flag, status=None
@@ -189,7 +177,17 @@ class CustomLogEntry(LogEntry):
             return "LogEntry Object"
 
 
-class VertriebAngebot(TimeStampMixin):
+# Eingaben von `pricing`, die keine Neuberechnung auslösen: der Aufschlag kommt über
+# `user_id`, die Speicher-/Smartmeter-Preise gehen mit dem Stand vor `calculate_fields()`
+# ein, das sie anschließend aus demselben Ergebnis überschreibt
+PRICING_UNTRACKED_INPUTS = (
+    "users_aufschlag",
+    "batteriespeicher_angebot_price",
+    "smartmeter_angebot_price",
+)
+
+
+class VertriebAngebot(LegacyArbeitsListeMixin, TimeStampMixin):
     angebot_id = models.CharField(max_length=255, unique=True, primary_key=True)
     current_date = models.DateField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -451,37 +449,67 @@ class VertriebAngebot(TimeStampMixin):
     ag_fetched_data = models.TextField(blank=True, null=True)
     countdown_on = models.BooleanField(default=False)
 
+    # Von calculate_fields() gesetzte Felder (save() und Bulk-Repricing)
+    CALCULATED_FIELDS = (
+        "modulleistungWp",
+        "wallbox_angebot_price",
+        "zubehoer_angebot_price",
+        "batteriespeicher_angebot_price",
+        "smartmeter_angebot_price",
+        "solar_module_angebot_price",
+        "angebotsumme",
+        "rabattsumme",
+        "benotigte_restenergie",
+        "nutzbare_nutzenergie",
+        "erzeugte_energie_pro_jahr",
+        "einspreisevergütung_gesamt",
+        "abzug_vergutung",
+        "Ersparnis",
+        "kosten_fur_restenergie",
+        "ag_data",
+        "Rest_liste",
+        "Arbeits_liste",
+        "nettokreditbetrag",
+    )
+
     def get_optional_accessory_price(self, name):
-        return float(OptionalAccessoriesPreise.objects.get(name=name).price)
+        return float(self.price_catalog.accessory_price(name))
 
     def get_module_preis(self, name):
-        return float(SolarModulePreise.objects.get(name=name).price)
+        return float(self.price_catalog.module(name)["price"])
 
     def get_module_garantie(self, name):
         try:
-            out = str(SolarModulePreise.objects.get(name=name).module_garantie)
+            out = str(self.price_catalog.module(name)["module_garantie"])
         except:
             out = ""
         return out
 
     def get_wr_garantie_preis(self, name):
-        return float(WrGarantiePreise.objects.get(name=name).price)
+        return float(self.price_catalog.wr_garantie_price(name))
 
     def get_leistungs_garantie(self, name):
         try:
-            out = str(SolarModulePreise.objects.get(name=name).leistungs_garantie)
+            out = str(self.price_catalog.module(name)["leistungs_garantie"])
         except:
             out = ""
         return out
 
     def get_wallbox_text(self, name):
         try:
-            out = str(WallBoxPreise.objects.get(name=name).pdf_text)
+            out = str(self.price_catalog.row("WallBoxPreise", name)["pdf_text"])
         except:
             out = ""
         return out
 
+    @property
+    def price_catalog(self):
+        if not hasattr(self, "_price_catalog"):
+            self._price_catalog = get_price_catalog()
+        return self._price_catalog
+
     def save(self, *args, **kwargs):
+        self._price_catalog = get_price_catalog()
         if not self.angebot_id:
             self.angebot_id = self.generate_angebot_id()
             action_flag = ADDITION
@@ -489,29 +517,11 @@ class VertriebAngebot(TimeStampMixin):
             action_flag = CHANGE
 
 
-        self.modulleistungWp = self.extract_modulleistungWp_from_name
-        self.wallbox_angebot_price = self.full_wallbox_preis
-        self.zubehoer_angebot_price = float(self.full_accessories_price)
         self.name = self.swap_name_order
         self.name_display_value = self.swap_name_order_PDF
         self.zoho_kundennumer = self.kundennumer_finder
-        self.batteriespeicher_angebot_price = self.batteriespeicher_preis
-        self.smartmeter_angebot_price = self.smartmeter_preis
-        tmpSumme, tmpRabatt = self.angebots_summe
-        self.angebotsumme = round(tmpSumme, 2)
-        self.rabattsumme = round(tmpRabatt, 2)
         self.anfrage_vom = self.get_current_date_formatted
-        self.benotigte_restenergie = self.restenergie
-        self.nutzbare_nutzenergie = self.nutz_energie
-        self.erzeugte_energie_pro_jahr = self.erzeugte_energie
-        self.einspreisevergütung_gesamt = self.einsp_verg
-        self.abzug_vergutung = self.abzug
-        self.Ersparnis = self.ersparnis
-        self.kosten_fur_restenergie = self.kosten_rest_energie
-        self.ag_data = self.data
-        self.Rest_liste = self.rest_liste
-        self.Arbeits_liste = self.arbeits_liste
-        self.nettokreditbetrag = self.get_nettokreditbetrag
+        self.calculate_fields()
         super(VertriebAngebot, self).save(*args, **kwargs)
 
         CustomLogEntry.objects.log_action(
@@ -522,6 +532,35 @@ class VertriebAngebot(TimeStampMixin):
             action_flag=action_flag,
         )
 
+    def calculate_fields(self):
+        """
+        Berechnet alle Preis- und Energiefelder aus `CALCULATED_FIELDS` neu, ohne zu speichern.
+        Wird von save() und vom Bulk-Repricing (`vertrieb_interface.repricing`) genutzt.
+        """
+        # `pricing` wird innerhalb des Kontextes nur einmal berechnet (siehe derived_fields);
+        # zubehoer_angebot_price nutzt bewusst noch die bisherigen Speicher-/Smartmeter-Preise.
+        with DerivedFieldContext(self):
+            self.modulleistungWp = self.extract_modulleistungWp_from_name
+            result = self.pricing
+            self.wallbox_angebot_price = result.full_wallbox_preis
+            self.zubehoer_angebot_price = result.zubehoer_angebot_price
+            self.batteriespeicher_angebot_price = result.batteriespeicher_preis
+            self.smartmeter_angebot_price = result.smartmeter_preis
+            self.solar_module_angebot_price = result.solar_module_angebot_price
+            self.angebotsumme = result.angebotsumme
+            self.rabattsumme = result.rabattsumme
+            self.benotigte_restenergie = result.restenergie
+            self.nutzbare_nutzenergie = result.nutz_energie
+            self.erzeugte_energie_pro_jahr = result.erzeugte_energie
+            self.einspreisevergütung_gesamt = result.einsp_verg
+            self.abzug_vergutung = result.abzug
+            self.Ersparnis = result.ersparnis
+            self.kosten_fur_restenergie = result.kosten_rest_energie
+            self.ag_data = self.data
+            self.Rest_liste = self.rest_liste
+            self.Arbeits_liste = self.arbeits_liste
+            self.nettokreditbetrag = result.nettokreditbetrag
+
     def __str__(self) -> str:
         return f"{self.angebot_id}"
 
@@ -648,6 +687,17 @@ class VertriebAngebot(TimeStampMixin):
                 parts = str(self.name_first_name) + " " + str(self.name_last_name)
         return str(parts)
 
+    def zoho_kunde_value(self, field):
+        """Ein Feld des zugehörigen `ZohoKunde` aus der Kundenliste des Vertrieblers, sonst ""."""
+        if not self.zoho_id:
+            return ""
+        value = (
+            ZohoKunde.objects.filter(user_id=self.user_id, zoho_id=str(self.zoho_id))
+            .values_list(field, flat=True)
+            .first()
+        )
+        return value or ""
+
     @property
     def kundennumer_finder(self):
         if self.zoho_kundennumer:
@@ -656,23 +706,7 @@ class VertriebAngebot(TimeStampMixin):
         if not self.zoho_id:
             return ""
 
-        try:
-            data = json.loads(
-                self.user.zoho_data_text
-                or '[{"zoho_id": "default", "zoho_kundennumer": "default"}]'
-            )
-        except json.JSONDecodeError:
-            return ""
-
-        zoho_id = str(self.zoho_id)
-        return next(
-            (
-                item["zoho_kundennumer"]
-                for item in data
-                if item.get("zoho_id") == zoho_id
-            ),
-            "",
-        )
+        return self.zoho_kunde_value("zoho_kundennumer")
 
 
     @property
@@ -740,341 +774,181 @@ class VertriebAngebot(TimeStampMixin):
 
     @property
     def extract_modulleistungWp_from_name(self):
-        match = re.search(r"(\d+)", str(self.solar_module))
-        if match:
-            return int(match.group(1))
-        return 420
-
-
-    @property
-    def leistungsmodul_preis(self):
-        if self.speicher_model == "LUNA 2000-5-S0":
-            return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul").price)
-        else:
-            return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul_7").price)
-
-    @property
-    def stromgrundpreis_gesamt(self):
-        return round(float(self.grundpreis) * 12 * int(self.zeitraum), 2)
-
-    @staticmethod
-    def priceInflation(pricePerYear, increasePerYear, years):
-        sumPrice = 0
-        priceList = []
-        for i in range(years):
-            sumPrice += pricePerYear
-            priceList.append(sumPrice)
-            pricePerYear = pricePerYear * (1.0 + increasePerYear)
-        return sumPrice, priceList
-
-    def get_arbeitspreis_and_list(self):
-        if not hasattr(self, "_arbeitspreis_and_list"):
-            try:
-                if float(self.verbrauch):
-                    self._arbeitspreis_and_list = self.priceInflation(
-                        float(self.arbeitspreis) / 100 * float(self.verbrauch),
-                        float(self.prognose) / 100,
-                        int(self.zeitraum),
-                    )
-
-            except:
-                self.verbrauch = 15000.0
-                self._arbeitspreis_and_list = self.priceInflation(
-                    float(self.arbeitspreis) / 100 * float(self.verbrauch),
-                    float(self.prognose) / 100,
-                    int(self.zeitraum),
-                )
-        return self._arbeitspreis_and_list
-
-    @property
-    def arbeitspreis_gesamt(self):
-        arb_ges, _ = self.get_arbeitspreis_and_list()
-        return round(arb_ges, 2)
-
-    @property
-    def arbeits_liste(self):
-        _, arb_liste = self.get_arbeitspreis_and_list()
-        return arb_liste
-
-    @property
-    def erzProJahr(self):
-        direction_map = {"Sud": "erzeugung_sued", "Ost/West": "erzeugung_ost_west"}
-        direction = str(self.ausrichtung)
-        if direction in direction_map:
-            return AndereKonfigurationWerte.objects.get(
-                name=direction_map[direction]
-            ).value
-        else:
-            return 0.00
-
-
-    @property
-    def get_komplexity(self):
-        complexity_map = {
-            "einfach, einfach erreichbar": "einfach_einfach_erreichbar",
-            "einfach, schwer erreichbar": "einfach_schwer_erreichbar",
-            "komplex, einfach erreichbar": "komplex_einfach_erreichbar",
-            "komplex, schwer erreichbar": "komplex_schwer_erreichbar",
-            "sehr komplex": "sehr_komplex",
-        }
-        complexity = str(self.komplex)
-        if complexity in complexity_map:
-            return AndereKonfigurationWerte.objects.get(
-                name=complexity_map[complexity]
-            ).value
-        else:
-            return 0.00
+        return extract_modulleistung_wp(self.solar_module)
 
     """
 
-    CALCULATING   SOLAR MODULE PARAMETERS  
+    PREISE & ERSPARNIS (siehe vertrieb_interface.pricing)
 
     """
 
-    @staticmethod
-    def get_values():
-        return {obj.name: obj.zuschlag for obj in SolarModulePreise.objects.all()}
-
-    @staticmethod
-    def get_prices():
-        return {obj.name: obj.price for obj in OptionalAccessoriesPreise.objects.all()}
-
-    @staticmethod
-    def get_module_prices():
-        return {obj.name: obj.price for obj in SolarModulePreise.objects.all()}
+    def pricing_input(self):
+        return OfferInput(
+            solar_module=self.solar_module,
+            modulleistungWp=self.modulleistungWp,
+            modulanzahl=self.modulanzahl,
+            hersteller=self.hersteller,
+            wechselrichter_model=self.wechselrichter_model,
+            garantieWR=self.garantieWR,
+            speicher_model=self.speicher_model,
+            anz_speicher=self.anz_speicher,
+            anz_wandhalterung_fuer_speicher=self.anz_wandhalterung_fuer_speicher,
+            smartmeter_model=self.smartmeter_model,
+            wallboxtyp=self.wallboxtyp,
+            wallbox_anzahl=self.wallbox_anzahl,
+            kabelanschluss=self.kabelanschluss,
+            kabelSmartGuard=self.kabelSmartGuard,
+            anzOptimizer=self.anzOptimizer,
+            ersatzstrom=self.ersatzstrom,
+            smartDongleLte=self.smartDongleLte,
+            midZaehler=self.midZaehler,
+            apzFeld=self.apzFeld,
+            apzFeldUVV=self.apzFeldUVV,
+            zaehlerschrank=self.zaehlerschrank,
+            zaehlerschrank_2=self.zaehlerschrank_2,
+            potentialausgleich=self.potentialausgleich,
+            beta_platte=self.beta_platte,
+            metall_ziegel=self.metall_ziegel,
+            prefa_befestigung=self.prefa_befestigung,
+            elwa=self.elwa,
+            thor=self.thor,
+            heizstab=self.heizstab,
+            komplex=self.komplex,
+            ausrichtung=self.ausrichtung,
+            indiv_price_included=self.indiv_price_included,
+            indiv_price=self.indiv_price,
+            rabatt=self.rabatt,
+            sonderrabatt_included=self.sonderrabatt_included,
+            sonderrabatt=self.sonderrabatt,
+            geruestKunde=self.geruestKunde,
+            geruestOeffentlich=self.geruestOeffentlich,
+            dachhakenKunde=self.dachhakenKunde,
+            finanzierung=self.finanzierung,
+            anzahlung=self.anzahlung,
+            users_aufschlag=self.user.users_aufschlag,  # type: ignore
+            batteriespeicher_angebot_price=self.batteriespeicher_angebot_price,
+            smartmeter_angebot_price=self.smartmeter_angebot_price,
+            verbrauch=self.verbrauch,
+            grundpreis=self.grundpreis,
+            arbeitspreis=self.arbeitspreis,
+            prognose=self.prognose,
+            zeitraum=self.zeitraum,
+            bis10kWp=self.bis10kWp,
+            bis40kWp=self.bis40kWp,
+        )
 
-    def calculate_price(self, model, name, multiplier):
-        try:
-            multiplier = int(multiplier)
-        except ValueError:
-            multiplier = 0
-        price = get_price(model, name)
-        return price * multiplier
+    # alle Eingaben von `pricing_input()`, der Aufschlag hängt am Benutzer
+    @derived(
+        "user_id",
+        *(name for name in OfferInput._fields if name not in PRICING_UNTRACKED_INPUTS),
+    )
+    def pricing(self):
+        return price_offer(self.pricing_input(), self.price_catalog)
 
     @property
-    def modulleistung_price(self):
-        prices = self.get_prices()
-        return float(prices[ACCESSORY_NAME])
+    def erzProJahr(self):
+        return self.pricing.erzProJahr
 
     @property
-    def elwa_price(self):
-        prices = self.get_prices()
-        return float(prices["elwa_2"])
+    def modulsumme_kWp(self):
+        return self.pricing.modulsumme_kWp
 
     @property
-    def thor_price(self):
-        prices = self.get_prices()
-        return float(prices["ac_thor_3_kw"])
+    def solar_module_gesamt_preis(self):
+        return self.pricing.solar_module_gesamt_preis
 
     @property
-    def heizstab_price(self):
-        prices = self.get_prices()
-        return float(prices["heizstab"])
+    def wandhalterung_fuer_speicher_preis(self):
+        return self.pricing.wandhalterung_fuer_speicher_preis
 
     @property
-    def solar_module_gesamt_preis(self):
-        module_prices = self.get_module_prices()
-        module_name = (
-            self.solar_module if self.solar_module else "Phono Solar PS420M7GFH-18/VNH"
-        )
-        try:
-            return float(module_prices[module_name]) * int(self.modulanzahl)
-        except KeyError:
-            # handle the error, maybe return a default value or raise a more descriptive error
-            return 0.0
+    def batteriespeicher_preis(self):
+        return self.pricing.batteriespeicher_preis
 
     @property
-    def beta_platte_preis(self):
-        limits = [7, 11, 15, 19, 23, 27, 30]
-        kwp = min(30, self.modulsumme_kWp)
-        kwpUpper = min(upper for upper in limits if upper >= kwp)
-        namePlatte = "BetaPlatte" + str(kwpUpper)
-        beta_preis = float(KwpPreise.objects.get(name=namePlatte).price)
-        return beta_preis
+    def smartmeter_preis(self):
+        return self.pricing.smartmeter_preis
 
     @property
-    def metall_ziegel_preis(self):
-        limits = [7, 11, 15, 19, 23, 27, 30]
-        kwp = min(30, self.modulsumme_kWp)
-        kwpUpper = min(upper for upper in limits if upper >= kwp)
-        nameZiegel = "MetallZiegel" + str(kwpUpper)
-        ziegel_preis = float(KwpPreise.objects.get(name=nameZiegel).price)
-        return ziegel_preis
+    def gesamtkapazitat(self):
+        kapazitat = KAPAZITAT_DICT.get(self.speicher_model)
+        if kapazitat:
+            return round(self.anz_speicher * kapazitat, 2)
+        return 0
 
     @property
-    def prefa_befestigung_preis(self):
-        prefa_preis = OptionalAccessoriesPreise.objects.get(name="prefa_befestigung").price * self.modulanzahl
-        return prefa_preis
-    @property
-    def wandhalterung_fuer_speicher_preis(self):
-        wandhalterung_preis = 0
-        wandDict = {"LUNA 2000-5-S0": "wandhalterung_fuer_speicher", "LUNA 2000-7-S1": "wandhalterung_fuer_speicher_7",
-                        "Vitocharge VX3 PV-Stromspeicher": "wandhalterung_fuer_speicher", "ATMOCE M-ELV Akku MS-7K-U": "wandhalterung_fuer_speicher_7"}
-        if self.anz_wandhalterung_fuer_speicher != 0:
-            anz_wandhalterung_fuer_speicher = int(self.anz_wandhalterung_fuer_speicher)
-            wandhalterung_preis = self.calculate_price(
-                OptionalAccessoriesPreise,
-                wandDict.get(self.speicher_model),
-                anz_wandhalterung_fuer_speicher,
-            )
-        return wandhalterung_preis
+    def full_optimizer_preis(self):
+        return self.pricing.full_optimizer_preis
 
     @property
-    def midZaehler_preis(self):
-        midZaehler_preis = 0
-        if self.midZaehler != 0:
-            anz_midZaehler = int(self.midZaehler)
-            midZaehler_preis = self.calculate_price(
-                OptionalAccessoriesPreise,
-                "mid_zaehler",
-                anz_midZaehler,
-            )
-            return midZaehler_preis
+    def full_wallbox_preis(self):
+        return self.pricing.full_wallbox_preis
 
     @property
-    def batteriespeicher_preis(self):
-        batterieDict = {"LUNA 2000-5-S0": "batteriemodul_huawei5", "LUNA 2000-7-S1": "batteriemodul_huawei7",
-                        "Vitocharge VX3 PV-Stromspeicher": "batteriemodul_viessmann", "ATMOCE M-ELV Akku MS-7K-U": "batteriemodul_atmoce"}
-        leistModDict = {"LUNA 2000-5-S0": True, "LUNA 2000-7-S1": True, "Vitocharge VX3 PV-Stromspeicher": False, "ATMOCE M-ELV Akku MS-7K-U": False}
-        batteriePreis = 0
-        if self.anz_speicher != 0:
-            anz_speicher = int(self.anz_speicher)
-            leistungsmodulNotwendig = leistModDict.get(self.speicher_model)
-            batterieDatensatz = batterieDict.get(self.speicher_model)
-            # Kein angenommenes Angebot oder angenommenes Angebot hatte keinen Speicher
-            if batterieDatensatz is not None:
-                batteriePreis = self.calculate_price(OptionalAccessoriesPreise, batterieDatensatz, anz_speicher)
-                if leistungsmodulNotwendig:
-                    batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * float(self.leistungsmodul_preis)
-                # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen
-                if self.modulsumme_kWp < 25.0 and self.speicher_model == "LUNA 2000-7-S1" and anz_speicher > 6:
-                    batteriePreis += self.get_optional_accessory_price("zusatzwechselrichter")
-                return batteriePreis
-        return batteriePreis
+    def full_accessories_price(self):
+        return self.pricing.full_accessories_price
 
     @property
-    def smartmeter_preis(self):
-        smartmeterPreis = 0
-        if self.smartmeter_model == "Smart Power Sensor DTSU666H":
-            smartmeterPreis = self.calculate_price(
-                    OptionalAccessoriesPreise, "smartmeter_dtsu", 1
-                )
-        elif self.smartmeter_model == "EMMA-A02":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_emma", 1
-            )
-        elif self.smartmeter_model == "Viessmann Energiezähler":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_viessmann", 1
-            )
-        elif self.smartmeter_model == "ATMOCE Gateway MG100":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_atmoce", 1
-            )
-        return smartmeterPreis
+    def angebots_summe(self):
+        return self.pricing.angebots_summe, self.pricing.rabatt
 
     @property
-    def gesamtkapazitat(self):
-        kapazitatDict = {"LUNA 2000-5-S0": 5, "LUNA 2000-7-S1": 6.9, "Vitocharge VX3 PV-Stromspeicher": 5, "ATMOCE M-ELV Akku MS-7K-U": 7}
-        if kapazitatDict.get(self.speicher_model):
-            return round(self.anz_speicher * kapazitatDict.get(self.speicher_model), 2)
-        return 0
+    def kosten_pva(self):
+        return self.pricing.kosten_pva
 
     @property
-    def modulsumme_kWp(self):
-        return self.modulleistungWp * self.modulanzahl / 1000
-
+    def stromgrundpreis_gesamt(self):
+        return self.pricing.stromgrundpreis_gesamt
 
     @property
-    def get_nettokreditbetrag(self):
-        return self.angebotsumme - self.anzahlung
+    def arbeitspreis_gesamt(self):
+        return self.pricing.arbeitspreis_gesamt
 
     @property
-    def get_zuschlag(self):
-        # Fetch all the values
-        values = self.get_values()
-
-        # Check if 'self.solar_module' is not None, else assign the default module name
-        module_name = (self.solar_module if self.solar_module else ("Phono Solar PS420M7GFH-18/VNH"))
-        # Return value based on module_name
-        return float(values.get(module_name))
+    def strom_ohne(self):
+        return float(self.stromgrundpreis_gesamt) + float(self.arbeitspreis_gesamt)
 
+    @property
+    def erzeugte_energie(self):
+        return self.pricing.erzeugte_energie
 
     @property
     def nutz_energie(self):
-        nutzEnergie = float(self.verbrauch)
-        if self.erzeugte_energie < nutzEnergie:
-            nutzEnergie = float(self.erzProJahr) * float(self.modulsumme_kWp)
-        if self.anz_speicher != 0:
-            if self.speicher_model == "LUNA 2000-5-S0":
-                kwh = self.anz_speicher * 5
-            else:
-                kwh = self.anz_speicher * 7
-            # Limitierung bis 6 Speichermodule, danach pauschal kein noch besserer Eigenverbrauch
-            nutzEnergie = nutzEnergie * BATT_DICT[min(kwh,42)]
-        else:
-            nutzEnergie = nutzEnergie * DEFAULT_BATT_USAGE
-        return round(nutzEnergie, 2)
+        return self.pricing.nutz_energie
 
     @property
     def restenergie(self):
-        rest = 0
-
-        if float(self.verbrauch):
-            rest += float(self.verbrauch) - float(self.nutz_energie)
-            return rest
-        else:
-            return 0
+        return self.pricing.restenergie
 
     @property
     def rest_strom_preis(self):
-        reststromPreis, _ = self.priceInflation(
-            float(self.arbeitspreis) / 100 * float(self.restenergie),
-            float(self.prognose) / 100,
-            self.zeitraum,
-        )
-        return round(reststromPreis, 2)
-
-    @property
-    def strom_ohne(self):
-        return float(self.stromgrundpreis_gesamt) + float(self.arbeitspreis_gesamt)
+        return self.pricing.rest_strom_preis
 
     @property
     def kosten_rest_energie(self):
-        return self.rest_strom_preis + self.stromgrundpreis_gesamt
+        return self.pricing.kosten_rest_energie
 
     @property
     def einsp_pro_jahr(self):
-        if self.modulsumme_kWp <= 10:
-            return float(self.bis10kWp) * 0.01 * self.einsp_energie
-            # return float(self.bis10kWp) * 0.01 * (10 / self.modulsumme_kWp)
-        else:
-            klZehn = float(self.bis10kWp) * 0.01 * (10 / self.modulsumme_kWp)
-            grZehn = (
-                float(self.bis40kWp)
-                * 0.01
-                * (self.modulsumme_kWp - 10)
-                / self.modulsumme_kWp
-            )
-            return (klZehn + grZehn) * self.einsp_energie
+        return self.pricing.einsp_pro_jahr
 
     @property
-    def erzeugte_energie(self):
-        return round(float(self.erzProJahr) * float(self.modulsumme_kWp), 2)
+    def einsp_verg(self):
+        return self.pricing.einsp_verg
 
     @property
-    def einsp_energie(self):
-        return self.erzeugte_energie - self.nutz_energie
+    def abzug(self):
+        return self.pricing.abzug
 
     @property
-    def einsp_verg(self):
-        return round(self.einsp_pro_jahr * self.zeitraum, 2)
-
-    """
+    def ersparnis(self):
+        return self.pricing.ersparnis
 
-    CALCULATING   WALLBOX  
+    def arbeitspreis_liste(self):
+        return list(self.pricing.arbeitspreis_liste)
 
-    """
+    def projected_rest_liste(self):
+        return list(self.pricing.rest_liste)
 
     @property
     def wallbox_anzahl_pdf(self):
@@ -1088,322 +962,111 @@ class VertriebAngebot(TimeStampMixin):
             else "\n1" if "Power Boost" in str(self.wallboxtyp) else "\n1"
         )
 
-    @property
-    def wallbox_kabel_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="kabelpreis").price)
-
-    @property
-    def smartguard_kabel_preis(self):
-        if self.kabelSmartGuard and self.kabelSmartGuard >= 0:
-            return self.kabelSmartGuard * self.get_optional_accessory_price("kabelpreis_smartguard")
-        return 0
-
-    @property
-    def optimizer_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="optimizer").price)
-
-    @property
-    def optimizer_full_preis(self):
-        return self.anzOptimizer * self.optimizer_preis
-
-
-    """
-
-    CALCULATING   ANGEBOT SUMME  
-
-    """
-
-    @property
-    def get_wechselrichter_price(self):
-        if self.wechselrichter_model == "SUN 2000 MAP0":
-            return self.get_optional_accessory_price("aufpreisMAP0")
-        elif self.wechselrichter_model == "SUN 2000 MB0":
-            return self.get_optional_accessory_price("aufpreisMB0")
-        return 0
-
-    @property
-    def full_optimizer_preis(self):
-        return self.anzOptimizer * self.get_optional_accessory_price("optimizer")
-
-    @property
-    def full_wallbox_preis(self):
-        preis = 0.0
-        if self.wallbox_anzahl:
-            preis += float(WallBoxPreise.objects.get(name=str(self.wallboxtyp)).price)
-            preis *= self.wallbox_anzahl
-        if self.kabelanschluss and self.kabelanschluss >= 0:
-            preis += self.kabelanschluss * self.get_optional_accessory_price(
-                "kabelpreis"
-            )
-        return preis
-
-    @property
-    def full_accessories_price(self):
-        accessories_price = 0
-        if self.full_optimizer_preis:
-            accessories_price += float(self.full_optimizer_preis)
-        if self.full_wallbox_preis:
-            accessories_price += float(self.full_wallbox_preis)
-        if self.batteriespeicher_angebot_price:
-            accessories_price += float(self.batteriespeicher_angebot_price)
-        if self.smartmeter_angebot_price:
-            accessories_price += float(self.smartmeter_angebot_price)
-        if self.ersatzstrom:
-            accessories_price += float(self.get_optional_accessory_price("ersatzstrom"))
-            accessories_price += float(self.smartguard_kabel_preis)
-        if self.smartDongleLte:
-            accessories_price += float(self.get_optional_accessory_price("smartDongleLte"))
-        if self.midZaehler > 0:
-            accessories_price += float(self.midZaehler_preis)
-        if self.apzFeld:
-            accessories_price += float(self.get_optional_accessory_price("apzFeld"))
-        if self.apzFeldUVV:
-            accessories_price += float(self.get_optional_accessory_price("apzFeldUVV"))
-        if self.zaehlerschrank:
-            accessories_price += float(self.get_optional_accessory_price("zaehlerschrank"))
-        if self.zaehlerschrank_2:
-            accessories_price += float(self.get_optional_accessory_price("zaehlerschrank_2"))
-        if self.potentialausgleich:
-            accessories_price += float(self.get_optional_accessory_price("potentialausgleich"))
-        if self.beta_platte:
-            accessories_price += float(self.beta_platte_preis)
-        if self.metall_ziegel:
-            accessories_price += float(self.metall_ziegel_preis)
-        if self.prefa_befestigung:
-            accessories_price += float(self.prefa_befestigung_preis)
-        if self.wandhalterung_fuer_speicher_preis:
-            accessories_price += float(self.wandhalterung_fuer_speicher_preis)
-        if self.elwa:
-            accessories_price += float(self.elwa_price)
-        if self.thor:
-            accessories_price += float(self.thor_price)
-        if self.heizstab:
-            accessories_price += float(self.heizstab_price)
-        return accessories_price
-
-    @property
-    def angebots_summe(self):
-        def get_price(prefix, kw):
-            name = prefix + str(kw)
-            return (float(KwpPreise.objects.get(name=name).price)) * float(
-                self.get_zuschlag
-            )
-
-        def get_garantie_price(kw, years):
-            name = f"garantie{kw}_{years}"
-            return float(WrGarantiePreise.objects.get(name=name).price)
-
-        limits = [5, 7, 10, 12, 15, 20, 25, 30]
-        ranges = ([(0, limits[0])]
-            + list(zip(limits, limits[1:]))
-            + [(limits[-1], float("30"))]
-        )
-
-        kwp = min(30, self.modulsumme_kWp)
-        angebotsSumme = sum(
-            (min(self.modulsumme_kWp, upper) - lower) * get_price("Preis", upper)
-            for lower, upper in ranges
-            if lower < kwp
-        )
-        angebotsSumme *= float(self.get_komplexity)
-        self.solar_module_angebot_price = angebotsSumme
-        angebotsSumme += float(self.full_accessories_price)
-        angebotsSumme += float(self.get_wechselrichter_price)
-
-        if self.hersteller == "Huawei" and self.garantieWR != "keine":
-            if self.speicher_model == "LUNA 2000-7-S1" and self.anz_speicher > 0:
-                garantie_faktor = float(AndereKonfigurationWerte.objects.get(name="garantiefaktor").value)
-            else:
-                garantie_faktor = 1
-            garantie_years = int(self.garantieWR.split(" ")[0])
-            garantie_kw = next(
-                kw
-                for kw in [3, 4, 5, 6, 8, 10, 15, 16, 20, 25, 30]
-                if kwp <= kw
-            )
-            angebotsSumme += get_garantie_price(garantie_kw, garantie_years) * garantie_faktor
-
-        if self.indiv_price_included:
-            rabatt = angebotsSumme - self.indiv_price
-            angebotsSumme = self.indiv_price
-
-        else:
-            rabatt = angebotsSumme * (self.rabatt/100)
-            angebotsSumme *= (1-(self.rabatt/100))
-
-            # Sonderrabatte
-            if self.sonderrabatt_included and Sonderrabatt.objects.all().exists():
-                angebotsSumme *= (1-(float(Sonderrabatt.objects.get(name=self.sonderrabatt).prozentsatz)/100))
-                angebotsSumme -= float(Sonderrabatt.objects.get(name=self.sonderrabatt).fixbetrag)
-
-        userAufschlag = float(self.user.users_aufschlag) / 100 + 1  # type: ignore
-        angebotsSumme *= userAufschlag
-        # Abzug Selbstleistungen nach Rabattierung
-        if self.geruestKunde:
-            angebotsSumme -= float(self.get_optional_accessory_price("geruestKunde"))
-            rabatt += float(self.get_optional_accessory_price("geruestKunde"))
-        elif self.geruestOeffentlich:
-            angebotsSumme += float(self.get_optional_accessory_price("geruestOeffentlich"))
-        if self.dachhakenKunde:
-            angebotsSumme -= float(self.get_optional_accessory_price("dachhakenKunde"))
-            rabatt += float(self.get_optional_accessory_price("dachhakenKunde"))
-        # Aufpreis Finanzierung nach Rabattierung
-        if self.finanzierung:
-            angebotsSumme += 300
-        return angebotsSumme, rabatt
-
-
-    @property
-    def kosten_pva(self):
-        return float(self.angebots_summe[0]) * float(
-            1 + AndereKonfigurationWerte.objects.get(name="steuersatz").value
-        )
-
-    @property
-    def abzug(self):
-        res = 0.0
-        if (
-            self.kosten_pva
-            and self.rest_strom_preis
-            and self.stromgrundpreis_gesamt
-            and self.einsp_verg
-        ):
-            res += (
-                self.kosten_pva
-                + self.rest_strom_preis
-                + self.stromgrundpreis_gesamt
-                - self.einsp_verg
-            )
-        return round(res, 2)
-
-    @property
-    def ersparnis(self):
-        ersp = float(self.arbeitspreis_gesamt) - (
-            float(self.kosten_pva)
-            + float(self.rest_strom_preis)
-            - float(self.einsp_verg)
-        )
-        return round(ersp, 2)
-
-    @property
-    def rest_liste(self):
-        restenergie = float(self.verbrauch) - self.nutz_energie
-        _, restListe = self.priceInflation(
-            float(self.arbeitspreis) / 100 * restenergie,
-            float(self.prognose) / 100,
-            self.zeitraum,
-        )
-        for i in range(self.zeitraum):
-            self.arbeits_liste[i] += float(self.grundpreis) * 12 * (i + 1)
-            restListe[i] += float(self.grundpreis) * 12 * (i + 1)
-            restListe[i] += self.kosten_pva
-            restListe[i] -= self.einsp_pro_jahr * (i + 1)
-        return restListe
-
     @property
     def data(self):
-        dt = {
-            "firma": self.firma,
-            "anrede": self.anrede,
-            "kunde": self.name_display_value,
-            "adresse": self.full_adresse,
-            "vertriebler": str(self.get_vertribler),
-            "vertriebAbk": self.vertrieb_abk,
-            "gueltig": self.angebot_gultig,
-            "module": self.solar_module,
-            "wpModule": self.modulleistungWp,
-            "anzModule": self.modulanzahl,
-            "produktGarantie": self.get_module_garantie(self.solar_module),
-            "leistungsGarantie": self.get_leistungs_garantie(self.solar_module),
-            "kWp": self.modulsumme_kWp,
-            "kWpOhneRundung": self.modulsumme_kWp,
-            "postanschrift": self.post_anschrift,
-            "garantieJahre": self.garantieWR,
-            "batterieVorh": self.batteriespeicher_preis,
-            "batterieModell": self.speicher_model,
-            "smartmeterModell": self.smartmeter_model,
-            "wandhalterungSpeicher": self.wandhalterung_fuer_speicher,
-            "anzWandhalterungSpeicher": self.anz_wandhalterung_fuer_speicher,
-            "wandhalterungSpeicherPreis": self.wandhalterung_fuer_speicher_preis,
-            "batterieAnz": self.anz_speicher,
-            "wallboxVorh": self.full_wallbox_preis,
-            "wallboxTyp": self.wallboxtyp,
-            "wallboxText": self.get_wallbox_text(self.wallboxtyp),
-            "wallboxAnz": self.wallbox_anzahl,
-            "optionVorh": self.ersatzstrom,
-            "kabelanschluss": self.kabelanschluss,
-            "kabelSmartGuard": self.kabelSmartGuard if self.ersatzstrom else 0,
-            "wr_tausch": "Kein Tausch",
-            "wr_tausch_text": "",
-            "elwa": self.elwa,
-            "thor": self.thor,
-            "midZaehler": self.midZaehler,
-            "apzFeld": self.apzFeld,
-            "apzFeldUVV": self.apzFeldUVV,
-            "zaehlerschrank": self.zaehlerschrank,
-            "zaehlerschrank_2": self.zaehlerschrank_2,
-            "potentialausgleich": self.potentialausgleich,
-            "geruestKunde": self.geruestKunde,
-            "geruestOeffentlich": self.geruestOeffentlich,
-            "dachhakenKunde": self.dachhakenKunde,
-            "betaPlatte": self.beta_platte,
-            "metallZiegel": self.metall_ziegel,
-            "prefaBefestigung": self.prefa_befestigung,
-            "heizstab": self.heizstab,
-            "smartDongleLte": self.smartDongleLte,
-            "optimierer": self.optimizer,
-            "anzOptimierer": self.anzOptimizer,
-            "ersatzstrom": self.ersatzstrom,
-            "solarModulePreis": self.solar_module_gesamt_preis,
-            "wallboxPreis": self.full_wallbox_preis,
-            "batterieSpeicherPreis": self.batteriespeicher_preis,
-            "gesamtOptimizerPreis": self.full_optimizer_preis,
-            "zahlungs_bedingungen": self.zahlungsbedingungen,
-            "rabatt": self.rabatt,
-            "rabattsumme": self.rabattsumme,
-            "ausweisung_rabatt": self.ausweisung_rabatt or (self.indiv_price_included and self.rabattsumme > 0),
-            "wp_kombi_rabatt": self.wp_kombi_rabatt,
-            "indiv_included:": self.indiv_price_included,
-            "indiv_text": self.indiv_text,
-            "angebotssumme": self.angebotsumme,
-            "steuersatz": float(
-                AndereKonfigurationWerte.objects.get(name="steuersatz").value
-            ),
-            "finanzierung": self.finanzierung,
-            "anzahlung": self.anzahlung,
-            "nettokreditbetrag": self.nettokreditbetrag,
-            "monatliche_rate": self.monatliche_rate,
-            "laufzeit": self.laufzeit,
-            "sollzinssatz": self.sollzinssatz,
-            "effektiver_zins": self.effektiver_zins,
-            "gesamtkreditbetrag": self.gesamtkreditbetrag,
-            "debug": False,
-            "hersteller": self.hersteller,
-            "wechselrichter": self.wechselrichter_model,
-            "version": 1.0,
-            "stromverbrauch": self.verbrauch,
-            "grundpreis": self.grundpreis,
-            "arbeitspreis": self.arbeitspreis,
-            "prognose": self.prognose,
-            "zeitraum": int(self.zeitraum),
-            "bis10kWp": float(self.bis10kWp),
-            "10bis40kWp": float(self.bis40kWp),
-            "ausrichtung": self.ausrichtung,
-            "erzeugungSued": self.erzProJahr,
-            "erzeugungOstWest": self.erzProJahr,
-            "grundpreisGes": self.stromgrundpreis_gesamt,
-            "arbeitspreisGes": self.arbeitspreis_gesamt,
-            "erzeugteEnergie": self.erzeugte_energie,
-            "nutzEnergie": self.nutzbare_nutzenergie,
-            "restenergie": self.restenergie,
-            "reststromPreis": self.rest_strom_preis,
-            "einspVerg": self.einsp_verg,
-            "kostenPVA": self.kosten_pva,
-            "ersparnis": self.ersparnis,
-            "arbeitsListe": self.arbeits_liste,
-            "restListe": self.rest_liste,
-        }
-        return dt
+        with DerivedFieldContext(self):
+            dt = {
+                "firma": self.firma,
+                "anrede": self.anrede,
+                "kunde": self.name_display_value,
+                "adresse": self.full_adresse,
+                "vertriebler": str(self.get_vertribler),
+                "vertriebAbk": self.vertrieb_abk,
+                "gueltig": self.angebot_gultig,
+                "module": self.solar_module,
+                "wpModule": self.modulleistungWp,
+                "anzModule": self.modulanzahl,
+                "produktGarantie": self.get_module_garantie(self.solar_module),
+                "leistungsGarantie": self.get_leistungs_garantie(self.solar_module),
+                "kWp": self.modulsumme_kWp,
+                "kWpOhneRundung": self.modulsumme_kWp,
+                "postanschrift": self.post_anschrift,
+                "garantieJahre": self.garantieWR,
+                "batterieVorh": self.batteriespeicher_preis,
+                "batterieModell": self.speicher_model,
+                "smartmeterModell": self.smartmeter_model,
+                "wandhalterungSpeicher": self.wandhalterung_fuer_speicher,
+                "anzWandhalterungSpeicher": self.anz_wandhalterung_fuer_speicher,
+                "wandhalterungSpeicherPreis": self.wandhalterung_fuer_speicher_preis,
+                "batterieAnz": self.anz_speicher,
+                "wallboxVorh": self.full_wallbox_preis,
+                "wallboxTyp": self.wallboxtyp,
+                "wallboxText": self.get_wallbox_text(self.wallboxtyp),
+                "wallboxAnz": self.wallbox_anzahl,
+                "optionVorh": self.ersatzstrom,
+                "kabelanschluss": self.kabelanschluss,
+                "kabelSmartGuard": self.kabelSmartGuard if self.ersatzstrom else 0,
+                "wr_tausch": "Kein Tausch",
+                "wr_tausch_text": "",
+                "elwa": self.elwa,
+                "thor": self.thor,
+                "midZaehler": self.midZaehler,
+                "apzFeld": self.apzFeld,
+                "apzFeldUVV": self.apzFeldUVV,
+                "zaehlerschrank": self.zaehlerschrank,
+                "zaehlerschrank_2": self.zaehlerschrank_2,
+                "potentialausgleich": self.potentialausgleich,
+                "geruestKunde": self.geruestKunde,
+                "geruestOeffentlich": self.geruestOeffentlich,
+                "dachhakenKunde": self.dachhakenKunde,
+                "betaPlatte": self.beta_platte,
+                "metallZiegel": self.metall_ziegel,
+                "prefaBefestigung": self.prefa_befestigung,
+                "heizstab": self.heizstab,
+                "smartDongleLte": self.smartDongleLte,
+                "optimierer": self.optimizer,
+                "anzOptimierer": self.anzOptimizer,
+                "ersatzstrom": self.ersatzstrom,
+                "solarModulePreis": self.solar_module_gesamt_preis,
+                "wallboxPreis": self.full_wallbox_preis,
+                "batterieSpeicherPreis": self.batteriespeicher_preis,
+                "gesamtOptimizerPreis": self.full_optimizer_preis,
+                "zahlungs_bedingungen": self.zahlungsbedingungen,
+                "rabatt": self.rabatt,
+                "rabattsumme": self.rabattsumme,
+                "ausweisung_rabatt": self.ausweisung_rabatt or (self.indiv_price_included and self.rabattsumme > 0),
+                "wp_kombi_rabatt": self.wp_kombi_rabatt,
+                "indiv_included:": self.indiv_price_included,
+                "indiv_text": self.indiv_text,
+                "angebotssumme": self.angebotsumme,
+                "steuersatz": float(
+                    self.price_catalog.andere_value("steuersatz")
+                ),
+                "finanzierung": self.finanzierung,
+                "anzahlung": self.anzahlung,
+                "nettokreditbetrag": self.nettokreditbetrag,
+                "monatliche_rate": self.monatliche_rate,
+                "laufzeit": self.laufzeit,
+                "sollzinssatz": self.sollzinssatz,
+                "effektiver_zins": self.effektiver_zins,
+                "gesamtkreditbetrag": self.gesamtkreditbetrag,
+                "debug": False,
+                "hersteller": self.hersteller,
+                "wechselrichter": self.wechselrichter_model,
+                "version": 1.0,
+                "stromverbrauch": self.verbrauch,
+                "grundpreis": self.grundpreis,
+                "arbeitspreis": self.arbeitspreis,
+                "prognose": self.prognose,
+                "zeitraum": int(self.zeitraum),
+                "bis10kWp": float(self.bis10kWp),
+                "10bis40kWp": float(self.bis40kWp),
+                "ausrichtung": self.ausrichtung,
+                "erzeugungSued": self.erzProJahr,
+                "erzeugungOstWest": self.erzProJahr,
+                "grundpreisGes": self.stromgrundpreis_gesamt,
+                "arbeitspreisGes": self.arbeitspreis_gesamt,
+                "erzeugteEnergie": self.erzeugte_energie,
+                "nutzEnergie": self.nutzbare_nutzenergie,
+                "restenergie": self.restenergie,
+                "reststromPreis": self.rest_strom_preis,
+                "einspVerg": self.einsp_verg,
+                "kostenPVA": self.kosten_pva,
+                "ersparnis": self.ersparnis,
+                "arbeitsListe": self.arbeits_liste,
+                "restListe": self.rest_liste,
+            }
+            return dt
 
 
 class VertriebTicket(TimeStampMixin):
@@ -1572,37 +1235,70 @@ class VertriebTicket(TimeStampMixin):
     ag_fetched_data = models.TextField(blank=True, null=True)
     countdown_on = models.BooleanField(default=False)
 
+    # Von calculate_fields() gesetzte Felder (save() und Bulk-Repricing)
+    CALCULATED_FIELDS = (
+        "modulleistungWp",
+        "wallbox_angebot_price",
+        "zubehoer_angebot_price",
+        "batteriespeicher_angebot_price",
+        "smartmeter_angebot_price",
+        "solar_module_angebot_price",
+        "angebotsumme",
+        "rabattsumme",
+        "ag_data",
+    )
+
+    # Spalten des angenommenen Angebots, die Nachkauf-Preise und PDF brauchen
+    ACCEPTED_OFFER_FIELDS = (
+        "angebot_id",
+        "solar_module",
+        "modulleistungWp",
+        "modulanzahl",
+        "anzOptimizer",
+        "speicher_model",
+        "anz_speicher",
+        "wallboxtyp",
+        "wallbox_anzahl",
+    )
+
     def get_optional_accessory_price(self, name):
         if self.istNachkauf:
-            return float(OptionalAccessoriesPreise.objects.get(name=name).price_other)
+            return float(self.price_catalog.accessory_price(name, True))
         else:
-            return float(OptionalAccessoriesPreise.objects.get(name=name).price)
+            return float(self.price_catalog.accessory_price(name))
 
     def get_module_preis(self, name):
-        return float(SolarModulePreise.objects.get(name=name).price)
+        return float(self.price_catalog.module(name)["price"])
 
     def get_module_garantie(self, name):
         try:
-            out = str(SolarModulePreise.objects.get(name=name).module_garantie)
+            out = str(self.price_catalog.module(name)["module_garantie"])
         except:
             out = ""
         return out
 
     def get_leistungs_garantie(self, name):
         try:
-            out = str(SolarModulePreise.objects.get(name=name).leistungs_garantie)
+            out = str(self.price_catalog.module(name)["leistungs_garantie"])
         except:
             out = ""
         return out
 
     def get_wallbox_text(self, name):
         try:
-            out = str(WallBoxPreise.objects.get(name=name).pdf_text)
+            out = str(self.price_catalog.row("WallBoxPreise", name)["pdf_text"])
         except:
             out = ""
         return out
 
+    @property
+    def price_catalog(self):
+        if not hasattr(self, "_price_catalog"):
+            self._price_catalog = get_price_catalog()
+        return self._price_catalog
+
     def save(self, *args, **kwargs):
+        self._price_catalog = get_price_catalog()
         if not self.ticket_id:
             self.ticket_id = self.generate_ticket_id()
             action_flag = ADDITION
@@ -1611,19 +1307,13 @@ class VertriebTicket(TimeStampMixin):
 
         self.zoho_kundennumer = self.kundennumer_finder
         self.angenommenes_angebot = self.angebot_finder
+        # das angenommene Angebot je save() einmal frisch laden
+        self.__dict__.pop("_accepted_offer", None)
         self.status_pva = self.get_status_pva
-        self.modulleistungWp = self.extract_modulleistungWp_from_name
-        self.wallbox_angebot_price = self.full_wallbox_preis
-        self.zubehoer_angebot_price = float(self.full_accessories_price)
         self.name = self.swap_name_order
         self.name_display_value = self.swap_name_order_PDF
-        self.batteriespeicher_angebot_price = self.batteriespeicher_preis
-        self.smartmeter_angebot_price = self.smartmeter_preis
-        tmpSumme, tmpRabatt = self.angebots_summe
-        self.angebotsumme = round(tmpSumme, 2)
-        self.rabattsumme = round(tmpRabatt, 2)
         self.anfrage_vom = self.get_current_date_formatted
-        self.ag_data = self.data
+        self.calculate_fields()
         super(VertriebTicket, self).save(*args, **kwargs)
 
         CustomLogEntry.objects.log_action(
@@ -1634,6 +1324,23 @@ class VertriebTicket(TimeStampMixin):
             action_flag=action_flag,
         )
 
+    def calculate_fields(self):
+        """
+        Berechnet alle Preisfelder aus `CALCULATED_FIELDS` neu, ohne zu speichern.
+        Wird von save() und vom Bulk-Repricing (`vertrieb_interface.repricing`) genutzt.
+        """
+        with DerivedFieldContext(self):
+            self.modulleistungWp = self.extract_modulleistungWp_from_name
+            result = self.pricing
+            self.wallbox_angebot_price = result.full_wallbox_preis
+            self.zubehoer_angebot_price = result.zubehoer_angebot_price
+            self.batteriespeicher_angebot_price = result.batteriespeicher_preis
+            self.smartmeter_angebot_price = result.smartmeter_preis
+            self.solar_module_angebot_price = result.solar_module_angebot_price
+            self.angebotsumme = result.angebotsumme
+            self.rabattsumme = result.rabattsumme
+            self.ag_data = self.data
+
     def __str__(self) -> str:
         return f"{self.ticket_id}"
 
@@ -1760,6 +1467,17 @@ class VertriebTicket(TimeStampMixin):
                 parts = str(self.name_first_name) + " " + str(self.name_last_name)
         return str(parts)
 
+    def zoho_kunde_value(self, field):
+        """Ein Feld des zugehörigen `ZohoKunde` aus der Kundenliste des Vertrieblers, sonst ""."""
+        if not self.zoho_id:
+            return ""
+        value = (
+            ZohoKunde.objects.filter(user_id=self.user_id, zoho_id=str(self.zoho_id))
+            .values_list(field, flat=True)
+            .first()
+        )
+        return value or ""
+
     @property
     def kundennumer_finder(self):
         if self.zoho_kundennumer:
@@ -1768,51 +1486,59 @@ class VertriebTicket(TimeStampMixin):
         if not self.zoho_id:
             return ""
 
-        try:
-            data = json.loads(
-                self.user.zoho_data_text
-                or '[{"zoho_id": "default", "zoho_kundennumer": "default"}]'
-            )
-        except json.JSONDecodeError:
-            return ""
-
-        zoho_id = str(self.zoho_id)
-        return next(
-            (
-                item["zoho_kundennumer"]
-                for item in data
-                if item.get("zoho_id") == zoho_id
-            ),
-            "",
-        )
+        return self.zoho_kunde_value("zoho_kundennumer")
 
     @property
     def angebot_finder(self):
-        angebote = VertriebAngebot.objects.filter(zoho_id=self.zoho_id)
-        for an in angebote:
-            if an.angebot_id == an.angenommenes_angebot:
-                return an.angebot_id
-        return ""
+        """
+        ID des angenommenen Angebots des Kunden oder "". Sind mehrere Angebote als
+        angenommen markiert, gilt das zuletzt geänderte.
+        """
+        angebot_id = (
+            VertriebAngebot.objects.filter(
+                zoho_id=self.zoho_id, angebot_id=F("angenommenes_angebot")
+            )
+            .order_by("-updated_at")
+            .values_list("angebot_id", flat=True)
+            .first()
+        )
+        return angebot_id or ""
+
+    @property
+    def accepted_offer(self):
+        """
+        Das angenommene Angebot (nur `ACCEPTED_OFFER_FIELDS`, ohne PDFs) oder None.
+        Wird je Instanz einmal geladen und bei geändertem `angenommenes_angebot` neu geholt.
+        """
+        cached = self.__dict__.get("_accepted_offer")
+        if cached is None or cached[0] != self.angenommenes_angebot:
+            angebot = None
+            if self.angenommenes_angebot:
+                angebot = (
+                    VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot)
+                    .only(*self.ACCEPTED_OFFER_FIELDS)
+                    .first()
+                )
+            cached = (self.angenommenes_angebot, angebot)
+            self._accepted_offer = cached
+        return cached[1]
+
+    @classmethod
+    def prefetch_accepted_offers(cls, tickets):
+        """Lädt die angenommenen Angebote mehrerer Tickets mit einer Query vor (z. B. für das Repricing)."""
+        angebot_ids = {ticket.angenommenes_angebot for ticket in tickets if ticket.angenommenes_angebot}
+        angebote = VertriebAngebot.objects.filter(angebot_id__in=angebot_ids).only(
+            *cls.ACCEPTED_OFFER_FIELDS
+        ).in_bulk()
+        for ticket in tickets:
+            ticket._accepted_offer = (
+                ticket.angenommenes_angebot,
+                angebote.get(ticket.angenommenes_angebot),
+            )
 
     @property
     def get_status_pva(self):
-        try:
-            data = json.loads(
-                self.user.zoho_data_text
-                or '[{"zoho_id": "default", "zoho_kundennumer": "default"}]'
-            )
-        except json.JSONDecodeError:
-            return ""
-
-        zoho_id = str(self.zoho_id)
-        return next(
-            (
-                item["status_pva"]
-                for item in data
-                if item.get("zoho_id") == zoho_id
-            ),
-            "",
-        )
+        return self.zoho_kunde_value("status_pva")
 
     @property
     def istNachkauf(self):
@@ -1820,13 +1546,13 @@ class VertriebTicket(TimeStampMixin):
 
     @property
     def wr_tausch_text(self):
-        wrTausch = WrTauschPreise.objects.get(name=self.wr_tausch)
-        return (wrTausch.pdf_name, wrTausch.pdf_text)
+        wrTausch = self.price_catalog.wr_tausch(self.wr_tausch)
+        return (wrTausch["pdf_name"], wrTausch["pdf_text"])
 
     @property
     def bauteile_finder(self):
-        if VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-            angebot = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot)
+        angebot = self.accepted_offer
+        if angebot is not None:
             bauteileStr = ""
             if angebot.modulanzahl > 0:
                 bauteileStr += str(angebot.modulanzahl) + "x " + angebot.solar_module + "\n"
@@ -1904,260 +1630,124 @@ class VertriebTicket(TimeStampMixin):
 
     @property
     def extract_modulleistungWp_from_name(self):
-        match = re.search(r"(\d+)", str(self.solar_module))
-        if match:
-            return int(match.group(1))
-        return 420
-
-
-    def leistungsmodul_preis(self, istNachkauf):
-        if self.speicher_model == "LUNA 2000-5-S0":
-            if istNachkauf:
-                return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul").price_other)
-            else:
-                return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul").price)
-        else:
-            if istNachkauf:
-                return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul_7").price_other)
-            else:
-                return float(OptionalAccessoriesPreise.objects.get(name="leistungsmodul_7").price)
-
-    @property
-    def stromgrundpreis_gesamt(self):
-        return round(float(self.grundpreis) * 12 * int(self.zeitraum), 2)
-
-    @staticmethod
-    def priceInflation(pricePerYear, increasePerYear, years):
-        sumPrice = 0
-        priceList = []
-        for i in range(years):
-            sumPrice += pricePerYear
-            priceList.append(sumPrice)
-            pricePerYear = pricePerYear * (1.0 + increasePerYear)
-        return sumPrice, priceList
+        return extract_modulleistung_wp(self.solar_module)
 
     """
 
-    CALCULATING   SOLAR MODULE PARAMETERS  
+    PREISE (siehe vertrieb_interface.pricing)
 
     """
 
-    @staticmethod
-    def get_values():
-        return {obj.name: obj.zuschlag for obj in SolarModulePreise.objects.all()}
-
-    @staticmethod
-    def get_prices():
-        return {obj.name: obj.price for obj in OptionalAccessoriesPreise.objects.all()}
-
-    @staticmethod
-    def get_module_prices():
-        return {obj.name: obj.price for obj in SolarModulePreise.objects.all()}
-
-    def calculate_price(self, model, name, multiplier, istNachkauf=False):
-        try:
-            multiplier = int(multiplier)
-        except ValueError:
-            multiplier = 0
-        price = get_price(model, name, istNachkauf)
-        return price * multiplier
-
-
-    @property
-    def solar_module_gesamt_preis(self):
-        module_prices = self.get_module_prices()
-        module_name = (
-            self.solar_module if self.solar_module else "Phono Solar PS420M7GFH-18/VNH"
+    def pricing_input(self):
+        angebot = self.accepted_offer
+        if angebot is not None:
+            speicher_model = angebot.speicher_model
+            anz_speicher = angebot.anz_speicher
+            angebot_kWp = angebot.modulleistungWp * angebot.modulanzahl / 1000
+        else:
+            speicher_model = anz_speicher = angebot_kWp = None
+        return TicketInput(
+            solar_module=self.solar_module,
+            modulleistungWp=self.modulleistungWp,
+            modulanzahl=self.modulanzahl,
+            speicher_model=self.speicher_model,
+            anz_speicher=self.anz_speicher,
+            anz_wandhalterung_fuer_speicher=self.anz_wandhalterung_fuer_speicher,
+            smartmeter_model=self.smartmeter_model,
+            wallboxtyp=self.wallboxtyp,
+            wallbox_anzahl=self.wallbox_anzahl,
+            kabelanschluss=self.kabelanschluss,
+            kabelSmartGuard=self.kabelSmartGuard,
+            anzOptimizer=self.anzOptimizer,
+            ersatzstrom=self.ersatzstrom,
+            smartDongleLte=self.smartDongleLte,
+            midZaehler=self.midZaehler,
+            apzFeld=self.apzFeld,
+            apzFeldUVV=self.apzFeldUVV,
+            zaehlerschrank=self.zaehlerschrank,
+            zaehlerschrank_2=self.zaehlerschrank_2,
+            potentialausgleich=self.potentialausgleich,
+            beta_platte=self.beta_platte,
+            metall_ziegel=self.metall_ziegel,
+            prefa_befestigung=self.prefa_befestigung,
+            wr_tausch=self.wr_tausch,
+            elwa=self.elwa,
+            thor=self.thor,
+            heizstab=self.heizstab,
+            indiv_price_included=self.indiv_price_included,
+            indiv_price=self.indiv_price,
+            rabatt=self.rabatt,
+            sonderrabatt_included=self.sonderrabatt_included,
+            sonderrabatt=self.sonderrabatt,
+            geruestKunde=self.geruestKunde,
+            geruestOeffentlich=self.geruestOeffentlich,
+            dachhakenKunde=self.dachhakenKunde,
+            users_aufschlag=self.user.users_aufschlag,  # type: ignore
+            status_pva=self.status_pva,
+            ort=self.ort,
+            batteriespeicher_angebot_price=self.batteriespeicher_angebot_price,
+            smartmeter_angebot_price=self.smartmeter_angebot_price,
+            angebot_speicher_model=speicher_model,
+            angebot_anz_speicher=anz_speicher,
+            angebot_kWp=angebot_kWp,
         )
-        try:
-            return float(module_prices[module_name]) * int(self.modulanzahl)
-        except KeyError:
-            # handle the error, maybe return a default value or raise a more descriptive error
-            return 0.0
-
-    @property
-    def beta_platte_preis(self):
-        limits = [7, 11, 15, 19, 23, 27, 30]
-        kwp = min(30, self.modulsumme_kWp)
-        kwpUpper = min(upper for upper in limits if upper >= kwp)
-        namePlatte = "BetaPlatte" + str(kwpUpper)
-        return float(KwpPreise.objects.get(name=namePlatte).price)
 
+    # Eingaben von `pricing_input()`; die angebot_*-Werte kommen aus `accepted_offer`
+    @derived(
+        "user_id",
+        "accepted_offer",
+        *(
+            name
+            for name in TicketInput._fields
+            if name not in PRICING_UNTRACKED_INPUTS and not name.startswith("angebot_")
+        ),
+    )
+    def pricing(self):
+        return price_ticket(self.pricing_input(), self.price_catalog)
 
     @property
-    def metall_ziegel_preis(self):
-        limits = [7, 11, 15, 19, 23, 27, 30]
-        kwp = min(30, self.modulsumme_kWp)
-        kwpUpper = min(upper for upper in limits if upper >= kwp)
-        nameZiegel = "MetallZiegel" + str(kwpUpper)
-        return float(KwpPreise.objects.get(name=nameZiegel).price)
+    def stromgrundpreis_gesamt(self):
+        return round(float(self.grundpreis) * 12 * int(self.zeitraum), 2)
 
     @property
-    def prefa_befestigung_preis(self):
-        if self.istNachkauf:
-            return OptionalAccessoriesPreise.objects.get(name="prefa_befestigung").price_other * self.modulanzahl
-        else:
-            return OptionalAccessoriesPreise.objects.get(name="prefa_befestigung").price * self.modulanzahl
-
+    def solar_module_gesamt_preis(self):
+        return self.pricing.solar_module_gesamt_preis
 
     @property
     def wandhalterung_fuer_speicher_preis(self):
-        wandhalterung_preis = 0
-        wandDict = {"LUNA 2000-5-S0": "wandhalterung_fuer_speicher", "LUNA 2000-7-S1": "wandhalterung_fuer_speicher_7",
-                    "Vitocharge VX3 PV-Stromspeicher": "wandhalterung_fuer_speicher", "ATMOCE M-ELV Akku MS-7K-U": "wandhalterung_fuer_speicher_7"}
-        if self.anz_wandhalterung_fuer_speicher != 0:
-            anz_wandhalterung_fuer_speicher = int(self.anz_wandhalterung_fuer_speicher)
-            wandhalterung_preis = self.calculate_price(
-                OptionalAccessoriesPreise,
-                wandDict.get(self.speicher_model),
-                anz_wandhalterung_fuer_speicher,
-                self.istNachkauf,
-            )
-        return wandhalterung_preis
-
-    @property
-    def midZaehler_preis(self):
-        midZaehler_preis = 0
-        if self.midZaehler != 0:
-            anz_midZaehler = int(self.midZaehler)
-            midZaehler_preis = self.calculate_price(
-                OptionalAccessoriesPreise,
-                "mid_zaehler",
-                anz_midZaehler,
-                self.istNachkauf,
-            )
-            return midZaehler_preis
+        return self.pricing.wandhalterung_fuer_speicher_preis
 
     @property
     def batteriespeicher_preis(self):
-        batterieDict = {"LUNA 2000-5-S0": "batteriemodul_huawei5", "LUNA 2000-7-S1": "batteriemodul_huawei7",
-                        "Vitocharge VX3 PV-Stromspeicher": "batteriemodul_viessmann", "ATMOCE M-ELV Akku MS-7K-U": "batteriemodul_atmoce"}
-        leistModDict = {"LUNA 2000-5-S0": True, "LUNA 2000-7-S1": True, "Vitocharge VX3 PV-Stromspeicher": False, "ATMOCE M-ELV Akku MS-7K-U": False}
-        batteriePreis = 0
-        if self.anz_speicher != 0:
-            anz_speicher = int(self.anz_speicher)
-            leistungsmodulNotwendig = leistModDict.get(self.speicher_model)
-            batterieDatensatz = batterieDict.get(self.speicher_model)
-            # Kein angenommenes Angebot oder angenommenes Angebot hatte keinen Speicher
-            if batterieDatensatz is not None and (not VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot)
-                or VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot).anz_speicher == 0):
-                batteriePreis = self.calculate_price(OptionalAccessoriesPreise, batterieDatensatz, anz_speicher, self.istNachkauf)
-                if leistungsmodulNotwendig:
-                    batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * float(self.leistungsmodul_preis(self.istNachkauf))
-                # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen
-                if self.modulsumme_kWp < 25.0 and self.speicher_model == "LUNA 2000-7-S1" and anz_speicher > 6:
-                    batteriePreis += self.get_optional_accessory_price("zusatzwechselrichter")
-                return batteriePreis
-            # Angenommenes Angebot mit angebotenem Speicher
-            elif VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-                angebot = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot)
-                # gleiches Speichermodell
-                if self.speicher_model == angebot.speicher_model:
-                    batteriePreis = self.calculate_price(OptionalAccessoriesPreise, batterieDatensatz, anz_speicher, self.istNachkauf)
-                    if leistungsmodulNotwendig:
-                        abweichung = ceil((anz_speicher + angebot.anz_speicher) / 3) - ceil(angebot.anz_speicher / 3)
-                        if abweichung >= 0:
-                            batteriePreis = float(batteriePreis) + abweichung * float(self.leistungsmodul_preis(self.istNachkauf))
-                        else:
-                            batteriePreis = float(batteriePreis) + abweichung * float(angebot.leistungsmodul_preis)
-                # abweichendes Speichermodell
-                else:
-                    leistungsmodulNotwendigOrig = leistModDict.get(angebot.speicher_model)
-                    batteriePreis = self.calculate_price(OptionalAccessoriesPreise, batterieDatensatz, anz_speicher, self.istNachkauf)
-                    batteriePreis -= self.calculate_price(OptionalAccessoriesPreise, batterieDict.get(angebot.speicher_model), angebot.anz_speicher, False)
-                    if leistungsmodulNotwendig:
-                        batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * float(self.leistungsmodul_preis(self.istNachkauf))
-                    if leistungsmodulNotwendigOrig:
-                        batteriePreis = float(batteriePreis) - ceil(angebot.anz_speicher / 3) * float(angebot.leistungsmodul_preis)
-                # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen, falls Limit jetzt erst überschritten
-                if self.modulsumme_kWp < 25.0 and self.speicher_model == "LUNA 2000-7-S1" and angebot.anz_speicher <= 6 and (anz_speicher + angebot.anz_speicher) > 6:
-                    batteriePreis += self.get_optional_accessory_price("zusatzwechselrichter")
-        return batteriePreis
+        return self.pricing.batteriespeicher_preis
 
     @property
     def smartmeter_preis(self):
-        smartmeterPreis = 0
-        if self.smartmeter_model == "Smart Power Sensor DTSU666H":
-            smartmeterPreis = self.calculate_price(
-                    OptionalAccessoriesPreise, "smartmeter_dtsu", 1, self.istNachkauf,
-                )
-        elif self.smartmeter_model == "EMMA-A02":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_emma", 1, self.istNachkauf,
-            )
-        elif self.smartmeter_model == "Viessmann Energiezähler":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_viessmann", 1, self.istNachkauf,
-            )
-        elif self.smartmeter_model == "ATMOCE Gateway MG100":
-            smartmeterPreis = self.calculate_price(
-                OptionalAccessoriesPreise, "smartmeter_atmoce", 1, self.istNachkauf,
-            )
-        return smartmeterPreis
-
+        return self.pricing.smartmeter_preis
 
     @property
     def PLZ_Aufpreis(self):
-        aufpreis = 0
-        if self.ort != None and self.ort != "":
-            plz = self.ort[0:5]
-            plzObj = PLZAufpreisNachkauf.objects.filter(text__icontains=plz)
-            if any(plzObj):
-                aufpreis = float(plzObj[0].value)
-            else:
-                aufpreis = float(PLZAufpreisNachkauf.objects.get(name="ab 500 km").value)
-        return aufpreis
-
+        return self.pricing.plz_aufpreis
 
     @property
     def gesamtkapazitat(self):
-        kapazitatDict = {"LUNA 2000-5-S0": 5, "LUNA 2000-7-S1": 6.9, "Vitocharge VX3 PV-Stromspeicher": 5, "ATMOCE M-ELV Akku MS-7K-U": 7}
-        if kapazitatDict.get(self.speicher_model):
-            if VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-                angebot = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot)
-                if angebot.speicher_model == self.speicher_model:
-                    return round((self.anz_speicher + angebot.anz_speicher) * kapazitatDict.get(self.speicher_model), 2)
-            return round(self.anz_speicher * kapazitatDict.get(self.speicher_model), 2)
-        return 0
+        return self.pricing.gesamtkapazitat
 
     @property
     def modulsumme_kWp(self):
-        return round(self.existing_kWp + self.ticket_kwp,2)
+        return self.pricing.modulsumme_kWp
 
     @property
     def existing_kWp(self):
-        existing = 0
-        if self.angenommenes_angebot != "" and VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-            existing = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot).modulsumme_kWp
-        return round(existing, 2)
+        return self.pricing.existing_kWp
 
     @property
     def ticket_kwp(self):
-        return round(self.modulleistungWp * self.modulanzahl / 1000, 2)
+        return self.pricing.ticket_kwp
 
     @property
     def anz_leistungs_module(self):
-        if self.angenommenes_angebot != "" and VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-            angebot = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot)
-            return ceil((self.anz_speicher + angebot.anz_speicher)/ 3) - ceil(angebot.anz_speicher / 3)
-        else:
-            return ceil(self.anz_speicher / 3)
-
-    @property
-    def get_zuschlag(self):
-        # Fetch all the values
-        values = self.get_values()
-
-        # Check if 'self.solar_module' is not None, else assign the default module name
-        module_name = (self.solar_module if self.solar_module else ("Phono Solar PS420M7GFH-18/VNH"))
-        # Return value based on module_name
-        return float(values.get(module_name))
-
-    """
-
-    CALCULATING   WALLBOX  
-
-    """
+        return self.pricing.anz_leistungs_module
 
     @property
     def wallbox_anzahl_pdf(self):
@@ -2171,230 +1761,111 @@ class VertriebTicket(TimeStampMixin):
             else "\n1" if "Power Boost" in str(self.wallboxtyp) else "\n1"
         )
 
-    @property
-    def wallbox_kabel_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="kabelpreis").price)
-
-    @property
-    def smartguard_kabel_preis(self):
-        if self.kabelSmartGuard and self.kabelSmartGuard >= 0:
-            return self.kabelSmartGuard * self.get_optional_accessory_price("kabelpreis_smartguard")
-        return 0
-
-    @property
-    def optimizer_preis(self):
-        return float(OptionalAccessoriesPreise.objects.get(name="optimizer").price)
-
-    @property
-    def optimizer_full_preis(self):
-        return self.anzOptimizer * self.optimizer_preis
-
-    """
-
-    CALCULATING   ANGEBOT SUMME  
-
-    """
-
     @property
     def full_optimizer_preis(self):
-        return self.anzOptimizer * self.get_optional_accessory_price("optimizer")
+        return self.pricing.full_optimizer_preis
 
     @property
     def full_wallbox_preis(self):
-        preis = 0.0
-        if self.wallbox_anzahl:
-            if self.istNachkauf:
-                preis += float(WallBoxPreise.objects.get(name=str(self.wallboxtyp)).price_other)
-            else:
-                preis += float(WallBoxPreise.objects.get(name=str(self.wallboxtyp)).price)
-            preis *= self.wallbox_anzahl
-        if self.kabelanschluss and self.kabelanschluss >= 0:
-            preis += float(self.calculate_price(OptionalAccessoriesPreise,"kabelpreis", self.kabelanschluss, self.istNachkauf))
-        return preis
-
-    @property
-    def wr_tausch_preis(self):
-        if any(WrTauschPreise.objects.filter(name=self.wr_tausch)):
-            return float(WrTauschPreise.objects.get(name=self.wr_tausch).price)
-        else:
-            return 0
+        return self.pricing.full_wallbox_preis
 
     @property
     def full_accessories_price(self):
-        accessories_price = 0
-        if self.full_optimizer_preis:
-            accessories_price += float(self.full_optimizer_preis)
-        if self.full_wallbox_preis:
-            accessories_price += float(self.full_wallbox_preis)
-        if self.batteriespeicher_angebot_price:
-            accessories_price += float(self.batteriespeicher_angebot_price)
-        if self.smartmeter_angebot_price:
-            accessories_price += float(self.smartmeter_angebot_price)
-        if self.ersatzstrom:
-            accessories_price += float(self.get_optional_accessory_price("ersatzstrom"))
-        if self.kabelSmartGuard:
-            accessories_price += float(self.smartguard_kabel_preis)
-        if self.smartDongleLte:
-            accessories_price += float(self.get_optional_accessory_price("smartDongleLte"))
-        if self.midZaehler > 0:
-            accessories_price += float(self.midZaehler_preis)
-        if self.apzFeld:
-            accessories_price += float(self.get_optional_accessory_price("apzFeld"))
-        if self.apzFeldUVV:
-            accessories_price += float(self.get_optional_accessory_price("apzFeldUVV"))
-        if self.zaehlerschrank:
-            accessories_price += float(self.get_optional_accessory_price("zaehlerschrank"))
-        if self.zaehlerschrank_2:
-            accessories_price += float(self.get_optional_accessory_price("zaehlerschrank_2"))
-        if self.potentialausgleich:
-            accessories_price += float(self.get_optional_accessory_price("potentialausgleich"))
-        if self.beta_platte:
-            accessories_price += float(self.beta_platte_preis)
-        if self.metall_ziegel:
-            accessories_price += float(self.metall_ziegel_preis)
-        if self.prefa_befestigung:
-            accessories_price += float(self.prefa_befestigung_preis)
-        if self.wandhalterung_fuer_speicher_preis:
-            accessories_price += float(self.wandhalterung_fuer_speicher_preis)
-        if(self.wr_tausch):
-            accessories_price += float(self.wr_tausch_preis)
-        if self.elwa:
-            accessories_price += float(self.get_optional_accessory_price("elwa_2"))
-        if self.thor:
-            accessories_price += float(self.get_optional_accessory_price("ac_thor_3_kw"))
-        if self.heizstab:
-            accessories_price += float(self.get_optional_accessory_price("heizstab"))
-        return accessories_price
+        return self.pricing.full_accessories_price
 
     @property
     def angebots_summe(self):
-        angebotsSumme = float(SolarModulePreise.objects.get(name=self.solar_module).price * self.modulanzahl)
-        self.solar_module_angebot_price = angebotsSumme
-        angebotsSumme += float(self.full_accessories_price)
-
-        if self.indiv_price_included:
-            rabatt = angebotsSumme - self.indiv_price
-            angebotsSumme = self.indiv_price
-
-        else:
-            rabatt = angebotsSumme * (self.rabatt/100)
-            angebotsSumme *= (1-(self.rabatt/100))
-
-            # Sonderrabatte
-            if self.sonderrabatt_included and Sonderrabatt.objects.all().exists():
-                angebotsSumme *= (1-(float(Sonderrabatt.objects.get(name=self.sonderrabatt).prozentsatz)/100))
-                angebotsSumme -= float(Sonderrabatt.objects.get(name=self.sonderrabatt).fixbetrag)
-
-        userAufschlag = float(self.user.users_aufschlag) / 100 + 1  # type: ignore
-        angebotsSumme *= userAufschlag
-        # Abzug Selbstleistungen nach Rabattierung
-        if self.geruestKunde:
-            angebotsSumme -= float(self.get_optional_accessory_price("geruestKunde"))
-            rabatt += float(self.get_optional_accessory_price("geruestKunde"))
-        elif self.geruestOeffentlich:
-            angebotsSumme += float(self.get_optional_accessory_price("geruestOeffentlich"))
-        if self.dachhakenKunde:
-            angebotsSumme -= float(self.get_optional_accessory_price("dachhakenKunde"))
-            rabatt += float(self.get_optional_accessory_price("dachhakenKunde"))
-
-        # Aufpreis PLZ als allerletztes
-        if self.istNachkauf:
-            angebotsSumme += self.PLZ_Aufpreis
-
-        return angebotsSumme, rabatt
-
+        return self.pricing.angebots_summe, self.pricing.rabatt
 
     @property
     def kosten_pva(self):
-        return float(self.angebots_summe[0]) * float(
-            1 + AndereKonfigurationWerte.objects.get(name="steuersatz").value
-        )
+        return self.pricing.kosten_pva
 
     @property
     def data(self):
-        batterieModellOrig = batterieAnzOrig = leistModAnzOrig = None
-        if VertriebAngebot.objects.filter(angebot_id=self.angenommenes_angebot):
-            angebot = VertriebAngebot.objects.get(angebot_id=self.angenommenes_angebot)
-            batterieModellOrig = angebot.speicher_model
-            batterieAnzOrig = angebot.anz_speicher
-            leistModAnzOrig = ceil(angebot.anz_speicher / 3)
-        dt = {
-            "firma": self.firma,
-            "anrede": self.anrede,
-            "kunde": self.name_display_value,
-            "adresse": self.full_adresse,
-            "vertriebler": str(self.get_vertribler),
-            "vertriebAbk": self.vertrieb_abk,
-            "gueltig": self.angebot_gultig,
-            "module": self.solar_module,
-            "wpModule": self.modulleistungWp,
-            "anzModule": self.modulanzahl,
-            "produktGarantie": self.get_module_garantie(self.solar_module),
-            "leistungsGarantie": self.get_leistungs_garantie(self.solar_module),
-            "kWp": round(self.modulsumme_kWp,2),
-            "kWpOhneRundung": self.modulsumme_kWp,
-            "existing_kWp":self.existing_kWp,
-            "ticket_kWp":self.ticket_kwp,
-            "postanschrift": self.post_anschrift,
-            "batterieVorh": self.batteriespeicher_preis,
-            "batterieModell": self.speicher_model,
-            "batterieModellOrig": batterieModellOrig,
-            "batterieAnz": self.anz_speicher,
-            "batterieAnzOrig": batterieAnzOrig,
-            "leistModAnz": self.anz_leistungs_module,
-            "leistModAnzOrig": leistModAnzOrig,
-            "smartmeterModell": self.smartmeter_model,
-            "wandhalterungSpeicher": self.wandhalterung_fuer_speicher,
-            "anzWandhalterungSpeicher": self.anz_wandhalterung_fuer_speicher,
-            "wandhalterungSpeicherPreis": self.wandhalterung_fuer_speicher_preis,
-            "wallboxVorh": self.full_wallbox_preis,
-            "wallboxTyp": self.wallboxtyp,
-            "wallboxText": self.get_wallbox_text(self.wallboxtyp),
-            "wallboxAnz": self.wallbox_anzahl,
-            "optionVorh": self.ersatzstrom,
-            "kabelanschluss": self.kabelanschluss,
-            "kabelSmartGuard": self.kabelSmartGuard,
-            "wr_tausch": self.wr_tausch,
-            "wr_tausch_text": self.wr_tausch_text,
-            "elwa": self.elwa,
-            "thor": self.thor,
-            "midZaehler": self.midZaehler,
-            "apzFeld": self.apzFeld,
-            "apzFeldUVV": self.apzFeldUVV,
-            "zaehlerschrank": self.zaehlerschrank,
-            "zaehlerschrank_2": self.zaehlerschrank_2,
-            "potentialausgleich": self.potentialausgleich,
-            "geruestKunde": self.geruestKunde,
-            "geruestOeffentlich": self.geruestOeffentlich,
-            "dachhakenKunde": self.dachhakenKunde,
-            "betaPlatte": self.beta_platte,
-            "metallZiegel": self.metall_ziegel,
-            "prefaBefestigung": self.prefa_befestigung,
-            "heizstab": self.heizstab,
-            "smartDongleLte": self.smartDongleLte,
-            "optimierer": self.optimizer,
-            "anzOptimierer": self.anzOptimizer,
-            "ersatzstrom": self.ersatzstrom,
-            "solarModulePreis": self.solar_module_gesamt_preis,
-            "wallboxPreis": self.full_wallbox_preis,
-            "batterieSpeicherPreis": self.batteriespeicher_preis,
-            "gesamtOptimizerPreis": self.full_optimizer_preis,
-            "rabatt": self.rabatt,
-            "rabattsumme": self.rabattsumme,
-            "ausweisung_rabatt": self.ausweisung_rabatt or (self.indiv_price_included and self.rabattsumme > 0),
-            "wp_kombi_rabatt": self.wp_kombi_rabatt,
-            "indiv_included:": self.indiv_price_included,
-            "indiv_text": self.indiv_text,
-            "angebotssumme": self.angebotsumme,
-            "steuersatz": float(
-                AndereKonfigurationWerte.objects.get(name="steuersatz").value
-            ),
-            "kostenPVA": self.kosten_pva,
-            "istNachkauf": self.istNachkauf,
-            "debug": False,
-            "version": 1.0,
-        }
-        return dt
+        with DerivedFieldContext(self):
+            batterieModellOrig = batterieAnzOrig = leistModAnzOrig = None
+            if self.accepted_offer is not None:
+                batterieModellOrig = self.accepted_offer.speicher_model
+                batterieAnzOrig = self.accepted_offer.anz_speicher
+                leistModAnzOrig = ceil(batterieAnzOrig / 3)
+            dt = {
+                "firma": self.firma,
+                "anrede": self.anrede,
+                "kunde": self.name_display_value,
+                "adresse": self.full_adresse,
+                "vertriebler": str(self.get_vertribler),
+                "vertriebAbk": self.vertrieb_abk,
+                "gueltig": self.angebot_gultig,
+                "module": self.solar_module,
+                "wpModule": self.modulleistungWp,
+                "anzModule": self.modulanzahl,
+                "produktGarantie": self.get_module_garantie(self.solar_module),
+                "leistungsGarantie": self.get_leistungs_garantie(self.solar_module),
+                "kWp": round(self.modulsumme_kWp,2),
+                "kWpOhneRundung": self.modulsumme_kWp,
+                "existing_kWp":self.existing_kWp,
+                "ticket_kWp":self.ticket_kwp,
+                "postanschrift": self.post_anschrift,
+                "batterieVorh": self.batteriespeicher_preis,
+                "batterieModell": self.speicher_model,
+                "batterieModellOrig": batterieModellOrig,
+                "batterieAnz": self.anz_speicher,
+                "batterieAnzOrig": batterieAnzOrig,
+                "leistModAnz": self.anz_leistungs_module,
+                "leistModAnzOrig": leistModAnzOrig,
+                "smartmeterModell": self.smartmeter_model,
+                "wandhalterungSpeicher": self.wandhalterung_fuer_speicher,
+                "anzWandhalterungSpeicher": self.anz_wandhalterung_fuer_speicher,
+                "wandhalterungSpeicherPreis": self.wandhalterung_fuer_speicher_preis,
+                "wallboxVorh": self.full_wallbox_preis,
+                "wallboxTyp": self.wallboxtyp,
+                "wallboxText": self.get_wallbox_text(self.wallboxtyp),
+                "wallboxAnz": self.wallbox_anzahl,
+                "optionVorh": self.ersatzstrom,
+                "kabelanschluss": self.kabelanschluss,
+                "kabelSmartGuard": self.kabelSmartGuard,
+                "wr_tausch": self.wr_tausch,
+                "wr_tausch_text": self.wr_tausch_text,
+                "elwa": self.elwa,
+                "thor": self.thor,
+                "midZaehler": self.midZaehler,
+                "apzFeld": self.apzFeld,
+                "apzFeldUVV": self.apzFeldUVV,
+                "zaehlerschrank": self.zaehlerschrank,
+                "zaehlerschrank_2": self.zaehlerschrank_2,
+                "potentialausgleich": self.potentialausgleich,
+                "geruestKunde": self.geruestKunde,
+                "geruestOeffentlich": self.geruestOeffentlich,
+                "dachhakenKunde": self.dachhakenKunde,
+                "betaPlatte": self.beta_platte,
+                "metallZiegel": self.metall_ziegel,
+                "prefaBefestigung": self.prefa_befestigung,
+                "heizstab": self.heizstab,
+                "smartDongleLte": self.smartDongleLte,
+                "optimierer": self.optimizer,
+                "anzOptimierer": self.anzOptimizer,
+                "ersatzstrom": self.ersatzstrom,
+                "solarModulePreis": self.solar_module_gesamt_preis,
+                "wallboxPreis": self.full_wallbox_preis,
+                "batterieSpeicherPreis": self.batteriespeicher_preis,
+                "gesamtOptimizerPreis": self.full_optimizer_preis,
+                "rabatt": self.rabatt,
+                "rabattsumme": self.rabattsumme,
+                "ausweisung_rabatt": self.ausweisung_rabatt or (self.indiv_price_included and self.rabattsumme > 0),
+                "wp_kombi_rabatt": self.wp_kombi_rabatt,
+                "indiv_included:": self.indiv_price_included,
+                "indiv_text": self.indiv_text,
+                "angebotssumme": self.angebotsumme,
+                "steuersatz": float(
+                    self.price_catalog.andere_value("steuersatz")
+                ),
+                "kostenPVA": self.kosten_pva,
+                "istNachkauf": self.istNachkauf,
+                "debug": False,
+                "version": 1.0,
+            }
+            return dt
 
 
 
@@ -2439,3 +1910,182 @@ class Dokument_PDF(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class ZohoKunde(TimeStampMixin):
+    """
+    Privatkunde aus Zoho (Report Privatkunden_API) in der Kundenliste eines Vertrieblers.
+    Wird vom Zoho-Sync gepflegt (`vertrieb_interface.zoho_sync`); `data` enthält den
+    vollständigen Datensatz aus `process_all_user_data` für die Autovervollständigung.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="zoho_kunden")
+    zoho_id = models.CharField(max_length=30)
+    vertriebler_id = models.CharField(max_length=30, blank=True, default="")
+    name = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=100, blank=True, default="")
+    status_pva = models.CharField(max_length=100, blank=True, default="")
+    zoho_kundennumer = models.CharField(max_length=100, blank=True, default="")
+    angenommenes_angebot = models.CharField(max_length=255, blank=True, default="")
+    anfrage_vom = models.DateField(null=True, blank=True)
+    data = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "zoho_id"], name="unique_zoho_kunde_per_user"
+            )
+        ]
+        indexes = [models.Index(fields=["vertriebler_id"])]
+
+    def __str__(self):
+        return f"{self.name} ({self.zoho_id})"
+
+
+class ZohoOutbox(TimeStampMixin):
+    """
+    Ausstehender Schreibzugriff auf Zoho, in derselben Transaktion wie die lokale
+    Änderung angelegt und von `tasks.drain_zoho_outbox` abgearbeitet
+    (siehe `vertrieb_interface.zoho_outbox`).
+
+    Einträge mit demselben `record_key` (ein Zoho-Datensatz bzw. ein Angebot) werden
+    streng der Reihe nach gesendet; `idempotency_key` verhindert doppelte offene Einträge.
+    Während des Sendens steht ein Eintrag auf `sending`, bis `locked_until`; danach darf
+    ihn ein anderer Worker wieder übernehmen.
+    """
+
+    PENDING = "pending"
+    SENDING = "sending"
+    DONE = "done"
+    SUPERSEDED = "superseded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Ausstehend"),
+        (SENDING, "Wird gesendet"),
+        (DONE, "Gesendet"),
+        (SUPERSEDED, "Überholt"),
+        (FAILED, "Fehlgeschlagen"),
+    ]
+    # noch nicht erledigt: blockieren jüngere Einträge desselben Datensatzes
+    OPEN = (PENDING, SENDING)
+
+    PUSH_ANGEBOT = "push_angebot"
+    PUSH_TICKET = "push_ticket"
+    UPDATE_KUNDE = "update_kunde"
+    OPERATION_CHOICES = [
+        (PUSH_ANGEBOT, "Angebot senden"),
+        (PUSH_TICKET, "Nachverkauf senden"),
+        (UPDATE_KUNDE, "Kundendaten aktualisieren"),
+    ]
+
+    operation = models.CharField(max_length=30, choices=OPERATION_CHOICES)
+    record_key = models.CharField(max_length=100)
+    idempotency_key = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    # lokales Objekt, das die Zoho-ID des neuen Datensatzes erhält (angebot_id/ticket_id)
+    source_id = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    zoho_record_id = models.CharField(max_length=255, blank=True, default="")
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Ende der Übernahme durch einen Worker (Status `sending`)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    # vor dem ersten Senden eines POST gesetzt und committet: ab dann erst in Zoho nachsehen
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(status__in=["pending", "sending"]),
+                name="unique_open_zoho_outbox_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["record_key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_operation_display()} {self.record_key} ({self.status})"
+
+
+class PdfJob(TimeStampMixin):
+    """
+    Auftrag zum Erstellen eines Angebots-, Kalkulations- oder Nachverkaufs-PDFs.
+
+    Angelegt von den `create_*_pdf`-Views und im Hintergrund von `tasks.render_pdf`
+    (eigene Celery-Queue "pdf") abgearbeitet, siehe `vertrieb_interface.pdf_jobs`.
+    `created_at`, `started_at` und `finished_at` ergeben Warte- und Renderzeit.
+    """
+
+    QUEUED = "queued"
+    RENDERING = "rendering"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Eingereiht"),
+        (RENDERING, "Wird erstellt"),
+        (DONE, "Fertig"),
+        (FAILED, "Fehlgeschlagen"),
+    ]
+
+    ANGEBOT = "angebot"
+    ANGEBOT_UND_KALKULATION = "angebot_calc"
+    KALKULATION = "calc"
+    TICKET = "ticket"
+    KIND_CHOICES = [
+        (ANGEBOT, "Angebot"),
+        (ANGEBOT_UND_KALKULATION, "Angebot mit Kalkulation"),
+        (KALKULATION, "Kalkulation"),
+        (TICKET, "Nachverkauf"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # angebot_id bzw. ticket_id
+    object_id = models.CharField(max_length=255)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="pdf_jobs")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["object_id", "kind", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} ({self.status})"
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    @property
+    def wait_ms(self):
+        """Zeit in der Queue bis zum Start des Renderns."""
+        if self.started_at is None:
+            return None
+        return round((self.started_at - self.created_at).total_seconds() * 1000)
+
+    @property
+    def render_ms(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round((self.finished_at - self.started_at).total_seconds() * 1000)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def reprice_after_price_change(sender, **kwargs):
+    # Preisänderungen (Admin, adminfeautures) erst nach dem Commit an die offenen
+    # Angebote/Tickets weitergeben, wenn der neue Katalogstand sichtbar ist;
+    # nicht beim Laden von Fixtures, in Tests oder beim Anlegen von Testdaten
+    if sender in PRICE_CATALOG_MODELS and not kwargs.get("raw"):
+        from vertrieb_interface.repricing import repricing_enabled, schedule_repricing
+
+        if repricing_enabled():
+            transaction.on_commit(schedule_repricing)
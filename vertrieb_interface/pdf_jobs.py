@@ -0,0 +1,166 @@
+"""
+PDF-Erstellung im Hintergrund.
+
+Die `create_*_pdf`-Views legen nur einen `PdfJob` an und leiten auf die Dokumentansicht
+weiter; `tasks.render_pdf` (Celery-Queue "pdf", siehe `CELERY_TASK_ROUTES`) baut das
+Dokument und schreibt es per UPDATE nur in die PDF-Spalte – ohne `save()`, also ohne
+Neuberechnung der Preise. Die Dokumentansicht fragt `pdf_job_status` ab, bis der Job
+fertig ist, und lädt dann das PDF.
+
+Ein noch nicht gestarteter Job für dasselbe Dokument wird wiederverwendet, ein
+laufender nicht (er rendert womöglich einen älteren Stand). Auch ein wiederverwendeter
+Job wird erneut eingereiht, falls die erste Nachricht verloren ging; `render_job`
+übernimmt ihn nur einmal. Ein Job, der länger als `PDF_JOB_TIMEOUT` rendert (Worker
+abgestürzt), gilt als fehlgeschlagen. Ist kein Broker erreichbar, wird das PDF direkt
+im Request erstellt.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from config.settings import PDF_JOB_TIMEOUT
+from vertrieb_interface.models import PdfJob, VertriebAngebot, VertriebTicket
+from vertrieb_interface.pdf_services import (
+    angebot_pdf_creator_user,
+    calc_pdf_creator,
+    ticket_pdf_creator_user,
+)
+
+logger = logging.getLogger(__name__)
+
+# Art -> (Modell, ID-Feld, PDF-Feld, View zum Ausliefern des PDFs)
+DOCUMENTS = {
+    PdfJob.ANGEBOT: (VertriebAngebot, "angebot_id", "angebot_pdf", "serve_pdf"),
+    PdfJob.ANGEBOT_UND_KALKULATION: (
+        VertriebAngebot,
+        "angebot_id",
+        "angebot_pdf",
+        "serve_pdf",
+    ),
+    PdfJob.KALKULATION: (VertriebAngebot, "angebot_id", "calc_pdf", "serve_calc_pdf"),
+    PdfJob.TICKET: (VertriebTicket, "ticket_id", "ticket_pdf", "serve_ticket_new_pdf"),
+}
+
+
+def pdf_url(job):
+    view_name = DOCUMENTS[job.kind][3]
+    return reverse(f"vertrieb_interface:{view_name}", args=[job.object_id])
+
+
+def enqueue_pdf_job(kind, object_id, user):
+    """Legt einen Job an (oder liefert den noch wartenden) und reiht ihn nach dem Commit (erneut) ein."""
+    with transaction.atomic():
+        job = (
+            PdfJob.objects.select_for_update()
+            .filter(kind=kind, object_id=object_id, user=user, status=PdfJob.QUEUED)
+            .first()
+        )
+        if job is None:
+            job = PdfJob.objects.create(kind=kind, object_id=object_id, user=user)
+        transaction.on_commit(lambda: schedule_render(job.id))
+    return job
+
+
+def schedule_render(job_id):
+    from vertrieb_interface.tasks import render_pdf
+
+    try:
+        render_pdf.delay(job_id)
+    except Exception as e:
+        logger.warning(f"PDF-Job {job_id} nicht eingereiht ({e}), wird direkt erstellt")
+        render_job(job_id)
+
+
+def fail_stale_jobs(jobs):
+    """Markiert die Jobs aus `jobs`, die länger als `PDF_JOB_TIMEOUT` rendern, als fehlgeschlagen."""
+    now = timezone.now()
+    return jobs.filter(
+        status=PdfJob.RENDERING,
+        started_at__lt=now - timedelta(seconds=PDF_JOB_TIMEOUT),
+    ).update(
+        status=PdfJob.FAILED,
+        error="Zeitüberschreitung, bitte PDF erneut erstellen",
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def latest_job(kinds, object_id, user):
+    """Jüngster Job des Benutzers für dieses Dokument (für die Dokumentansicht), sonst None."""
+    jobs = PdfJob.objects.filter(kind__in=kinds, object_id=object_id, user=user)
+    fail_stale_jobs(jobs)
+    return jobs.order_by("-id").first()
+
+
+def render_document(job):
+    """Baut das PDF des Jobs; liefert die Bytes."""
+    user = job.user
+    if job.kind == PdfJob.TICKET:
+        vertrieb_ticket = VertriebTicket.objects.get(ticket_id=job.object_id)
+        return ticket_pdf_creator_user.createOfferPdf(
+            vertrieb_ticket.data, vertrieb_ticket, user.user_certifikate, user
+        )
+    vertrieb_angebot = VertriebAngebot.objects.get(angebot_id=job.object_id)
+    if job.kind == PdfJob.KALKULATION:
+        return calc_pdf_creator.createCalcPdf(vertrieb_angebot.data, vertrieb_angebot, user)
+    return angebot_pdf_creator_user.createOfferPdf(
+        vertrieb_angebot.data,
+        vertrieb_angebot,
+        user.user_certifikate,
+        user,
+        job.kind == PdfJob.ANGEBOT_UND_KALKULATION,
+    )
+
+
+def render_job(job_id):
+    """
+    Erstellt das PDF eines wartenden Jobs; liefert den neuen Status oder None, wenn
+    ein anderer Worker den Job schon übernommen hat.
+    """
+    claimed = PdfJob.objects.filter(pk=job_id, status=PdfJob.QUEUED).update(
+        status=PdfJob.RENDERING, started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job = PdfJob.objects.select_related("user").get(pk=job_id)
+    model, id_field, pdf_field, _ = DOCUMENTS[job.kind]
+    try:
+        content = render_document(job)
+        # nur die PDF-Spalte (und updated_at für die Aufräum-Tasks), kein save()
+        updated = model.objects.filter(**{id_field: job.object_id}).update(
+            **{pdf_field: content, "updated_at": timezone.now()}
+        )
+        if not updated:
+            raise model.DoesNotExist(f"{job.object_id} existiert nicht mehr")
+        job.status = PdfJob.DONE
+        job.error = ""
+    except Exception as e:
+        logger.exception(f"PDF-Job {job} fehlgeschlagen")
+        job.status = PdfJob.FAILED
+        job.error = str(e) or e.__class__.__name__
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+    logger.info(
+        f"PDF-Job {job}: {job.wait_ms} ms in der Queue, {job.render_ms} ms gerendert"
+    )
+    return job.status
+
+
+def job_status(job):
+    """Antwort des Status-Endpunkts."""
+    if fail_stale_jobs(PdfJob.objects.filter(pk=job.pk)):
+        job.refresh_from_db()
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "finished": job.finished,
+        "error": job.error,
+        "wait_ms": job.wait_ms,
+        "render_ms": job.render_ms,
+        "pdf_url": pdf_url(job) if job.status == PdfJob.DONE else None,
+    }
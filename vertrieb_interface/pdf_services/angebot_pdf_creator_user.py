@@ -1,10 +1,12 @@
 from datetime import datetime, date
 from math import ceil
 from fpdf import FPDF
+from shared.pdf_assets import AssetCacheMixin
 from config import settings
 from vertrieb_interface.pdf_services.helper_functions import convertCurrency
 from vertrieb_interface.pdf_services.calc_pdf_creator import calcPage1, calcPage2
-from vertrieb_interface.models import Editierbarer_Text
+from vertrieb_interface.pdf_services.text_layout import get_text_layout
+from vertrieb_interface.pdf_services.static_sections import StaticSectionMixin, static_section
 from prices.models import (
     AndereKonfigurationWerte,
     WrGarantiePreise,
@@ -16,22 +18,24 @@ from prices.models import (
 )
 import os
 
-title = ""
-pages = 6
-
-class PDF(FPDF):
+class PDF(StaticSectionMixin, AssetCacheMixin, FPDF):
     """
     Diese Klasse erzeugt ein PDF-Dokument mit spezifischem Layout und Inhalt.
     """
 
-    def __init__(self, title1, *args, **kwargs):
+    def __init__(self, title1, total_pages, *args, **kwargs):
         """
         Initialisiert das PDF-Objekt mit spezifischen Margen und Linienbreiten.
+        Titel und Seitenzahl für die Kopfzeile gehören zum Dokument, nicht zum Modul,
+        damit mehrere PDFs parallel im selben Prozess erstellt werden können.
         """
         super(PDF, self).__init__(*args, **kwargs)
         self.is_last_page = False
         self.skip_logo = False
         self.title1 = title1
+        self.total_pages = total_pages
+        # alle editierbaren Texte auf einmal, statt einer Abfrage pro Attribut
+        self.text_layout = get_text_layout()
         self.set_left_margin(18.875)
         self.set_right_margin(12.875)
         self.set_line_width(0.5)
@@ -41,18 +45,7 @@ class PDF(FPDF):
         """
         Ruft ein Attribut eines editierbaren Textes ab, wobei Standardwerte zurückgegeben werden, falls nicht vorhanden.
         """
-        try:
-            text_instance = Editierbarer_Text.objects.get(identifier=identifier)
-            return getattr(text_instance, attribute)
-        except Editierbarer_Text.DoesNotExist:
-            defaults = {
-                "content": "Kein Text gefunden",
-                "font": "JUNO Solar Lt",
-                "font_size": 11,
-                "x": 0,
-                "y": 0,
-            }
-            return defaults.get(attribute, None)
+        return self.text_layout.get(identifier, attribute)
 
     def fetch_x(self, identifier):
         x = self.get_attribute_by_identifier(identifier, "x")
@@ -228,7 +221,7 @@ class PDF(FPDF):
         self.set_y(0)
         self.set_font("JUNO Solar Lt", "", 8)
         self.set_text_color(0)
-        header_text = f"Seite {self.page_no()}/{pages}       {self.title1}"
+        header_text = f"Seite {self.page_no()}/{self.total_pages}       {self.title1}"
         self.cell(0, 10, header_text, 0, 0, "")
 
         if not self.skip_logo:
@@ -236,7 +229,7 @@ class PDF(FPDF):
             self.set_font("JUNO Solar Lt", "", 12)
             self.set_x(40)
             if self.page_no() != 1:
-                self.cell(0, 10, title, 0, 0, "")
+                self.cell(0, 10, self.title, 0, 0, "")
 
             logo_path = os.path.join(settings.STATIC_ROOT, "fonts/junosolar_logo.jpg")
             self.image(logo_path, x=167, y=10, w=30, h=15)
@@ -1323,7 +1316,6 @@ def anzahlZubehoer(data):
     return anzahlZubehoer
 
 def createOfferPdf(data, vertrieb_angebot, certifikate, user, withCalc=False):
-    global title, pages
     title1 = f"{vertrieb_angebot.angebot_id}"
     pages = 6
     if certifikate:
@@ -1347,8 +1339,8 @@ def createOfferPdf(data, vertrieb_angebot, certifikate, user, withCalc=False):
     if anzZubehoer > 11:
         pages += 1
 
-    pdf = PDF(title1)
-    pdf.set_title(title)
+    pdf = PDF(title1, pages)
+    pdf.set_title("")
     pdf.set_author("JUNO Solar Home GmbH")
     pdf.set_creator(f"{user.first_name} {user.last_name})")
     # create the offer-PDF
@@ -1831,6 +1823,10 @@ def certPage(pdf, certifikate):
     return pdf
 
 def agbPage(pdf):
+    # die AGB ändern sich nur mit den editierbaren Texten: einmal setzen, danach übernehmen
+    return static_section(pdf, "agb", pdf.text_layout.version, agbLayout)
+
+def agbLayout(pdf):
     pdf.skip_logo = True
     pdf.add_page()
     pdf.is_last_page = True
@@ -1,19 +1,18 @@
 import os
 import platform
 import traceback
+import uuid
 import matplotlib.pyplot as plt
 from config import settings
 from matplotlib.figure import Figure
 from datetime import date
 from vertrieb_interface.pdf_services.helper_functions import printFloat
 from fpdf import FPDF
+from shared.pdf_assets import AssetCacheMixin
 
-title = ""
-pages = 2
 
-
-class PDF(FPDF):
-    def __init__(self, title1, *args, **kwargs):
+class PDF(AssetCacheMixin, FPDF):
+    def __init__(self, title1, total_pages, *args, **kwargs):
         """
         Initialisiert das PDF-Objekt mit spezifischen Margen und Linienbreiten.
         """
@@ -21,6 +20,7 @@ class PDF(FPDF):
         self.is_last_page = False
         self.skip_logo = False
         self.title1 = title1
+        self.total_pages = total_pages
         self.set_left_margin(18.875)
         self.set_right_margin(12.875)
         self.set_line_width(0.5)
@@ -47,7 +47,7 @@ class PDF(FPDF):
         self.set_y(0)
         self.set_font("JUNO Solar Lt", "", 8)
         self.set_text_color(0)
-        header_text = f"Seite {self.page_no()}/{pages}       {self.title1}"
+        header_text = f"Seite {self.page_no()}/{self.total_pages}       {self.title1}"
         self.cell(0, 10, header_text, 0, 0, "")
 
         if not self.skip_logo:
@@ -55,7 +55,7 @@ class PDF(FPDF):
             self.set_font("JUNO Solar Lt", "", 12)
             self.set_x(40)
             if self.page_no() != 1:
-                self.cell(0, 10, title, 0, 0, "")
+                self.cell(0, 10, self.title, 0, 0, "")
 
             logo_path = os.path.join(settings.STATIC_ROOT, "fonts/junosolar_logo.jpg")
             self.image(logo_path, x=167, y=10, w=30, h=15)
@@ -400,15 +400,20 @@ def calcPage2(pdf, data, user_folder, vertrieb_angebot):
         ax.set_title("Visualisierung der voraussichtlichen Amortisationszeit")
         ax.legend()
 
-        ax.figure.savefig(
-            f"{user_folder}/calc_tmp_{vertrieb_angebot.angebot_id}.png"
-        )
+        # Eigene Datei je Aufruf, damit parallel erstellte PDFs desselben Angebots
+        # (Angebot mit Kalkulation und Kalkulation) nicht gegenseitig das Diagramm
+        # überschreiben; danach wird sie für die Ansicht atomar umbenannt.
+        chart_path = f"{user_folder}/calc_tmp_{vertrieb_angebot.angebot_id}_{uuid.uuid4().hex}.png"
+        ax.figure.savefig(chart_path)
         pdf.image(
-            f"{user_folder}/calc_tmp_{vertrieb_angebot.angebot_id}.png",
+            chart_path,
             x=10,
             y=185,
             w=200,
         )
+        os.replace(
+            chart_path, f"{user_folder}/calc_tmp_{vertrieb_angebot.angebot_id}.png"
+        )
         calc_folder = f"{user_folder}/"
         calc_image = f"{user_folder}/calc_tmp_{vertrieb_angebot.angebot_id}.png"
     except Exception as e:
@@ -417,12 +422,9 @@ def calcPage2(pdf, data, user_folder, vertrieb_angebot):
 
 
 def createCalcPdf(data, vertrieb_angebot, user):
-    global title, pages
-    title = f""
     title1 = f"Kalkulation {vertrieb_angebot.angebot_id}"
-    pages = 2
-    pdf = PDF(title1)
-    pdf.set_title(title)
+    pdf = PDF(title1, 2)
+    pdf.set_title("")
     pdf.set_author("JUNO Solar Home GmbH")
     pdf.set_creator(f"{user.first_name} {user.last_name})")
     user_folder = os.path.join(
@@ -0,0 +1,200 @@
+"""
+Feste Abschnitte der Angebots- und Ticket-PDFs, einmal gesetzt und danach übernommen.
+
+Die AGB (`agbPage`) hängen nur vom Stand der `Editierbarer_Text`-Einträge ab, wurden aber
+für jedes Dokument neu mit `multi_cell` umbrochen. `static_section()` setzt einen solchen
+Abschnitt beim ersten Dokument wie bisher und merkt sich dabei pro Seite den Seiteninhalt
+nach der Kopfzeile (die PDF-Operatoren aus `pdf.pages`), die verwendeten Zeichen jeder
+Schrift und den FPDF-Zustand am Ende. Jedes weitere Dokument mit demselben Textstand legt
+nur noch die Seiten an (Kopf- und Fußzeilen mit eigener Seitenzahl und Nummer) und hängt
+den gespeicherten Inhalt an; das Ergebnis ist Byte für Byte dasselbe PDF.
+
+Ein Abschnitt wird nur übernommen, wenn das Dokument beim Aufruf im selben Zustand ist
+(Schrift, Farben, Ränder, Schriftnummern) wie beim Aufzeichnen, sonst wird er gesetzt und
+zusätzlich aufgezeichnet. Legt ein Abschnitt neue Schriften oder Bilder an oder schreibt
+vor seiner ersten Seite etwas auf die vorige, wird er nicht gespeichert.
+"""
+import threading
+
+# Zustand, den `add_page()` und der Seiteninhalt lesen bzw. der Abschnitt hinterlässt
+STATE = (
+    "x",
+    "y",
+    "lasth",
+    "ws",
+    "font_family",
+    "font_style",
+    "font_size_pt",
+    "font_size",
+    "underline",
+    "unifontsubset",
+    "line_width",
+    "draw_color",
+    "fill_color",
+    "text_color",
+    "color_flag",
+    "auto_page_break",
+    "b_margin",
+    "page_break_trigger",
+    "l_margin",
+    "t_margin",
+    "r_margin",
+    "c_margin",
+    "cur_orientation",
+    "w",
+    "h",
+    "w_pt",
+    "h_pt",
+    "skip_logo",
+    "is_last_page",
+)
+# setzt `add_page()` bzw. die Kopfzeile ohnehin neu
+PAGE_STATE = ("x", "y", "lasth")
+
+_sections = {}
+_sections_lock = threading.Lock()
+
+
+def snapshot(pdf):
+    return tuple(getattr(pdf, name, None) for name in STATE)
+
+
+def restore(pdf, state, keep=()):
+    for name, value in zip(STATE, state):
+        if name not in keep:
+            setattr(pdf, name, value)
+    pdf.current_font = pdf.fonts[pdf.font_family + pdf.font_style] if pdf.font_family else {}
+
+
+def entry_state(pdf):
+    """Zustand, von dem der Inhalt eines Abschnitts abhängt, samt Nummern der Schriften."""
+    state = tuple(
+        value for name, value in zip(STATE, snapshot(pdf)) if name not in PAGE_STATE
+    )
+    fonts = tuple(sorted((key, font["i"]) for key, font in pdf.fonts.items()))
+    return state, fonts
+
+
+def subset_lengths(pdf):
+    return {key: len(font["subset"]) for key, font in pdf.fonts.items() if "subset" in font}
+
+
+class Section:
+    """Aufgezeichneter Abschnitt: pro Seite `(Ausrichtung, Zustand vor add_page, Inhalt)`."""
+
+    def __init__(self, entry, pages, chars, exit_state):
+        self.entry = entry
+        self.pages = pages
+        self.chars = chars
+        self.exit_state = exit_state
+
+    def replay(self, pdf):
+        for number, (orientation, state, content) in enumerate(self.pages):
+            # die Fußzeile der vorigen Seite gehört noch zum eigenen Dokument
+            restore(pdf, state, keep=PAGE_STATE if number == 0 else ())
+            # Kopf- und Fußzeilen entstehen wie gewohnt neu
+            pdf.add_page(orientation)
+            pdf.pages[pdf.page] += content
+        for key, chars in self.chars.items():
+            pdf.fonts[key]["subset"].extend(chars)
+        restore(pdf, self.exit_state)
+
+
+class SectionRecorder:
+    """Zeichnet einen Abschnitt auf, während er normal gesetzt wird (über `StaticSectionMixin`)."""
+
+    def __init__(self, pdf):
+        self.entry = entry_state(pdf)
+        self.images = set(pdf.images)
+        self.start = (pdf.page, len(pdf.pages.get(pdf.page, "")))
+        self.pages = []
+        self.chars = {}
+        self.body = None
+        self.cacheable = True
+
+    def before_page(self, pdf, orientation):
+        if not self.pages and self.start != (pdf.page, len(pdf.pages.get(pdf.page, ""))):
+            self.cacheable = False
+        self.close_body(pdf)
+        self.pages.append([orientation, snapshot(pdf), ""])
+
+    def after_page(self, pdf):
+        self.body = (pdf.page, len(pdf.pages[pdf.page]), subset_lengths(pdf))
+
+    def close_body(self, pdf):
+        if self.body is None:
+            return
+        page, offset, lengths = self.body
+        self.pages[-1][2] = pdf.pages[page][offset:]
+        for key, length in lengths.items():
+            chars = self.chars.setdefault(key, {})
+            chars.update(dict.fromkeys(pdf.fonts[key]["subset"][length:]))
+        self.body = None
+
+    def finish(self, pdf):
+        self.close_body(pdf)
+        if (
+            not self.cacheable
+            or not self.pages
+            or entry_state(pdf)[1] != self.entry[1]
+            or set(pdf.images) != self.images
+        ):
+            return None
+        return Section(
+            self.entry,
+            [tuple(page) for page in self.pages],
+            {key: list(chars) for key, chars in self.chars.items() if chars},
+            snapshot(pdf),
+        )
+
+
+class StaticSectionMixin:
+    """Vor `FPDF` in die Basisklassen eines Generators, damit `static_section()` aufzeichnen kann."""
+
+    section_recorder = None
+
+    def add_page(self, orientation=""):
+        recorder = self.section_recorder
+        if recorder is not None:
+            recorder.before_page(self, orientation)
+        super().add_page(orientation)
+        if recorder is not None:
+            recorder.after_page(self)
+
+
+def static_section(pdf, name, version, render):
+    """
+    Setzt den Abschnitt `name` mit `render(pdf)` oder übernimmt ihn aus einem früheren
+    Dokument derselben Klasse mit gleichem `version` und gleichem Zustand beim Aufruf.
+    `render` muss mit `add_page()` beginnen. Gespeichert werden nur die Abschnitte des
+    aktuellen `version`, ältere verwirft der nächste Aufruf.
+    """
+    key = (name, type(pdf))
+    entry = entry_state(pdf)
+    cached = _sections.get(key)
+    if cached is not None and cached[0] == version:
+        for section in cached[1]:
+            if section.entry == entry:
+                section.replay(pdf)
+                return pdf
+
+    recorder = pdf.section_recorder = SectionRecorder(pdf)
+    try:
+        pdf = render(pdf)
+    finally:
+        pdf.section_recorder = None
+    section = recorder.finish(pdf)
+
+    if section is not None:
+        with _sections_lock:
+            cached = _sections.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, ())
+            if all(known.entry != section.entry for known in cached[1]):
+                _sections[key] = (version, cached[1] + (section,))
+    return pdf
+
+
+def clear():
+    with _sections_lock:
+        _sections.clear()
@@ -0,0 +1,81 @@
+import threading
+from types import MappingProxyType
+
+from django.db.models import Count, Max
+
+
+class TextLayout:
+    """
+    Schnappschuss aller `Editierbarer_Text`-Zeilen, nach `identifier`.
+
+    Die PDF-Generatoren lesen Inhalt, Schrift und Position jedes Textblocks hieraus statt
+    mit einem `objects.get(identifier=...)` pro Attribut. Zeilen und Map sind
+    schreibgeschützt, da derselbe Schnappschuss von allen Dokumenten des Prozesses
+    geteilt wird.
+    """
+
+    # wie bisher in `PDF.get_attribute_by_identifier`, wenn es keinen Eintrag gibt
+    DEFAULTS = MappingProxyType(
+        {
+            "content": "Kein Text gefunden",
+            "font": "JUNO Solar Lt",
+            "font_size": 11,
+            "x": 0,
+            "y": 0,
+        }
+    )
+
+    def __init__(self, version, texts):
+        self.version = version
+        self.texts = MappingProxyType(
+            {identifier: MappingProxyType(row) for identifier, row in texts.items()}
+        )
+
+    @classmethod
+    def load(cls, version=None):
+        from vertrieb_interface.models import Editierbarer_Text
+
+        return cls(
+            version,
+            {row["identifier"]: row for row in Editierbarer_Text.objects.values()},
+        )
+
+    def get(self, identifier, attribute):
+        row = self.texts.get(identifier)
+        if row is None:
+            return self.DEFAULTS.get(attribute, None)
+        return row[attribute]
+
+
+_layout = None
+_layout_lock = threading.Lock()
+
+
+def current_version():
+    """
+    Versionsstempel der Texte: jüngstes `last_updated` und Anzahl der Zeilen. Jede
+    Änderung im Admin (auto_now) und jedes Löschen ändert ihn, ohne eigene Versionstabelle.
+    """
+    from vertrieb_interface.models import Editierbarer_Text
+
+    stamp = Editierbarer_Text.objects.aggregate(
+        last_updated=Max("last_updated"), count=Count("pk")
+    )
+    return stamp["last_updated"], stamp["count"]
+
+
+def get_text_layout():
+    """
+    Liefert das TextLayout dieses Prozesses und lädt es neu, sobald sich
+    `current_version()` geändert hat; eine Abfrage pro Dokument statt einer pro Attribut.
+    """
+    global _layout
+
+    version = current_version()
+    layout = _layout
+    if layout is None or layout.version != version:
+        with _layout_lock:
+            if _layout is None or _layout.version != version:
+                _layout = TextLayout.load(version)
+            layout = _layout
+    return layout
@@ -1,21 +1,20 @@
 from datetime import datetime, date
 from math import ceil
 from fpdf import FPDF
+from shared.pdf_assets import AssetCacheMixin
 from config import settings
 from vertrieb_interface.pdf_services.helper_functions import convertCurrency
-from vertrieb_interface.models import Editierbarer_Text
+from vertrieb_interface.pdf_services.text_layout import get_text_layout
+from vertrieb_interface.pdf_services.static_sections import StaticSectionMixin
 from vertrieb_interface.pdf_services.angebot_pdf_creator_user import agbPage, certPage, page4, anzahlZubehoer, replace_spaces_with_underscores
 import os
 
-title = ""
-pages = 6
-
-class PDF(FPDF):
+class PDF(StaticSectionMixin, AssetCacheMixin, FPDF):
     """
     Diese Klasse erzeugt ein PDF-Dokument mit spezifischem Layout und Inhalt.
     """
 
-    def __init__(self, title1, *args, **kwargs):
+    def __init__(self, title1, total_pages, *args, **kwargs):
         """
         Initialisiert das PDF-Objekt mit spezifischen Margen und Linienbreiten.
         """
@@ -23,6 +22,9 @@ class PDF(FPDF):
         self.is_last_page = False
         self.skip_logo = False
         self.title1 = title1
+        self.total_pages = total_pages
+        # alle editierbaren Texte auf einmal, statt einer Abfrage pro Attribut
+        self.text_layout = get_text_layout()
         self.set_left_margin(18.875)
         self.set_right_margin(12.875)
         self.set_line_width(0.5)
@@ -32,18 +34,7 @@ class PDF(FPDF):
         """
         Ruft ein Attribut eines editierbaren Textes ab, wobei Standardwerte zurückgegeben werden, falls nicht vorhanden.
         """
-        try:
-            text_instance = Editierbarer_Text.objects.get(identifier=identifier)
-            return getattr(text_instance, attribute)
-        except Editierbarer_Text.DoesNotExist:
-            defaults = {
-                "content": "Kein Text gefunden",
-                "font": "JUNO Solar Lt",
-                "font_size": 11,
-                "x": 0,
-                "y": 0,
-            }
-            return defaults.get(attribute, None)
+        return self.text_layout.get(identifier, attribute)
 
     def fetch_x(self, identifier):
         x = self.get_attribute_by_identifier(identifier, "x")
@@ -205,7 +196,7 @@ class PDF(FPDF):
         self.set_y(0)
         self.set_font("JUNO Solar Lt", "", 8)
         self.set_text_color(0)
-        header_text = f"Seite {self.page_no()}/{pages}       {self.title1}"
+        header_text = f"Seite {self.page_no()}/{self.total_pages}       {self.title1}"
         self.cell(0, 10, header_text, 0, 0, "")
 
         if not self.skip_logo:
@@ -213,7 +204,7 @@ class PDF(FPDF):
             self.set_font("JUNO Solar Lt", "", 12)
             self.set_x(40)
             if self.page_no() != 1:
-                self.cell(0, 10, title, 0, 0, "")
+                self.cell(0, 10, self.title, 0, 0, "")
 
             logo_path = os.path.join(settings.STATIC_ROOT, "fonts/junosolar_logo.jpg")
             self.image(logo_path, x=167, y=10, w=30, h=15)
@@ -661,7 +652,6 @@ class PDF(FPDF):
 
 
 def createOfferPdf(data, vertrieb_ticket, certifikate, user):
-    global title, pages
     title1 = f"{vertrieb_ticket.ticket_id}"
     pages = 4
     if certifikate:
@@ -684,8 +674,8 @@ def createOfferPdf(data, vertrieb_ticket, certifikate, user):
     if anzZubehoer > 11:
         pages += 1
 
-    pdf = PDF(title1)
-    pdf.set_title(title)
+    pdf = PDF(title1, pages)
+    pdf.set_title("")
     pdf.set_author("JUNO Solar Home GmbH")
     pdf.set_creator(f"{user.first_name} {user.last_name})")
     # create the offer-PDF
@@ -0,0 +1,859 @@
+"""
+Preis- und Ersparnisberechnung für VertriebAngebot und VertriebTicket ohne Django-ORM.
+
+`price_offer()` und `price_ticket()` bekommen einen einfachen Eingabedatensatz
+(`OfferInput`/`TicketInput`) und einen `PriceCatalog` und liefern ein
+`OfferResult`/`TicketResult`. Alle Typen sind picklebar, die Funktionen können
+daher auch in einem `ProcessPoolExecutor` oder Celery-Worker laufen.
+Die Modelle bauen nur den Datensatz (`pricing_input()`) und lesen das Ergebnis.
+"""
+import re
+from math import ceil
+from typing import NamedTuple, Optional
+
+from shared.projection import price_inflation, project
+
+# BATT_DICT = {1: 0.6, 2: 0.7, 3: 0.75, 4: 0.8, 5: 0.85, 6: 0.92}
+BATT_DICT = {5: 0.6, 7: 0.66, 10: 0.74, 14: 0.79, 15: 0.79, 20: 0.81, 21: 0.81, 25: 0.85, 28: 0.90, 30: 0.92, 35: 0.92,
+             42: 0.92}
+DEFAULT_BATT_USAGE = 0.35
+DEFAULT_MODULE = "Phono Solar PS420M7GFH-18/VNH"
+
+BATTERIE_DICT = {
+    "LUNA 2000-5-S0": "batteriemodul_huawei5",
+    "LUNA 2000-7-S1": "batteriemodul_huawei7",
+    "Vitocharge VX3 PV-Stromspeicher": "batteriemodul_viessmann",
+    "ATMOCE M-ELV Akku MS-7K-U": "batteriemodul_atmoce",
+}
+LEISTUNGSMODUL_DICT = {
+    "LUNA 2000-5-S0": True,
+    "LUNA 2000-7-S1": True,
+    "Vitocharge VX3 PV-Stromspeicher": False,
+    "ATMOCE M-ELV Akku MS-7K-U": False,
+}
+WANDHALTERUNG_DICT = {
+    "LUNA 2000-5-S0": "wandhalterung_fuer_speicher",
+    "LUNA 2000-7-S1": "wandhalterung_fuer_speicher_7",
+    "Vitocharge VX3 PV-Stromspeicher": "wandhalterung_fuer_speicher",
+    "ATMOCE M-ELV Akku MS-7K-U": "wandhalterung_fuer_speicher_7",
+}
+KAPAZITAT_DICT = {
+    "LUNA 2000-5-S0": 5,
+    "LUNA 2000-7-S1": 6.9,
+    "Vitocharge VX3 PV-Stromspeicher": 5,
+    "ATMOCE M-ELV Akku MS-7K-U": 7,
+}
+SMARTMETER_DICT = {
+    "Smart Power Sensor DTSU666H": "smartmeter_dtsu",
+    "EMMA-A02": "smartmeter_emma",
+    "Viessmann Energiezähler": "smartmeter_viessmann",
+    "ATMOCE Gateway MG100": "smartmeter_atmoce",
+}
+AUSRICHTUNG_DICT = {"Sud": "erzeugung_sued", "Ost/West": "erzeugung_ost_west"}
+KOMPLEX_DICT = {
+    "einfach, einfach erreichbar": "einfach_einfach_erreichbar",
+    "einfach, schwer erreichbar": "einfach_schwer_erreichbar",
+    "komplex, einfach erreichbar": "komplex_einfach_erreichbar",
+    "komplex, schwer erreichbar": "komplex_schwer_erreichbar",
+    "sehr komplex": "sehr_komplex",
+}
+
+
+class OfferInput(NamedTuple):
+    """Eingabefelder eines VertriebAngebot, die in Preis und Ersparnis eingehen."""
+
+    solar_module: Optional[str] = None
+    modulleistungWp: int = 420
+    modulanzahl: int = 0
+    hersteller: Optional[str] = None
+    wechselrichter_model: Optional[str] = None
+    garantieWR: Optional[str] = None
+    speicher_model: Optional[str] = None
+    anz_speicher: int = 0
+    anz_wandhalterung_fuer_speicher: int = 0
+    smartmeter_model: Optional[str] = None
+    wallboxtyp: Optional[str] = None
+    wallbox_anzahl: int = 0
+    kabelanschluss: Optional[float] = None
+    kabelSmartGuard: Optional[float] = None
+    anzOptimizer: int = 0
+    ersatzstrom: bool = False
+    smartDongleLte: bool = False
+    midZaehler: int = 0
+    apzFeld: bool = False
+    apzFeldUVV: bool = False
+    zaehlerschrank: bool = False
+    zaehlerschrank_2: bool = False
+    potentialausgleich: bool = False
+    beta_platte: bool = False
+    metall_ziegel: bool = False
+    prefa_befestigung: bool = False
+    elwa: bool = False
+    thor: bool = False
+    heizstab: bool = False
+    komplex: Optional[str] = None
+    ausrichtung: Optional[str] = None
+    indiv_price_included: bool = False
+    indiv_price: float = 0.0
+    rabatt: float = 0
+    sonderrabatt_included: bool = False
+    sonderrabatt: Optional[str] = None
+    geruestKunde: bool = False
+    geruestOeffentlich: bool = False
+    dachhakenKunde: bool = False
+    finanzierung: bool = False
+    anzahlung: float = 0.0
+    users_aufschlag: float = 0
+    # zuletzt gespeicherte Werte; zubehoer_angebot_price wurde schon immer damit berechnet
+    batteriespeicher_angebot_price: float = 0.0
+    smartmeter_angebot_price: float = 0.0
+    verbrauch: float = 15000
+    grundpreis: float = 9.8
+    arbeitspreis: float = 46.8
+    prognose: float = 5.2
+    zeitraum: int = 15
+    bis10kWp: float = 8.20
+    bis40kWp: float = 7.10
+
+
+class OfferResult(NamedTuple):
+    modulsumme_kWp: float
+    erzProJahr: float
+    solar_module_gesamt_preis: float
+    wandhalterung_fuer_speicher_preis: float
+    full_wallbox_preis: float
+    full_optimizer_preis: float
+    batteriespeicher_preis: float
+    smartmeter_preis: float
+    zubehoer_angebot_price: float
+    full_accessories_price: float
+    solar_module_angebot_price: float
+    angebots_summe: float
+    rabatt: float
+    angebotsumme: float
+    rabattsumme: float
+    nettokreditbetrag: float
+    kosten_pva: float
+    erzeugte_energie: float
+    nutz_energie: float
+    restenergie: float
+    einsp_pro_jahr: float
+    einsp_verg: float
+    stromgrundpreis_gesamt: float
+    arbeitspreis_gesamt: float
+    rest_strom_preis: float
+    kosten_rest_energie: float
+    abzug: float
+    ersparnis: float
+    # kumulierte Arbeitspreise ohne Grundpreis, daraus baut das Modell `arbeits_liste`
+    arbeitspreis_liste: list
+    arbeits_liste: list
+    rest_liste: list
+
+
+class TicketInput(NamedTuple):
+    """Eingabefelder eines VertriebTicket inkl. der Eckdaten des angenommenen Angebots."""
+
+    solar_module: Optional[str] = None
+    modulleistungWp: int = 420
+    modulanzahl: int = 0
+    speicher_model: Optional[str] = None
+    anz_speicher: int = 0
+    anz_wandhalterung_fuer_speicher: int = 0
+    smartmeter_model: Optional[str] = None
+    wallboxtyp: Optional[str] = None
+    wallbox_anzahl: int = 0
+    kabelanschluss: Optional[float] = None
+    kabelSmartGuard: Optional[float] = None
+    anzOptimizer: int = 0
+    ersatzstrom: bool = False
+    smartDongleLte: bool = False
+    midZaehler: int = 0
+    apzFeld: bool = False
+    apzFeldUVV: bool = False
+    zaehlerschrank: bool = False
+    zaehlerschrank_2: bool = False
+    potentialausgleich: bool = False
+    beta_platte: bool = False
+    metall_ziegel: bool = False
+    prefa_befestigung: bool = False
+    wr_tausch: Optional[str] = None
+    elwa: bool = False
+    thor: bool = False
+    heizstab: bool = False
+    indiv_price_included: bool = False
+    indiv_price: float = 0.0
+    rabatt: float = 0
+    sonderrabatt_included: bool = False
+    sonderrabatt: Optional[str] = None
+    geruestKunde: bool = False
+    geruestOeffentlich: bool = False
+    dachhakenKunde: bool = False
+    users_aufschlag: float = 0
+    status_pva: Optional[str] = None
+    ort: Optional[str] = None
+    batteriespeicher_angebot_price: float = 0.0
+    smartmeter_angebot_price: float = 0.0
+    # angenommenes Angebot (None, falls keins existiert)
+    angebot_speicher_model: Optional[str] = None
+    angebot_anz_speicher: Optional[int] = None
+    angebot_kWp: Optional[float] = None
+
+
+class TicketResult(NamedTuple):
+    istNachkauf: bool
+    existing_kWp: float
+    ticket_kwp: float
+    modulsumme_kWp: float
+    gesamtkapazitat: float
+    anz_leistungs_module: int
+    solar_module_gesamt_preis: float
+    wandhalterung_fuer_speicher_preis: float
+    full_wallbox_preis: float
+    full_optimizer_preis: float
+    batteriespeicher_preis: float
+    smartmeter_preis: float
+    plz_aufpreis: float
+    zubehoer_angebot_price: float
+    full_accessories_price: float
+    solar_module_angebot_price: float
+    angebots_summe: float
+    rabatt: float
+    angebotsumme: float
+    rabattsumme: float
+    kosten_pva: float
+
+
+def extract_modulleistung_wp(solar_module):
+    match = re.search(r"(\d+)", str(solar_module))
+    if match:
+        return int(match.group(1))
+    return 420
+
+
+def calculate_price(catalog, name, multiplier, istNachkauf=False):
+    try:
+        multiplier = int(multiplier)
+    except ValueError:
+        multiplier = 0
+    return catalog.get_price("OptionalAccessoriesPreise", name, istNachkauf) * multiplier
+
+
+def leistungsmodul_preis(catalog, speicher_model, istNachkauf=False):
+    name = "leistungsmodul" if speicher_model == "LUNA 2000-5-S0" else "leistungsmodul_7"
+    return float(catalog.accessory_price(name, istNachkauf))
+
+
+def kwp_stufen_preis(catalog, prefix, modulsumme_kWp):
+    limits = [7, 11, 15, 19, 23, 27, 30]
+    kwp = min(30, modulsumme_kWp)
+    kwpUpper = min(upper for upper in limits if upper >= kwp)
+    return float(catalog.kwp_price(prefix + str(kwpUpper)))
+
+
+def smartmeter_preis(catalog, smartmeter_model, istNachkauf=False):
+    if smartmeter_model in SMARTMETER_DICT:
+        return calculate_price(catalog, SMARTMETER_DICT[smartmeter_model], 1, istNachkauf)
+    return 0
+
+
+def wandhalterung_preis(catalog, record, istNachkauf=False):
+    if record.anz_wandhalterung_fuer_speicher != 0:
+        return calculate_price(
+            catalog,
+            WANDHALTERUNG_DICT.get(record.speicher_model),
+            int(record.anz_wandhalterung_fuer_speicher),
+            istNachkauf,
+        )
+    return 0
+
+
+def sonderrabatt_anwenden(catalog, record, angebotsSumme):
+    if record.sonderrabatt_included and catalog.rows("Sonderrabatt"):
+        angebotsSumme *= (1 - (float(catalog.sonderrabatt(record.sonderrabatt)["prozentsatz"]) / 100))
+        angebotsSumme -= float(catalog.sonderrabatt(record.sonderrabatt)["fixbetrag"])
+    return angebotsSumme
+
+
+def offer_battery_price(catalog, record, modulsumme_kWp):
+    batteriePreis = 0
+    if record.anz_speicher != 0:
+        anz_speicher = int(record.anz_speicher)
+        batterieDatensatz = BATTERIE_DICT.get(record.speicher_model)
+        if batterieDatensatz is not None:
+            batteriePreis = calculate_price(catalog, batterieDatensatz, anz_speicher)
+            if LEISTUNGSMODUL_DICT.get(record.speicher_model):
+                batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * leistungsmodul_preis(
+                    catalog, record.speicher_model
+                )
+            # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen
+            if modulsumme_kWp < 25.0 and record.speicher_model == "LUNA 2000-7-S1" and anz_speicher > 6:
+                batteriePreis += float(catalog.accessory_price("zusatzwechselrichter"))
+    return batteriePreis
+
+
+def offer_accessories(catalog, record, parts, batterie, smartmeter):
+    accessory = lambda name: float(catalog.accessory_price(name))
+    accessories_price = 0
+    if parts["full_optimizer_preis"]:
+        accessories_price += float(parts["full_optimizer_preis"])
+    if parts["full_wallbox_preis"]:
+        accessories_price += float(parts["full_wallbox_preis"])
+    if batterie:
+        accessories_price += float(batterie)
+    if smartmeter:
+        accessories_price += float(smartmeter)
+    if record.ersatzstrom:
+        accessories_price += accessory("ersatzstrom")
+        accessories_price += float(parts["smartguard_kabel_preis"])
+    if record.smartDongleLte:
+        accessories_price += accessory("smartDongleLte")
+    if record.midZaehler > 0:
+        accessories_price += float(calculate_price(catalog, "mid_zaehler", int(record.midZaehler)))
+    if record.apzFeld:
+        accessories_price += accessory("apzFeld")
+    if record.apzFeldUVV:
+        accessories_price += accessory("apzFeldUVV")
+    if record.zaehlerschrank:
+        accessories_price += accessory("zaehlerschrank")
+    if record.zaehlerschrank_2:
+        accessories_price += accessory("zaehlerschrank_2")
+    if record.potentialausgleich:
+        accessories_price += accessory("potentialausgleich")
+    if record.beta_platte:
+        accessories_price += kwp_stufen_preis(catalog, "BetaPlatte", parts["modulsumme_kWp"])
+    if record.metall_ziegel:
+        accessories_price += kwp_stufen_preis(catalog, "MetallZiegel", parts["modulsumme_kWp"])
+    if record.prefa_befestigung:
+        accessories_price += float(catalog.accessory_price("prefa_befestigung") * record.modulanzahl)
+    if parts["wandhalterung_fuer_speicher_preis"]:
+        accessories_price += float(parts["wandhalterung_fuer_speicher_preis"])
+    if record.elwa:
+        accessories_price += accessory("elwa_2")
+    if record.thor:
+        accessories_price += accessory("ac_thor_3_kw")
+    if record.heizstab:
+        accessories_price += accessory("heizstab")
+    return accessories_price
+
+
+def offer_sum(catalog, record, parts, full_accessories_price):
+    """Angebotssumme und Rabatt; liefert außerdem den reinen PV-Anteil (solar_module_angebot_price)."""
+    accessory = lambda name: float(catalog.accessory_price(name))
+    module_name = record.solar_module if record.solar_module else DEFAULT_MODULE
+    zuschlag = float(catalog.rows("SolarModulePreise").get(module_name, {}).get("zuschlag"))
+    modulsumme_kWp = parts["modulsumme_kWp"]
+
+    limits = [5, 7, 10, 12, 15, 20, 25, 30]
+    ranges = ([(0, limits[0])]
+        + list(zip(limits, limits[1:]))
+        + [(limits[-1], float("30"))]
+    )
+    kwp = min(30, modulsumme_kWp)
+    angebotsSumme = sum(
+        (min(modulsumme_kWp, upper) - lower) * (float(catalog.kwp_price("Preis" + str(upper))) * zuschlag)
+        for lower, upper in ranges
+        if lower < kwp
+    )
+    komplex = str(record.komplex)
+    angebotsSumme *= float(catalog.andere_value(KOMPLEX_DICT[komplex]) if komplex in KOMPLEX_DICT else 0.00)
+    solar_module_angebot_price = angebotsSumme
+    angebotsSumme += float(full_accessories_price)
+    angebotsSumme += float(parts["wechselrichter_preis"])
+
+    if record.hersteller == "Huawei" and record.garantieWR != "keine":
+        if record.speicher_model == "LUNA 2000-7-S1" and record.anz_speicher > 0:
+            garantie_faktor = float(catalog.andere_value("garantiefaktor"))
+        else:
+            garantie_faktor = 1
+        garantie_years = int(record.garantieWR.split(" ")[0])
+        garantie_kw = next(
+            kw
+            for kw in [3, 4, 5, 6, 8, 10, 15, 16, 20, 25, 30]
+            if kwp <= kw
+        )
+        angebotsSumme += float(catalog.wr_garantie_price(f"garantie{garantie_kw}_{garantie_years}")) * garantie_faktor
+
+    if record.indiv_price_included:
+        rabatt = angebotsSumme - record.indiv_price
+        angebotsSumme = record.indiv_price
+    else:
+        rabatt = angebotsSumme * (record.rabatt / 100)
+        angebotsSumme *= (1 - (record.rabatt / 100))
+        angebotsSumme = sonderrabatt_anwenden(catalog, record, angebotsSumme)
+
+    userAufschlag = float(record.users_aufschlag) / 100 + 1
+    angebotsSumme *= userAufschlag
+    # Abzug Selbstleistungen nach Rabattierung
+    if record.geruestKunde:
+        angebotsSumme -= accessory("geruestKunde")
+        rabatt += accessory("geruestKunde")
+    elif record.geruestOeffentlich:
+        angebotsSumme += accessory("geruestOeffentlich")
+    if record.dachhakenKunde:
+        angebotsSumme -= accessory("dachhakenKunde")
+        rabatt += accessory("dachhakenKunde")
+    # Aufpreis Finanzierung nach Rabattierung
+    if record.finanzierung:
+        angebotsSumme += 300
+    return angebotsSumme, rabatt, solar_module_angebot_price
+
+
+def price_offer(record, catalog, with_projection=True):
+    """
+    Berechnet alle Preis- und Ersparniswerte eines Angebots (`OfferInput` -> `OfferResult`).
+    Mit `with_projection=False` bleiben die Listen (`arbeits_liste` usw.) leer (None), z. B. wenn
+    der Aufrufer die Projektion für viele Angebote gesammelt rechnet.
+    """
+    accessory = lambda name: float(catalog.accessory_price(name))
+    modulsumme_kWp = record.modulleistungWp * record.modulanzahl / 1000
+    module_name = record.solar_module if record.solar_module else DEFAULT_MODULE
+    module_row = catalog.rows("SolarModulePreise").get(module_name)
+    try:
+        solar_module_gesamt_preis = float(module_row["price"]) * int(record.modulanzahl)
+    except TypeError:
+        solar_module_gesamt_preis = 0.0
+
+    full_wallbox_preis = 0.0
+    if record.wallbox_anzahl:
+        full_wallbox_preis += float(catalog.wallbox_price(str(record.wallboxtyp)))
+        full_wallbox_preis *= record.wallbox_anzahl
+    if record.kabelanschluss and record.kabelanschluss >= 0:
+        full_wallbox_preis += record.kabelanschluss * accessory("kabelpreis")
+
+    smartguard_kabel_preis = 0
+    if record.kabelSmartGuard and record.kabelSmartGuard >= 0:
+        smartguard_kabel_preis = record.kabelSmartGuard * accessory("kabelpreis_smartguard")
+
+    wechselrichter_preis = 0
+    if record.wechselrichter_model == "SUN 2000 MAP0":
+        wechselrichter_preis = accessory("aufpreisMAP0")
+    elif record.wechselrichter_model == "SUN 2000 MB0":
+        wechselrichter_preis = accessory("aufpreisMB0")
+
+    parts = {
+        "modulsumme_kWp": modulsumme_kWp,
+        "full_optimizer_preis": record.anzOptimizer * accessory("optimizer"),
+        "full_wallbox_preis": full_wallbox_preis,
+        "smartguard_kabel_preis": smartguard_kabel_preis,
+        "wandhalterung_fuer_speicher_preis": wandhalterung_preis(catalog, record),
+        "wechselrichter_preis": wechselrichter_preis,
+    }
+    batteriespeicher_preis = offer_battery_price(catalog, record, modulsumme_kWp)
+    smartmeter = smartmeter_preis(catalog, record.smartmeter_model)
+    # zubehoer_angebot_price wird (wie bisher in save()) mit den zuletzt gespeicherten
+    # Speicher-/Smartmeterpreisen berechnet, die Angebotssumme mit den aktuellen
+    zubehoer_angebot_price = float(
+        offer_accessories(
+            catalog,
+            record,
+            parts,
+            record.batteriespeicher_angebot_price,
+            record.smartmeter_angebot_price,
+        )
+    )
+    full_accessories_price = offer_accessories(
+        catalog, record, parts, batteriespeicher_preis, smartmeter
+    )
+    angebots_summe, rabatt, solar_module_angebot_price = offer_sum(
+        catalog, record, parts, full_accessories_price
+    )
+    angebotsumme = round(angebots_summe, 2)
+    kosten_pva = float(angebots_summe) * float(1 + catalog.andere_value("steuersatz"))
+
+    # Ersparnis
+    ausrichtung = str(record.ausrichtung)
+    erzProJahr = catalog.andere_value(AUSRICHTUNG_DICT[ausrichtung]) if ausrichtung in AUSRICHTUNG_DICT else 0.00
+    erzeugte_energie = round(float(erzProJahr) * float(modulsumme_kWp), 2)
+    nutz_energie = float(record.verbrauch)
+    if erzeugte_energie < nutz_energie:
+        nutz_energie = float(erzProJahr) * float(modulsumme_kWp)
+    if record.anz_speicher != 0:
+        if record.speicher_model == "LUNA 2000-5-S0":
+            kwh = record.anz_speicher * 5
+        else:
+            kwh = record.anz_speicher * 7
+        # Limitierung bis 6 Speichermodule, danach pauschal kein noch besserer Eigenverbrauch
+        nutz_energie = nutz_energie * BATT_DICT[min(kwh, 42)]
+    else:
+        nutz_energie = nutz_energie * DEFAULT_BATT_USAGE
+    nutz_energie = round(nutz_energie, 2)
+    restenergie = 0
+    if float(record.verbrauch):
+        restenergie += float(record.verbrauch) - float(nutz_energie)
+
+    einsp_energie = erzeugte_energie - nutz_energie
+    if modulsumme_kWp <= 10:
+        einsp_pro_jahr = float(record.bis10kWp) * 0.01 * einsp_energie
+    else:
+        klZehn = float(record.bis10kWp) * 0.01 * (10 / modulsumme_kWp)
+        grZehn = (
+            float(record.bis40kWp)
+            * 0.01
+            * (modulsumme_kWp - 10)
+            / modulsumme_kWp
+        )
+        einsp_pro_jahr = (klZehn + grZehn) * einsp_energie
+    einsp_verg = round(einsp_pro_jahr * record.zeitraum, 2)
+
+    stromgrundpreis_gesamt = round(float(record.grundpreis) * 12 * int(record.zeitraum), 2)
+    arbeit_gesamt, _ = price_inflation(
+        float(record.arbeitspreis) / 100 * float(record.verbrauch),
+        float(record.prognose) / 100,
+        int(record.zeitraum),
+    )
+    arbeitspreis_gesamt = round(float(arbeit_gesamt[0]), 2)
+    rest_gesamt, _ = price_inflation(
+        float(record.arbeitspreis) / 100 * float(restenergie),
+        float(record.prognose) / 100,
+        int(record.zeitraum),
+    )
+    rest_strom_preis = round(float(rest_gesamt[0]), 2)
+    kosten_rest_energie = rest_strom_preis + stromgrundpreis_gesamt
+
+    abzug = 0.0
+    if kosten_pva and rest_strom_preis and stromgrundpreis_gesamt and einsp_verg:
+        abzug += kosten_pva + rest_strom_preis + stromgrundpreis_gesamt - einsp_verg
+    abzug = round(abzug, 2)
+    ersparnis = round(
+        float(arbeitspreis_gesamt) - (float(kosten_pva) + float(rest_strom_preis) - float(einsp_verg)),
+        2,
+    )
+    arbeitspreis_liste = arbeits_liste = rest_liste = None
+    if with_projection:
+        projection = project(
+            verbrauch=float(record.verbrauch),
+            restenergie=float(record.verbrauch) - nutz_energie,
+            arbeitspreis=float(record.arbeitspreis),
+            grundpreis=float(record.grundpreis),
+            prognose=float(record.prognose),
+            zeitraum=int(record.zeitraum),
+            kosten_pva=kosten_pva,
+            einsp_pro_jahr=einsp_pro_jahr,
+        )
+        arbeitspreis_liste = projection.arbeit_liste()
+        arbeits_liste = projection.ohne_pv_liste()
+        rest_liste = projection.mit_pv_liste()
+
+    return OfferResult(
+        modulsumme_kWp=modulsumme_kWp,
+        erzProJahr=erzProJahr,
+        solar_module_gesamt_preis=solar_module_gesamt_preis,
+        wandhalterung_fuer_speicher_preis=parts["wandhalterung_fuer_speicher_preis"],
+        full_wallbox_preis=full_wallbox_preis,
+        full_optimizer_preis=parts["full_optimizer_preis"],
+        batteriespeicher_preis=batteriespeicher_preis,
+        smartmeter_preis=smartmeter,
+        zubehoer_angebot_price=zubehoer_angebot_price,
+        full_accessories_price=full_accessories_price,
+        solar_module_angebot_price=solar_module_angebot_price,
+        angebots_summe=angebots_summe,
+        rabatt=rabatt,
+        angebotsumme=angebotsumme,
+        rabattsumme=round(rabatt, 2),
+        nettokreditbetrag=angebotsumme - record.anzahlung,
+        kosten_pva=kosten_pva,
+        erzeugte_energie=erzeugte_energie,
+        nutz_energie=nutz_energie,
+        restenergie=restenergie,
+        einsp_pro_jahr=einsp_pro_jahr,
+        einsp_verg=einsp_verg,
+        stromgrundpreis_gesamt=stromgrundpreis_gesamt,
+        arbeitspreis_gesamt=arbeitspreis_gesamt,
+        rest_strom_preis=rest_strom_preis,
+        kosten_rest_energie=kosten_rest_energie,
+        abzug=abzug,
+        ersparnis=ersparnis,
+        arbeitspreis_liste=arbeitspreis_liste,
+        arbeits_liste=arbeits_liste,
+        rest_liste=rest_liste,
+    )
+
+
+def sweep_offer(record, catalog, modulanzahl_values, anz_speicher_values, speicher_models):
+    """
+    Rechnet Varianten eines Angebots über das Raster Modulanzahl × Speichermodule × Speichermodell.
+
+    Preise kommen je Zelle aus `price_offer()`, die Amortisationsreihen für alle Zellen aus
+    einem einzigen `project()`-Aufruf. Zellen ohne Speicher hängen nicht vom Speichermodell ab
+    und werden nur einmal gerechnet. Liefert eine Liste von Dictionaries, eine je Zelle.
+    """
+    variants = []
+    results = {}
+    for modulanzahl in modulanzahl_values:
+        for speicher_model in speicher_models:
+            for anz_speicher in anz_speicher_values:
+                variant = record._replace(
+                    modulanzahl=modulanzahl,
+                    anz_speicher=anz_speicher,
+                    speicher_model=speicher_model if anz_speicher else record.speicher_model,
+                )
+                if variant not in results:
+                    results[variant] = price_offer(variant, catalog, with_projection=False)
+                variants.append((speicher_model, variant))
+
+    cells = [results[variant] for _, variant in variants]
+    n = len(cells)
+    projection = project(
+        verbrauch=[float(record.verbrauch)] * n,
+        restenergie=[float(record.verbrauch) - cell.nutz_energie for cell in cells],
+        arbeitspreis=[float(record.arbeitspreis)] * n,
+        grundpreis=[float(record.grundpreis)] * n,
+        prognose=[float(record.prognose)] * n,
+        zeitraum=[int(record.zeitraum)] * n,
+        kosten_pva=[cell.kosten_pva for cell in cells],
+        einsp_pro_jahr=[cell.einsp_pro_jahr for cell in cells],
+    )
+    amortisationsjahre = projection.amortisationsjahre()
+
+    return [
+        {
+            "modulanzahl": variant.modulanzahl,
+            "anz_speicher": variant.anz_speicher,
+            "speicher_model": speicher_model,
+            "modulsumme_kWp": cell.modulsumme_kWp,
+            "angebotsumme": cell.angebotsumme,
+            "nutz_energie": cell.nutz_energie,
+            "eigenverbrauchsquote": round(cell.nutz_energie / cell.erzeugte_energie, 4)
+            if cell.erzeugte_energie
+            else 0.0,
+            "ersparnis": cell.ersparnis,
+            "amortisationsjahr": int(jahr) or None,
+        }
+        for (speicher_model, variant), cell, jahr in zip(variants, cells, amortisationsjahre)
+    ]
+
+
+def ticket_battery_price(catalog, record, istNachkauf, modulsumme_kWp):
+    batteriePreis = 0
+    if record.anz_speicher != 0:
+        anz_speicher = int(record.anz_speicher)
+        leistungsmodulNotwendig = LEISTUNGSMODUL_DICT.get(record.speicher_model)
+        batterieDatensatz = BATTERIE_DICT.get(record.speicher_model)
+        hat_angebot = record.angebot_anz_speicher is not None
+        zusatzwechselrichter = lambda: float(catalog.accessory_price("zusatzwechselrichter", istNachkauf))
+        # Kein angenommenes Angebot oder angenommenes Angebot hatte keinen Speicher
+        if batterieDatensatz is not None and (not hat_angebot or record.angebot_anz_speicher == 0):
+            batteriePreis = calculate_price(catalog, batterieDatensatz, anz_speicher, istNachkauf)
+            if leistungsmodulNotwendig:
+                batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * leistungsmodul_preis(
+                    catalog, record.speicher_model, istNachkauf
+                )
+            # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen
+            if modulsumme_kWp < 25.0 and record.speicher_model == "LUNA 2000-7-S1" and anz_speicher > 6:
+                batteriePreis += zusatzwechselrichter()
+            return batteriePreis
+        # Angenommenes Angebot mit angebotenem Speicher
+        elif hat_angebot:
+            angebot_anz_speicher = record.angebot_anz_speicher
+            # gleiches Speichermodell
+            if record.speicher_model == record.angebot_speicher_model:
+                batteriePreis = calculate_price(catalog, batterieDatensatz, anz_speicher, istNachkauf)
+                if leistungsmodulNotwendig:
+                    abweichung = ceil((anz_speicher + angebot_anz_speicher) / 3) - ceil(angebot_anz_speicher / 3)
+                    if abweichung >= 0:
+                        batteriePreis = float(batteriePreis) + abweichung * leistungsmodul_preis(
+                            catalog, record.speicher_model, istNachkauf
+                        )
+                    else:
+                        batteriePreis = float(batteriePreis) + abweichung * leistungsmodul_preis(
+                            catalog, record.angebot_speicher_model
+                        )
+            # abweichendes Speichermodell
+            else:
+                leistungsmodulNotwendigOrig = LEISTUNGSMODUL_DICT.get(record.angebot_speicher_model)
+                batteriePreis = calculate_price(catalog, batterieDatensatz, anz_speicher, istNachkauf)
+                batteriePreis -= calculate_price(
+                    catalog, BATTERIE_DICT.get(record.angebot_speicher_model), angebot_anz_speicher, False
+                )
+                if leistungsmodulNotwendig:
+                    batteriePreis = float(batteriePreis) + ceil(anz_speicher / 3) * leistungsmodul_preis(
+                        catalog, record.speicher_model, istNachkauf
+                    )
+                if leistungsmodulNotwendigOrig:
+                    batteriePreis = float(batteriePreis) - ceil(angebot_anz_speicher / 3) * leistungsmodul_preis(
+                        catalog, record.angebot_speicher_model
+                    )
+            # Falls mehr als 6 Speichermodule bei Huawei 7 eventuell Zusatzwechselrichter notwendig wegen fehlenden Steckplätzen, falls Limit jetzt erst überschritten
+            if modulsumme_kWp < 25.0 and record.speicher_model == "LUNA 2000-7-S1" and angebot_anz_speicher <= 6 and (anz_speicher + angebot_anz_speicher) > 6:
+                batteriePreis += zusatzwechselrichter()
+    return batteriePreis
+
+
+def plz_aufpreis(catalog, ort):
+    aufpreis = 0
+    if ort != None and ort != "":
+        zone = catalog.plz_zone(ort.strip()[0:5])
+        if zone is not None:
+            aufpreis = float(zone["value"])
+        else:
+            aufpreis = float(catalog.row("PLZAufpreisNachkauf", "ab 500 km")["value"])
+    return aufpreis
+
+
+def ticket_accessories(catalog, record, istNachkauf, parts, batterie, smartmeter):
+    accessory = lambda name: float(catalog.accessory_price(name, istNachkauf))
+    accessories_price = 0
+    if parts["full_optimizer_preis"]:
+        accessories_price += float(parts["full_optimizer_preis"])
+    if parts["full_wallbox_preis"]:
+        accessories_price += float(parts["full_wallbox_preis"])
+    if batterie:
+        accessories_price += float(batterie)
+    if smartmeter:
+        accessories_price += float(smartmeter)
+    if record.ersatzstrom:
+        accessories_price += accessory("ersatzstrom")
+    if record.kabelSmartGuard:
+        accessories_price += float(parts["smartguard_kabel_preis"])
+    if record.smartDongleLte:
+        accessories_price += accessory("smartDongleLte")
+    if record.midZaehler > 0:
+        accessories_price += float(calculate_price(catalog, "mid_zaehler", int(record.midZaehler), istNachkauf))
+    if record.apzFeld:
+        accessories_price += accessory("apzFeld")
+    if record.apzFeldUVV:
+        accessories_price += accessory("apzFeldUVV")
+    if record.zaehlerschrank:
+        accessories_price += accessory("zaehlerschrank")
+    if record.zaehlerschrank_2:
+        accessories_price += accessory("zaehlerschrank_2")
+    if record.potentialausgleich:
+        accessories_price += accessory("potentialausgleich")
+    if record.beta_platte:
+        accessories_price += kwp_stufen_preis(catalog, "BetaPlatte", parts["modulsumme_kWp"])
+    if record.metall_ziegel:
+        accessories_price += kwp_stufen_preis(catalog, "MetallZiegel", parts["modulsumme_kWp"])
+    if record.prefa_befestigung:
+        accessories_price += float(catalog.accessory_price("prefa_befestigung", istNachkauf) * record.modulanzahl)
+    if parts["wandhalterung_fuer_speicher_preis"]:
+        accessories_price += float(parts["wandhalterung_fuer_speicher_preis"])
+    if record.wr_tausch:
+        accessories_price += float(parts["wr_tausch_preis"])
+    if record.elwa:
+        accessories_price += accessory("elwa_2")
+    if record.thor:
+        accessories_price += accessory("ac_thor_3_kw")
+    if record.heizstab:
+        accessories_price += accessory("heizstab")
+    return accessories_price
+
+
+def price_ticket(record, catalog):
+    """Berechnet die Preise eines Nachkauf-/Erweiterungstickets (`TicketInput` -> `TicketResult`)."""
+    istNachkauf = record.status_pva == "abgeschlossen" or record.status_pva == "Endabnahme erfolgt"
+    accessory = lambda name: float(catalog.accessory_price(name, istNachkauf))
+    hat_angebot = record.angebot_anz_speicher is not None
+
+    existing_kWp = round(record.angebot_kWp if hat_angebot else 0, 2)
+    ticket_kwp = round(record.modulleistungWp * record.modulanzahl / 1000, 2)
+    modulsumme_kWp = round(existing_kWp + ticket_kwp, 2)
+
+    gesamtkapazitat = 0
+    if KAPAZITAT_DICT.get(record.speicher_model):
+        kapazitat = KAPAZITAT_DICT.get(record.speicher_model)
+        if hat_angebot and record.angebot_speicher_model == record.speicher_model:
+            gesamtkapazitat = round((record.anz_speicher + record.angebot_anz_speicher) * kapazitat, 2)
+        else:
+            gesamtkapazitat = round(record.anz_speicher * kapazitat, 2)
+    if hat_angebot:
+        anz_leistungs_module = ceil((record.anz_speicher + record.angebot_anz_speicher) / 3) - ceil(record.angebot_anz_speicher / 3)
+    else:
+        anz_leistungs_module = ceil(record.anz_speicher / 3)
+
+    module_name = record.solar_module if record.solar_module else DEFAULT_MODULE
+    module_row = catalog.rows("SolarModulePreise").get(module_name)
+    try:
+        solar_module_gesamt_preis = float(module_row["price"]) * int(record.modulanzahl)
+    except TypeError:
+        solar_module_gesamt_preis = 0.0
+
+    full_wallbox_preis = 0.0
+    if record.wallbox_anzahl:
+        full_wallbox_preis += float(catalog.wallbox_price(str(record.wallboxtyp), istNachkauf))
+        full_wallbox_preis *= record.wallbox_anzahl
+    if record.kabelanschluss and record.kabelanschluss >= 0:
+        full_wallbox_preis += float(calculate_price(catalog, "kabelpreis", record.kabelanschluss, istNachkauf))
+
+    smartguard_kabel_preis = 0
+    if record.kabelSmartGuard and record.kabelSmartGuard >= 0:
+        smartguard_kabel_preis = record.kabelSmartGuard * accessory("kabelpreis_smartguard")
+
+    wr_tausch_preis = 0
+    if record.wr_tausch in catalog.rows("WrTauschPreise"):
+        wr_tausch_preis = float(catalog.wr_tausch(record.wr_tausch)["price"])
+
+    parts = {
+        "modulsumme_kWp": modulsumme_kWp,
+        "full_optimizer_preis": record.anzOptimizer * accessory("optimizer"),
+        "full_wallbox_preis": full_wallbox_preis,
+        "smartguard_kabel_preis": smartguard_kabel_preis,
+        "wandhalterung_fuer_speicher_preis": wandhalterung_preis(catalog, record, istNachkauf),
+        "wr_tausch_preis": wr_tausch_preis,
+    }
+    batteriespeicher_preis = ticket_battery_price(catalog, record, istNachkauf, modulsumme_kWp)
+    smartmeter = smartmeter_preis(catalog, record.smartmeter_model, istNachkauf)
+    zubehoer_angebot_price = float(
+        ticket_accessories(
+            catalog,
+            record,
+            istNachkauf,
+            parts,
+            record.batteriespeicher_angebot_price,
+            record.smartmeter_angebot_price,
+        )
+    )
+    full_accessories_price = ticket_accessories(
+        catalog, record, istNachkauf, parts, batteriespeicher_preis, smartmeter
+    )
+
+    angebotsSumme = float(catalog.module(record.solar_module)["price"] * record.modulanzahl)
+    solar_module_angebot_price = angebotsSumme
+    angebotsSumme += float(full_accessories_price)
+    if record.indiv_price_included:
+        rabatt = angebotsSumme - record.indiv_price
+        angebotsSumme = record.indiv_price
+    else:
+        rabatt = angebotsSumme * (record.rabatt / 100)
+        angebotsSumme *= (1 - (record.rabatt / 100))
+        angebotsSumme = sonderrabatt_anwenden(catalog, record, angebotsSumme)
+
+    userAufschlag = float(record.users_aufschlag) / 100 + 1
+    angebotsSumme *= userAufschlag
+    # Abzug Selbstleistungen nach Rabattierung
+    if record.geruestKunde:
+        angebotsSumme -= accessory("geruestKunde")
+        rabatt += accessory("geruestKunde")
+    elif record.geruestOeffentlich:
+        angebotsSumme += accessory("geruestOeffentlich")
+    if record.dachhakenKunde:
+        angebotsSumme -= accessory("dachhakenKunde")
+        rabatt += accessory("dachhakenKunde")
+    # Aufpreis PLZ als allerletztes
+    aufpreis = plz_aufpreis(catalog, record.ort)
+    if istNachkauf:
+        angebotsSumme += aufpreis
+
+    return TicketResult(
+        istNachkauf=istNachkauf,
+        existing_kWp=existing_kWp,
+        ticket_kwp=ticket_kwp,
+        modulsumme_kWp=modulsumme_kWp,
+        gesamtkapazitat=gesamtkapazitat,
+        anz_leistungs_module=anz_leistungs_module,
+        solar_module_gesamt_preis=solar_module_gesamt_preis,
+        wandhalterung_fuer_speicher_preis=parts["wandhalterung_fuer_speicher_preis"],
+        full_wallbox_preis=full_wallbox_preis,
+        full_optimizer_preis=parts["full_optimizer_preis"],
+        batteriespeicher_preis=batteriespeicher_preis,
+        smartmeter_preis=smartmeter,
+        plz_aufpreis=aufpreis,
+        zubehoer_angebot_price=zubehoer_angebot_price,
+        full_accessories_price=full_accessories_price,
+        solar_module_angebot_price=solar_module_angebot_price,
+        angebots_summe=angebotsSumme,
+        rabatt=rabatt,
+        angebotsumme=round(angebotsSumme, 2),
+        rabattsumme=round(rabatt, 2),
+        kosten_pva=float(angebotsSumme) * float(1 + catalog.andere_value("steuersatz")),
+    )
@@ -0,0 +1,182 @@
+import contextvars
+import datetime
+import logging
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from config.settings import REPRICING_DELAY, REPRICING_ENABLED
+from prices.catalog import get_price_catalog
+from prices.models import PriceCatalogVersion
+from vertrieb_interface.models import VertriebAngebot, VertriebTicket
+
+logger = logging.getLogger(__name__)
+
+# Angebote/Tickets in diesen Status (oder gesperrt, d. h. PDF verschickt) werden nicht neu bepreist
+CLOSED_STATUSES = ("angenommen", "abgelehnt", "abgelaufen", "storniert", "bekommen")
+
+# Felder, die im Diff-Report erscheinen und über "geändert" entscheiden.
+# ag_data und die Listen werden mitgeschrieben, aber nicht verglichen (ag_data enthält das Tagesdatum).
+DIFF_FIELDS = (
+    "wallbox_angebot_price",
+    "zubehoer_angebot_price",
+    "batteriespeicher_angebot_price",
+    "smartmeter_angebot_price",
+    "solar_module_angebot_price",
+    "angebotsumme",
+    "rabattsumme",
+)
+
+# Binärspalten, die für die Neuberechnung nie geladen werden
+DEFERRED_FIELDS = {
+    VertriebAngebot: ("angebot_pdf", "calc_pdf", "profile_foto"),
+    VertriebTicket: ("ticket_pdf", "profile_foto"),
+}
+
+
+_paused = contextvars.ContextVar("repricing_paused", default=False)
+
+
+@contextmanager
+def repricing_paused():
+    """Preisänderungen in diesem Block (z. B. beim Anlegen von Testdaten) reihen nichts ein."""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+def repricing_enabled():
+    return REPRICING_ENABLED and not _paused.get()
+
+
+def _value(obj, field):
+    # Preise kommen teils als Decimal aus dem Katalog, gespeichert werden FloatFields
+    value = getattr(obj, field)
+    return float(value) if value is not None else None
+
+
+def open_rows(model, lock=False):
+    queryset = (
+        model.objects.filter(is_locked=False)
+        .exclude(status__in=CLOSED_STATUSES)
+        .select_related("user")
+        .defer(*DEFERRED_FIELDS[model])
+        .order_by("pk")
+    )
+    if lock:
+        # nur die eigenen Zeilen, nicht die per select_related geladenen Benutzer
+        queryset = queryset.select_for_update(of=("self",))
+    return queryset
+
+
+def reprice_model(model, catalog, dry_run=False, chunk_size=500):
+    """
+    Berechnet `CALCULATED_FIELDS` aller offenen Zeilen von `model` in Blöcken neu
+    und schreibt geänderte Zeilen per `bulk_update` zurück (kein save(), kein Log-Eintrag,
+    `updated_at` bleibt unverändert). Jeder Block wird in einer eigenen Transaktion
+    gesperrt gelesen und geschrieben, ein gleichzeitiges save() eines Vertrieblers wartet
+    also auf den Block, statt von ihm überschrieben zu werden.
+
+    Liefert `(stats, changes)`; `changes` enthält je geänderter Zeile die alten und neuen
+    Werte der `DIFF_FIELDS`.
+    """
+    started = time.monotonic()
+    rows = 0
+    changes = []
+    last_pk = None
+
+    while True:
+        with transaction.atomic():
+            queryset = open_rows(model, lock=not dry_run)
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            chunk = list(queryset[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            rows += len(chunk)
+            if model is VertriebTicket:
+                VertriebTicket.prefetch_accepted_offers(chunk)
+
+            changed = []
+            for obj in chunk:
+                old = {field: _value(obj, field) for field in DIFF_FIELDS}
+                obj._price_catalog = catalog
+                obj.calculate_fields()
+                new = {field: _value(obj, field) for field in DIFF_FIELDS}
+                diff = {
+                    field: [old[field], new[field]]
+                    for field in DIFF_FIELDS
+                    if old[field] != new[field]
+                }
+                if diff:
+                    changed.append(obj)
+                    changes.append(
+                        {"model": model.__name__, "id": obj.pk, "fields": diff}
+                    )
+
+            if changed and not dry_run:
+                model.objects.bulk_update(changed, model.CALCULATED_FIELDS)
+
+    seconds = time.monotonic() - started
+    stats = {
+        "rows": rows,
+        "changed": len(changes),
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds else 0.0,
+    }
+    return stats, changes
+
+
+def reprice_open_offers(dry_run=False, chunk_size=500):
+    """
+    Bepreist alle offenen VertriebAngebote und VertriebTickets mit dem aktuellen PriceCatalog neu.
+    Mit `dry_run=True` wird nichts geschrieben, nur der Diff-Report erstellt.
+    """
+    catalog = get_price_catalog()
+    report = {
+        "dry_run": dry_run,
+        "catalog_version": catalog.version,
+        "models": {},
+        "changes": [],
+    }
+    for model in (VertriebAngebot, VertriebTicket):
+        stats, changes = reprice_model(model, catalog, dry_run, chunk_size)
+        report["models"][model.__name__] = stats
+        report["changes"].extend(changes)
+    return report
+
+
+def schedule_repricing():
+    """
+    Reiht `tasks.reprice_open_vertrieb_rows` nach dem Commit einer Preisänderung mit
+    `REPRICING_DELAY` ein. Weitere Änderungen bis zum Start reihen nichts mehr ein, der
+    Lauf liest den Katalog erst beim Start und enthält sie ohnehin. Ob schon ein Lauf
+    aussteht, steht für alle Prozesse in `PriceCatalogVersion.repricing_due_at`; nur wer
+    es per bedingtem UPDATE setzt, reiht ein. Ohne Broker bleibt nur der Befehl
+    `reprice_open_offers`. Liefert True, wenn eingereiht wurde.
+    """
+    from vertrieb_interface.tasks import reprice_open_vertrieb_rows
+
+    now = timezone.now()
+    claimed = (
+        PriceCatalogVersion.objects.filter(pk=1)
+        .filter(Q(repricing_due_at__isnull=True) | Q(repricing_due_at__lte=now))
+        .update(repricing_due_at=now + datetime.timedelta(seconds=REPRICING_DELAY))
+    )
+    if not claimed:
+        return False
+    try:
+        reprice_open_vertrieb_rows.apply_async(countdown=REPRICING_DELAY)
+    except Exception as e:
+        PriceCatalogVersion.objects.filter(pk=1).update(repricing_due_at=None)
+        logger.warning(
+            f"Repricing nicht eingereiht ({e}), bitte reprice_open_offers ausführen"
+        )
+        return False
+    return True
@@ -1,8 +1,18 @@
 from datetime import timedelta
 from django.utils import timezone
 from celery import shared_task
+from django.core.cache import cache
 from django.db import transaction, DatabaseError
 from vertrieb_interface.models import VertriebAngebot, VertriebTicket
+from vertrieb_interface.repricing import reprice_open_offers
+from vertrieb_interface.zoho_sync import is_stale, sync_user_kunden
+from vertrieb_interface.zoho_outbox import drain
+from vertrieb_interface.pdf_jobs import render_job
+from vertrieb_interface.api_views.zoho_operations_aktualisierung import (
+    refresh_user_angebote,
+)
+from authentication.models import User
+from shared.zoho_client import APIException
 from celery.utils.log import get_task_logger
 import logging
 
@@ -10,6 +20,9 @@ import logging
 logger = get_task_logger(__name__)
 logger.setLevel(logging.INFO)
 
+# So lange wird nach dem Einreihen kein weiterer Refresh für denselben Benutzer angestoßen
+ZOHO_REFRESH_PENDING_TIMEOUT = 120
+
 
 @shared_task
 def delete_unassigned_vertriebangebot_day_old():
@@ -109,3 +122,111 @@ def delete_angenommen_vertriebangebot_two_months_old():
         )
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
+
+
+@shared_task
+def reprice_open_vertrieb_rows(dry_run=False, chunk_size=500):
+    """
+    Bepreist alle offenen VertriebAngebot- und VertriebTicket-Instanzen nach Änderungen an den Preistabellen neu.
+    Gibt den Report mit Diff und Durchsatz (Zeilen/s) zurück; mit dry_run=True wird nichts gespeichert.
+    """
+    logger.info("Task - reprice_open_vertrieb_rows  - starting")
+    try:
+        report = reprice_open_offers(dry_run=dry_run, chunk_size=chunk_size)
+    except DatabaseError as e:
+        logger.error(f"Failed to reprice open offers due to a database error: {e}")
+        return None
+    for model_name, stats in report["models"].items():
+        logger.info(
+            f"{model_name}: {stats['rows']} rows, {stats['changed']} changed, {stats['rows_per_second']} rows/s (dry_run={dry_run})"
+        )
+    return report
+
+
+@shared_task
+def reconcile_zoho_kunden():
+    """
+    Vollabgleich der Privatkunden aller aktiven Vertriebler, die den Delta-Sync nutzen.
+    Entfernt u. a. in Zoho gelöschte Datensätze, die der Delta-Abruf nicht sieht.
+    """
+    logger.info("Task - reconcile_zoho_kunden  - starting")
+    users = User.objects.filter(
+        is_active=True, zoho_id__isnull=False, zoho_synced_at__isnull=False
+    ).select_related("role")
+    synced = failed = 0
+    for user in users.iterator():
+        try:
+            sync_user_kunden(user, full=True)
+            synced += 1
+        except (APIException, DatabaseError) as e:
+            failed += 1
+            logger.error(f"Failed to reconcile Zoho data for {user}: {e}")
+    logger.info(f"Reconciled Zoho data for {synced} users, {failed} failed.")
+    return {"synced": synced, "failed": failed}
+
+
+@shared_task(ignore_result=True)
+def drain_zoho_outbox():
+    """
+    Sendet fällige Einträge der Zoho-Outbox (siehe `vertrieb_interface.zoho_outbox`).
+    Läuft nach jedem neuen Eintrag und zusätzlich minütlich für Wiederholungen.
+    """
+    logger.info("Task - drain_zoho_outbox  - starting")
+    try:
+        stats = drain()
+    except DatabaseError as e:
+        logger.error(f"Failed to drain Zoho outbox: {e}")
+        return
+    if any(stats.values()):
+        logger.info(
+            f"Zoho outbox: {stats['done']} sent, {stats['superseded']} superseded, "
+            f"{stats['retry']} to retry, {stats['failed']} failed."
+        )
+
+
+@shared_task(ignore_result=True)
+def render_pdf(job_id):
+    """
+    Erstellt das PDF eines `PdfJob` (siehe `vertrieb_interface.pdf_jobs`). Läuft auf
+    der Queue "pdf", damit lange Renderzeiten die übrigen Tasks nicht aufhalten.
+    """
+    status = render_job(job_id)
+    logger.info(f"Task - render_pdf - job {job_id}: {status or 'already taken'}")
+
+
+@shared_task(ignore_result=True)
+def refresh_zoho_kunden(user_id):
+    """
+    Hintergrund-Refresh der Zoho-Kundendaten eines Benutzers samt Abgleich seiner VertriebAngebote.
+    Überspringt Benutzer, deren Daten inzwischen schon wieder aktuell sind.
+    """
+    logger.info(f"Task - refresh_zoho_kunden  - starting for user {user_id}")
+    try:
+        user = User.objects.select_related("role").get(pk=user_id)
+        if not is_stale(user):
+            return
+        if not refresh_user_angebote(user):
+            logger.error(f"Failed to reconcile VertriebAngebot instances for {user}")
+    except User.DoesNotExist:
+        logger.error(f"User {user_id} does not exist.")
+    except (APIException, DatabaseError) as e:
+        logger.error(f"Failed to refresh Zoho data for user {user_id}: {e}")
+
+
+def schedule_zoho_refresh(user):
+    """
+    Reiht `refresh_zoho_kunden` ein, wenn die Kundendaten des Benutzers veraltet sind.
+    Blockiert nie auf Zoho; liefert True, solange ein Refresh aussteht.
+    """
+    if not is_stale(user):
+        return False
+    if not cache.add(f"zoho_refresh:{user.pk}", True, ZOHO_REFRESH_PENDING_TIMEOUT):
+        return True
+    try:
+        refresh_zoho_kunden.delay(user.pk)
+    except Exception as e:
+        # Broker nicht erreichbar: Seite trotzdem mit den vorhandenen Daten anzeigen
+        logger.error(f"Failed to schedule Zoho refresh for {user}: {e}")
+        cache.delete(f"zoho_refresh:{user.pk}")
+        return False
+    return True
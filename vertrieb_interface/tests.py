@@ -0,0 +1,443 @@
+import datetime
+import json
+import os
+import re
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from prices.catalog import get_price_catalog
+from prices.models import KwpPreise, PriceCatalogVersion
+from shared.benchmark import (
+    build_angebot,
+    build_ticket,
+    scenarios,
+    seed_prices,
+    seed_users,
+)
+from shared.benchmark_pdf import CREATION_DATE_RE, build_documents, render
+from shared.zoho_client import (
+    NoRecordsException,
+    ServerErrorException,
+    TransportException,
+)
+from vertrieb_interface import zoho_outbox
+from vertrieb_interface.derived_fields import (
+    DerivedFieldContext,
+    add_profile_hook,
+    remove_profile_hook,
+)
+from vertrieb_interface.models import ZohoOutbox
+from vertrieb_interface.pdf_services import static_sections
+from vertrieb_interface.pricing import (
+    OfferInput,
+    TicketInput,
+    price_offer,
+    price_ticket,
+)
+from vertrieb_interface.tasks import reprice_open_vertrieb_rows
+
+# Ein- und Ausgaben von VertriebAngebot/VertriebTicket.save() vor der Umstellung auf
+# `vertrieb_interface.pricing`, mit den Preisen aus `shared.benchmark.seed_prices()`;
+# jede Konfiguration zweimal gespeichert (der zweite Lauf rechnet zubehoer_angebot_price
+# mit den gespeicherten Speicher-/Smartmeter-Preisen)
+PRICING_BASELINE = os.path.join(
+    os.path.dirname(__file__), "test_data", "pricing_baseline.json"
+)
+
+# gespeichertes Feld -> Feld von OfferResult/TicketResult
+OFFER_FIELDS = {
+    "angebotsumme": "angebotsumme",
+    "rabattsumme": "rabattsumme",
+    "zubehoer_angebot_price": "zubehoer_angebot_price",
+    "wallbox_angebot_price": "full_wallbox_preis",
+    "batteriespeicher_angebot_price": "batteriespeicher_preis",
+    "smartmeter_angebot_price": "smartmeter_preis",
+    "solar_module_angebot_price": "solar_module_angebot_price",
+    "benotigte_restenergie": "restenergie",
+    "nutzbare_nutzenergie": "nutz_energie",
+    "erzeugte_energie_pro_jahr": "erzeugte_energie",
+    "einspreisevergütung_gesamt": "einsp_verg",
+    "abzug_vergutung": "abzug",
+    "Ersparnis": "ersparnis",
+    "kosten_fur_restenergie": "kosten_rest_energie",
+    "nettokreditbetrag": "nettokreditbetrag",
+    "Rest_liste": "rest_liste",
+}
+TICKET_FIELDS = {
+    "angebotsumme": "angebotsumme",
+    "rabattsumme": "rabattsumme",
+    "zubehoer_angebot_price": "zubehoer_angebot_price",
+    "wallbox_angebot_price": "full_wallbox_preis",
+    "batteriespeicher_angebot_price": "batteriespeicher_preis",
+    "smartmeter_angebot_price": "smartmeter_preis",
+    "solar_module_angebot_price": "solar_module_angebot_price",
+    "PLZ_Aufpreis": "plz_aufpreis",
+}
+
+
+def decode(value):
+    if isinstance(value, dict) and set(value) == {"decimal"}:
+        return Decimal(value["decimal"])
+    return value
+
+
+def load_baseline():
+    with open(PRICING_BASELINE, encoding="utf-8") as file:
+        return json.load(file, object_hook=decode)
+
+
+class DerivedFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_prices()
+        cls.user = seed_users()[0]
+        cls.configs = [config for _, config in scenarios()][:12]
+
+    def setUp(self):
+        self.counts = []
+        add_profile_hook(self.record)
+        self.addCleanup(remove_profile_hook, self.record)
+
+    def record(self, instance, counts):
+        self.counts.append((type(instance).__name__, counts))
+
+    def test_pricing_runs_once_per_save(self):
+        for index, config in enumerate(self.configs):
+            # die IDs enthalten die Uhrzeit, daher wie im Benchmark gleich wieder löschen
+            for document in (
+                build_angebot(config, self.user, index),
+                build_ticket(config, self.user),
+            ):
+                document.save()
+                document.delete()
+        self.assertEqual(len(self.counts), 2 * len(self.configs))
+        for model, counts in self.counts:
+            self.assertEqual(counts, {"pricing": 1}, model)
+
+    def test_changed_dependency_recomputes(self):
+        angebot = build_angebot(self.configs[0], self.user, 0)
+        with DerivedFieldContext(angebot):
+            before = angebot.pricing.angebots_summe
+            self.assertIs(angebot.pricing, angebot.pricing)
+            angebot.modulanzahl += 10
+            after = angebot.pricing.angebots_summe
+        self.assertGreater(after, before)
+        self.assertEqual(self.counts, [("VertriebAngebot", {"pricing": 2})])
+
+
+class PricingEquivalenceTest(TestCase):
+    """`price_offer`/`price_ticket` liefern Bit für Bit die Werte der früheren Modell-Properties."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_prices()
+        cls.baseline = load_baseline()
+
+    def check(self, cases, input_type, price, fields):
+        catalog = get_price_catalog()
+        for case in cases:
+            with self.subTest(case["name"]):
+                result = price(input_type(**case["input"]), catalog)
+                for stored, attribute in fields.items():
+                    self.assertEqual(
+                        getattr(result, attribute), case["expected"][stored], stored
+                    )
+
+    def test_offers(self):
+        self.check(self.baseline["offers"], OfferInput, price_offer, OFFER_FIELDS)
+
+    def test_tickets(self):
+        self.check(self.baseline["tickets"], TicketInput, price_ticket, TICKET_FIELDS)
+
+    def test_baseline_covers_surcharge_paths(self):
+        tickets = self.baseline["tickets"]
+        orte = {case["input"]["ort"] for case in tickets}
+        self.assertIn("99999 Nirgends", orte)  # keine Zone, "ab 500 km"
+        self.assertIn("", orte)
+        self.assertTrue(
+            any(
+                case["input"]["batteriespeicher_angebot_price"]
+                for case in self.baseline["offers"]
+            )
+        )
+
+
+class StubZoho:
+    """
+    Minimaler Zoho-Client für die Outbox: merkt sich alle Aufrufe, legt bei POST
+    Datensätze an und wirft die Fehler aus `failures` (je Methode, der Reihe nach).
+    `lose_response` simuliert einen POST, der ankommt, dessen Antwort aber verloren geht.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.records = {}
+        self.failures = {"GET": [], "POST": [], "PATCH": []}
+        self.lose_response = False
+
+    def fail(self, method):
+        if self.failures[method]:
+            raise self.failures[method].pop(0)
+
+    def get(self, url, params=None):
+        self.calls.append(("GET", params["criteria"]))
+        self.fail("GET")
+        angebot_id = re.fullmatch(r'Angebot_ID == "(.*)"', params["criteria"])[1]
+        data = [
+            {"ID": record_id}
+            for record_id, record in self.records.items()
+            if record["Angebot_ID"] == angebot_id
+        ]
+        if not data:
+            raise NoRecordsException("GET report/Angebote: HTTP 404, Zoho-Code 3100")
+        return {"data": data}
+
+    def post(self, url, json=None):
+        self.calls.append(("POST", json["data"]["Angebot_ID"]))
+        self.fail("POST")
+        record_id = str(len(self.records) + 1)
+        self.records[record_id] = json["data"]
+        if self.lose_response:
+            self.lose_response = False
+            raise TransportException("POST form/Angebot: Timeout")
+        return {"data": {"ID": record_id}}
+
+    def patch(self, url, json=None):
+        self.calls.append(("PATCH", url.rsplit("/", 1)[1], json["data"]))
+        self.fail("PATCH")
+        return {"data": json["data"]}
+
+
+class ZohoOutboxTest(TestCase):
+    def setUp(self):
+        self.zoho = StubZoho()
+        for target, value in (
+            ("get_zoho_client", lambda: self.zoho),
+            ("connector.log_and_notify", lambda message: None),
+        ):
+            patcher = mock.patch(f"vertrieb_interface.zoho_outbox.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def update(self, zoho_id, **data):
+        return zoho_outbox.enqueue(
+            ZohoOutbox.UPDATE_KUNDE, f"Privatkunde:{zoho_id}", {"data": data}
+        )
+
+    def push(self, angebot_id):
+        return zoho_outbox.enqueue(
+            ZohoOutbox.PUSH_ANGEBOT,
+            f"Angebot:{angebot_id}",
+            {"data": {"Angebot_ID": angebot_id}},
+            idempotency_key=f"{ZohoOutbox.PUSH_ANGEBOT}:{angebot_id}",
+            source_id=angebot_id,
+        )
+
+    def make_due(self):
+        """Backoff und Übernahmen gelten als abgelaufen."""
+        past = timezone.now() - datetime.timedelta(seconds=1)
+        ZohoOutbox.objects.filter(status=ZohoOutbox.PENDING).update(
+            next_attempt_at=past
+        )
+        ZohoOutbox.objects.filter(status=ZohoOutbox.SENDING).update(locked_until=past)
+
+    def status(self, entry):
+        entry.refresh_from_db()
+        return entry.status
+
+    def test_record_keys(self):
+        ticket = SimpleNamespace(ticket_id="NV-1")
+        angebot = SimpleNamespace(angebot_id="AN-1")
+        with mock.patch.object(
+            zoho_outbox.connector, "ticket_payload", return_value={"data": {}}
+        ), mock.patch.object(
+            zoho_outbox.connector, "angebot_payload", return_value={"data": {}}
+        ):
+            ticket_entry = zoho_outbox.enqueue_ticket(ticket, "42")
+            angebot_entry = zoho_outbox.enqueue_angebot(angebot, "42")
+        self.assertEqual(ticket_entry.record_key, "Ticket:NV-1")
+        self.assertEqual(angebot_entry.record_key, "Angebot:AN-1")
+
+    def test_sends_in_creation_order(self):
+        self.update("1", Email="a@example.com")
+        self.push("AN-1")
+        self.update("2", Email="b@example.com")
+        stats = zoho_outbox.drain()
+        self.assertEqual(stats["done"], 3)
+        self.assertEqual(
+            self.zoho.calls,
+            [
+                ("PATCH", "1", {"Email": "a@example.com"}),
+                ("POST", "AN-1"),
+                ("PATCH", "2", {"Email": "b@example.com"}),
+            ],
+        )
+
+    def test_retry_blocks_later_entries_of_same_record(self):
+        self.zoho.failures["PATCH"].append(ServerErrorException("HTTP 503"))
+        first = self.update("1", Email="alt@example.com")
+        self.assertEqual(zoho_outbox.drain()["retry"], 1)
+        self.assertEqual(ZohoOutbox.objects.get(pk=first.pk).attempts, 1)
+
+        # der jüngere Eintrag wartet, solange der ältere im Backoff hängt
+        second = self.update("1", Email="neu@example.com")
+        other = self.update("2", Email="x@example.com")
+        self.assertEqual(zoho_outbox.drain()["done"], 1)
+        self.assertEqual(self.status(second), ZohoOutbox.PENDING)
+        self.assertEqual(self.status(other), ZohoOutbox.DONE)
+
+        # nach dem Backoff überholt der jüngere den älteren
+        self.make_due()
+        stats = zoho_outbox.drain()
+        self.assertEqual((stats["superseded"], stats["done"]), (1, 1))
+        self.assertEqual(self.status(first), ZohoOutbox.SUPERSEDED)
+        self.assertEqual(self.status(second), ZohoOutbox.DONE)
+        patches = [call for call in self.zoho.calls if call[1] == "1"]
+        self.assertEqual(
+            patches,
+            [
+                ("PATCH", "1", {"Email": "alt@example.com"}),
+                ("PATCH", "1", {"Email": "neu@example.com"}),
+            ],
+        )
+
+    def test_superseded_update_is_not_sent(self):
+        entries = [self.update("1", Telefon=str(number)) for number in range(3)]
+        stats = zoho_outbox.drain()
+        self.assertEqual((stats["superseded"], stats["done"]), (2, 1))
+        self.assertEqual(
+            [self.status(entry) for entry in entries],
+            [ZohoOutbox.SUPERSEDED, ZohoOutbox.SUPERSEDED, ZohoOutbox.DONE],
+        )
+        self.assertEqual(self.zoho.calls, [("PATCH", "1", {"Telefon": "2"})])
+
+    def test_lease_of_dead_worker_expires(self):
+        entry = self.push("AN-1")
+        # Worker übernimmt den Eintrag und stirbt vor dem Zoho-Aufruf
+        dead = zoho_outbox.claim(entry.pk)
+        self.assertEqual(dead.status, ZohoOutbox.SENDING)
+        self.assertEqual(zoho_outbox.drain()["done"], 0)
+        self.assertEqual(self.zoho.calls, [])
+
+        self.make_due()
+        self.assertEqual(zoho_outbox.drain()["done"], 1)
+        self.assertEqual(self.zoho.calls, [("POST", "AN-1")])
+
+        # ein verspätetes Ergebnis des alten Workers überschreibt nichts
+        dead.status = ZohoOutbox.FAILED
+        self.assertIsNone(zoho_outbox.finish(dead))
+        self.assertEqual(self.status(entry), ZohoOutbox.DONE)
+
+    def test_lost_post_response_does_not_create_second_record(self):
+        self.zoho.lose_response = True
+        entry = self.push("AN-1")
+        self.assertEqual(zoho_outbox.drain()["retry"], 1)
+        entry.refresh_from_db()
+        self.assertIsNotNone(entry.dispatched_at)
+
+        self.make_due()
+        self.assertEqual(zoho_outbox.drain()["done"], 1)
+        self.assertEqual(len(self.zoho.records), 1)
+        self.assertEqual([call[0] for call in self.zoho.calls], ["POST", "GET"])
+        entry.refresh_from_db()
+        self.assertEqual(entry.zoho_record_id, "1")
+
+    def test_retry_after_failed_post_posts_again(self):
+        self.zoho.failures["POST"].append(ServerErrorException("HTTP 503"))
+        entry = self.push("AN-1")
+        self.assertEqual(zoho_outbox.drain()["retry"], 1)
+        self.make_due()
+        self.assertEqual(zoho_outbox.drain()["done"], 1)
+        self.assertEqual([call[0] for call in self.zoho.calls], ["POST", "GET", "POST"])
+        self.assertEqual(len(self.zoho.records), 1)
+        self.assertEqual(self.status(entry), ZohoOutbox.DONE)
+
+
+class StaticSectionsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_prices()
+        cls.documents = build_documents(seed_users(), 2)
+
+    def setUp(self):
+        static_sections.clear()
+        self.addCleanup(static_sections.clear)
+
+    def pdf(self, document, index):
+        _, angebot, ticket, user = self.documents[index]
+        # frisch geladen, `data` verändert die `arbeits_liste` der Instanz
+        angebot = type(angebot).objects.get(pk=angebot.pk)
+        return CREATION_DATE_RE.sub(b"", render(document, angebot, ticket, user))
+
+    def test_replayed_section_matches_live_output(self):
+        for document in ("angebot", "angebot_calc"):
+            with self.subTest(document):
+                static_sections.clear()
+                live = self.pdf(document, 1)
+
+                # die AGB aus dem ersten Dokument aufzeichnen, im zweiten übernehmen
+                static_sections.clear()
+                self.pdf(document, 0)
+                with mock.patch.object(
+                    static_sections.Section,
+                    "replay",
+                    autospec=True,
+                    side_effect=static_sections.Section.replay,
+                ) as replay:
+                    replayed = self.pdf(document, 1)
+                self.assertEqual(replay.call_count, 1)
+                self.assertEqual(replayed, live)
+
+
+class RepricingScheduleTest(TestCase):
+    def setUp(self):
+        enabled = mock.patch("vertrieb_interface.repricing.REPRICING_ENABLED", True)
+        apply_async = mock.patch.object(reprice_open_vertrieb_rows, "apply_async")
+        enabled.start()
+        self.apply_async = apply_async.start()
+        self.addCleanup(mock.patch.stopall)
+
+    def change_price(self, price="1000"):
+        KwpPreise.objects.update_or_create(
+            name="Pauschal", defaults={"price": Decimal(price)}
+        )
+
+    def test_one_run_per_delay(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.change_price("1000")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.change_price("1100")
+        self.assertEqual(self.apply_async.call_count, 1)
+        due_at = PriceCatalogVersion.objects.get(pk=1).repricing_due_at
+        self.assertGreater(due_at, timezone.now())
+
+        # ist der Lauf gestartet, reiht die nächste Änderung wieder ein
+        PriceCatalogVersion.objects.filter(pk=1).update(
+            repricing_due_at=timezone.now() - datetime.timedelta(seconds=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.change_price("1200")
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_broker_failure_releases_lock(self):
+        self.apply_async.side_effect = ConnectionError("kein Broker")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.change_price()
+        self.assertIsNone(PriceCatalogVersion.objects.get(pk=1).repricing_due_at)
+        self.apply_async.side_effect = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.change_price("1100")
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_not_scheduled_while_seeding_or_disabled(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            seed_prices()
+        self.assertEqual(callbacks, [])
+        with mock.patch("vertrieb_interface.repricing.REPRICING_ENABLED", False):
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.change_price()
+        self.assertEqual(callbacks, [])
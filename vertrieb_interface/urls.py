@@ -28,6 +28,17 @@ vertrieb_patterns = [
         views.reset_calculator,
         name="reset_calculator",
     ),
+    path("vertrieb/api/calc/", views.calc_api, name="calc_api"),
+    path(
+        "vertrieb/api/zoho_sync_status/",
+        views.zoho_sync_status,
+        name="zoho_sync_status",
+    ),
+    path(
+        "vertrieb/api/angebot/<str:angebot_id>/varianten/",
+        views.angebot_varianten_api,
+        name="angebot_varianten_api",
+    ),
     path(
         "vertrieb/edit_angebot/map/<str:angebot_id>/", views.map_view, name="map_view"
     ),
@@ -136,6 +147,7 @@ path(
         views.pdfticket_list_view,
         name="PDFTicketListView",
     ),
+    path("pdf_job_status/<int:job_id>/", views.pdf_job_status, name="pdf_job_status"),
     path("serve_pdf/<str:angebot_id>/", views.serve_pdf, name="serve_pdf"),
     path(
         "serve_calc_pdf/<str:angebot_id>/", views.serve_calc_pdf, name="serve_calc_pdf"
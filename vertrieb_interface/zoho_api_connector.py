@@ -1,119 +1,66 @@
-import time
-import requests
-from dotenv import load_dotenv
 import datetime
-import requests
 import json
+
+from django.utils import timezone
+
 from vertrieb_interface.telegram_logs_sender import send_message_to_bot
-from config.settings import (
-    ZOHO_CLIENT_ID,
-    ZOHO_CLIENT_SECRET,
-    ZOHO_REFRESH_TOKEN,
-    ACCESS_TOKEN_URL,
-    BASE_URL,
+from config.settings import BASE_URL, ZOHO_ANGEBOT_FORM_URL
+from shared.zoho_client import (
+    APIException,
+    RateLimitExceededException,
+    UnauthorizedException,
+    get_zoho_client,
 )
 
 VERTRIEB_URL = f"{BASE_URL}/Privatkunden_API"
 ANGEBOTE_URL = f"{BASE_URL}/Angebote"
 PROVISIONE_URL = f"{BASE_URL}/Provision_alle_PVA"
-HTTP_OK = 200
-HTTP_UNAUTHORIZED = 401
+ANGEBOT_FORM_URL = ZOHO_ANGEBOT_FORM_URL
 LIMIT_ALL = 200
 LIMIT_CURRENT = 200
-MAX_RETRIES = 2
-SLEEP_TIME = 2
-
-load_dotenv()
-session = requests.Session()
-
-
-class APIException(Exception):
-    pass
-
-
-class UnauthorizedException(APIException):
-    pass
 
 
-class RateLimitExceededException(APIException):
-    pass
+EXCLUDED_STATUS = ("storniert", "abgelehnt", "nicht qualifiziert")
+ZOHO_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 
-token_info = {"access_token": None, "expires_at": 0}
+def zoho_datetime(value):
+    """Zeitpunkt im Format der Creator-Kriterien, z. B. "18-Oct-2026 14:05:00" (lokale Zeit)."""
+    value = timezone.localtime(value)
+    return f"{value.day:02d}-{ZOHO_MONTHS[value.month - 1]}-{value.year} {value:%H:%M:%S}"
 
 
-def refresh_access_token():
+def kunden_criteria(user, modified_since=None):
     """
-    Refresh the access token using the refresh token.
-    """
-    global token_info
-
-    current_time = time.time()
-    if current_time < token_info["expires_at"]:
-        return token_info["access_token"]
-
-    token_data = {
-        "refresh_token": ZOHO_REFRESH_TOKEN,
-        "client_id": ZOHO_CLIENT_ID,
-        "client_secret": ZOHO_CLIENT_SECRET,
-        "grant_type": "refresh_token",
-    }
-    try:
-        response = requests.post(ACCESS_TOKEN_URL, data=token_data)
-        response.raise_for_status()
-
-        token_info["access_token"] = response.json()["access_token"]
-        token_info["expires_at"] = current_time + response.json()["expires_in"]
-
-        return token_info["access_token"]
-    except:
-        print(f"Error refreshing access token")
+    Kriterium für die Privatkunden eines Vertrieblers (Admins/Manager: alle).
 
-
-def fetch_data_from_api(url, params=None):
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers, params=params)
-
-    if response.status_code == HTTP_OK:
-
-        return response.json()
-    else:
-
-        time.sleep(SLEEP_TIME)
-
-    return None
-
-
-def fetch_user_angebote_all(request):
-    user = request.user
-    start_index = 1
-    all_user_angebots_list = []
+    Ohne `modified_since` der volle Bestand, mit nur die seitdem geänderten
+    Datensätze – ohne Status-Filter, damit auch stornierte/abgelehnte Kunden
+    ankommen und lokal entfernt werden können.
+    """
     if user.role.name == "admin" or user.role.name == "manager":
-        crit = f'Vertriebler.ID != null && Anfrage_vom > today.subDay({user.records_fetch_limit}) && (Status == null || Status == "" || (Status != "storniert" && Status != "abgelehnt" && Status != "nicht qualifiziert"))'
+        scope = "Vertriebler.ID != null"
     else:
-        crit = f'Vertriebler.ID == {user.zoho_id} && Anfrage_vom > today.subDay({user.records_fetch_limit}) && (Status == null || Status == "" || (Status != "storniert" && Status != "abgelehnt" && Status != "nicht qualifiziert"))'
-    while True:
-        params = {
-            "from": start_index,
-            "limit": LIMIT_ALL,
-            "criteria": crit,
-        }
+        scope = f"Vertriebler.ID == {user.zoho_id}"
+    if modified_since is not None:
+        return f'{scope} && Modified_Time > "{zoho_datetime(modified_since)}"'
+    return f'{scope} && Anfrage_vom > today.subDay({user.records_fetch_limit}) && (Status == null || Status == "" || (Status != "storniert" && Status != "abgelehnt" && Status != "nicht qualifiziert"))'
 
-        data = fetch_data_from_api(VERTRIEB_URL, params)
 
-        if data is None or not data.get("data"):
+def fetch_kunden(user, modified_since=None):
+    kunden = []
+    for records in get_zoho_client().iter_pages(
+        VERTRIEB_URL,
+        {"criteria": kunden_criteria(user, modified_since)},
+        limit=LIMIT_ALL,
+        start=1,
+    ):
+        kunden.extend(process_all_user_data({"data": records}))
+    return kunden
 
-            break
-        else:
-
-            all_user_angebots_list.extend(process_all_user_data(data))
 
-            start_index += LIMIT_ALL
-            if len(data.get("data")) < LIMIT_ALL:
-                break
-
-    return all_user_angebots_list
+def fetch_user_angebote_all(request):
+    return fetch_kunden(request.user)
 
 
 def log_and_notify(message):
@@ -238,14 +185,8 @@ def process_all_user_data(data):
 def fetch_angenommen_status(request, zoho_id):
     user = request.user
     url = f"{VERTRIEB_URL}/{zoho_id}"
-
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    response = requests.get(url, headers=headers)
-    data = response.json()
-    data = data.get("data")
-    return data
+    data = get_zoho_client().get(url)
+    return data.get("data")
 
 
 def process_current_user_data(data, current_angebot_list):
@@ -272,26 +213,6 @@ def process_current_user_data(data, current_angebot_list):
     return current_angebot_list
 
 
-def update_status(zoho_id, new_status):
-    update_url = f"{VERTRIEB_URL}/{zoho_id}"
-
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    current_datetime = datetime.datetime.now()
-    bekommen_am = current_datetime.strftime("%d-%b-%Y")
-
-    payload = {
-        "data": {
-            "Status": new_status,
-            "Angebot_bekommen_am": bekommen_am,
-        }
-    }
-
-    response = requests.put(update_url, headers=headers, json=payload)
-    return response.json()
-
-
 def escape_unicode_chars(s):
     """
     Manually replace specific unicode characters with their escape sequences.
@@ -308,7 +229,8 @@ def escape_unicode_chars(s):
     return s
 
 
-def put_form_data_to_zoho_jpp(form):
+def kunde_payload(form):
+    """(zoho_id, payload) für die Aktualisierung eines Privatkunden aus dem Angebotsformular."""
     # Extract data from form
     form_data = {field: form.cleaned_data.get(field) for field in form.fields}
 
@@ -319,11 +241,6 @@ def put_form_data_to_zoho_jpp(form):
     if not zoho_id:
         raise ValueError("Zoho ID and new status are required")
 
-    update_url = f"{VERTRIEB_URL}/{zoho_id}"
-
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-
     anrede = form_data.get("anrede")
     name_first_name = form_data.get("name_first_name")
     name_suffix = form_data.get("name_suffix")
@@ -356,23 +273,14 @@ def put_form_data_to_zoho_jpp(form):
             },
         }
     }
-
-    headers["Content-Type"] = "application/json"
-
-    response = requests.patch(update_url, headers=headers, json=payload)
-
-    return response.json()
+    return zoho_id, payload
 
 
 def return_lower_bull(val):
     return "true" if val else "false"
 
 
-def pushAngebot(vertrieb_angebot, user_zoho_id):
-    url = f"https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/form/Angebot"
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-
+def angebot_payload(vertrieb_angebot, user_zoho_id):
     date_obj_gultig = datetime.datetime.strptime(
         vertrieb_angebot.angebot_gultig, "%d.%m.%Y"
     )
@@ -425,23 +333,10 @@ def pushAngebot(vertrieb_angebot, user_zoho_id):
             "Finanzierung": return_lower_bull(vertrieb_angebot.finanzierung),
         }
     }
-    try:
-        response = requests.post(url, json=dataMap, headers=headers)
-        response_data = response.json()
-        new_record_id = response_data["data"]["ID"]
-        log_and_notify(
-            f"Neue Angebot nach Zoho gesendet record ID: {new_record_id}, Angebotssumme: {vertrieb_angebot.angebotsumme}"
-        )
-        return response
-    except:
-        pass
-
-
-def pushTicket(vertrieb_ticket, user_zoho_id):
-    url = f"https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/form/Angebot"
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
+    return dataMap
 
+
+def ticket_payload(vertrieb_ticket, user_zoho_id):
     date_obj_gultig = datetime.datetime.strptime(
         vertrieb_ticket.angebot_gultig, "%d.%m.%Y"
     )
@@ -490,27 +385,4 @@ def pushTicket(vertrieb_ticket, user_zoho_id):
             "Angebotssumme": str(vertrieb_ticket.angebotsumme),
         }
     }
-    try:
-        response = requests.post(url, json=dataMap, headers=headers)
-        response_data = response.json()
-        new_record_id = response_data["data"]["ID"]
-        log_and_notify(
-            f"Neuen Nachverkauf nach Zoho gesendet record ID: {new_record_id}, Angebotssumme: {vertrieb_ticket.angebotsumme}"
-        )
-        return response
-    except:
-        pass
-
-
-def delete_redundant_angebot(angebot_zoho_id):
-    url = f"https://creator.zoho.eu/api/v2/junosolar/juno-kleinanlagen-portal/report/Angebote/{angebot_zoho_id}"
-    access_token = refresh_access_token()
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    response = requests.delete(url, headers=headers)
-    if not response:
-
-        pass
-    else:
-
-        pass
\ No newline at end of file
+    return dataMap
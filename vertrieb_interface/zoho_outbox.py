@@ -0,0 +1,327 @@
+"""
+Transaktionale Outbox für Schreibzugriffe auf Zoho.
+
+Views schreiben statt eines direkten API-Aufrufs einen `ZohoOutbox`-Eintrag – in
+derselben Transaktion wie die lokale Änderung, d. h. entweder beides oder nichts.
+`tasks.drain_zoho_outbox` sendet die Einträge danach im Hintergrund:
+
+- je `record_key` strikt in Anlegereihenfolge; ein fälliger Eintrag wartet, solange
+  ein älterer für denselben Datensatz offen ist (auch wenn der gerade im Backoff hängt),
+- ohne offene Transaktion während des Zoho-Aufrufs: ein Worker übernimmt den Eintrag in
+  einer kurzen Transaktion (`sending` bis `locked_until`), ruft Zoho auf und trägt das
+  Ergebnis in einer zweiten ein; stirbt er dazwischen, wird der Eintrag nach Ablauf von
+  `ZOHO_OUTBOX_LEASE` wieder fällig,
+- mit Wiederholungen und wachsendem Abstand bis `ZOHO_OUTBOX_MAX_ATTEMPTS`, danach
+  `failed` plus Telegram-Meldung; nichts verschwindet stillschweigend,
+- idempotent: ein offener Eintrag je `idempotency_key`; vor dem ersten POST von `push_*`
+  wird `dispatched_at` committet, und ist es gesetzt, wird vor jedem weiteren Versuch in
+  Zoho nach der Angebot_ID gesucht, damit ein zwar angekommener, aber nicht mehr
+  bestätigter POST keinen zweiten Datensatz erzeugt,
+- gebündelt: mehrere offene Kundendaten-Updates desselben Datensatzes werden zum
+  letzten Stand zusammengefasst (ältere gelten als `superseded`).
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from config.settings import (
+    ZOHO_OUTBOX_BATCH_SIZE,
+    ZOHO_OUTBOX_LEASE,
+    ZOHO_OUTBOX_MAX_ATTEMPTS,
+)
+from shared.zoho_client import (
+    APIException,
+    NoRecordsException,
+    NotFoundException,
+    RateLimitExceededException,
+    ServerErrorException,
+    TransportException,
+    UnauthorizedException,
+    get_zoho_client,
+)
+from vertrieb_interface import zoho_api_connector as connector
+from vertrieb_interface.models import VertriebAngebot, VertriebTicket, ZohoOutbox
+
+logger = logging.getLogger(__name__)
+
+# Abstand der Wiederholungen: 30 s, 1 min, 2 min, ... höchstens eine Stunde
+RETRY_BASE = datetime.timedelta(seconds=30)
+RETRY_MAX = datetime.timedelta(hours=1)
+# Fehler, bei denen eine spätere Wiederholung Aussicht auf Erfolg hat
+TRANSIENT_ERRORS = (
+    RateLimitExceededException,
+    ServerErrorException,
+    TransportException,
+    UnauthorizedException,
+)
+
+
+def payload_hash(payload):
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def enqueue(operation, record_key, payload, idempotency_key=None, source_id=""):
+    """
+    Legt einen Outbox-Eintrag an und stößt nach dem Commit das Abarbeiten an.
+    Gibt es schon einen offenen Eintrag mit demselben `idempotency_key`
+    (Standard: Operation, Datensatz und Payload), wird dieser zurückgegeben.
+    """
+    if idempotency_key is None:
+        idempotency_key = f"{operation}:{record_key}:{payload_hash(payload)}"
+    entry, _ = ZohoOutbox.objects.get_or_create(
+        idempotency_key=idempotency_key,
+        status__in=ZohoOutbox.OPEN,
+        defaults={
+            "status": ZohoOutbox.PENDING,
+            "operation": operation,
+            "record_key": record_key,
+            "payload": payload,
+            "source_id": source_id,
+        },
+    )
+    transaction.on_commit(schedule_drain)
+    return entry
+
+
+def enqueue_angebot(vertrieb_angebot, user_zoho_id):
+    return enqueue(
+        ZohoOutbox.PUSH_ANGEBOT,
+        f"Angebot:{vertrieb_angebot.angebot_id}",
+        connector.angebot_payload(vertrieb_angebot, user_zoho_id),
+        idempotency_key=f"{ZohoOutbox.PUSH_ANGEBOT}:{vertrieb_angebot.angebot_id}",
+        source_id=vertrieb_angebot.angebot_id,
+    )
+
+
+def enqueue_ticket(vertrieb_ticket, user_zoho_id):
+    return enqueue(
+        ZohoOutbox.PUSH_TICKET,
+        f"Ticket:{vertrieb_ticket.ticket_id}",
+        connector.ticket_payload(vertrieb_ticket, user_zoho_id),
+        idempotency_key=f"{ZohoOutbox.PUSH_TICKET}:{vertrieb_ticket.ticket_id}",
+        source_id=vertrieb_ticket.ticket_id,
+    )
+
+
+def enqueue_kunde_update(form):
+    zoho_id, payload = connector.kunde_payload(form)
+    return enqueue(ZohoOutbox.UPDATE_KUNDE, f"Privatkunde:{zoho_id}", payload)
+
+
+def schedule_drain():
+    """Reiht `drain_zoho_outbox` ein; ohne Broker übernimmt der nächste Beat-Lauf."""
+    from vertrieb_interface.tasks import drain_zoho_outbox
+
+    try:
+        drain_zoho_outbox.delay()
+    except Exception as e:
+        logger.warning(
+            f"Zoho-Outbox: Abarbeiten nicht eingereiht ({e}), Beat holt es nach"
+        )
+
+
+def record_id(entry):
+    """Zoho-ID aus `record_key` ("Privatkunde:123" -> "123")."""
+    return entry.record_key.split(":", 1)[1]
+
+
+def find_pushed_angebot(angebot_id):
+    """ID eines schon angelegten Zoho-Angebots mit dieser Angebot_ID, sonst None."""
+    try:
+        response = get_zoho_client().get(
+            connector.ANGEBOTE_URL, {"criteria": f'Angebot_ID == "{angebot_id}"'}
+        )
+    except (NoRecordsException, NotFoundException):
+        return None
+    records = response.get("data") or []
+    return records[0]["ID"] if records else None
+
+
+def push(entry, model, id_field):
+    """POST eines Angebots/Nachverkaufs; die neue Zoho-ID landet am lokalen Objekt."""
+    new_record_id = None
+    if entry.dispatched_at:
+        new_record_id = find_pushed_angebot(entry.payload["data"]["Angebot_ID"])
+    if new_record_id is None:
+        # eigene, sofort committete Transaktion: auch wenn der Worker nach dem POST
+        # stirbt, sieht der nächste Versuch, dass schon gesendet worden sein kann
+        entry.dispatched_at = timezone.now()
+        with transaction.atomic():
+            ZohoOutbox.objects.filter(pk=entry.pk).update(
+                dispatched_at=entry.dispatched_at
+            )
+        response_data = get_zoho_client().post(
+            connector.ANGEBOT_FORM_URL, json=entry.payload
+        )
+        new_record_id = response_data["data"]["ID"]
+        connector.log_and_notify(
+            f"{entry.get_operation_display()} nach Zoho gesendet record ID: {new_record_id}, Angebotssumme: {entry.payload['data'].get('Angebotssumme')}"
+        )
+    model.objects.filter(**{id_field: entry.source_id}).update(
+        angebot_zoho_id=new_record_id
+    )
+    return new_record_id
+
+
+def send(entry):
+    """Führt den Schreibzugriff aus; liefert die Zoho-ID des betroffenen Datensatzes."""
+    client = get_zoho_client()
+    if entry.operation == ZohoOutbox.PUSH_ANGEBOT:
+        return push(entry, VertriebAngebot, "angebot_id")
+    if entry.operation == ZohoOutbox.PUSH_TICKET:
+        return push(entry, VertriebTicket, "ticket_id")
+    if entry.operation == ZohoOutbox.UPDATE_KUNDE:
+        client.patch(f"{connector.VERTRIEB_URL}/{record_id(entry)}", json=entry.payload)
+        return record_id(entry)
+    raise ValueError(f"Unbekannte Outbox-Operation {entry.operation}")
+
+
+def is_superseded(entry):
+    """Ein jüngeres offenes Kundendaten-Update desselben Datensatzes überschreibt dieses ohnehin."""
+    return (
+        entry.operation == ZohoOutbox.UPDATE_KUNDE
+        and ZohoOutbox.objects.filter(
+            record_key=entry.record_key,
+            operation=ZohoOutbox.UPDATE_KUNDE,
+            status=ZohoOutbox.PENDING,
+            id__gt=entry.id,
+        ).exists()
+    )
+
+
+def due_q(now):
+    """Wartende fällige Einträge und solche, deren Worker die Übernahme nicht beendet hat."""
+    return Q(status=ZohoOutbox.PENDING, next_attempt_at__lte=now) | Q(
+        status=ZohoOutbox.SENDING, locked_until__lte=now
+    )
+
+
+def due_entries(now=None):
+    """Fällige offene Einträge ohne älteren offenen Vorgänger für denselben Datensatz."""
+    earlier_open = ZohoOutbox.objects.filter(
+        record_key=OuterRef("record_key"),
+        status__in=ZohoOutbox.OPEN,
+        id__lt=OuterRef("id"),
+    )
+    return (
+        ZohoOutbox.objects.filter(due_q(now or timezone.now()))
+        .filter(~Exists(earlier_open))
+        .order_by("id")
+    )
+
+
+def claim(entry_id):
+    """
+    Übernimmt einen fälligen Eintrag für `ZOHO_OUTBOX_LEASE` Sekunden (kurze eigene
+    Transaktion); None, wenn ein anderer Worker ihn hat oder er nicht mehr fällig ist.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        entry = (
+            ZohoOutbox.objects.select_for_update(skip_locked=True)
+            .filter(due_q(now), pk=entry_id)
+            .first()
+        )
+        if entry is None:
+            return None
+        entry.status = ZohoOutbox.SENDING
+        entry.locked_until = now + datetime.timedelta(seconds=ZOHO_OUTBOX_LEASE)
+        entry.save(update_fields=["status", "locked_until", "updated_at"])
+    return entry
+
+
+def finish(entry):
+    """Trägt das Ergebnis ein, sofern der Eintrag noch von diesem Worker übernommen ist."""
+    with transaction.atomic():
+        current = (
+            ZohoOutbox.objects.select_for_update()
+            .filter(
+                pk=entry.pk,
+                status=ZohoOutbox.SENDING,
+                locked_until=entry.locked_until,
+            )
+            .first()
+        )
+        if current is None:
+            logger.warning(f"Zoho-Outbox: {entry} wurde inzwischen neu übernommen")
+            return None
+        entry.locked_until = None
+        entry.save()
+    return entry.status
+
+
+def process_entry(entry_id):
+    """
+    Sendet einen Eintrag; liefert den neuen Status oder None, wenn ein anderer Worker
+    ihn gerade bearbeitet bzw. schon erledigt hat. Der Zoho-Aufruf läuft außerhalb jeder
+    Transaktion, damit Zeilen des Rate-Limiters nicht bis zum Ende gesperrt bleiben.
+    """
+    entry = claim(entry_id)
+    if entry is None:
+        return None
+    if is_superseded(entry):
+        entry.status = ZohoOutbox.SUPERSEDED
+        return finish(entry)
+    try:
+        entry.zoho_record_id = str(send(entry) or "")
+        entry.status = ZohoOutbox.DONE
+        entry.sent_at = timezone.now()
+        entry.last_error = ""
+    except (APIException, KeyError, ValueError) as e:
+        entry.attempts += 1
+        entry.last_error = str(e)
+        permanent = not isinstance(e, TRANSIENT_ERRORS)
+        if permanent or entry.attempts >= ZOHO_OUTBOX_MAX_ATTEMPTS:
+            entry.status = ZohoOutbox.FAILED
+            connector.log_and_notify(
+                f"Zoho-Outbox: {entry} endgültig fehlgeschlagen nach {entry.attempts} Versuch(en): {e}"
+            )
+        else:
+            entry.status = ZohoOutbox.PENDING
+            entry.next_attempt_at = timezone.now() + min(
+                RETRY_BASE * 2 ** (entry.attempts - 1), RETRY_MAX
+            )
+            logger.warning(
+                f"Zoho-Outbox: {entry} fehlgeschlagen ({e}), Versuch {entry.attempts}"
+            )
+    return finish(entry)
+
+
+def drain(batch_size=ZOHO_OUTBOX_BATCH_SIZE):
+    """
+    Arbeitet bis zu `batch_size` fällige Einträge ab. Scheitert ein Eintrag, bleiben
+    die übrigen desselben Datensatzes für diesen Lauf liegen.
+    """
+    stats = {"done": 0, "superseded": 0, "retry": 0, "failed": 0}
+    blocked = set()
+    processed = 0
+    while processed < batch_size:
+        entries = [
+            entry
+            for entry in due_entries().only("id", "record_key")[
+                : batch_size - processed
+            ]
+            if entry.record_key not in blocked
+        ]
+        if not entries:
+            break
+        for entry in entries:
+            if entry.record_key in blocked:
+                continue
+            status = process_entry(entry.id)
+            processed += 1
+            if status == ZohoOutbox.PENDING:
+                stats["retry"] += 1
+            elif status is not None:
+                stats[status] += 1
+            if status not in (ZohoOutbox.DONE, ZohoOutbox.SUPERSEDED):
+                blocked.add(entry.record_key)
+    return stats
@@ -0,0 +1,110 @@
+"""
+Delta-Sync der Privatkunden eines Vertrieblers aus Zoho in die Tabelle `ZohoKunde`.
+
+Statt bei jedem Aufruf den vollen Bestand zu laden, werden nur die seit dem
+letzten Abruf geänderten Datensätze (`Modified_Time`) geholt und per `zoho_id`
+upserted. Stornierte/abgelehnte Kunden und Anfragen außerhalb von
+`records_fetch_limit` werden dabei gelöscht. Gelöschte Datensätze sieht der
+Delta-Abruf nicht; die fängt der nächtliche Vollabgleich
+(`tasks.reconcile_zoho_kunden`) auf.
+"""
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from config.settings import ZOHO_SYNC_TTL
+from vertrieb_interface.models import ZohoKunde
+from vertrieb_interface.zoho_api_connector import (
+    EXCLUDED_STATUS,
+    ZOHO_MONTHS,
+    fetch_kunden,
+)
+
+# Überlappung des Abfragefensters gegen Uhrabweichungen und Datensätze,
+# die während des letzten Abrufs geändert wurden
+SYNC_OVERLAP = datetime.timedelta(minutes=5)
+# Spalten, die ein Upsert überschreibt (alles außer Schlüssel und created_at)
+KUNDE_UPDATE_FIELDS = [
+    "vertriebler_id",
+    "name",
+    "status",
+    "status_pva",
+    "zoho_kundennumer",
+    "angenommenes_angebot",
+    "anfrage_vom",
+    "data",
+    "updated_at",
+]
+
+
+def parse_zoho_date(value):
+    """ "18-Oct-2026" -> date; None, wenn leer oder unbekanntes Format."""
+    try:
+        day, month, year = value.split("-")
+        return datetime.date(int(year), ZOHO_MONTHS.index(month) + 1, int(day))
+    except (AttributeError, ValueError):
+        return None
+
+
+def kunde_row(user, kunde):
+    """`ZohoKunde` aus einem Eintrag von `process_all_user_data`."""
+    return ZohoKunde(
+        user=user,
+        zoho_id=kunde["zoho_id"],
+        vertriebler_id=kunde.get("vertriebler_id") or "",
+        name=kunde.get("name") or "",
+        status=kunde.get("status") or "",
+        status_pva=kunde.get("status_pva") or "",
+        zoho_kundennumer=kunde.get("zoho_kundennumer") or "",
+        angenommenes_angebot=kunde.get("angenommenes_angebot") or "",
+        anfrage_vom=parse_zoho_date(kunde.get("anfrage_vom")),
+        data=kunde,
+    )
+
+
+def is_stale(user):
+    """Die Kundendaten sind älter als `ZOHO_SYNC_TTL` oder wurden noch nie geladen."""
+    return user.zoho_synced_at is None or (
+        timezone.now() - user.zoho_synced_at
+    ).total_seconds() > ZOHO_SYNC_TTL
+
+
+def sync_user_kunden(user, full=False):
+    """
+    Aktualisiert die `ZohoKunde`-Zeilen des Benutzers.
+
+    Ohne bisherigen Abruf oder mit `full=True` ersetzt der volle Bestand die Zeilen,
+    sonst werden nur die seit `zoho_synced_at` geänderten Datensätze upserted.
+    Wirft `APIException` bei Zoho-Fehlern; die gespeicherten Daten bleiben dann unverändert.
+    """
+    started = timezone.now()
+    update_fields = ["zoho_synced_at"]
+    full = full or user.zoho_synced_at is None or user.zoho_full_synced_at is None
+    if full:
+        kunden = fetch_kunden(user)
+        user.zoho_full_synced_at = started
+        update_fields.append("zoho_full_synced_at")
+    else:
+        kunden = fetch_kunden(user, modified_since=user.zoho_synced_at - SYNC_OVERLAP)
+    # doppelte zoho_ids (z. B. während des Blätterns geändert): der letzte Stand gilt
+    rows = list({kunde["zoho_id"]: kunde_row(user, kunde) for kunde in kunden}.values())
+
+    with transaction.atomic():
+        own_kunden = ZohoKunde.objects.filter(user=user)
+        if full:
+            own_kunden.delete()
+            ZohoKunde.objects.bulk_create(rows, batch_size=500)
+        else:
+            ZohoKunde.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["user", "zoho_id"],
+                update_fields=KUNDE_UPDATE_FIELDS,
+            )
+            cutoff = timezone.localdate() - datetime.timedelta(days=user.records_fetch_limit)
+            own_kunden.filter(status__in=EXCLUDED_STATUS).delete()
+            own_kunden.filter(anfrage_vom__lte=cutoff).delete()
+        user.zoho_synced_at = started
+        user.save(update_fields=update_fields)